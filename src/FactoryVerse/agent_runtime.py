@@ -254,14 +254,64 @@ class FactoryVerseRuntime:
         query: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Execute DuckDB query."""
+        """Execute DuckDB query.
+        
+        map_db.show() syncs the chunks the query touches (or the whole map
+        when its area cannot be inferred) before running it.
+        """
         wrapped_code = f"""
 with playing_factorio():
-    result = map_db.connection.sql('''{query}''').show()
-    print(result)
+    print(await map_db.show('''{query}'''))
 """
         return self.execute_code(wrapped_code, compress_output=True, metadata=metadata)
     
+    def execute_map_changes(
+        self,
+        cursor: str = "llm",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Show what changed on the map since this cursor's last read.
+        
+        A compact diff for the model's turn instead of re-running broad
+        queries; the first call only registers the cursor.
+        """
+        wrapped_code = f"""
+from FactoryVerse.infra.change_feed import format_changes
+with playing_factorio():
+    print(format_changes(await map_db.changes_since({cursor!r})))
+"""
+        return self.execute_code(wrapped_code, compress_output=True, metadata=metadata)
+
+    def enable_profiling(self) -> str:
+        """Start per-method RCON/action profiling on the kernel's factory."""
+        code = """
+import FactoryVerse.dsl.dsl as _fv_dsl
+_fv_dsl._configured_factory.enable_profiling()
+print("⏱️ RCON profiling enabled")
+"""
+        return self.execute_code(code, compress_output=False)
+
+    def write_profile(self, name: str = "rcon_profile", reset: bool = False) -> str:
+        """Print the profiler table and write it to the session directory.
+
+        Args:
+            name: File name without extension (writes <name>.json and <name>.txt)
+            reset: Clear the profiler after writing
+        """
+        path = self.notebook_path.parent / name
+        code = f"""
+import FactoryVerse.dsl.dsl as _fv_dsl
+_fv_profiler = _fv_dsl._configured_factory.profiler
+if _fv_profiler is None:
+    print("⚠️ RCON profiling is not enabled")
+else:
+    print(_fv_profiler.format_table())
+    print(f"📝 Profile written to {{_fv_profiler.write({str(path)!r})}}")
+    if {reset!r}:
+        _fv_profiler.reset()
+"""
+        return self.execute_code(code, compress_output=False)
+
     def respond(
         self,
         message: str,
@@ -11,6 +11,7 @@ from .dsl import (
     get_reachable_entities,
     MapPosition,
 )
+from .multi_agent import MultiAgentFactory, FleetReport
 
 __all__ = [
     "walking",
@@ -24,4 +25,6 @@ __all__ = [
     "configure",
     "get_reachable_entities",
     "MapPosition",
+    "MultiAgentFactory",
+    "FleetReport",
 ]
@@ -7,7 +7,7 @@ import socket
 import threading
 import queue
 from pathlib import Path
-from typing import Any, Dict, Optional, Union, List, Literal, TYPE_CHECKING, Callable
+from typing import Any, Dict, Optional, Tuple, Union, List, Literal, TYPE_CHECKING, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +27,25 @@ from contextlib import contextmanager
 from FactoryVerse.dsl.types import Direction, MapPosition, BoundingBox
 from FactoryVerse.infra.udp_dispatcher import UDPDispatcher, get_udp_dispatcher
 from FactoryVerse.dsl.ghosts import GhostManager
+from FactoryVerse.dsl.entity.collection import EntityCollection
 from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.sync_journal import SyncJournal
+from FactoryVerse.infra.rcon_batch import RconBatch, RCON_MAX_COMMAND_BYTES
+from FactoryVerse.infra.rcon_transport import RconTransport
+from FactoryVerse.infra.rcon_pool import RconPool, ACTION_METHODS, command_methods
+from FactoryVerse.infra.rcon_profiler import RconProfiler
+from FactoryVerse.infra.rcon_dispatch import RemoteDispatcher
+from FactoryVerse.infra.action_registry import ActionRegistry, PROGRESS_EXTENDED_ACTIONS, get_action_registry
+from FactoryVerse.infra.json_codec import json_loads
 
 if TYPE_CHECKING:
     import duckdb
     from FactoryVerse.dsl.item.base import Item, PlaceableItem
     from FactoryVerse.dsl.entity.base import ReachableEntity
     from FactoryVerse.dsl.entity.remote_view_entity import RemoteViewEntity
+    from FactoryVerse.infra.shared_map import SharedMapNode
+    from FactoryVerse.infra.change_feed import ChangeFeed
+    from FactoryVerse.infra.subscriptions import Predicate
 
 
 # Import _playing_factory from types to break circular dependencies
@@ -51,7 +63,8 @@ class AsyncActionListener:
     def __init__(self, udp_dispatcher: Optional[UDPDispatcher] = None, 
                  agent_port: Optional[int] = None, 
                  host: str = "0.0.0.0",
-                 timeout: int = 30):
+                 timeout: int = 30,
+                 registry: Optional[ActionRegistry] = None):
         """
         Initialize the UDP listener.
         
@@ -60,16 +73,13 @@ class AsyncActionListener:
             agent_port: Optional direct UDP port for agent-specific messages. If provided, listens directly on this port.
             host: Host to bind to (only used if agent_port is provided)
             timeout: Default timeout in seconds for waiting on actions
+            registry: Action registry tracking completions (default: the process-wide one)
         """
         self.udp_dispatcher = udp_dispatcher
         self.agent_port = agent_port
         self.host = host
         self.timeout = timeout
-        self.pending_actions: Dict[str, asyncio.Event] = {}
-        self.action_results: Dict[str, Dict[str, Any]] = {}
-        self.event_loops: Dict[str, asyncio.AbstractEventLoop] = {}
-        self.action_timeouts: Dict[str, float] = {}  # Track timeout deadlines for progress extension
-        self.action_progress: Dict[str, Dict[str, Any]] = {}  # Track progress for actions
+        self.actions = registry or get_action_registry()
         self.notification_queue: queue.Queue = queue.Queue()  # Thread-safe queue for notifications
         self.notification_callbacks: Dict[str, Callable] = {}  # Callbacks for specific notification types
         self.running = False
@@ -170,37 +180,20 @@ class AsyncActionListener:
             if not status:
                 return
             
-            if action_id not in self.pending_actions:
-                return
-            
             # State machine routing
             if status == "queued":
                 # Ignore - logging only, redundant with RCON response
                 return
             
             if status == "progress":
-                # Track progress
-                self.action_progress[action_id] = payload.get('result', {})
-                
-                # Extend timeout for walking only
-                action_type = payload.get('action_type')
-                if action_type == 'walk_to' and action_id in self.action_timeouts:
-                    # Extend timeout by default timeout duration when progress is received
-                    self.action_timeouts[action_id] = time.time() + self.timeout
-                    logger.debug(f"Extended timeout for {action_id} due to progress")
-                
+                # Track progress; walking extends its deadline while it moves
+                extend = payload.get('action_type') in PROGRESS_EXTENDED_ACTIONS
+                self.actions.progress(action_id, payload, extend=extend)
                 return
             
             if status in ("completed", "cancelled"):
-                # Finish await
-                self.action_results[action_id] = payload
-                event = self.pending_actions[action_id]
-                
-                loop = self.event_loops.get(action_id)
-                if loop and loop.is_running():
-                    loop.call_soon_threadsafe(event.set)
-                else:
-                    event.set()
+                # Finish await (buffered if it beat the registration)
+                self.actions.complete(action_id, payload)
                 return
             
             # Unknown status
@@ -226,20 +219,20 @@ class AsyncActionListener:
     def register_action(self, action_id: str, initial_timeout_deadline: Optional[float] = None):
         """Register an action to wait for completion via UDP.
         
+        Must be called from the event loop that will wait for the action.
+        
         Args:
             action_id: The action ID to register
             initial_timeout_deadline: Optional initial timeout deadline in seconds since epoch (for progress-based extension)
         """
-        event = asyncio.Event()
-        self.pending_actions[action_id] = event
-        self.action_results[action_id] = None
-        self.action_progress[action_id] = {}
+        timeout = None
         if initial_timeout_deadline:
-            self.action_timeouts[action_id] = initial_timeout_deadline
-        try:
-            self.event_loops[action_id] = asyncio.get_running_loop()
-        except RuntimeError:
-            self.event_loops[action_id] = None
+            timeout = max(0.0, initial_timeout_deadline - time.time())
+        self.actions.register(action_id, timeout=timeout)
+    
+    def get_progress(self, action_id: str) -> Dict[str, Any]:
+        """Latest progress result reported for a pending action."""
+        return self.actions.get_progress(action_id)
     
     async def wait_for_action(self, action_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
@@ -247,7 +240,7 @@ class AsyncActionListener:
         
         Args:
             action_id: The action ID to wait for
-            timeout: Optional timeout override in seconds
+            timeout: Optional timeout override in seconds (walking progress pushes it back)
             
         Returns:
             The action completion payload
@@ -256,27 +249,7 @@ class AsyncActionListener:
             TimeoutError: If action doesn't complete within timeout
             ValueError: If action_id not registered
         """
-        if action_id not in self.pending_actions:
-            raise ValueError(f"Action not registered: {action_id}")
-        
-        event = self.pending_actions[action_id]
-        timeout_secs = timeout or self.timeout
-        
-        # Initialize timeout deadline for progress-based extension (walking only)
-        if action_id not in self.action_timeouts:
-            self.action_timeouts[action_id] = time.time() + timeout_secs
-        
-        try:
-            await asyncio.wait_for(event.wait(), timeout=timeout_secs)
-            return self.action_results[action_id]
-        except asyncio.TimeoutError:
-            raise
-        finally:
-            self.pending_actions.pop(action_id, None)
-            self.action_results.pop(action_id, None)
-            self.action_timeouts.pop(action_id, None)
-            self.action_progress.pop(action_id, None)
-            self.event_loops.pop(action_id, None)
+        return await self.actions.wait(action_id, timeout=timeout or self.timeout)
 
 
 class AgentCommands:
@@ -471,40 +444,202 @@ class AgentInventory:
         return int(actual_crafts) if actual_crafts != float("inf") else 0
 
 
+class ReachableCache:
+    """Caches get_reachable snapshots for one agent.
+    
+    An entry is reused while the agent stays in the same position cell, it
+    is younger than max_age_ticks (estimated from wall time at 60 UPS), and
+    nothing invalidated it: the agent's own state-changing calls and action
+    completions, or an entity_operation UDP event within reach of the
+    cached position.
+    """
+    
+    # Default character build reach (10) plus slack for entity extents
+    REACH_RADIUS = 12.0
+    TICKS_PER_SECOND = 60
+    
+    def __init__(self, max_age_ticks: int = 60, cell_size: float = 1.0):
+        self.max_age_ticks = max_age_ticks
+        self.cell_size = cell_size
+        self._lock = threading.Lock()
+        self._entry: Optional[Dict[str, Any]] = None
+        self._position: Optional[Tuple[float, float]] = None
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+    
+    def _cell(self, position: Tuple[float, float]) -> Tuple[int, int]:
+        return (int(position[0] // self.cell_size), int(position[1] // self.cell_size))
+    
+    def get(self, attach_ghosts: bool) -> Optional[Dict[str, Any]]:
+        """Return the cached entry (snapshot + built objects) if still valid."""
+        with self._lock:
+            entry = self._entry
+            valid = (
+                entry is not None
+                and (entry["attach_ghosts"] or not attach_ghosts)
+                and (time.monotonic() - entry["fetched_at"]) * self.TICKS_PER_SECOND < self.max_age_ticks
+                and (self._position is None or self._cell(self._position) == entry["cell"])
+            )
+            self.stats["hits" if valid else "misses"] += 1
+            return entry if valid else None
+    
+    def put(self, data: Dict[str, Any], attach_ghosts: bool) -> Dict[str, Any]:
+        """Store a fresh snapshot and return its entry."""
+        pos = data.get("agent_position") or {}
+        position = (float(pos.get("x", 0.0)), float(pos.get("y", 0.0)))
+        entry = {
+            "data": data,
+            "attach_ghosts": attach_ghosts,
+            "tick": data.get("tick"),
+            "position": position,
+            "cell": self._cell(position),
+            "fetched_at": time.monotonic(),
+        }
+        with self._lock:
+            self._entry = entry
+            self._position = position
+        return entry
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._entry is not None:
+                self.stats["invalidations"] += 1
+            self._entry = None
+    
+    def note_position(self, position: Union[Dict[str, float], MapPosition]) -> None:
+        """Record the agent's latest known position (a new cell misses the cache)."""
+        if hasattr(position, "x") and hasattr(position, "y"):
+            x, y = position.x, position.y
+        else:
+            x, y = position.get("x", 0.0), position.get("y", 0.0)
+        with self._lock:
+            self._position = (float(x), float(y))
+    
+    def on_entity_operation(self, payload: Dict[str, Any]) -> None:
+        """UDP handler: drop the entry if the operation happened within reach."""
+        with self._lock:
+            entry = self._entry
+        if entry is None:
+            return
+        position = _entity_operation_position(payload)
+        if position is not None:
+            dx, dy = position[0] - entry["position"][0], position[1] - entry["position"][1]
+            if dx * dx + dy * dy > self.REACH_RADIUS * self.REACH_RADIUS:
+                return
+        self.invalidate()
+
+
+def _entity_operation_position(payload: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Position of an entity_operation payload (entity data, payload, or "(name:x,y)" key)."""
+    entity = payload.get("entity") or {}
+    pos = entity.get("position") or payload.get("position")
+    if isinstance(pos, dict) and "x" in pos and "y" in pos:
+        return float(pos["x"]), float(pos["y"])
+    key = payload.get("entity_key") or entity.get("key") or ""
+    try:
+        x, y = key.rstrip(")").rsplit(":", 1)[1].split(",")
+        return float(x), float(y)
+    except (IndexError, ValueError):
+        return None
+
+
+class ReachableEntityIndex:
+    """Raw reachable entity data indexed by name and position.
+
+    ReachableEntity objects (with their prototypes) are built on first
+    access and kept for the lifetime of the cached snapshot, so a lookup
+    by name in a dense base only pays for the entities it returns.
+    """
+
+    def __init__(self, entities_data: List[Dict[str, Any]]):
+        self.data = entities_data
+        self._instances: List[Optional[ReachableEntity]] = [None] * len(entities_data)
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_position: Dict[Tuple[str, float, float], int] = {}
+        for i, entity_data in enumerate(entities_data):
+            name = entity_data.get("name") or entity_data.get("entity_name", "")
+            self._by_name.setdefault(name, []).append(i)
+            pos = entity_data.get("position")
+            if isinstance(pos, dict):
+                self._by_position.setdefault((name, pos.get("x", 0), pos.get("y", 0)), i)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def indices(self, name: Optional[str] = None, position: Optional[MapPosition] = None) -> List[int]:
+        """Indices of entities with this name (and position), in snapshot order."""
+        if position is not None:
+            i = self._by_position.get((name, position.x, position.y))
+            return [] if i is None else [i]
+        if name is not None:
+            return self._by_name.get(name, [])
+        return list(range(len(self.data)))
+
+    def entity(self, i: int) -> ReachableEntity:
+        """Entity at index i (built on first access)."""
+        instance = self._instances[i]
+        if instance is None:
+            from FactoryVerse.dsl.entity.base import create_entity_from_data
+            instance = self._instances[i] = create_entity_from_data(self.data[i])
+        return instance
+
+
 class ReachableEntities:
     """Represents reachable entities with query methods.
     
     Similar to AgentInventory but for entities. Provides filtering
     and query capabilities without returning raw lists.
     
-    Note: Always fetches fresh data from the game - no caching.
+    Snapshots are cached while the agent stays put and nothing within reach
+    changes (see ReachableCache); pass fresh=True to force a new fetch.
+    Entity objects are only built for the matches returned (see
+    ReachableEntityIndex).
     """
     
     def __init__(self, factory: "PlayingFactory"):
         self._factory = factory
     
-    def _fetch_fresh_data(self):
-        """Fetch fresh entities data from factory (no caching)."""
-        data = self._factory.get_reachable(attach_ghosts=False)
-        entities_data = data.get("entities", [])
-        # Convert to entity instances
-        from FactoryVerse.dsl.entity.base import create_entity_from_data
-        entities_instances = [
-            create_entity_from_data(entity_data)
-            for entity_data in entities_data
-        ]
-        return entities_instances, entities_data
+    def _fetch_fresh_data(self, fresh: bool = False) -> ReachableEntityIndex:
+        """Fetch the entity index from factory (cached snapshot unless fresh)."""
+        entry = self._factory._reachable_entry(attach_ghosts=False, fresh=fresh)
+        if "entities_index" not in entry:
+            entry["entities_index"] = ReachableEntityIndex(entry["data"].get("entities", []))
+        return entry["entities_index"]
+    
+    def _match(
+        self,
+        index: ReachableEntityIndex,
+        entity_name: Optional[str],
+        position: Optional[MapPosition],
+        options: Dict[str, Any],
+        limit: Optional[int] = None,
+    ) -> List[ReachableEntity]:
+        """Filter on raw data first; build only the entities that match."""
+        matches = []
+        for i in index.indices(entity_name, position):
+            data = index.data[i]
+            if "recipe" in options and data.get("recipe") != options["recipe"]:
+                continue
+            if "entity_type" in options and data.get("type") != options["entity_type"]:
+                continue
+            if "status" in options and data.get("status") != options["status"]:
+                continue
+            inst = index.entity(i)
+            if "direction" in options and inst.direction != options["direction"]:
+                continue
+            matches.append(inst)
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
     
     def get_entity(
         self,
         entity_name: str,
         position: Optional[MapPosition] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        fresh: bool = False
     ) -> Optional[ReachableEntity]:
         """Get a single entity matching criteria.
         
-        Always fetches fresh data from the game - no caching.
-        
         Args:
             entity_name: Entity prototype name (e.g., "electric-mining-drill")
             position: Optional exact position match
@@ -513,90 +648,33 @@ class ReachableEntities:
                 - direction: Direction - filter by direction
                 - entity_type: str - filter by Factorio entity type
                 - status: str - filter by status (e.g., "working", "no-power")
+            fresh: Bypass the reachable snapshot cache
         
         Returns:
             First matching ReachableEntity instance, or None if not found
         """
-        # Always fetch fresh data
-        entities_instances, entities_data = self._fetch_fresh_data()
-        options = options or {}
-        
-        # Filter by name first
-        matches = [
-            (inst, data) for inst, data in zip(entities_instances, entities_data)
-            if inst.name == entity_name
-        ]
-        
-        # Filter by position if provided
-        if position is not None:
-            matches = [(inst, data) for inst, data in matches if inst.position == position]
-        
-        # Apply option filters
-        if "recipe" in options:
-            recipe = options["recipe"]
-            matches = [(inst, data) for inst, data in matches if data.get("recipe") == recipe]
-        
-        if "direction" in options:
-            direction = options["direction"]
-            matches = [(inst, data) for inst, data in matches if inst.direction == direction]
-        
-        if "entity_type" in options:
-            entity_type = options["entity_type"]
-            matches = [(inst, data) for inst, data in matches if data.get("type") == entity_type]
-        
-        if "status" in options:
-            status = options["status"]
-            matches = [(inst, data) for inst, data in matches if data.get("status") == status]
-        
-        return matches[0][0] if matches else None
+        matches = self._match(self._fetch_fresh_data(fresh), entity_name, position, options or {}, limit=1)
+        return matches[0] if matches else None
     
     def get_entities(
         self,
         entity_name: Optional[str] = None,
-        options: Optional[Dict[str, Any]] = None
-    ) -> List[ReachableEntity]:
+        options: Optional[Dict[str, Any]] = None,
+        fresh: bool = False
+    ) -> EntityCollection:
         """Get entities matching criteria.
         
-        Always fetches fresh data from the game - no caching.
-        
         Args:
             entity_name: Optional entity prototype name filter
             options: Optional dict with filters (same as get_entity)
+            fresh: Bypass the reachable snapshot cache
         
         Returns:
-            List of matching ReachableEntity instances (may be empty)
+            EntityCollection of matching ReachableEntity instances (may be empty),
+            with bulk add_fuel / store_items / take_products
         """
-        # Always fetch fresh data
-        entities_instances, entities_data = self._fetch_fresh_data()
-        options = options or {}
-        
-        # Start with all entities
-        matches = [
-            (inst, data) for inst, data in zip(entities_instances, entities_data)
-        ]
-        
-        # Filter by name if provided
-        if entity_name is not None:
-            matches = [(inst, data) for inst, data in matches if inst.name == entity_name]
-        
-        # Apply option filters (same logic as get_entity)
-        if "recipe" in options:
-            recipe = options["recipe"]
-            matches = [(inst, data) for inst, data in matches if data.get("recipe") == recipe]
-        
-        if "direction" in options:
-            direction = options["direction"]
-            matches = [(inst, data) for inst, data in matches if inst.direction == direction]
-        
-        if "entity_type" in options:
-            entity_type = options["entity_type"]
-            matches = [(inst, data) for inst, data in matches if data.get("type") == entity_type]
-        
-        if "status" in options:
-            status = options["status"]
-            matches = [(inst, data) for inst, data in matches if data.get("status") == status]
-        
-        return [inst for inst, _ in matches]
+        matches = self._match(self._fetch_fresh_data(fresh), entity_name, None, options or {})
+        return EntityCollection(matches, factory=self._factory)
 
 
 class ReachableResources:
@@ -604,37 +682,37 @@ class ReachableResources:
     
     Similar pattern to AgentInventory but for resources (ores, trees, rocks).
     
-    Note: Always fetches fresh data from the game - no caching.
+    Shares the reachable snapshot cache with ReachableEntities; pass
+    fresh=True to force a new fetch.
     """
     
     def __init__(self, factory: "PlayingFactory"):
         self._factory = factory
     
-    def _fetch_fresh_data(self):
-        """Fetch fresh resources data from factory (no caching)."""
-        data = self._factory.get_reachable(attach_ghosts=False)
-        return data.get("resources", [])
+    def _fetch_fresh_data(self, fresh: bool = False):
+        """Fetch resources data from factory (cached snapshot unless fresh)."""
+        entry = self._factory._reachable_entry(attach_ghosts=False, fresh=fresh)
+        return entry["data"].get("resources", [])
     
     def get_resource(
         self,
         resource_name: str,
-        position: Optional[MapPosition] = None
+        position: Optional[MapPosition] = None,
+        fresh: bool = False
     ) -> Optional[Any]:
         """Get a single resource matching criteria.
         
-        Always fetches fresh data from the game - no caching.
-        
         Args:
             resource_name: Resource name (e.g., "iron-ore", "tree")
             position: Optional exact position match
+            fresh: Bypass the reachable snapshot cache
         
         Returns:
             BaseResource instance (or appropriate subclass), or None if not found
         """
         from FactoryVerse.dsl.resource.base import _create_resource_from_data
         
-        # Always fetch fresh data
-        resources_data = self._fetch_fresh_data()
+        resources_data = self._fetch_fresh_data(fresh)
         
         matches = [
             data for data in resources_data
@@ -655,15 +733,14 @@ class ReachableResources:
     def get_resources(
         self,
         resource_name: Optional[str] = None,
-        resource_type: Optional[str] = None
+        resource_type: Optional[str] = None,
+        fresh: bool = False
     ) -> List[Any]:
         """Get resources matching criteria.
         
         Returns ResourceOrePatch for multiple ore patches of same type,
         BaseResource for single ore patches or entities.
         
-        Always fetches fresh data from the game - no caching.
-        
         Args:
             resource_name: Optional resource name filter (e.g., "iron-ore", "tree")
             resource_type: Optional resource type filter. Can be:
@@ -672,6 +749,7 @@ class ReachableResources:
                 - "tree" - filters to trees only
                 - "simple-entity" - filters to rocks only
                 - "resource" - filters to ore patches only (Factorio type)
+            fresh: Bypass the reachable snapshot cache
         
         Returns:
             List[Union[ResourceOrePatch, BaseResource]]:
@@ -680,8 +758,7 @@ class ReachableResources:
         """
         from FactoryVerse.dsl.resource.base import ResourceOrePatch, BaseResource, _create_resource_from_data
         
-        # Always fetch fresh data
-        resources_data = self._fetch_fresh_data()
+        resources_data = self._fetch_fresh_data(fresh)
         
         matches = resources_data
         
@@ -750,6 +827,11 @@ class _DuckDBAccessor:
     Provides read-only access to entities across the entire map via SQL queries.
     Returns RemoteViewEntity instances that can be inspected and used for planning,
     but cannot be mutated (no pickup, add_fuel, etc.).
+    
+    Every query runs on its own cursor, so it sees a consistent snapshot of
+    committed data and never shares transaction state with the sync writer.
+    The async query()/show() helpers first sync only the chunks the query's
+    spatial predicates can touch (see infra.db.query_extent).
     """
     
     def __init__(self, connection):
@@ -760,6 +842,124 @@ class _DuckDBAccessor:
         """
         self.connection = connection
     
+    def cursor(self) -> "duckdb.DuckDBPyConnection":
+        """Open a reader cursor (an isolated connection to the same database).
+        
+        Returns:
+            New DuckDB cursor; safe to use from another thread
+        """
+        return self.connection.cursor()
+    
+    def _run_read_only(self, fn: Callable[[Any], Any]) -> Any:
+        """Run fn(cursor) inside a read-only transaction on a fresh cursor."""
+        cursor = self.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION READ ONLY")
+            try:
+                return fn(cursor)
+            finally:
+                cursor.execute("ROLLBACK")
+        finally:
+            cursor.close()
+    
+    async def query(self, sql: str, params: Optional[List[Any]] = None):
+        """Run a read-only query in a worker thread and return a DataFrame.
+        
+        Use this for long analytical queries: the event loop keeps receiving
+        UDP updates while the query runs, and the query sees one consistent
+        snapshot even if the writer commits meanwhile. Pending updates are
+        applied first - only for the area the query is restricted to, when
+        that can be inferred from its predicates.
+        
+        Args:
+            sql: SQL query
+            params: Optional positional parameters
+        
+        Returns:
+            pandas DataFrame with the query result
+        
+        Example:
+            >>> df = await map_db.query("SELECT entity_name, COUNT(*) FROM map_entity GROUP BY 1")
+        """
+        await self.sync(query=sql, params=params)
+        return await asyncio.to_thread(
+            self._run_read_only, lambda cur: cur.execute(sql, params or []).df()
+        )
+    
+    async def show(self, sql: str) -> str:
+        """Run a read-only query in a worker thread and render it as a table.
+        
+        Args:
+            sql: SQL query
+        
+        Returns:
+            The same box-drawn table DuckDB prints for relation.show()
+        """
+        await self.sync(query=sql)
+        return await asyncio.to_thread(self._run_read_only, lambda cur: str(cur.sql(sql)))
+    
+    async def changes_since(
+        self,
+        cursor: str,
+        kinds: Optional[List[str]] = None,
+        area: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Dict[str, Any]:
+        """Compact map changes since this cursor's last read.
+        
+        The first call registers the cursor and returns an empty delta; later
+        calls return what was added, removed or modified in between.
+        
+        Args:
+            cursor: Consumer name (e.g. "planner")
+            kinds: Restrict to "entity", "ghost" and/or "status"
+            area: Restrict to (min_x, min_y, max_x, max_y)
+        
+        Returns:
+            Dictionary with added, removed, modified, cursor, count and truncated
+            (truncated: the cursor fell behind the retained log - re-query once)
+        
+        Example:
+            >>> delta = await map_db.changes_since("planner", kinds=["entity"])
+            >>> [e["key"] for e in delta["removed"]]
+        """
+        from FactoryVerse.dsl.types import _playing_factory
+        factory = _playing_factory.get()
+        feed = factory._change_feed() if factory else None
+        if feed is None:
+            raise RuntimeError("Change feed requires a running map sync (not available on read replicas)")
+        await self.sync()
+        return feed.changes_since(cursor, kinds=kinds, area=area)
+    
+    async def as_of(self, tick: int) -> List[Dict[str, Any]]:
+        """Entity states as of a game tick (requires entity history).
+        
+        Args:
+            tick: Game tick
+        
+        Returns:
+            One version dict per entity (entity_key, entity_name, position,
+            state, op, valid_from_tick, valid_to_tick)
+        
+        Example:
+            >>> await map_db.as_of(current_tick - 5 * 60 * 60)  # 5 minutes ago
+        """
+        from FactoryVerse.infra.db.entity_history import entities_as_of
+        await self.sync()
+        return await asyncio.to_thread(self._run_read_only, lambda cur: entities_as_of(cur, tick))
+    
+    async def changed_since(self, tick: int) -> List[Dict[str, Any]]:
+        """Entity versions opened or closed after a game tick (requires entity history).
+        
+        Args:
+            tick: Game tick
+        
+        Returns:
+            Version dicts, oldest change first; closed_by == "destroyed" marks removals
+        """
+        from FactoryVerse.infra.db.entity_history import entities_changed_since
+        await self.sync()
+        return await asyncio.to_thread(self._run_read_only, lambda cur: entities_changed_since(cur, tick))
+    
     def get_entity(self, query: str) -> Optional["RemoteViewEntity"]:
         """Get single read-only entity from DuckDB query.
         
@@ -792,25 +992,30 @@ class _DuckDBAccessor:
         if 'LIMIT 1' not in query_upper:
             raise ValueError("get_entity() requires LIMIT 1 in query")
         
-        # Execute query
-        cursor = self.connection.execute(query)
-        result = cursor.fetchone()
-        
-        if result is None:
-            return None
-        
-        # Convert to RemoteViewEntity
-        entity_data = self._row_to_dict(result, cursor)
+        # Execute query on an isolated reader cursor
+        cursor = self.cursor()
+        try:
+            cursor.execute(query)
+            result = cursor.fetchone()
+            
+            if result is None:
+                return None
+            
+            # Convert to RemoteViewEntity
+            entity_data = self._row_to_dict(result, cursor)
+        finally:
+            cursor.close()
         return create_entity_from_db(entity_data)
     
-    def get_entities(self, query: str) -> List["RemoteViewEntity"]:
+    def get_entities(self, query: str) -> EntityCollection:
         """Get read-only entities from DuckDB query.
         
         Args:
             query: SQL SELECT query (validated for safety)
         
         Returns:
-            List of RemoteViewEntity instances (read-only)
+            EntityCollection of RemoteViewEntity instances (read-only one by one;
+            bulk actions run server-side and report out-of-reach entities as failures)
         
         Raises:
             ValueError: If query is invalid or unsafe
@@ -829,33 +1034,53 @@ class _DuckDBAccessor:
         # Validate query
         self._validate_query(query)
         
-        # Execute query
-        cursor = self.connection.execute(query)
-        results = cursor.fetchall()
+        # Execute query on an isolated reader cursor
+        cursor = self.cursor()
+        try:
+            cursor.execute(query)
+            results = cursor.fetchall()
+            rows = [self._row_to_dict(row, cursor) for row in results]
+        finally:
+            cursor.close()
         
         # Convert to RemoteViewEntity instances
-        entities = []
-        for row in results:
-            entity_data = self._row_to_dict(row, cursor)
+        entities = EntityCollection()
+        for entity_data in rows:
             entity = create_entity_from_db(entity_data)
             entities.append(entity)
         
         return entities
     
-    async def sync(self, timeout: float = 5.0) -> None:
+    async def sync(
+        self,
+        timeout: float = 5.0,
+        query: Optional[str] = None,
+        params: Optional[List[Any]] = None,
+    ) -> None:
         """Explicitly sync the database before queries.
         
         Call this before critical queries that require up-to-date data:
-            await map_db.sync()
-            entities = map_db.get_entities(...)
+            await map_db.sync(query=sql)
+            entities = map_db.get_entities(sql)
         
         Args:
             timeout: Maximum time to wait for sync (seconds)
+            query: Optional SQL the sync is for. If its spatial predicates
+                restrict it to an area, only the chunks of that area are
+                synced; otherwise the whole map is.
+            params: Positional parameters of query
         """
         from FactoryVerse.dsl.types import _playing_factory
+        from FactoryVerse.infra.db.query_extent import infer_query_chunks
         factory = _playing_factory.get()
-        if factory and factory._game_data_sync and factory._game_data_sync.is_running:
-            await factory._game_data_sync.ensure_synced(timeout=timeout)
+        if factory and factory._shared_map is not None:
+            await factory._sync_shared_map(timeout=timeout)
+        elif factory and factory._game_data_sync and factory._game_data_sync.is_running:
+            chunks = infer_query_chunks(query, params) if query else None
+            if chunks is not None:
+                await factory._game_data_sync.ensure_synced_for(chunks, timeout=timeout)
+            else:
+                await factory._game_data_sync.ensure_synced(timeout=timeout)
     
     def _validate_query(self, query: str) -> None:
         """Validate that query is safe and read-only.
@@ -903,6 +1128,35 @@ class _DuckDBAccessor:
         return entity_data
 
 
+# Most items a single mine_resource action may take
+MAX_MINE_COUNT = 25
+
+
+def _cap_mine_count(max_count: Optional[int]) -> Optional[int]:
+    if max_count and max_count > MAX_MINE_COUNT:
+        logger.warning(f"Capping mining count from {max_count} to {MAX_MINE_COUNT}")
+        return MAX_MINE_COUNT
+    return max_count
+
+
+def _mined_items(result_payload: Dict[str, Any]) -> List[ItemStack]:
+    """ItemStacks from a mine_resource completion payload."""
+    result_data = result_payload.get("result", {})
+    return [
+        ItemStack(name=name, count=count, subgroup="raw-resource")  # Default to raw-resource or infer
+        for name, count in result_data.get("actual_products", {}).items()
+    ]
+
+
+def _crafted_items(result_payload: Dict[str, Any]) -> List[ItemStack]:
+    """ItemStacks from a craft_enqueue completion payload."""
+    result_data = result_payload.get("result", {})
+    return [
+        ItemStack(name=name, count=count, subgroup="intermediate-product")  # Default or infer
+        for name, count in result_data.get("products", {}).items()
+    ]
+
+
 class WalkingAction:
     """Walking action wrapper."""
     
@@ -927,8 +1181,12 @@ class WalkingAction:
         Returns:
             Completion payload
         """
-        response = self._factory.walk_to(position, strict_goal, options)
-        return await self._factory._await_action(response, timeout=timeout)
+        self._factory._prefetch_walk_route(position)
+        response = await self._factory._call_async("walk_to", position, strict_goal, options or {})
+        result = await self._factory._await_action(response, timeout=timeout)
+        if isinstance(result, dict) and result.get("success"):
+            self._factory._note_agent_position(position)
+        return result
     
     def cancel(self) -> str:
         """Cancel current walking action."""
@@ -957,22 +1215,10 @@ class MiningAction:
         Returns:
             List of ItemStack objects obtained from mining
         """
-        if max_count and max_count > 25:
-            # Enforce 25 limit mentioned by user
-            logger.warning(f"Capping mining count from {max_count} to 25")
-            max_count = 25
-            
-        response = self._factory.mine_resource(resource_name, max_count)
+        max_count = _cap_mine_count(max_count)
+        response = await self._factory._call_async("mine_resource", resource_name, max_count)
         result_payload = await self._factory._await_action(response, timeout=timeout)
-        
-        # Parse result for items
-        items = []
-        result_data = result_payload.get("result", {})
-        if "actual_products" in result_data:
-            for name, count in result_data["actual_products"].items():
-                items.append(ItemStack(name=name, count=count, subgroup="raw-resource")) # Default to raw-resource or infer
-                
-        return items
+        return _mined_items(result_payload)
     
     def cancel(self) -> str:
         """Cancel current mining action."""
@@ -1001,17 +1247,10 @@ class CraftingAction:
         Returns:
             List of ItemStack objects crafted
         """
-        response = self._factory.craft_enqueue(recipe, count)
+        self._factory._validate_craft(recipe)
+        response = await self._factory._call_async("craft_enqueue", recipe, count)
         result_payload = await self._factory._await_action(response, timeout=timeout)
-        
-        # Parse result for items
-        items = []
-        result_data = result_payload.get("result", {})
-        if "products" in result_data:
-            for name, count in result_data["products"].items():
-                items.append(ItemStack(name=name, count=count, subgroup="intermediate-product")) # Default or infer
-                
-        return items
+        return _crafted_items(result_payload)
     
     def enqueue(self, recipe: str, count: int = 1) -> Dict[str, Any]:
         """Enqueue a recipe for crafting.
@@ -1115,14 +1354,19 @@ class PlayingFactory:
         Initialize PlayingFactory.
         
         Args:
-            rcon_client: RCON client for remote interface calls
+            rcon_client: RCON client for remote interface calls (wrapped in the
+                client's shared RconTransport so async methods don't block the loop),
+                or an RconPool (commands are scheduled fairly under this agent's id)
             agent_id: Agent ID (e.g., 'agent_1')
             recipes: Recipes instance
             tech_tree: TechTree instance
             udp_dispatcher: Optional UDPDispatcher for shared port mode (deprecated, use agent_udp_port instead)
             agent_udp_port: Optional UDP port for agent-specific async actions. If provided, agent owns this port completely.
         """
-        self._rcon = rcon_client
+        if isinstance(rcon_client, RconPool):
+            self._rcon = rcon_client.handle(agent_id)
+        else:
+            self._rcon = RconTransport.for_client(rcon_client)
         self._agent_id = agent_id
         self.agent_commands = AgentCommands(agent_id)
         self.recipes = recipes
@@ -1134,6 +1378,10 @@ class PlayingFactory:
         self._ghost_manager = GhostManager(self, agent_id=agent_id)
         self._duckdb_connection = None
         self._game_data_sync = None
+        self._shared_map = None  # SharedMapNode or MapReplica when attached
+        self._dispatcher: Optional[RemoteDispatcher] = None  # compact calls after enable_dispatcher()
+        self._reachable_cache = ReachableCache()
+        self._profiler: Optional[RconProfiler] = None  # per-method timings while profiling
         
         # Initialize action wrappers
         self._walking = WalkingAction(self)
@@ -1180,7 +1428,20 @@ class PlayingFactory:
                 calculated_timeout = self._async_listener.timeout
         
         self._async_listener.register_action(action_id)
-        return await self._async_listener.wait_for_action(action_id, timeout=calculated_timeout)
+        registered_at = time.perf_counter()
+        try:
+            payload = await self._async_listener.wait_for_action(action_id, timeout=calculated_timeout)
+        finally:
+            # The action changed the world (and maybe the agent's position) meanwhile
+            self._reachable_cache.invalidate()
+        if self._profiler is not None and isinstance(payload, dict):
+            result = payload.get("result") if isinstance(payload.get("result"), dict) else {}
+            self._profiler.record_completion(
+                payload.get("action_type") or result.get("action") or "action",
+                time.perf_counter() - registered_at,
+                ticks=result.get("actual_ticks", payload.get("actual_ticks")),
+            )
+        return payload
 
     @property
     def agent_id(self) -> str:
@@ -1267,9 +1528,57 @@ class PlayingFactory:
             full_command = f"/c {command}"
             
         logger.info(f"RCON TX: {full_command}")
-        response = self._rcon.send_command(full_command)
+        response = self._send_command(full_command)
         logger.info(f"RCON RX: {response}")
+        if self._dispatcher is not None and RemoteDispatcher.is_unregistered(response):
+            # Dispatcher lost (save loaded) or interface added since: register again and resend
+            if self._dispatcher.handshake(refresh=True):
+                response = self._send_command(full_command)
+        return response
+    
+    async def execute_async(self, command: str, silent: bool = True) -> str:
+        """Like execute(), but awaits the response instead of blocking the event loop."""
+        full_command = f"/sc {command}" if silent else f"/c {command}"
+        logger.info(f"RCON TX: {full_command}")
+        response = await self._send_command_async(full_command)
+        logger.info(f"RCON RX: {response}")
+        if self._dispatcher is not None and RemoteDispatcher.is_unregistered(response):
+            if await asyncio.to_thread(self._dispatcher.handshake, True):
+                response = await self._send_command_async(full_command)
+        return response
+    
+    def _send_command(self, full_command: str) -> str:
+        if self._profiler is None:
+            return self._rcon.send_command(full_command)
+        start = time.perf_counter()
+        try:
+            response = self._rcon.send_command(full_command)
+        except Exception:
+            self._profile_call(full_command, None, start, error=True)
+            raise
+        self._profile_call(full_command, response, start)
+        return response
+    
+    async def _send_command_async(self, full_command: str) -> str:
+        if self._profiler is None:
+            return await self._rcon.send_command_async(full_command)
+        start = time.perf_counter()
+        try:
+            response = await self._rcon.send_command_async(full_command)
+        except Exception:
+            self._profile_call(full_command, None, start, error=True)
+            raise
+        self._profile_call(full_command, response, start)
         return response
+    
+    def _profile_call(self, full_command: str, response: Optional[str], start: float, error: bool = False) -> None:
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.record_call(
+                RconProfiler.method_of(command_methods(full_command)),
+                len(full_command.encode()), len((response or "").encode()),
+                time.perf_counter() - start, error=error,
+            )
 
     def _serialize_arg(self, arg):
         """Convert argument to JSON-serializable format."""
@@ -1279,32 +1588,165 @@ class PlayingFactory:
         # Handle other common types
         return arg
     
+    def _args_json(self, args: tuple) -> Optional[str]:
+        """Serialize positional arguments as a compact JSON array (None if there are none)."""
+        if not args:
+            return None
+        return json.dumps([self._serialize_arg(arg) for arg in args], separators=(",", ":"))
+    
+    def _note_call(self, method: str) -> None:
+        """State-changing calls invalidate the reachable snapshot cache."""
+        if method in ACTION_METHODS:
+            self._reachable_cache.invalidate()
+    
+    def _build_remote_call(self, method: str, *args) -> str:
+        """Build the Lua remote.call expression for a method call with positional arguments."""
+        self._note_call(method)
+        args_json = self._args_json(args)
+        if self._dispatcher is not None:
+            compact = self._dispatcher.call_expression(self.agent_id, method, args_json)
+            if compact is not None:
+                return compact
+        return self._full_remote_call(method, args_json)
+    
+    def _full_remote_call(self, method: str, args_json: Optional[str]) -> str:
+        remote_call = f"remote.call('{self.agent_id}', '{method}'"
+        if args_json is not None:
+            # Pass args as a JSON table unpacked into positional arguments
+            remote_call += f", table.unpack(helpers.json_to_table('{args_json}'))"
+        return remote_call + ")"
+    
     def _build_command(self, method: str, *args) -> str:
         """Build RCON command string for a method call with positional arguments.
         
         Args are passed as positional arguments to match RemoteInterface method signatures.
+        With the dispatcher enabled this is a short fvd(...) call instead of the full chunk.
         """
-        remote_call = f"remote.call('{self.agent_id}', '{method}'"
+        self._note_call(method)
+        args_json = self._args_json(args)
+        if self._dispatcher is not None:
+            compact = self._dispatcher.command(self.agent_id, method, args_json)
+            if compact is not None:
+                return compact
+        return f"rcon.print(helpers.table_to_json({self._full_remote_call(method, args_json)}))"
+    
+    def enable_dispatcher(self) -> bool:
+        """Register the compact call dispatcher in the game (one-time handshake).
         
-        if args:
-            # Convert args to JSON-serializable format and pass as table
-            serialized_args = [self._serialize_arg(arg) for arg in args]
-            args_json = json.dumps(serialized_args)
-            remote_call += f", table.unpack(helpers.json_to_table('{args_json}'))"
+        Later remote interface calls are sent as fvd('<agent>', <op>, '<args>')
+        instead of the full remote.call chunk. If the handshake fails, calls
+        keep using the full form.
         
-        remote_call += ")"
-        return f"rcon.print(helpers.table_to_json({remote_call}))"
+        Returns:
+            True if compact calls are enabled
+        """
+        dispatcher = RemoteDispatcher(self._rcon.send_command, interfaces=[self.agent_id])
+        try:
+            ready = dispatcher.handshake()
+        except Exception as e:
+            logger.warning(f"RCON dispatcher unavailable, using full commands: {e}")
+            ready = False
+        if ready and not dispatcher.has_interface(self.agent_id):
+            # Agent interface created after the cached introspection
+            ready = dispatcher.handshake(refresh=True)
+        self._dispatcher = dispatcher if ready else None
+        return ready
+    
+    def batch(self, max_command_bytes: Optional[int] = RCON_MAX_COMMAND_BYTES) -> RconBatch:
+        """Collect remote interface calls and send them in one RCON round trip.
+        
+        Each call returns a future resolved with the raw (parsed JSON) result
+        of the RemoteInterface method when the block exits; a call that raises
+        in Lua fails only its own future with BatchCallError.
+        
+        Args:
+            max_command_bytes: Split into several commands above this size
+            
+        Returns:
+            RconBatch usable as an async context manager
+        
+        Example:
+            >>> async with factory.batch() as b:
+            ...     futures = [b.call("inspect_entity", "stone-furnace", pos) for pos in positions]
+            >>> results = [f.result() for f in futures]
+        """
+        return RconBatch(
+            self._build_remote_call, self.execute,
+            execute_async=self.execute_async, max_command_bytes=max_command_bytes,
+        )
+
+    @property
+    def profiler(self) -> Optional[RconProfiler]:
+        """Active RconProfiler, or None when profiling is off."""
+        return self._profiler
+
+    def enable_profiling(self, profiler: Optional[RconProfiler] = None) -> RconProfiler:
+        """Start recording per-method RCON and action timings.
+
+        Args:
+            profiler: Profiler to record into (default: a new one)
+
+        Returns:
+            The active RconProfiler
+        """
+        self._profiler = profiler or RconProfiler()
+        return self._profiler
+
+    def disable_profiling(self) -> Optional[RconProfiler]:
+        """Stop profiling and return the profiler that was active."""
+        profiler, self._profiler = self._profiler, None
+        return profiler
+
+    @contextmanager
+    def profile(self, profiler: Optional[RconProfiler] = None):
+        """Profile RCON calls and action completions made inside the block.
+
+        Args:
+            profiler: Profiler to record into (default: a new one)
+
+        Yields:
+            The RconProfiler (see format_table() and write())
+
+        Example:
+            >>> with factory.profile() as profiler:
+            ...     await walking.to(MapPosition(x=10, y=0))
+            >>> print(profiler.format_table())
+        """
+        previous = self._profiler
+        active = self.enable_profiling(profiler)
+        try:
+            yield active
+        finally:
+            self._profiler = previous
 
     def _execute_and_parse_json(self, command: str) -> Dict[str, Any]:
         """Execute RCON command and parse resultant JSON with error handling."""
-        result = self.execute(command)
+        return self._parse_json_response(self.execute(command), command)
+    
+    async def _execute_and_parse_json_async(self, command: str) -> Dict[str, Any]:
+        """Async variant of _execute_and_parse_json (does not block the event loop)."""
+        return self._parse_json_response(await self.execute_async(command), command)
+    
+    async def _call_async(self, method: str, *args) -> Dict[str, Any]:
+        """Call a RemoteInterface method and parse its JSON result without blocking."""
+        return await self._execute_and_parse_json_async(self._build_command(method, *args))
+    
+    def _parse_json_response(self, result: str, command: str) -> Dict[str, Any]:
+        """Parse an RCON JSON response with error handling."""
         if not result or not result.strip():
             # Sometimes RCON returns empty string on silent failure or no output
             # Raise descriptive error
             raise RuntimeError(f"RCON command returned empty response. Command: {command}")
         
         try:
-            return json.loads(result)
+            if self._profiler is None:
+                return json_loads(result)
+            start = time.perf_counter()
+            parsed = json_loads(result)
+            self._profiler.record_decode(
+                RconProfiler.method_of(command_methods(command)), time.perf_counter() - start
+            )
+            return parsed
         except json.JSONDecodeError as e:
             # Log the raw result for debugging
             logger.error(f"JSON decode failed. Result: '{result}'")
@@ -1385,12 +1827,20 @@ class PlayingFactory:
         Returns:
             CraftAsyncResponse with {queued, action_id, recipe, count}
         """
+        self._validate_craft(recipe_name)
+        cmd = self._build_command("craft_enqueue", recipe_name, count)
+        return self._execute_and_parse_json(cmd)
+
+    def _validate_craft(self, recipe_name: str) -> None:
+        """Check that a recipe can be hand-crafted by this agent right now.
+        
+        Raises:
+            ValueError: If the recipe is not hand-craftable or not enabled
+        """
         if not self.recipes[recipe_name].is_hand_craftable():
             raise ValueError(f"Recipe {recipe_name} is not hand-craftable")
         if not self.recipes[recipe_name].enabled:
             raise ValueError(f"Recipe {recipe_name} is not enabled, try researching technology first")
-        cmd = self._build_command("craft_enqueue", recipe_name, count)
-        return self._execute_and_parse_json(cmd)
 
     def craft_dequeue(self, recipe_name: str, count: Optional[int] = None) -> ActionResult:
         """Cancel queued crafting for a recipe.
@@ -1542,6 +1992,24 @@ class PlayingFactory:
         )
         return self._execute_and_parse_json(cmd)
 
+    def transfer_inventory_items(self, transfers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several put/take inventory transfers in one call.
+        
+        Used by EntityCollection bulk actions (add_fuel, store_items, take_products).
+        
+        RCON Contract: RemoteInterface.lua transfer_inventory_items
+        
+        Args:
+            transfers: List of {op ("put" or "take"), entity_name, position,
+                inventory_type, item_name, count}
+            
+        Returns:
+            {success, succeeded, failed, results}; results[i] is {success, result}
+            or {success, error} for transfers[i]
+        """
+        cmd = self._build_command("transfer_inventory_items", transfers)
+        return self._execute_and_parse_json(cmd)
+
     # ========================================================================
     # SYNC: Placement
     # ========================================================================
@@ -1677,7 +2145,10 @@ class PlayingFactory:
             ActionResult with {success, position}
         """
         cmd = self._build_command("teleport", position)
-        return self._execute_and_parse_json(cmd)
+        result = self._execute_and_parse_json(cmd)
+        if isinstance(result, dict) and result.get("position"):
+            self._note_agent_position(result["position"])
+        return result
 
     # ========================================================================
     # QUERIES
@@ -1695,7 +2166,10 @@ class PlayingFactory:
             AgentInspectionData with {agent_id, tick, position, state?}
         """
         cmd = self._build_command("inspect", attach_state)
-        return self._execute_and_parse_json(cmd)
+        result = self._execute_and_parse_json(cmd)
+        if isinstance(result, dict) and result.get("position"):
+            self._note_agent_position(result["position"])
+        return result
 
     def inspect_entity(self, entity_name: str, position: MapPosition) -> EntityInspectionData:
         """Get comprehensive volatile state for a specific entity.
@@ -1735,6 +2209,7 @@ class PlayingFactory:
         """
         cmd = self._build_command("get_position")
         result = self._execute_and_parse_json(cmd)
+        self._note_agent_position(result)
         return MapPosition(x=result["x"], y=result["y"])
 
     def get_placement_cues(self, entity_name: str, resource_name: Optional[str] = None) -> PlacementCuesResponse:
@@ -1861,6 +2336,9 @@ class PlayingFactory:
                 - agent_id: Agent ID
                 - tick: Game tick
                 - data: Notification-specific data
+            
+            Standing queries registered with subscribe() arrive here too, as
+            notification_type "subscription".
         
         Example:
             >>> notifications = await factory.get_notifications(timeout=0.1)
@@ -1913,6 +2391,55 @@ class PlayingFactory:
             >>> factory.register_notification_callback("research_finished", on_research_done)
         """
         self._async_listener.notification_callbacks[notification_type] = callback
+    
+    async def subscribe(
+        self,
+        name: str,
+        predicate: Union[str, "Predicate"],
+        notify_initial: bool = False,
+    ) -> int:
+        """Register a standing query over the map DB.
+        
+        The predicate is re-evaluated only for entities touched by each synced
+        batch; every entity whose result flips is delivered through
+        get_notifications() (or a "subscription" callback) as a
+        notification_type "subscription" event with
+        data = {subscription, entity_key, transition, row}, where transition
+        is "became_true" or "became_false".
+        
+        Args:
+            name: Subscription name (re-registering replaces it)
+            predicate: SELECT returning an entity_key column, or a Predicate
+                (e.g. StatusPredicate({"no_minable_resources"}))
+            notify_initial: Also notify for entities matching right now
+            
+        Returns:
+            Number of entities currently matching
+        
+        Example:
+            >>> from FactoryVerse.infra.subscriptions import StatusPredicate
+            >>> await factory.subscribe(
+            ...     "drills_out_of_ore",
+            ...     StatusPredicate({"no_minable_resources"}, entity_names={"burner-mining-drill"}),
+            ... )
+        """
+        sync = self._map_sync()
+        if sync is None:
+            raise RuntimeError("Subscriptions need a map DB sync service (not available on replicas)")
+        await self._ensure_async_listener()
+        return sync.subscribe(name, predicate, self._async_listener._handle_notification, notify_initial=notify_initial)
+    
+    def unsubscribe(self, name: str) -> bool:
+        """Remove a standing query registered with subscribe().
+        
+        Args:
+            name: Subscription name
+            
+        Returns:
+            True if it existed
+        """
+        sync = self._map_sync()
+        return sync.unsubscribe(name) if sync is not None else False
 
     # ========================================================================
     # REACHABILITY
@@ -1932,8 +2459,24 @@ class PlayingFactory:
             - resources: List of ReachableResourceData  
             - ghosts: List of ReachableGhostData (only if attach_ghosts=True)
         """
+        return self._fetch_reachable(attach_ghosts)["data"]
+    
+    def _fetch_reachable(self, attach_ghosts: bool) -> Dict[str, Any]:
+        """Call get_reachable and store the snapshot in the reachable cache."""
         cmd = self._build_command("get_reachable", attach_ghosts)
-        return self._execute_and_parse_json(cmd)
+        result = self._execute_and_parse_json(cmd)
+        if isinstance(result, dict) and result.get("agent_position"):
+            self._note_agent_position(result["agent_position"])
+            return self._reachable_cache.put(result, attach_ghosts)
+        return {"data": result}
+    
+    def _reachable_entry(self, attach_ghosts: bool = False, fresh: bool = False) -> Dict[str, Any]:
+        """Cached reachable snapshot entry ({data, ...}); one get_reachable call on a miss."""
+        if not fresh:
+            entry = self._reachable_cache.get(attach_ghosts)
+            if entry is not None:
+                return entry
+        return self._fetch_reachable(attach_ghosts)
     
     @property
     def ghosts(self) -> GhostManager:
@@ -1958,6 +2501,9 @@ class PlayingFactory:
         replay_updates: bool = True,
         wait_for_initial: bool = True,
         initial_timeout: float = 60.0,
+        max_detail_rows: Optional[int] = None,
+        track_history: bool = False,
+        history_retention_ticks: Optional[int] = None,
     ) -> None:
         """Load snapshot data into the database (async version).
         
@@ -1965,7 +2511,8 @@ class PlayingFactory:
         snapshot directory. This is the primary way to set up the database.
         
         Also initializes and starts GameDataSyncService for real-time sync.
-        If wait_for_initial=True, blocks until all charted chunks reach COMPLETE state.
+        If wait_for_initial=True, blocks until the snapshot system finishes its
+        bootstrap, loading each chunk once as it completes.
         
         Args:
             snapshot_dir: Path to snapshot directory. If None, auto-detects from
@@ -1978,47 +2525,58 @@ class PlayingFactory:
             include_ghosts: Load ghost tables
             include_analytics: Load analytics tables (power, agent stats)
             replay_updates: Replay operations logs (entities_updates.jsonl, etc.)
-            wait_for_initial: If True, wait for all charted chunks to reach COMPLETE state
+            wait_for_initial: If True, stream chunks into an empty DB as their snapshots
+                             complete and wait for the snapshot bootstrap to finish
+                             (per-chunk tables are then always loaded). If False, do a
+                             single bulk load of whatever is on disk.
             initial_timeout: Maximum time to wait for initial snapshot completion (seconds)
-        """
-        # Load snapshots synchronously (files on disk)
-        snapshot_dir = self._load_snapshots_sync(
-            snapshot_dir=snapshot_dir,
-            db_path=db_path,
-            prototype_api_file=prototype_api_file,
-            include_base=include_base,
-            include_components=include_components,
-            include_derived=include_derived,
-            include_ghosts=include_ghosts,
-            include_analytics=include_analytics,
-            replay_updates=replay_updates,
-        )
-        
-        # Start GameDataSyncService
-        await self._ensure_game_data_sync()
-        
-        # Wait for bootstrap completion if requested
-        # This waits for the system to transition from INITIAL_SNAPSHOTTING to MAINTENANCE
-        # which respects the bootstrap waiting period for async charting
-        if wait_for_initial:
-            await self._wait_for_bootstrap_complete(timeout=initial_timeout)
-            
-            # CRITICAL: Reload all snapshot files from disk after bootstrap completes
-            # This ensures we have ALL data that was snapshotted during bootstrap.
-            # Without this reload, we'd have a mix of:
-            # - Old data from initial load (before bootstrap)
-            # - Some new data from UDP file_io events (if they arrived)
-            # - Missing data from chunks that completed DURING bootstrap wait
-            logger.info("🔄 Bootstrap complete. Reloading all snapshot files to ensure complete data...")
-            print("\n" + "=" * 60)
-            print("🔄 Reloading snapshot data after bootstrap...")
-            print("=" * 60)
-            
-            from FactoryVerse.infra.db.loader import load_all
-            load_all(
-                self._duckdb_connection,
-                snapshot_dir,
-                prototype_api_file,
+            max_detail_rows: Optional memory budget for tile-level map detail (rows of
+                            resource_tile, water_tile and resource_entity). Detail of
+                            far / least recently queried chunks is evicted past it and
+                            reloaded from the snapshot files when a query touches them;
+                            resource_patch and water_patch keep the whole map.
+            track_history: Record tick-versioned entity history (entity_history table,
+                          map_db.as_of() / map_db.changed_since())
+            history_retention_ticks: Keep closed history versions for this many ticks
+        
+        With a db_path, applied updates are journaled next to the database file.
+        On the next start the journal is replayed instead of doing a full load
+        and bootstrap wait, so restarts cost time proportional to the downtime.
+        
+        If the map is already loaded (e.g. by configure()), it is not loaded
+        again: the sync service is started and, with wait_for_initial, chunks
+        completed since are picked up once the bootstrap finishes.
+        """
+        if self._shared_map is not None:
+            # Map is owned by a shared sync node - just catch up with it
+            await self._sync_shared_map()
+            return
+        
+        if self._game_data_sync is not None:
+            # Already loaded (configure() or an earlier call) - don't build the tables twice
+            await self._ensure_game_data_sync()
+            if wait_for_initial:
+                await self._wait_for_bootstrap_complete(timeout=initial_timeout)
+                await self._game_data_sync.load_all_complete_chunks()
+        elif db_path is not None and await self._resume_from_journal(snapshot_dir, db_path):
+            pass
+        elif wait_for_initial:
+            await self._stream_bootstrap(
+                snapshot_dir=snapshot_dir,
+                db_path=db_path,
+                prototype_api_file=prototype_api_file,
+                include_derived=include_derived,
+                include_ghosts=include_ghosts,
+                include_analytics=include_analytics,
+                replay_updates=replay_updates,
+                timeout=initial_timeout,
+            )
+        else:
+            # Load snapshots synchronously (files on disk)
+            self._load_snapshots_sync(
+                snapshot_dir=snapshot_dir,
+                db_path=db_path,
+                prototype_api_file=prototype_api_file,
                 include_base=include_base,
                 include_components=include_components,
                 include_derived=include_derived,
@@ -2027,8 +2585,110 @@ class PlayingFactory:
                 replay_updates=replay_updates,
             )
             
-            logger.info("✅ Post-bootstrap reload complete. DB now contains all snapshotted data.")
-            print("✅ Post-bootstrap reload complete!")
+            # Start GameDataSyncService
+            await self._ensure_game_data_sync()
+        
+        if track_history:
+            await self._game_data_sync.enable_history(retention_ticks=history_retention_ticks)
+        
+        # Budget applies after patches are derived from the full tile set
+        if max_detail_rows is not None:
+            await self._game_data_sync.set_memory_budget(max_detail_rows)
+            stats = self._game_data_sync.get_memory_stats()
+            print(
+                f"🧠 Map detail budget {max_detail_rows} rows: {stats['detail_rows']} resident, "
+                f"{stats['evicted_chunks']} chunks evicted"
+            )
+    
+    async def _stream_bootstrap(
+        self,
+        snapshot_dir: Optional[Path],
+        db_path: Optional[Union[str, Path]],
+        prototype_api_file: Optional[str],
+        include_derived: bool,
+        include_ghosts: bool,
+        include_analytics: bool,
+        replay_updates: bool,
+        timeout: float,
+    ) -> None:
+        """Build the map DB by streaming chunks in while the game bootstraps.
+        
+        Starts from an empty schema and starts GameDataSyncService first, so
+        every chunk is loaded exactly once - chunks already on disk are queued
+        up front, later ones as their snapshot_state reaches COMPLETE (nearest
+        to the agent first). Once the snapshot system reports MAINTENANCE a
+        reconciliation pass compares file sizes to catch anything missed,
+        then the global tables (ghosts, derived, analytics) are built once.
+        
+        Per-chunk tables (tiles, trees/rocks, entities and their components)
+        and their update logs are always loaded in this mode.
+        """
+        import duckdb
+        import time
+        from FactoryVerse.infra.db.duckdb_schema import create_schema
+        from FactoryVerse.infra.db.loader import load_ghosts, load_derived_tables, load_analytics
+        
+        started = time.time()
+        if self._duckdb_connection is None:
+            if db_path is None:
+                self._duckdb_connection = duckdb.connect(':memory:')
+            else:
+                from FactoryVerse.infra.db.duckdb_schema import connect
+                self._duckdb_connection = connect(db_path)
+        create_schema(self._duckdb_connection, prototype_api_file)
+        
+        if snapshot_dir is None:
+            try:
+                from FactoryVerse.infra.factorio_client_setup import get_client_script_output_dir
+                snapshot_dir = get_client_script_output_dir()
+            except Exception as e:
+                raise ValueError(
+                    f"snapshot_dir required and could not be auto-detected: {e}"
+                )
+        snapshot_dir = Path(snapshot_dir)
+        
+        if self._game_data_sync is None:
+            self._game_data_sync = GameDataSyncService(
+                agent_id=self._agent_id,
+                db_connection=self._duckdb_connection,
+                snapshot_dir=snapshot_dir,
+                udp_dispatcher=get_udp_dispatcher(),
+                rcon_client=self._rcon,
+                journal_path=SyncJournal.path_for(db_path) if db_path is not None else None,
+            )
+        sync = self._game_data_sync
+        await self._ensure_game_data_sync()
+        
+        queued = sync.schedule_snapshot_chunks()
+        if queued == 0 and self._rcon:
+            try:
+                print("No snapshot files found. Triggering map snapshot via RCON...")
+                result = self._rcon.send_command("take_map_snapshot")
+                if result and "error" not in result.lower():
+                    print("✅ Map snapshot triggered successfully")
+                else:
+                    print(f"⚠️  RCON command may have failed: {result}")
+            except Exception as e:
+                print(f"⚠️  Could not trigger map snapshot via RCON: {e}")
+        print(f"📦 Streaming map snapshot into DB ({queued} chunks already on disk)...")
+        
+        await self._wait_for_bootstrap_complete(timeout=timeout)
+        await sync.load_all_complete_chunks()
+        stats = await sync.reconcile_snapshot_files()
+        
+        if include_ghosts:
+            await sync.run_write(load_ghosts, snapshot_dir, replay_updates=replay_updates)
+        if include_derived:
+            await sync.run_write(load_derived_tables, snapshot_dir)
+        if include_analytics:
+            await sync.run_write(load_analytics, snapshot_dir)
+        
+        logger.info(f"✅ Streamed bootstrap complete in {time.time() - started:.1f}s: {stats}")
+        print(
+            f"✅ Map DB ready in {time.time() - started:.1f}s "
+            f"({sync.get_chunk_load_stats()['loaded']} chunks, "
+            f"{stats['loaded'] + stats['reloaded']} picked up by reconciliation)"
+        )
     
     def _load_snapshots_sync(
         self,
@@ -2155,10 +2815,80 @@ class PlayingFactory:
                 snapshot_dir=snapshot_dir,
                 udp_dispatcher=udp_dispatcher,
                 rcon_client=self._rcon,
+                journal_path=SyncJournal.path_for(db_path) if db_path is not None else None,
             )
+        self._game_data_sync.mark_chunks_loaded_from_disk()
         
         return snapshot_dir
     
+    async def _resume_from_journal(
+        self,
+        snapshot_dir: Optional[Path],
+        db_path: Union[str, Path],
+        start: bool = True,
+    ) -> bool:
+        """Resume a persisted database from its sync journal, if it has a checkpoint.
+        
+        Args:
+            snapshot_dir: Snapshot directory (auto-detected if None)
+            db_path: Persisted DuckDB database file
+            start: Start the sync service after recovering
+        
+        Returns:
+            True if the database was recovered
+        """
+        journal_path = SyncJournal.path_for(db_path)
+        checkpoint, _ = SyncJournal(journal_path).load()
+        if checkpoint is None or not Path(db_path).exists() or self._game_data_sync is not None:
+            return False
+        
+        if snapshot_dir is None:
+            from FactoryVerse.infra.factorio_client_setup import get_client_script_output_dir
+            snapshot_dir = get_client_script_output_dir()
+        
+        if self._duckdb_connection is None:
+            from FactoryVerse.infra.db.duckdb_schema import connect
+            self._duckdb_connection = connect(db_path)
+        
+        self._game_data_sync = GameDataSyncService(
+            agent_id=self._agent_id,
+            db_connection=self._duckdb_connection,
+            snapshot_dir=Path(snapshot_dir),
+            udp_dispatcher=get_udp_dispatcher(),
+            rcon_client=self._rcon,
+            journal_path=journal_path,
+        )
+        stats = await self._game_data_sync.recover_from_journal()
+        if start:
+            await self._ensure_game_data_sync()
+        print(
+            f"✅ Resumed map DB from journal in {stats['seconds']:.2f}s "
+            f"({stats['tail_replayed']} journaled updates, {stats['log_entries_replayed']} log entries, "
+            f"{stats['new_chunks_loaded']} new chunks)"
+        )
+        return True
+    
+    def _resume_from_journal_sync(
+        self,
+        snapshot_dir: Optional[Path],
+        db_path: Union[str, Path],
+    ) -> bool:
+        """Synchronous _resume_from_journal() for configure().
+        
+        Runs the recovery on its own event loop in a worker thread, so it also
+        works when the caller's thread already runs a loop (notebooks). The
+        sync service is left stopped, like after _load_snapshots_sync().
+        
+        Returns:
+            True if the database was recovered
+        """
+        import concurrent.futures
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                asyncio.run, self._resume_from_journal(snapshot_dir, db_path, start=False)
+            ).result()
+    
     def _get_charted_chunks(self) -> List[tuple[int, int]]:
         """Query game for list of charted chunks via RCON.
         
@@ -2186,9 +2916,11 @@ class PlayingFactory:
     async def _wait_for_bootstrap_complete(self, timeout: float = 120.0) -> None:
         """Wait for bootstrap phase to complete (INITIAL_SNAPSHOTTING → MAINTENANCE).
         
-        Polls the snapshot system's phase status and waits for transition to MAINTENANCE.
-        This is more reliable than waiting for individual chunks since it respects
-        the bootstrap waiting period (300 ticks) that allows async charting to complete.
+        Waits on the snapshot system's system_phase_changed UDP event (via
+        GameDataSyncService), so chunk loads stream in while we wait. The
+        phase is also probed over RCON up front and every few seconds as a
+        fallback, which respects the bootstrap waiting period (300 ticks) that
+        allows async charting to complete.
         
         Args:
             timeout: Maximum time to wait for bootstrap (seconds, default 120s = 2 minutes)
@@ -2200,85 +2932,150 @@ class PlayingFactory:
         import time
         
         start_time = time.time()
-        check_interval = 1.0  # Check every second
+        probe_interval = 5.0  # RCON fallback cadence; the UDP event wakes us sooner
+        sync = self._game_data_sync
         
         logger.info("⏳ Waiting for snapshot system bootstrap to complete...")
         print("⏳ Waiting for snapshot system bootstrap to complete...")
         
         while True:
-            # Check if timeout exceeded
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
+            status = self._query_snapshot_status()
+            if status is not None and sync is not None:
+                sync.set_system_phase(status.get("system_phase"))
+            system_phase = sync.system_phase if sync is not None else (status or {}).get("system_phase")
+            
+            if system_phase == "MAINTENANCE":
+                # Bootstrap complete!
+                completed = (status or {}).get("completed_chunks", 0)
+                logger.info(f"✅ Bootstrap complete! Transitioned to MAINTENANCE mode.")
+                logger.info(f"✅ {completed} chunks snapshotted during bootstrap.")
+                print(f"✅ Bootstrap complete! {completed} chunks snapshotted.")
+                return
+            
+            if status is not None and system_phase == "INITIAL_SNAPSHOTTING":
+                pending = status.get("pending_chunks", 0)
+                completed = status.get("completed_chunks", 0)
+                bootstrap_wait = status.get("bootstrap_wait", {})
+                if bootstrap_wait.get("waiting", False):
+                    print(
+                        f"  ⏱️  Bootstrap waiting: {bootstrap_wait.get('current_tick', 0)}/"
+                        f"{bootstrap_wait.get('total_ticks', 300)} ticks, "
+                        f"{pending} pending, {completed} completed"
+                    )
+                else:
+                    print(f"  📦 Processing: {pending} pending, {completed} completed")
+            
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
                 raise asyncio.TimeoutError(
                     f"Bootstrap did not complete within {timeout}s. "
                     "System may still be in INITIAL_SNAPSHOTTING phase."
                 )
             
-            # Query snapshot system status via RCON
-            try:
-                cmd = "/c rcon.print(helpers.table_to_json(remote.call('map', 'get_snapshot_status')))"
-                result = self._rcon.send_command(cmd)
-                
-                # Handle None result (happens when command fails)
-                if result is None or result.strip() == "":
-                    logger.debug("Empty or None result from RCON, retrying...")
-                    await asyncio.sleep(check_interval)
-                    continue
-                    
-                status = json.loads(result)
-                
-                system_phase = status.get("system_phase")
-                
-                if system_phase == "MAINTENANCE":
-                    # Bootstrap complete!
-                    stats = status.get("bootstrap_wait", {})
-                    completed = status.get("completed_chunks", 0)
-                    logger.info(f"✅ Bootstrap complete! Transitioned to MAINTENANCE mode.")
-                    logger.info(f"✅ {completed} chunks snapshotted during bootstrap.")
-                    print(f"✅ Bootstrap complete! {completed} chunks snapshotted.")
-                    return
-                
-                elif system_phase == "INITIAL_SNAPSHOTTING":
-                    # Still bootstrapping
-                    pending = status.get("pending_chunks", 0)
-                    completed = status.get("completed_chunks", 0)
-                    bootstrap_wait = status.get("bootstrap_wait", {})
-                    current_tick = bootstrap_wait.get("current_tick", 0)
-                    total_ticks = bootstrap_wait.get("total_ticks", 300)
-                    waiting = bootstrap_wait.get("waiting", False)
-                    
-                    if waiting:
-                        logger.debug(
-                            f"Bootstrap waiting: {current_tick}/{total_ticks} ticks, "
-                            f"{pending} pending chunks, {completed} completed"
-                        )
-                        if int(elapsed) % 5 == 0:  # Log every 5 seconds
-                            print(
-                                f"  ⏱️  Bootstrap waiting: {current_tick}/{total_ticks} ticks, "
-                                f"{pending} pending, {completed} completed"
-                            )
-                    else:
-                        logger.debug(
-                            f"Processing chunks: {pending} pending, {completed} completed"
-                        )
-                        if int(elapsed) % 5 == 0:
-                            print(f"  📦 Processing: {pending} pending, {completed} completed")
-                
-            except Exception as e:
-                logger.warning(f"Error checking bootstrap status: {e}")
-                # Continue waiting, don't fail on transient errors
-            
-            # Wait before next check
-            await asyncio.sleep(check_interval)
+            if sync is not None:
+                await sync.wait_for_maintenance(timeout=min(probe_interval, remaining))
+            else:
+                await asyncio.sleep(min(probe_interval, remaining))
+    
+    def _query_snapshot_status(self) -> Optional[Dict[str, Any]]:
+        """Query the snapshot system status over RCON (None if unavailable)."""
+        if not self._rcon:
+            return None
+        try:
+            cmd = "/c rcon.print(helpers.table_to_json(remote.call('map', 'get_snapshot_status')))"
+            result = self._rcon.send_command(cmd)
+            if result is None or result.strip() == "":
+                return None
+            return json.loads(result)
+        except Exception as e:
+            logger.warning(f"Error checking bootstrap status: {e}")
+            return None
+    
+    def attach_shared_map(self, source: Union["SharedMapNode", str, Path]) -> None:
+        """Read the map from a shared sync node instead of a private copy.
+        
+        The agent then neither loads snapshots nor runs its own
+        GameDataSyncService; map_db queries go to the shared database.
+        
+        Args:
+            source: A SharedMapNode in this process (queries use cursors on
+                its connection), or the replica directory a SharedMapNode in
+                another process publishes into (queries use the newest
+                read-only replica, refreshed on sync).
+        """
+        from FactoryVerse.infra.shared_map import SharedMapNode, MapReplica
+        
+        if isinstance(source, SharedMapNode):
+            self._shared_map = source
+            self._duckdb_connection = source.reader()
+        else:
+            replica = MapReplica(source)
+            self._shared_map = replica
+            self._duckdb_connection = replica.connection
+        if hasattr(self, '_map_db_accessor'):
+            self._map_db_accessor.connection = self._duckdb_connection
+        logger.info(f"Attached shared map for agent {self._agent_id}")
+    
+    def _refresh_shared_map(self) -> None:
+        """Switch to the newest published replica (no-op for in-process nodes)."""
+        from FactoryVerse.infra.shared_map import MapReplica
+        
+        if isinstance(self._shared_map, MapReplica) and self._shared_map.refresh():
+            self._duckdb_connection = self._shared_map.connection
+            if hasattr(self, '_map_db_accessor'):
+                self._map_db_accessor.connection = self._duckdb_connection
+    
+    def _map_sync(self) -> Optional[GameDataSyncService]:
+        """Sync service that writes this agent's map DB (None for replicas)."""
+        from FactoryVerse.infra.shared_map import SharedMapNode
+        
+        if self._shared_map is not None:
+            if isinstance(self._shared_map, SharedMapNode):
+                return self._shared_map.sync
+            return None
+        return self._game_data_sync
+    
+    def _change_feed(self) -> Optional["ChangeFeed"]:
+        """Change feed of the sync service that writes this agent's map DB."""
+        sync = self._map_sync()
+        return sync.change_feed if sync is not None else None
+    
+    async def _sync_shared_map(self, timeout: float = 5.0) -> None:
+        """Catch up with the shared map (replica refresh or node watermark)."""
+        from FactoryVerse.infra.shared_map import SharedMapNode
+        
+        if isinstance(self._shared_map, SharedMapNode):
+            if self._shared_map.sync is not None:
+                await self._shared_map.sync.ensure_synced(timeout=timeout)
+        else:
+            self._refresh_shared_map()
+    
+    def _note_agent_position(self, position: Union[Dict[str, float], MapPosition]) -> None:
+        """Feed a known agent position to the reachable cache and the chunk load scheduler."""
+        self._reachable_cache.note_position(position)
+        if self._game_data_sync is not None:
+            self._game_data_sync.set_agent_position(self._agent_id, position)
+    
+    def _prefetch_walk_route(self, goal: Union[Dict[str, float], MapPosition]) -> None:
+        """Prioritize loading the chunks between the agent and a walk goal."""
+        if self._game_data_sync is not None:
+            self._game_data_sync.prefetch_route([goal], agent_id=self._agent_id)
     
     async def _ensure_game_data_sync(self):
         """Ensure game data sync service is started."""
         if self._game_data_sync and not self._game_data_sync.is_running:
             await self._game_data_sync.start()
+            # Entity changes within reach invalidate the reachable snapshot cache
+            self._game_data_sync.udp_dispatcher.subscribe(
+                "entity_operation", self._reachable_cache.on_entity_operation
+            )
     
     async def _stop_game_data_sync(self):
         """Stop game data sync service."""
         if self._game_data_sync and self._game_data_sync.is_running:
+            self._game_data_sync.udp_dispatcher.unsubscribe(
+                "entity_operation", self._reachable_cache.on_entity_operation
+            )
             await self._game_data_sync.stop()
     
     @property
@@ -2370,7 +3167,7 @@ def playing_factorio(rcon_client: "RconClient", agent_id: str, recipes: Optional
             # But I can't easily modify PlayingFactory class right now without potentially breaking things.
             # Let's just do it directly here for now.
             cmd = f"/c remote.call('snapshot', 'set_entity_filter', game.json_to_table('{entities_json}'))"
-            rcon_client.send_command(cmd)
+            factory._rcon.send_command(cmd)
             # print(f"DEBUG: Set entity filter with {len(entities)} entities")
     except Exception as e:
         print(f"Warning: Failed to set entity filter: {e}")
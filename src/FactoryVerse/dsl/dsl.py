@@ -23,8 +23,12 @@ import json
 import logging
 import sys
 import asyncio
+import threading
+import weakref
 from contextlib import contextmanager
 from factorio_rcon import RCONClient as RconClient
+from FactoryVerse.infra.rcon_pool import RconPool
+from FactoryVerse.infra.rcon_transport import RconTransport
 
 
 def _get_factory() -> PlayingFactory:
@@ -312,7 +316,9 @@ class _ReachableAccessor:
             options: Optional dict with filters (same as get_entity)
         
         Returns:
-            List of matching ReachableEntity instances (may be empty)
+            EntityCollection of matching ReachableEntity instances (may be empty).
+            Bulk add_fuel / store_items / add_ingredients / take_products act on
+            all of them in one call and report per-entity results.
         """
         return _get_factory().reachable_entities.get_entities(entity_name, options)
     
@@ -383,6 +389,9 @@ class _DuckDBAccessor:
     Provides high-level method to load snapshot data into the database.
     """
     
+    # Reader cursor handed out by `connection`, one per thread and connection
+    _readers = threading.local()
+    
     async def load_snapshots(
         self,
         snapshot_dir: Optional[Path] = None,
@@ -440,27 +449,38 @@ class _DuckDBAccessor:
     
     @property
     def connection(self) -> "duckdb.DuckDBPyConnection":
-        """Get the DuckDB connection (automatically synced).
+        """Get a reader cursor on the map database (automatically synced).
         
         This property automatically ensures the DB is synced before returning.
-        The sync happens asynchronously if needed, but the connection is returned
+        The sync happens asynchronously if needed, but the cursor is returned
         immediately for synchronous queries.
         
+        The cursor is isolated from the sync writer: reads never run inside
+        a half-applied chunk load or gap repair. Each thread gets one cursor
+        per connection, reused on every access, so loops don't pile up open
+        cursors. Don't close it; use cursor() for one you own and close.
+        
         Returns:
-            DuckDB connection object
+            This thread's DuckDB reader cursor, seeing committed data only
         
         Raises:
             RuntimeError: If database has not been loaded yet
         """
         factory = _get_factory()
+        if factory._shared_map is not None:
+            factory._refresh_shared_map()
         con = factory.duckdb_connection
         if con is None:
             raise RuntimeError(
                 "DuckDB database not loaded. Call map_db.load_snapshots() first."
             )
         
-        # Ensure sync if service is running (non-blocking)
-        if factory._game_data_sync and factory._game_data_sync.is_running:
+        # Ensure sync if service is running and behind (non-blocking)
+        if (
+            factory._game_data_sync
+            and factory._game_data_sync.is_running
+            and not factory._game_data_sync.is_synced()
+        ):
             import asyncio
             try:
                 loop = asyncio.get_event_loop()
@@ -472,12 +492,40 @@ class _DuckDBAccessor:
                     loop.run_until_complete(factory._game_data_sync.ensure_synced())
             except RuntimeError:
                 pass
-        return con
+        
+        # Keyed weakly: a replaced shared-map replica connection drops its cursor
+        cursors = getattr(self._readers, "cursors", None)
+        if cursors is None:
+            cursors = self._readers.cursors = weakref.WeakKeyDictionary()
+        cursor = cursors.get(con)
+        if cursor is None:
+            cursor = cursors[con] = con.cursor()
+        return cursor
     
-    async def ensure_synced(self, timeout: float = 5.0) -> ActionResult:
-        """Explicitly ensure DB is synced before query."""
+    async def ensure_synced(
+        self,
+        timeout: float = 5.0,
+        query: Optional[str] = None,
+        params: Optional[List[Any]] = None,
+    ) -> ActionResult:
+        """Explicitly ensure DB is synced before query.
+        
+        Args:
+            timeout: Maximum time to wait (seconds)
+            query: Optional SQL about to be run; when its predicates restrict
+                it to an area, only that area's chunks are waited for
+            params: Positional parameters of query
+        """
+        from FactoryVerse.infra.db.query_extent import infer_query_chunks
         factory = _get_factory()
+        if factory._shared_map is not None:
+            await factory._sync_shared_map(timeout)
+            return {"success": True}
         if factory._game_data_sync:
+            chunks = infer_query_chunks(query, params) if query else None
+            if chunks is not None:
+                await factory._game_data_sync.ensure_synced_for(chunks, timeout)
+                return {"success": True, "chunks": len(chunks)}
             await factory._game_data_sync.ensure_synced(timeout)
             return {"success": True}
         return {"success": False, "reason": "Sync service not running"}
@@ -485,6 +533,10 @@ class _DuckDBAccessor:
     def sync(self, timeout: float = 5.0) -> ActionResult:
         """Alias for ensure_synced() for consistency with factory.map_db.sync()."""
         import asyncio
+        sync_service = _get_factory()._game_data_sync
+        if sync_service and sync_service.is_synced():
+            # Watermark already caught up - nothing to wait for
+            return {"success": True}
         try:
             loop = asyncio.get_event_loop()
             if loop.is_running():
@@ -524,10 +576,82 @@ class _DuckDBAccessor:
             query: SQL SELECT query (validated for safety)
         
         Returns:
-            List of RemoteViewEntity instances (read-only)
+            EntityCollection of RemoteViewEntity instances (read-only). Bulk
+            actions on the collection report out-of-reach entities as failures.
         """
         factory = _get_factory()
         return factory.map_db.get_entities(query)
+    
+    def cursor(self) -> "duckdb.DuckDBPyConnection":
+        """Open an isolated reader cursor on the map database.
+        
+        Returns:
+            New DuckDB cursor seeing committed data only
+        """
+        return _get_factory().map_db.cursor()
+    
+    async def query(self, sql: str, params: Optional[List[Any]] = None):
+        """Run a read-only query in a worker thread (doesn't block sync).
+        
+        Args:
+            sql: SQL query
+            params: Optional positional parameters
+        
+        Returns:
+            pandas DataFrame with the query result
+        """
+        return await _get_factory().map_db.query(sql, params)
+    
+    async def show(self, sql: str) -> str:
+        """Run a read-only query in a worker thread and render it as a table.
+        
+        Args:
+            sql: SQL query
+        
+        Returns:
+            Box-drawn table text, as printed by relation.show()
+        """
+        return await _get_factory().map_db.show(sql)
+    
+    async def changes_since(
+        self,
+        cursor: str,
+        kinds: Optional[List[str]] = None,
+        area: Optional[tuple] = None,
+    ) -> Dict[str, Any]:
+        """Compact map changes (added/removed/modified) since this cursor's last read.
+        
+        Args:
+            cursor: Consumer name; the first call registers it
+            kinds: Restrict to "entity", "ghost" and/or "status"
+            area: Restrict to (min_x, min_y, max_x, max_y)
+        
+        Returns:
+            Dictionary with added, removed, modified, cursor, count and truncated
+        """
+        return await _get_factory().map_db.changes_since(cursor, kinds=kinds, area=area)
+    
+    async def as_of(self, tick: int) -> List[Dict[str, Any]]:
+        """Entity states as of a game tick (requires entity history).
+        
+        Args:
+            tick: Game tick
+        
+        Returns:
+            One version dict per entity
+        """
+        return await _get_factory().map_db.as_of(tick)
+    
+    async def changed_since(self, tick: int) -> List[Dict[str, Any]]:
+        """Entity versions opened or closed after a game tick (requires entity history).
+        
+        Args:
+            tick: Game tick
+        
+        Returns:
+            Version dicts, oldest change first
+        """
+        return await _get_factory().map_db.changed_since(tick)
 
 map_db = _DuckDBAccessor()
 
@@ -614,7 +738,9 @@ def configure(
     agent_id: str,
     snapshot_dir: Optional[Path] = None,
     db_path: Optional[Union[str, Path]] = None,
-    agent_udp_port: Optional[int] = None
+    agent_udp_port: Optional[int] = None,
+    shared_map_dir: Optional[Union[str, Path]] = None,
+    compact_calls: bool = False,
 ):
     """
     Configure the DSL environment with RCON connection and agent ID.
@@ -627,14 +753,22 @@ def configure(
         db_path: Optional path to DuckDB database file (uses in-memory if None)
         agent_udp_port: Optional UDP port for agent-specific async actions. 
                        If provided, agent owns this port completely (decoupled from snapshot port).
+        shared_map_dir: Optional replica directory of a shared map sync node. If provided,
+                       the agent reads the shared map instead of loading its own copy.
+        compact_calls: Register the in-game call dispatcher so remote calls are sent
+                       as short opcodes (falls back to full commands if it fails).
+                       Opt-in: defines the console globals fv_ops/fvc/fvd in the game.
     """
     global _configured_factory
     
+    # The transport's I/O thread owns the client; don't call it from this thread
+    rcon = rcon_client if isinstance(rcon_client, RconPool) else RconTransport.for_client(rcon_client)
+    
     # 1. Fetch recipes
     cmd = f"/c rcon.print(helpers.table_to_json(remote.call('{agent_id}', 'get_recipes')))"
     try:
-        res = rcon_client.send_command(cmd)
-        res = rcon_client.send_command(cmd)
+        res = rcon.send_command(cmd)
+        res = rcon.send_command(cmd)
         recipes_data = json.loads(res)
         if isinstance(recipes_data, dict):
             # If it's a dict (keyed by name), convert to list of values
@@ -653,7 +787,7 @@ def configure(
     # 2. Fetch technologies
     cmd = f"/c rcon.print(helpers.table_to_json(remote.call('{agent_id}', 'get_technologies')))"
     try:
-        res = rcon_client.send_command(cmd)
+        res = rcon.send_command(cmd)
         techs_res = json.loads(res)
         if isinstance(techs_res, dict):
             techs_data = techs_res.get('technologies', [])
@@ -669,18 +803,24 @@ def configure(
     # Note: RCON client is stored inside the factory but marked private
     # If agent_udp_port is provided, agent will listen directly on that port (decoupled from snapshot port)
     _configured_factory = PlayingFactory(
-        rcon_client, agent_id, recipes, tech_tree, agent_udp_port=agent_udp_port
+        rcon, agent_id, recipes, tech_tree, agent_udp_port=agent_udp_port
     )
+    if compact_calls:
+        _configured_factory.enable_dispatcher()
     
     # 3. Auto-load snapshots if snapshot_dir or db_path provided
     # Note: Uses sync version here since configure() is not async
     # User should call await map_db.load_snapshots() in playing_factorio() context
     # to wait for initial snapshot completion
-    if snapshot_dir is not None or db_path is not None:
-        _configured_factory._load_snapshots_sync(
-            snapshot_dir=snapshot_dir,
-            db_path=db_path
-        )
+    if shared_map_dir is not None:
+        _configured_factory.attach_shared_map(shared_map_dir)
+    elif snapshot_dir is not None or db_path is not None:
+        # A persisted DB with a journal checkpoint catches up instead of reloading
+        if db_path is None or not _configured_factory._resume_from_journal_sync(snapshot_dir, db_path):
+            _configured_factory._load_snapshots_sync(
+                snapshot_dir=snapshot_dir,
+                db_path=db_path
+            )
 
 
 @contextmanager
@@ -0,0 +1,201 @@
+"""Entity collections with bulk inventory actions.
+
+get_entities() on reachable and map_db returns an EntityCollection: a plain
+list of entities that can also refuel, load or empty all of them with a
+single RCON call (RemoteInterface.lua transfer_inventory_items).
+
+Every entity gets its own BulkEntityResult, so one full, empty or
+out-of-reach entity is reported without failing the others.
+
+**Example Agent Usage**:
+```python
+furnaces = reachable.get_entities("stone-furnace")
+results = furnaces.add_fuel([ItemStack("coal", 5)])
+failed = [r for r in results if not r["success"]]
+
+plates = furnaces.take_products()  # take everything from every output
+```
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Union
+
+from FactoryVerse.dsl.item.base import ItemStack
+from FactoryVerse.dsl.mixins import CrafterMixin, FuelableMixin, InventoryMixin
+from FactoryVerse.dsl.types import BulkEntityResult
+
+if TYPE_CHECKING:
+    from FactoryVerse.dsl.agent import PlayingFactory
+
+# Stacks for every entity, or a function giving the stacks for one entity
+ItemSpec = Union[List[ItemStack], Callable[[Any], List[ItemStack]]]
+
+
+class EntityCollection(list):
+    """List of entities with bulk counterparts of the per-entity inventory methods.
+
+    **For Agents**: Use these instead of looping over entities when the same
+    operation applies to many of them - one round trip instead of one per stack.
+    - add_fuel(): FuelableMixin.add_fuel on every entity
+    - store_items(): InventoryMixin.store_items on every entity
+    - add_ingredients(): CrafterMixin.add_ingredients on every entity
+    - take_products(): CrafterMixin.take_products on every entity
+
+    Items are either one list of ItemStacks applied to every entity, or a
+    function returning the stacks for a given entity. Results are returned
+    in entity order.
+    """
+
+    def __init__(self, entities: Iterable[Any] = (), factory: Optional["PlayingFactory"] = None):
+        super().__init__(entities)
+        self._factory_ref = factory
+
+    @property
+    def _factory(self) -> "PlayingFactory":
+        """Factory the collection came from, else the active gameplay context."""
+        if self._factory_ref is not None:
+            return self._factory_ref
+        from FactoryVerse.dsl.types import _playing_factory
+        factory = _playing_factory.get()
+        if factory is None:
+            raise RuntimeError(
+                "No active gameplay session for EntityCollection. "
+                "Use 'with playing_factorio(rcon, agent_id):' to enable operations."
+            )
+        return factory
+
+    def add_fuel(self, items: ItemSpec) -> List[BulkEntityResult]:
+        """Add fuel to every entity (validated per entity like FuelableMixin.add_fuel).
+
+        Args:
+            items: ItemStacks of fuel for each entity, or a function entity -> stacks
+
+        Returns:
+            One BulkEntityResult per entity
+        """
+        def fuel_inventory(entity: Any, stacks: List[ItemStack]) -> str:
+            if not isinstance(entity, FuelableMixin):
+                raise ValueError(f"{entity.name} does not accept fuel")
+            for stack in stacks:
+                entity._validate_fuel(stack.name)
+            return "fuel"
+
+        return self._transfer("put", items, fuel_inventory)
+
+    def store_items(self, items: ItemSpec) -> List[BulkEntityResult]:
+        """Store items in every entity's inventory (InventoryMixin.store_items).
+
+        Args:
+            items: ItemStacks to store in each entity, or a function entity -> stacks
+
+        Returns:
+            One BulkEntityResult per entity
+        """
+        def storage_inventory(entity: Any, stacks: List[ItemStack]) -> str:
+            if not isinstance(entity, InventoryMixin):
+                raise ValueError(f"{entity.name} has no storage inventory")
+            return entity._get_inventory_type()
+
+        return self._transfer("put", items, storage_inventory)
+
+    def add_ingredients(self, items: ItemSpec) -> List[BulkEntityResult]:
+        """Add ingredients to every entity's input buffer (CrafterMixin.add_ingredients).
+
+        Args:
+            items: ItemStacks to add to each entity, or a function entity -> stacks
+
+        Returns:
+            One BulkEntityResult per entity
+        """
+        return self._transfer("put", items, _crafter_inventory("input"))
+
+    def take_products(self, items: Optional[ItemSpec] = None) -> List[BulkEntityResult]:
+        """Take products from every entity's output buffer (CrafterMixin.take_products).
+
+        Args:
+            items: ItemStacks to take from each entity, or a function entity -> stacks.
+                If None, takes everything available (no inspect call needed).
+
+        Returns:
+            One BulkEntityResult per entity; "items" holds the ItemStacks taken
+        """
+        if items is None:
+            # An empty item name takes the whole inventory server-side
+            items = [ItemStack("", None)]
+        return self._transfer("take", items, _crafter_inventory("output"))
+
+    def _transfer(
+        self,
+        op: str,
+        items: ItemSpec,
+        inventory_for: Callable[[Any, List[ItemStack]], str],
+    ) -> List[BulkEntityResult]:
+        """Plan one transfer per (entity, stack), send them in one call, and split results per entity."""
+        results: List[BulkEntityResult] = []
+        transfers: List[Dict[str, Any]] = []
+        owners: List[int] = []
+
+        for wrapped in self:
+            # RemoteViewEntity and ghost views keep the entity in _entity
+            entity = getattr(wrapped, "_entity", wrapped)
+            result: BulkEntityResult = {
+                "entity_name": entity.name,
+                "position": {"x": entity.position.x, "y": entity.position.y},
+                "success": True,
+                "results": [],
+            }
+            if op == "take":
+                result["items"] = []
+            results.append(result)
+
+            try:
+                stacks = items(wrapped) if callable(items) else items
+                inventory_type = inventory_for(entity, stacks)
+            except ValueError as e:
+                result["success"] = False
+                result["error"] = str(e)
+                continue
+
+            for stack in stacks:
+                transfers.append({
+                    "op": op,
+                    "entity_name": entity.name,
+                    "position": result["position"],
+                    "inventory_type": inventory_type,
+                    "item_name": stack.name,
+                    "count": stack.count,
+                })
+                owners.append(len(results) - 1)
+
+        if not transfers:
+            return results
+
+        response = self._factory.transfer_inventory_items(transfers)
+        for owner, outcome in zip(owners, response.get("results") or []):
+            result = results[owner]
+            if not outcome.get("success"):
+                result["success"] = False
+                result.setdefault("error", outcome.get("error", "Transfer failed"))
+                continue
+            action_result = outcome.get("result") or {}
+            result["results"].append(action_result)
+            if op == "take":
+                result["items"].extend(_taken_stacks(action_result))
+        return results
+
+
+def _crafter_inventory(inventory_type: str) -> Callable[[Any, List[ItemStack]], str]:
+    def crafter_inventory(entity: Any, stacks: List[ItemStack]) -> str:
+        if not isinstance(entity, CrafterMixin):
+            raise ValueError(f"{entity.name} has no {inventory_type} buffer")
+        return inventory_type
+    return crafter_inventory
+
+
+def _taken_stacks(action_result: Dict[str, Any]) -> List[ItemStack]:
+    """ItemStacks from a take result (one item, or "items" when everything was taken)."""
+    if action_result.get("item_name"):
+        return [ItemStack(name=action_result["item_name"], count=action_result.get("count", 0))]
+    return [
+        ItemStack(name=item["item_name"], count=item["count"])
+        for item in action_result.get("items") or []
+    ]
@@ -0,0 +1,334 @@
+"""Drive several agents from one place.
+
+MultiAgentFactory wraps one PlayingFactory per agent and fans actions out
+to all of them in one call:
+
+    agents = MultiAgentFactory.create(rcon, [f"agent_{i}" for i in range(1, 9)], recipes, tech_tree)
+    report = await agents.walk_to({f"agent_{i}": MapPosition(x=10 * i, y=0) for i in range(1, 9)})
+    report.raise_for_errors()
+
+Async actions (walk_to, mine, craft) are enqueued for every agent in one
+batched RCON command per server (agents on the same connection or pool
+share a chunk; see RconBatch). All completions are then awaited together,
+so a coordinated step takes about one round trip plus the slowest action
+instead of N round trips.
+
+Every fan-out returns a FleetReport with one result or error per agent. A
+failing agent never cancels the others.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from FactoryVerse.dsl.agent import PlayingFactory, _cap_mine_count, _crafted_items, _mined_items
+from FactoryVerse.dsl.recipe.base import Recipes
+from FactoryVerse.dsl.technology.base import TechTree
+from FactoryVerse.dsl.types import MapPosition, _playing_factory
+from FactoryVerse.infra.rcon_batch import RCON_MAX_COMMAND_BYTES, RconBatch
+from FactoryVerse.infra.rcon_pool import PooledRcon
+
+logger = logging.getLogger(__name__)
+
+
+class FleetReport:
+    """Combined outcome of a multi-agent step: a result or an error per agent."""
+
+    def __init__(self, results: Dict[str, Any], errors: Dict[str, BaseException], elapsed: float):
+        self.results = results
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """True if every agent succeeded."""
+        return not self.errors
+
+    @property
+    def succeeded(self) -> List[str]:
+        return list(self.results)
+
+    @property
+    def failed(self) -> List[str]:
+        return list(self.errors)
+
+    def __getitem__(self, agent_id: str) -> Any:
+        """Result for an agent (raises its error if it failed)."""
+        if agent_id in self.errors:
+            raise self.errors[agent_id]
+        return self.results[agent_id]
+
+    def raise_for_errors(self) -> "FleetReport":
+        """Raise the first agent error, if any (returns self otherwise)."""
+        if self.errors:
+            agent_id, error = next(iter(self.errors.items()))
+            raise RuntimeError(f"{len(self.errors)} agent(s) failed, first {agent_id}: {error}") from error
+        return self
+
+    def __repr__(self) -> str:
+        return (
+            f"FleetReport(ok={len(self.results)}, failed={len(self.errors)}, "
+            f"elapsed={self.elapsed:.2f}s)"
+        )
+
+
+def _server_key(factory: PlayingFactory) -> int:
+    """Identity of the RCON server connection behind a factory (agents sharing it can share a batch)."""
+    rcon = factory._rcon
+    if isinstance(rcon, PooledRcon):
+        return id(rcon.pool)
+    return id(getattr(rcon, "client", rcon))
+
+
+class MultiAgentFactory:
+    """Facade over several PlayingFactory instances (one per agent)."""
+
+    def __init__(self, factories: Iterable[PlayingFactory], max_command_bytes: Optional[int] = RCON_MAX_COMMAND_BYTES):
+        """
+        Initialize the facade.
+
+        Args:
+            factories: One PlayingFactory per agent
+            max_command_bytes: Split batched commands above this size (see RconBatch)
+        """
+        self.factories: Dict[str, PlayingFactory] = {f.agent_id: f for f in factories}
+        self.max_command_bytes = max_command_bytes
+
+    @classmethod
+    def create(
+        cls,
+        rcon_client: Any,
+        agent_ids: Iterable[str],
+        recipes: Recipes,
+        tech_tree: TechTree,
+        compact_calls: bool = False,
+    ) -> "MultiAgentFactory":
+        """
+        Build one PlayingFactory per agent on a shared RCON client or RconPool.
+
+        Args:
+            rcon_client: RCON client (or RconPool) shared by all agents
+            agent_ids: Agent IDs (e.g., 'agent_1')
+            recipes: Recipes instance shared by all agents
+            tech_tree: TechTree instance shared by all agents
+            compact_calls: Register the in-game call dispatcher for each agent
+                (opt-in: defines console globals and costs a handshake per agent)
+
+        Returns:
+            MultiAgentFactory over the new factories
+        """
+        factories = [PlayingFactory(rcon_client, agent_id, recipes, tech_tree) for agent_id in agent_ids]
+        if compact_calls:
+            for factory in factories:
+                factory.enable_dispatcher()
+        return cls(factories)
+
+    def __len__(self) -> int:
+        return len(self.factories)
+
+    def __getitem__(self, agent_id: str) -> PlayingFactory:
+        return self.factories[agent_id]
+
+    @property
+    def agent_ids(self) -> List[str]:
+        return list(self.factories)
+
+    # ========================================================================
+    # Fan-out
+    # ========================================================================
+
+    async def call(self, method: str, args: Optional[Dict[str, Tuple]] = None) -> FleetReport:
+        """
+        Call a RemoteInterface method for many agents in one batched round trip per server.
+
+        Args:
+            method: RemoteInterface method name (e.g., 'inspect')
+            args: Positional arguments per agent (default: every agent, no arguments)
+
+        Returns:
+            FleetReport with each agent's raw result
+        """
+        start = time.monotonic()
+        calls = args if args is not None else {agent_id: () for agent_id in self.factories}
+        results, errors = await self._batched({agent_id: (method, tuple(a)) for agent_id, a in calls.items()})
+        return FleetReport(results, errors, time.monotonic() - start)
+
+    async def run(self, step: Callable[[PlayingFactory], Awaitable[Any]], agent_ids: Optional[Iterable[str]] = None) -> FleetReport:
+        """
+        Run an async step for many agents concurrently.
+
+        Each step runs with its agent's factory as the active gameplay context,
+        so DSL helpers (walking, reachable, ...) inside it act on that agent.
+
+        Args:
+            step: factory -> awaitable
+            agent_ids: Agents to run (default: all)
+
+        Returns:
+            FleetReport with each step's return value
+        """
+        start = time.monotonic()
+        ids = list(agent_ids) if agent_ids is not None else self.agent_ids
+        tasks = []
+        for agent_id in ids:
+            factory = self.factories[agent_id]
+            context = contextvars.copy_context()
+            context.run(_playing_factory.set, factory)
+            tasks.append(asyncio.create_task(step(factory), context=context))
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return self._report(dict(zip(ids, outcomes)), {}, start)
+
+    async def walk_to(
+        self,
+        targets: Dict[str, Union[Dict[str, float], MapPosition]],
+        strict_goal: bool = False,
+        options: Optional[Dict] = None,
+        timeout: Optional[int] = None,
+    ) -> FleetReport:
+        """
+        Walk several agents to their targets at once.
+
+        Args:
+            targets: Target position per agent
+            strict_goal: If true, fail if exact position unreachable
+            options: Additional pathfinding options (same for every agent)
+            timeout: Optional timeout in seconds per agent
+
+        Returns:
+            FleetReport with each agent's completion payload
+        """
+        for agent_id, position in targets.items():
+            self.factories[agent_id]._prefetch_walk_route(position)
+
+        def on_done(factory: PlayingFactory, agent_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+            if isinstance(payload, dict) and payload.get("success"):
+                factory._note_agent_position(targets[agent_id])
+            return payload
+
+        return await self._fan_out(
+            {agent_id: ("walk_to", (position, strict_goal, options or {})) for agent_id, position in targets.items()},
+            timeout, on_done,
+        )
+
+    async def mine(
+        self,
+        resources: Dict[str, str],
+        max_count: Optional[int] = None,
+        timeout: Optional[int] = None,
+    ) -> FleetReport:
+        """
+        Mine a resource with several agents at once.
+
+        Args:
+            resources: Resource prototype name per agent
+            max_count: Max items each agent mines (None = deplete resource)
+            timeout: Optional timeout in seconds per agent
+
+        Returns:
+            FleetReport with each agent's mined ItemStacks
+        """
+        max_count = _cap_mine_count(max_count)
+        return await self._fan_out(
+            {agent_id: ("mine_resource", (resource, max_count)) for agent_id, resource in resources.items()},
+            timeout, lambda factory, agent_id, payload: _mined_items(payload),
+        )
+
+    async def craft(
+        self,
+        recipes: Dict[str, Union[str, Tuple[str, int]]],
+        timeout: Optional[int] = None,
+    ) -> FleetReport:
+        """
+        Hand-craft with several agents at once.
+
+        Args:
+            recipes: Recipe name, or (recipe name, count), per agent
+            timeout: Optional timeout in seconds per agent
+
+        Returns:
+            FleetReport with each agent's crafted ItemStacks
+
+        Raises:
+            ValueError: If an agent's recipe is not hand-craftable or not enabled
+                (checked for every agent before anything is sent)
+        """
+        specs = {
+            agent_id: (spec, 1) if isinstance(spec, str) else spec
+            for agent_id, spec in recipes.items()
+        }
+        for agent_id, (recipe, _) in specs.items():
+            self.factories[agent_id]._validate_craft(recipe)
+        calls = {agent_id: ("craft_enqueue", (recipe, count)) for agent_id, (recipe, count) in specs.items()}
+        return await self._fan_out(calls, timeout, lambda factory, agent_id, payload: _crafted_items(payload))
+
+    # ========================================================================
+    # Internals
+    # ========================================================================
+
+    async def _fan_out(
+        self,
+        calls: Dict[str, Tuple[str, Tuple]],
+        timeout: Optional[int],
+        on_done: Callable[[PlayingFactory, str, Dict[str, Any]], Any],
+    ) -> FleetReport:
+        """Enqueue async actions in batched round trips, then await all completions together."""
+        start = time.monotonic()
+        responses, errors = await self._batched(calls)
+
+        async def complete(agent_id: str, response: Dict[str, Any]) -> Any:
+            factory = self.factories[agent_id]
+            if isinstance(response, dict) and response.get("success") is False:
+                raise RuntimeError(f"Action failed: {response.get('error', 'Unknown error')}")
+            payload = await factory._await_action(response, timeout=timeout)
+            return on_done(factory, agent_id, payload)
+
+        ids = list(responses)
+        outcomes = await asyncio.gather(
+            *(complete(agent_id, responses[agent_id]) for agent_id in ids), return_exceptions=True
+        )
+        return self._report(dict(zip(ids, outcomes)), errors, start)
+
+    async def _batched(self, calls: Dict[str, Tuple[str, Tuple]]) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+        """Send one call per agent, one RconBatch per server, all servers concurrently."""
+        groups: Dict[int, List[str]] = {}
+        for agent_id in calls:
+            groups.setdefault(_server_key(self.factories[agent_id]), []).append(agent_id)
+
+        futures: Dict[str, asyncio.Future] = {}
+        batches = []
+        for agent_ids in groups.values():
+            sender = self.factories[agent_ids[0]]
+            batch = RconBatch(
+                lambda method, agent_id, *args: self.factories[agent_id]._build_remote_call(method, *args),
+                sender.execute, execute_async=sender.execute_async,
+                max_command_bytes=self.max_command_bytes,
+            )
+            for agent_id in agent_ids:
+                method, args = calls[agent_id]
+                futures[agent_id] = batch.call(method, agent_id, *args)
+            batches.append(batch)
+        await asyncio.gather(*(batch.flush() for batch in batches))
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        for agent_id, future in futures.items():
+            if future.exception() is not None:
+                errors[agent_id] = future.exception()
+            else:
+                results[agent_id] = future.result()
+        return results, errors
+
+    def _report(self, outcomes: Dict[str, Any], errors: Dict[str, BaseException], start: float) -> FleetReport:
+        results = {}
+        errors = dict(errors)
+        for agent_id, outcome in outcomes.items():
+            if isinstance(outcome, BaseException):
+                errors[agent_id] = outcome
+            else:
+                results[agent_id] = outcome
+        report = FleetReport(results, errors, time.monotonic() - start)
+        if errors:
+            logger.warning(f"Multi-agent step: {report}")
+        return report
@@ -359,6 +359,19 @@ class ActionResult(TypedDict, total=False):
     actual_products: Dict[str, int]
 
 
+class BulkEntityResult(TypedDict, total=False):
+    """Per-entity outcome of a bulk inventory action on an EntityCollection.
+    
+    RCON Contract: One entity's share of RemoteInterface.lua transfer_inventory_items
+    """
+    entity_name: str
+    position: Dict[str, float]
+    success: bool
+    results: List[ActionResult]
+    items: List[Any]  # ItemStacks taken (take_products only)
+    error: str
+
+
 # =============================================================================
 # AGENT INSPECTION
 # =============================================================================
@@ -0,0 +1,445 @@
+"""Action completion tracking with futures and a hierarchical timer wheel.
+
+Async actions (walk_to, mine_resource, craft_enqueue, ...) return an
+action_id over RCON and report completion later over UDP. ActionRegistry
+keeps one entry per in-flight action:
+
+- a future created with ``loop.create_future()`` on the waiter's loop,
+  resolved from the UDP thread with ``loop.call_soon_threadsafe``
+- a deadline in a hierarchical TimerWheel (O(1) schedule/cancel), pushed
+  back by progress events for actions that report progress (walking)
+
+A completed or timed-out entry is dropped as soon as wait() hands out its
+result; a cancelled waiter drops it immediately. Completions that arrive before the action is registered (the
+UDP event can beat the RCON response) are buffered for a short while and
+handed to the matching registration.
+
+One registry (get_action_registry) and one timer thread serve all agents
+in the process.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Actions whose progress events extend the deadline
+PROGRESS_EXTENDED_ACTIONS: Set[str] = {"walk_to"}
+
+
+# ============================================================================
+# Timer wheel
+# ============================================================================
+
+class _Timer:
+    __slots__ = ("tick", "key", "cancelled")
+
+    def __init__(self, tick: int, key: Hashable):
+        self.tick = tick
+        self.key = key
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Hierarchical timing wheel (not thread safe).
+
+    Level 0 has one slot per tick (resolution seconds); each higher level
+    covers ``slots`` slots of the level below. Timers cascade down a level
+    when their higher-level slot comes up, so schedule and cancel are O(1)
+    and advancing costs O(expired + cascaded) per tick.
+    """
+
+    def __init__(self, resolution: float = 0.05, slots: int = 64, levels: int = 4, now: Optional[float] = None):
+        """
+        Initialize the wheel.
+
+        Args:
+            resolution: Seconds per tick
+            slots: Slots per level
+            levels: Number of levels (range = resolution * slots ** levels)
+            now: Current time (default: time.monotonic())
+        """
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._wheels: List[List[List[_Timer]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._tick = int((time.monotonic() if now is None else now) / resolution)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, deadline: float, key: Hashable) -> _Timer:
+        """
+        Schedule key to expire at deadline.
+
+        Args:
+            deadline: Expiry time (same clock as advance())
+            key: Returned by advance() on expiry
+
+        Returns:
+            Timer handle for cancel()
+        """
+        timer = _Timer(max(math.ceil(deadline / self.resolution), self._tick + 1), key)
+        self._place(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer: _Timer) -> None:
+        """Cancel a timer (dropped lazily when its slot comes up)."""
+        if not timer.cancelled:
+            timer.cancelled = True
+            self._count -= 1
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Advance to now and collect expired keys.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Keys of timers that expired, in expiry order
+        """
+        target = int(now / self.resolution)
+        if self._count == 0:
+            # Nothing to fire or cascade, skip the idle ticks
+            self._tick = max(self._tick, target)
+            return []
+
+        expired: List[Hashable] = []
+        while self._tick < target:
+            self._tick += 1
+            # Cascade higher levels whose slot boundary we crossed
+            span = self.slots
+            for level in range(1, self.levels):
+                if self._tick % span:
+                    break
+                index = (self._tick // span) % self.slots
+                bucket = self._wheels[level][index]
+                self._wheels[level][index] = []
+                for timer in bucket:
+                    if not timer.cancelled:
+                        self._place(timer)
+                span *= self.slots
+
+            slot = self._tick % self.slots
+            bucket = self._wheels[0][slot]
+            self._wheels[0][slot] = []
+            for timer in bucket:
+                if timer.cancelled:
+                    continue
+                if timer.tick > self._tick:
+                    self._place(timer)
+                    continue
+                timer.cancelled = True
+                self._count -= 1
+                expired.append(timer.key)
+        return expired
+
+    def _place(self, timer: _Timer) -> None:
+        delta = max(timer.tick - self._tick, 1)
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots or level == self.levels - 1:
+                tick = timer.tick if delta < span * self.slots else self._tick + span * (self.slots - 1)
+                self._wheels[level][(tick // span) % self.slots].append(timer)
+                return
+            span *= self.slots
+
+
+# ============================================================================
+# Action registry
+# ============================================================================
+
+class _PendingAction:
+    __slots__ = ("action_id", "future", "loop", "timer", "timeout", "progress", "registered_at", "settled")
+
+    def __init__(self, action_id: str, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.action_id = action_id
+        self.future = future
+        self.loop = loop
+        self.timer: Optional[_Timer] = None
+        self.timeout: Optional[float] = None
+        self.progress: Dict[str, Any] = {}
+        self.registered_at = time.monotonic()
+        self.settled = False  # Result or timeout decided (the future may not be done yet)
+
+
+def _settle(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """Complete a future unless it's already done (runs on the future's loop)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class ActionRegistry:
+    """Futures for in-flight async actions, with timer-wheel deadlines."""
+
+    def __init__(self, resolution: float = 0.05, early_ttl: float = 60.0, max_early: int = 10000):
+        """
+        Initialize the registry.
+
+        Args:
+            resolution: Deadline resolution in seconds
+            early_ttl: Seconds to keep completions that arrive before registration
+            max_early: Maximum number of buffered early completions
+        """
+        self.early_ttl = early_ttl
+        self.max_early = max_early
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._wheel = TimerWheel(resolution=resolution)
+        self._actions: Dict[str, _PendingAction] = {}
+        # action_id -> (payload, arrival time), oldest first
+        self._early: "OrderedDict[str, tuple]" = OrderedDict()
+        # Recently finished ids; duplicate completions are dropped instead of buffered
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"registered": 0, "completed": 0, "timeouts": 0, "early": 0, "extensions": 0}
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __contains__(self, action_id: str) -> bool:
+        return action_id in self._actions
+
+    def register(self, action_id: str, timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        Register an action and return its completion future.
+
+        Must be called from the event loop that will await the future.
+
+        Args:
+            action_id: Action ID from the RCON response
+            timeout: Seconds until TimeoutError (None = set later by wait())
+
+        Returns:
+            Future resolved with the completion payload
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = _PendingAction(action_id, future, loop)
+        with self._lock:
+            previous = self._actions.get(action_id)
+            if previous is not None:
+                self._remove(previous)
+                previous.loop.call_soon_threadsafe(previous.future.cancel)
+            self.stats["registered"] += 1
+            self._actions[action_id] = entry
+            early = self._early.pop(action_id, None)
+            if early is not None:
+                # Completed before we got here
+                entry.settled = True
+                self._mark_finished(action_id)
+                self.stats["completed"] += 1
+                future.set_result(early[0])
+            elif timeout is not None:
+                self._set_deadline(entry, timeout)
+        future.add_done_callback(lambda f: f.cancelled() and self._discard(entry))
+        return future
+
+    async def wait(self, action_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for a registered action to complete.
+
+        Args:
+            action_id: The action ID to wait for
+            timeout: Seconds until TimeoutError if no deadline was set at registration
+
+        Returns:
+            The completion payload
+
+        Raises:
+            TimeoutError: If the action doesn't complete in time
+            ValueError: If action_id is not registered
+        """
+        with self._lock:
+            entry = self._actions.get(action_id)
+            if entry is not None and not entry.settled and entry.timer is None and timeout is not None:
+                self._set_deadline(entry, timeout)
+        if entry is None:
+            raise ValueError(f"Action not registered: {action_id}")
+        try:
+            return await entry.future
+        finally:
+            self._discard(entry)
+
+    def complete(self, action_id: str, payload: Dict[str, Any]) -> bool:
+        """
+        Resolve an action with its completion payload (thread safe).
+
+        Args:
+            action_id: Completed action
+            payload: Completion payload
+
+        Returns:
+            True if a registered waiter was resolved, False if buffered or dropped
+        """
+        with self._lock:
+            entry = self._actions.get(action_id)
+            if entry is None or entry.settled:
+                if entry is None and action_id not in self._finished:
+                    self._buffer_early(action_id, payload)
+                return False
+            self._settle_entry(entry)
+            self.stats["completed"] += 1
+        self._call_soon(entry, payload, None)
+        return True
+
+    def progress(self, action_id: str, payload: Dict[str, Any], extend: bool = False) -> None:
+        """
+        Record progress for an action (thread safe).
+
+        Args:
+            action_id: Action in progress
+            payload: Progress payload (its "result" is kept as the latest progress)
+            extend: Push the deadline back by the action's timeout
+        """
+        with self._lock:
+            entry = self._actions.get(action_id)
+            if entry is None or entry.settled:
+                return
+            entry.progress = payload.get("result") or {}
+            if extend and entry.timeout is not None:
+                self._set_deadline(entry, entry.timeout)
+                self.stats["extensions"] += 1
+
+    def get_progress(self, action_id: str) -> Dict[str, Any]:
+        """Latest progress result of a pending action ({} if none)."""
+        entry = self._actions.get(action_id)
+        return entry.progress if entry is not None else {}
+
+    def cancel(self, action_id: str) -> None:
+        """Stop tracking an action; its waiter gets CancelledError."""
+        with self._lock:
+            entry = self._actions.get(action_id)
+            if entry is None:
+                return
+            self._remove(entry)
+        entry.loop.call_soon_threadsafe(entry.future.cancel)
+
+    def close(self) -> None:
+        """Stop the timer thread and cancel all pending actions."""
+        with self._lock:
+            self._closed = True
+            entries = list(self._actions.values())
+            for entry in entries:
+                self._remove(entry)
+            self._wakeup.notify_all()
+        for entry in entries:
+            try:
+                entry.loop.call_soon_threadsafe(entry.future.cancel)
+            except RuntimeError:
+                pass  # Loop already closed
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    # ------------------------------------------------------------------------
+    # Internals (call with the lock held unless noted)
+    # ------------------------------------------------------------------------
+
+    def _set_deadline(self, entry: _PendingAction, timeout: float) -> None:
+        if entry.timer is not None:
+            self._wheel.cancel(entry.timer)
+        entry.timeout = timeout
+        entry.timer = self._wheel.schedule(time.monotonic() + timeout, entry.action_id)
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run_timers, name="fv-action-timers", daemon=True)
+            self._thread.start()
+        if len(self._wheel) == 1:
+            self._wakeup.notify()
+
+    def _remove(self, entry: _PendingAction) -> None:
+        if self._actions.get(entry.action_id) is entry:
+            del self._actions[entry.action_id]
+        if entry.timer is not None:
+            self._wheel.cancel(entry.timer)
+            entry.timer = None
+
+    def _settle_entry(self, entry: _PendingAction) -> None:
+        """Mark an entry decided; it stays registered until wait() collects it."""
+        entry.settled = True
+        if entry.timer is not None:
+            self._wheel.cancel(entry.timer)
+            entry.timer = None
+        self._mark_finished(entry.action_id)
+
+    def _discard(self, entry: _PendingAction) -> None:
+        """Drop an entry (collected by wait(), or its waiter was cancelled)."""
+        with self._lock:
+            self._remove(entry)
+
+    def _buffer_early(self, action_id: str, payload: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        self._early[action_id] = (payload, now)
+        self._early.move_to_end(action_id)
+        self.stats["early"] += 1
+        while self._early:
+            oldest_id, (_, arrived) = next(iter(self._early.items()))
+            if len(self._early) <= self.max_early and now - arrived <= self.early_ttl:
+                break
+            del self._early[oldest_id]
+
+    def _mark_finished(self, action_id: str) -> None:
+        self._finished[action_id] = time.monotonic()
+        while len(self._finished) > self.max_early:
+            self._finished.popitem(last=False)
+
+    def _call_soon(self, entry: _PendingAction, result: Any, error: Optional[BaseException]) -> None:
+        """Settle entry's future on its loop (lock not held)."""
+        try:
+            entry.loop.call_soon_threadsafe(_settle, entry.future, result, error)
+        except RuntimeError:
+            logger.debug(f"Event loop closed before action {entry.action_id} settled")
+
+    def _run_timers(self) -> None:
+        """Timer thread: advance the wheel and time out expired actions."""
+        resolution = self._wheel.resolution
+        while True:
+            with self._lock:
+                while not self._closed and len(self._wheel) == 0:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                self._wakeup.wait(timeout=resolution)
+                expired = []
+                for action_id in self._wheel.advance(time.monotonic()):
+                    entry = self._actions.get(action_id)
+                    if entry is None or entry.settled:
+                        continue
+                    entry.timer = None
+                    self._settle_entry(entry)
+                    self.stats["timeouts"] += 1
+                    expired.append(entry)
+            for entry in expired:
+                self._call_soon(entry, None, asyncio.TimeoutError(
+                    f"Action {entry.action_id} timed out after {entry.timeout:.1f}s"
+                ))
+
+
+# Global registry instance (singleton pattern)
+_global_registry: Optional[ActionRegistry] = None
+
+
+def get_action_registry() -> ActionRegistry:
+    """
+    Get or create the process-wide action registry.
+
+    Returns:
+        The global ActionRegistry instance
+    """
+    global _global_registry
+    if _global_registry is None:
+        _global_registry = ActionRegistry()
+    return _global_registry
@@ -0,0 +1,267 @@
+"""Change feed over the map database with per-consumer cursors.
+
+GameDataSyncService appends one record per applied change (entity
+added/modified/removed, ghost added/modified/removed, entity status
+changed) to a bounded in-memory log. Consumers register a named cursor and
+read compact deltas since their last read, instead of re-running broad
+queries every turn:
+
+    feed = sync.change_feed
+    feed.register("planner")
+    ...
+    delta = feed.changes_since("planner", kinds={"entity"}, area=(-50, -50, 50, 50))
+    delta["added"], delta["removed"], delta["modified"]
+
+Deltas are compacted per key: an entity added and then removed within the
+window does not appear at all, one added and then modified is reported as
+added with its latest data. When a cursor fell behind the retained log
+(capacity exceeded) the delta is marked truncated and the consumer should
+re-query the tables once.
+"""
+
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+KINDS = ("entity", "ghost", "status")
+
+# (min_x, min_y, max_x, max_y) in tile coordinates
+Area = Tuple[float, float, float, float]
+
+
+@dataclass
+class ChangeRecord:
+    """A single applied change."""
+    seq: int
+    kind: str  # entity / ghost / status
+    action: str  # added / modified / removed
+    key: str
+    name: Optional[str] = None
+    position: Optional[Dict[str, float]] = None
+    tick: Optional[int] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class ChangeFeed:
+    """Bounded change log with named consumer cursors."""
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the change feed.
+
+        Args:
+            capacity: Changes retained; cursors further behind get a truncated delta
+        """
+        self._log: deque = deque(maxlen=capacity)
+        self._counter = itertools.count(1)
+        self._last_seq = 0
+        self._cursors: Dict[str, int] = {}
+        self._statuses: Optional[Dict[str, str]] = None
+
+    @property
+    def active(self) -> bool:
+        """True when at least one cursor is registered (recording is skipped otherwise)."""
+        return bool(self._cursors)
+
+    def register(self, name: str, from_start: bool = False) -> int:
+        """
+        Register a named cursor (no-op if it exists).
+
+        Args:
+            name: Consumer name
+            from_start: Start at the oldest retained change instead of now
+
+        Returns:
+            The cursor position
+        """
+        if name not in self._cursors:
+            start = (self._log[0].seq - 1) if from_start and self._log else self._last_seq
+            self._cursors[name] = start
+        return self._cursors[name]
+
+    def unregister(self, name: str) -> None:
+        """Drop a cursor."""
+        self._cursors.pop(name, None)
+
+    def record(
+        self,
+        kind: str,
+        action: str,
+        key: str,
+        name: Optional[str] = None,
+        position: Optional[Dict[str, float]] = None,
+        tick: Optional[int] = None,
+        **data: Any,
+    ) -> None:
+        """Append a change (ignored while no cursor is registered)."""
+        if not self._cursors:
+            return
+        seq = next(self._counter)
+        self._last_seq = seq
+        self._log.append(ChangeRecord(seq, kind, action, key, name, position, tick, data))
+
+    def record_statuses(self, statuses: Dict[str, Dict[str, Any]], tick: Optional[int] = None) -> int:
+        """
+        Diff a full status snapshot against the previous one and record changes.
+
+        Args:
+            statuses: entity_key -> {"status", "name", "x", "y"}
+            tick: Tick of the snapshot
+
+        Returns:
+            Number of status changes recorded
+        """
+        if not self._cursors or self._statuses is None:
+            # First snapshot seen (or nobody listening): baseline only
+            self._statuses = {k: v["status"] for k, v in statuses.items()}
+            return 0
+        changes = 0
+        for key, info in statuses.items():
+            previous = self._statuses.get(key)
+            if previous != info["status"]:
+                self.record(
+                    "status", "added" if previous is None else "modified", key,
+                    name=info.get("name"), position={"x": info.get("x"), "y": info.get("y")},
+                    tick=tick, status=info["status"], previous=previous,
+                )
+                changes += 1
+        for key in self._statuses.keys() - statuses.keys():
+            self.record("status", "removed", key, tick=tick, previous=self._statuses[key])
+            changes += 1
+        self._statuses = {k: v["status"] for k, v in statuses.items()}
+        return changes
+
+    def changes_since(
+        self,
+        name: str,
+        kinds: Optional[Iterable[str]] = None,
+        area: Optional[Area] = None,
+        advance: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Compact delta since the cursor's last read.
+
+        Args:
+            name: Cursor name (registered on first use, starting now)
+            kinds: Restrict to these kinds (entity, ghost, status)
+            area: Restrict to changes positioned inside (min_x, min_y, max_x, max_y);
+                removals without a known position are always included
+            advance: Move the cursor to the end of the log
+
+        Returns:
+            Dictionary with added, removed and modified lists of
+            {kind, key, name, position, tick, ...}, cursor (new position),
+            count (raw changes read) and truncated
+        """
+        if name not in self._cursors:
+            self.register(name)
+            return {"added": [], "removed": [], "modified": [], "cursor": self._last_seq, "count": 0, "truncated": False}
+
+        since = self._cursors[name]
+        truncated = bool(self._log) and self._log[0].seq > since + 1
+        wanted: Optional[Set[str]] = set(kinds) if kinds is not None else None
+
+        merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        count = 0
+        for record in self._log:
+            if record.seq <= since:
+                continue
+            if wanted is not None and record.kind not in wanted:
+                continue
+            count += 1
+            _merge(merged, record)
+
+        delta = {"added": [], "removed": [], "modified": []}
+        for entry in merged.values():
+            action = entry.pop("_action")
+            if action is None:
+                continue
+            if area is not None and not _in_area(entry.get("position"), area, action):
+                continue
+            delta[action].append(entry)
+
+        if advance:
+            self._cursors[name] = self._last_seq
+        return {**delta, "cursor": self._last_seq, "count": count, "truncated": truncated}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get change feed statistics.
+
+        Returns:
+            Dictionary with retained, last_seq and cursors (name -> lag)
+        """
+        return {
+            "retained": len(self._log),
+            "last_seq": self._last_seq,
+            "cursors": {name: self._last_seq - seq for name, seq in self._cursors.items()},
+        }
+
+
+def _merge(merged: Dict[Tuple[str, str], Dict[str, Any]], record: ChangeRecord) -> None:
+    """Fold a record into the per-key delta (first action + latest data)."""
+    slot = (record.kind, record.key)
+    entry = merged.get(slot)
+    latest = {
+        "kind": record.kind,
+        "key": record.key,
+        "name": record.name,
+        "position": record.position,
+        "tick": record.tick,
+        **record.data,
+    }
+    if entry is None:
+        merged[slot] = {**latest, "_action": record.action}
+        return
+
+    first = entry["_action"]
+    if record.action == "removed":
+        # added..removed cancels out; anything else ends as removed
+        action = None if first == "added" else "removed"
+    elif first == "removed":
+        action = "modified"  # removed then re-added: net change
+    else:
+        action = first or record.action
+
+    for k, v in latest.items():
+        if v is not None and not (k == "previous" and "previous" in entry):
+            entry[k] = v
+    entry["_action"] = action
+
+
+def _in_area(position: Optional[Dict[str, float]], area: Area, action: str) -> bool:
+    if not position or position.get("x") is None:
+        return action == "removed"
+    min_x, min_y, max_x, max_y = area
+    return min_x <= position["x"] <= max_x and min_y <= position["y"] <= max_y
+
+
+def format_changes(delta: Dict[str, Any], limit: int = 50) -> str:
+    """
+    Render a delta as compact text lines for a model prompt.
+
+    Args:
+        delta: Result of ChangeFeed.changes_since()
+        limit: Maximum lines per action
+
+    Returns:
+        One line per change ("+" added, "-" removed, "~" modified)
+    """
+    lines = []
+    if delta.get("truncated"):
+        lines.append("! change log truncated since last read - re-query the map")
+    for action, mark in (("added", "+"), ("removed", "-"), ("modified", "~")):
+        entries = delta.get(action, [])
+        for entry in entries[:limit]:
+            pos = entry.get("position") or {}
+            where = f" @ ({pos['x']}, {pos['y']})" if pos.get("x") is not None else ""
+            detail = ""
+            if entry["kind"] == "status":
+                detail = f" {entry.get('previous') or '-'} -> {entry.get('status') or '-'}"
+            elif entry.get("direction"):
+                detail = f" facing {entry['direction']}"
+            lines.append(f"{mark} {entry['kind']} {entry['key']}{where}{detail}")
+        if len(entries) > limit:
+            lines.append(f"{mark} ... {len(entries) - limit} more {action}")
+    return "\n".join(lines) if lines else "No changes."
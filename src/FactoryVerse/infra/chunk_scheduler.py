@@ -0,0 +1,234 @@
+"""Priority scheduling for chunk loads into the map database.
+
+Chunks whose snapshot completed are loaded one at a time under the sync
+service's write lock. On large maps the order matters: an agent standing at
+the origin should not wait for chunks a kilometre away. ChunkLoadScheduler
+orders pending loads by:
+
+1. Urgent chunks (named in ensure_synced(required_chunks=...))
+2. Distance (Chebyshev, in chunks) to the nearest focus: each agent's
+   current chunk, or a chunk on a planned walking route (where the distance
+   is the chunk's rank along the route, so the route is loaded in walking
+   order)
+3. Arrival order
+
+Priorities are evaluated when the next chunk is picked, not when it is
+queued, so a chunk that becomes urgent, or an agent that moves, takes effect
+before the next load - the loader releases the write lock between chunks,
+which is what makes the schedule preemptible.
+
+Usage:
+    scheduler = ChunkLoadScheduler()
+    scheduler.set_focus("agent_1", {"x": 100.5, "y": -40})
+    scheduler.push((3, -2))
+    scheduler.pop()  # -> nearest pending chunk
+"""
+
+import heapq
+import itertools
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+CHUNK_SIZE = 32
+
+ChunkKey = Tuple[int, int]
+
+
+def chunk_of(position: Any) -> ChunkKey:
+    """
+    Return the chunk containing a map position.
+
+    Args:
+        position: {x, y} dict or object with x/y attributes (tile coordinates)
+
+    Returns:
+        (chunk_x, chunk_y)
+    """
+    if isinstance(position, dict):
+        x, y = position["x"], position["y"]
+    else:
+        x, y = position.x, position.y
+    return math.floor(x / CHUNK_SIZE), math.floor(y / CHUNK_SIZE)
+
+
+def route_chunks(waypoints: Iterable[Any], radius: int = 1) -> List[ChunkKey]:
+    """
+    Chunks covered by a polyline route, in walking order.
+
+    Each straight segment between consecutive waypoints is sampled every
+    half chunk; every chunk within radius (Chebyshev) of a sampled chunk is
+    included the first time it is reached.
+
+    Args:
+        waypoints: Positions ({x, y} dicts or objects with x/y)
+        radius: Chunks to include on each side of the path
+
+    Returns:
+        Ordered, de-duplicated list of (chunk_x, chunk_y)
+    """
+    points = [
+        (p["x"], p["y"]) if isinstance(p, dict) else (p.x, p.y)
+        for p in waypoints
+    ]
+    if not points:
+        return []
+    if len(points) == 1:
+        points = points * 2
+
+    ordered: List[ChunkKey] = []
+    seen: Set[ChunkKey] = set()
+    step = CHUNK_SIZE / 2
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        samples = max(1, math.ceil(math.hypot(x1 - x0, y1 - y0) / step))
+        for i in range(samples + 1):
+            t = i / samples
+            cx, cy = chunk_of({"x": x0 + (x1 - x0) * t, "y": y0 + (y1 - y0) * t})
+            for dx in range(-radius, radius + 1):
+                for dy in range(-radius, radius + 1):
+                    key = (cx + dx, cy + dy)
+                    if key not in seen:
+                        seen.add(key)
+                        ordered.append(key)
+    return ordered
+
+
+class ChunkLoadScheduler:
+    """Priority queue of pending chunk loads, ordered by proximity to agents."""
+
+    def __init__(self, near_radius: int = 2):
+        """
+        Initialize the scheduler.
+
+        Args:
+            near_radius: Chunks within this distance of a focus count as
+                "near"; ensure_synced waits for near chunks only
+        """
+        self.near_radius = near_radius
+        self._pending: Dict[ChunkKey, int] = {}  # chunk -> arrival order
+        self._urgent: Set[ChunkKey] = set()
+        self._focus: Dict[str, ChunkKey] = {}  # agent_id -> current chunk
+        self._route: Dict[ChunkKey, int] = {}  # chunk -> rank along planned route
+        self._heap: List[Tuple[Tuple[int, float, int], ChunkKey]] = []
+        self._dirty = False
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, chunk_key: ChunkKey) -> bool:
+        return chunk_key in self._pending
+
+    # ------------------------------------------------------------------
+    # Focus
+    # ------------------------------------------------------------------
+
+    def set_focus(self, agent_id: str, position: Any) -> None:
+        """Record an agent's current position (tile coordinates)."""
+        chunk_key = chunk_of(position)
+        if self._focus.get(agent_id) != chunk_key:
+            self._focus[agent_id] = chunk_key
+            self._dirty = True
+
+    def get_focus(self, agent_id: str) -> Optional[ChunkKey]:
+        """Return the chunk an agent was last seen in, if known."""
+        return self._focus.get(agent_id)
+
+    def set_route(self, chunks: List[ChunkKey]) -> None:
+        """Replace the planned route (chunks in walking order)."""
+        self._route = {}
+        for rank, chunk_key in enumerate(chunks):
+            self._route.setdefault(chunk_key, rank)
+        self._dirty = True
+
+    def clear_route(self) -> None:
+        """Forget the planned route."""
+        if self._route:
+            self._route = {}
+            self._dirty = True
+
+    def mark_urgent(self, chunk_key: ChunkKey) -> None:
+        """Load chunk_key before anything else once it is pending."""
+        if chunk_key not in self._urgent:
+            self._urgent.add(chunk_key)
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+
+    def distance(self, chunk_key: ChunkKey) -> float:
+        """
+        Distance of a chunk to the nearest focus or route chunk.
+
+        Returns:
+            Chebyshev distance in chunks (route chunks: their route rank),
+            or 0 when no focus is known
+        """
+        if not self._focus and not self._route:
+            return 0
+        best = math.inf
+        cx, cy = chunk_key
+        for fx, fy in self._focus.values():
+            best = min(best, max(abs(cx - fx), abs(cy - fy)))
+        rank = self._route.get(chunk_key)
+        if rank is not None:
+            best = min(best, rank)
+        return best
+
+    def priority(self, chunk_key: ChunkKey) -> Tuple[int, float, int]:
+        """Sort key for a pending chunk (lower loads first)."""
+        return (
+            0 if chunk_key in self._urgent else 1,
+            self.distance(chunk_key),
+            self._pending.get(chunk_key, 0),
+        )
+
+    def is_near(self, chunk_key: ChunkKey) -> bool:
+        """Check whether a chunk is urgent or within near_radius of a focus."""
+        return chunk_key in self._urgent or self.distance(chunk_key) <= self.near_radius
+
+    def is_near_focus(self, chunk_key: ChunkKey) -> bool:
+        """Like is_near, but nothing is near while no focus or route is known (for eviction)."""
+        if chunk_key in self._urgent:
+            return True
+        if not self._focus and not self._route:
+            return False
+        return self.distance(chunk_key) <= self.near_radius
+
+    def push(self, chunk_key: ChunkKey) -> None:
+        """Queue a chunk for loading (no-op if already queued)."""
+        if chunk_key in self._pending:
+            return
+        self._pending[chunk_key] = next(self._counter)
+        heapq.heappush(self._heap, (self.priority(chunk_key), chunk_key))
+
+    def discard(self, chunk_key: ChunkKey) -> None:
+        """Remove a chunk (e.g. loaded by another path)."""
+        self._pending.pop(chunk_key, None)
+        self._urgent.discard(chunk_key)
+
+    def pop(self) -> Optional[ChunkKey]:
+        """
+        Take the highest-priority pending chunk.
+
+        Returns:
+            (chunk_x, chunk_y), or None if nothing is pending
+        """
+        if self._dirty:
+            self._heap = [(self.priority(c), c) for c in self._pending]
+            heapq.heapify(self._heap)
+            self._dirty = False
+        while self._heap:
+            (_, _, order), chunk_key = heapq.heappop(self._heap)
+            if self._pending.get(chunk_key) == order:  # Skip entries of discarded/re-queued chunks
+                self.discard(chunk_key)
+                return chunk_key
+        return None
+
+    def pending_near(self) -> List[ChunkKey]:
+        """Pending chunks that are urgent or near a focus, in priority order."""
+        return sorted((c for c in self._pending if self.is_near(c)), key=self.priority)
+
+    def has_pending_near(self) -> bool:
+        """Check whether any urgent or near chunk is still pending."""
+        return any(self.is_near(c) for c in self._pending)
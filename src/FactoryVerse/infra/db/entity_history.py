@@ -0,0 +1,307 @@
+"""
+Tick-versioned history of placed entities (optional temporal mode).
+
+map_entity and the component tables only hold the current state. With
+history enabled, GameDataSyncService also records every applied entity
+operation in ``entity_history``: the entity's current version is closed
+(``valid_to_tick`` set) and a new one opened, so past states and recent
+changes can be queried without replaying the JSONL logs.
+
+    entity_history(entity_key, entity_name, position, state, op,
+                   valid_from_tick, valid_to_tick, closed_by)
+
+- ``state`` is the serialized entity (as sent by the mod), JSON
+- ``op`` opened the version (created/upsert/rotated/configuration_changed)
+- ``closed_by`` closed it (the next op, or destroyed); NULL while current
+
+Views:
+
+- ``entity_history_current``: open versions (the current state)
+
+Queries (ticks are game ticks):
+
+- AS OF t:  valid_from_tick <= t AND (valid_to_tick IS NULL OR valid_to_tick > t)
+- changed since t: valid_from_tick > t OR valid_to_tick > t
+
+Versions are appended in tick order, so DuckDB's per-row-group min/max
+zonemaps prune both range predicates; an ART index on entity_key keeps
+closing the current version cheap. Re-applying an operation (log replay,
+gap repair, chunk reload) does not create a new version when the state is
+unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS entity_history (
+        entity_key VARCHAR NOT NULL,
+        entity_name VARCHAR,
+        position STRUCT(x DOUBLE, y DOUBLE),
+        state JSON,
+        op VARCHAR NOT NULL,
+        valid_from_tick BIGINT NOT NULL,
+        valid_to_tick BIGINT,
+        closed_by VARCHAR
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entity_history_key ON entity_history(entity_key);",
+    """
+    CREATE OR REPLACE VIEW entity_history_current AS
+    SELECT * FROM entity_history WHERE valid_to_tick IS NULL
+    """,
+]
+
+AS_OF_SQL = """
+    SELECT entity_key, entity_name, position, state, op, valid_from_tick, valid_to_tick
+    FROM entity_history
+    WHERE valid_from_tick <= ? AND (valid_to_tick IS NULL OR valid_to_tick > ?)
+    ORDER BY entity_key
+"""
+
+CHANGED_SINCE_SQL = """
+    SELECT entity_key, entity_name, position, state, op, valid_from_tick, valid_to_tick, closed_by
+    FROM entity_history
+    WHERE valid_from_tick > ? OR valid_to_tick > ?
+    ORDER BY COALESCE(valid_to_tick, valid_from_tick), entity_key
+"""
+
+
+def create_history_schema(con: duckdb.DuckDBPyConnection) -> None:
+    """
+    Create the entity_history table, index and views (idempotent).
+
+    Args:
+        con: DuckDB connection
+    """
+    for statement in SCHEMA_STATEMENTS:
+        con.execute(statement)
+
+
+class EntityHistory:
+    """Writes entity versions and enforces the retention policy."""
+
+    def __init__(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        retention_ticks: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        retention_every: int = 1000,
+    ):
+        """
+        Initialize history tracking (creates the schema).
+
+        Args:
+            con: DuckDB connection (the sync writer's)
+            retention_ticks: Drop closed versions that ended more than this many
+                ticks before the latest recorded tick
+            max_rows: Drop the oldest closed versions beyond this many rows
+                (open versions are never dropped)
+            retention_every: Enforce retention after this many new versions
+        """
+        self.con = con
+        self.retention_ticks = retention_ticks
+        self.max_rows = max_rows
+        self.retention_every = retention_every
+        self._since_retention = 0
+        self._latest_tick = 0
+        self.stats = {"versions": 0, "closed": 0, "pruned": 0}
+        create_history_schema(con)
+
+    def seed_from_map_entity(self, tick: int) -> int:
+        """
+        Open a state-less version for every map_entity row without one.
+
+        Used when history is enabled on a populated DB, so AS OF queries see
+        entities that existed before tracking started.
+
+        Args:
+            tick: Game tick the versions start at
+
+        Returns:
+            Number of versions opened
+        """
+        return len(self.con.execute(
+            """
+            INSERT INTO entity_history (entity_key, entity_name, position, op, valid_from_tick)
+            SELECT me.entity_key, me.entity_name::VARCHAR, {'x': me.position.x, 'y': me.position.y}, 'seed', ?
+            FROM map_entity me
+            WHERE NOT EXISTS (
+                SELECT 1 FROM entity_history h
+                WHERE h.entity_key = me.entity_key AND h.valid_to_tick IS NULL
+            )
+            RETURNING entity_key
+            """,
+            [tick],
+        ).fetchall())
+
+    def _current_state(self, entity_key: str) -> Optional[str]:
+        row = self.con.execute(
+            "SELECT state FROM entity_history WHERE entity_key = ? AND valid_to_tick IS NULL",
+            [entity_key],
+        ).fetchone()
+        return row[0] if row else None
+
+    def _close(self, entity_key: str, tick: int, closed_by: str) -> bool:
+        closed = self.con.execute(
+            "UPDATE entity_history SET valid_to_tick = ?, closed_by = ? "
+            "WHERE entity_key = ? AND valid_to_tick IS NULL RETURNING entity_key",
+            [tick, closed_by, entity_key],
+        ).fetchall()
+        self.stats["closed"] += len(closed)
+        return bool(closed)
+
+    def record_upsert(self, entity_data: Dict[str, Any], tick: int, op: str = "upsert") -> bool:
+        """
+        Open a new version for a created or changed entity.
+
+        Args:
+            entity_data: Serialized entity ({key, name, position, ...})
+            tick: Game tick of the operation
+            op: Operation that produced this version
+
+        Returns:
+            True if a version was recorded (False if the state is unchanged)
+        """
+        entity_key = entity_data.get("key")
+        if not entity_key:
+            return False
+        state = json.dumps(entity_data, sort_keys=True)
+        current = self._current_state(entity_key)
+        if current is not None and json.loads(current) == entity_data:
+            return False
+        self._close(entity_key, tick, op)
+        pos = entity_data.get("position") or {}
+        self.con.execute(
+            "INSERT INTO entity_history (entity_key, entity_name, position, state, op, valid_from_tick) "
+            "VALUES (?, ?, {'x': ?, 'y': ?}, ?, ?, ?)",
+            [entity_key, entity_data.get("name"), float(pos.get("x", 0.0)), float(pos.get("y", 0.0)), state, op, tick],
+        )
+        self._recorded(tick)
+        return True
+
+    def record_rotation(self, entity_key: str, direction: str, tick: int) -> bool:
+        """
+        Open a new version with an updated direction.
+
+        Args:
+            entity_key: Entity key
+            direction: New direction name (e.g. "east")
+            tick: Game tick of the operation
+
+        Returns:
+            True if a version was recorded
+        """
+        current = self._current_state(entity_key)
+        if current is None:
+            return False
+        entity_data = json.loads(current)
+        if entity_data.get("direction") == direction:
+            return False
+        entity_data["direction"] = direction
+        return self.record_upsert(entity_data, tick, op="rotated")
+
+    def record_destroy(self, entity_key: str, tick: int) -> bool:
+        """
+        Close the entity's current version.
+
+        Args:
+            entity_key: Entity key
+            tick: Game tick of the operation
+
+        Returns:
+            True if an open version was closed
+        """
+        closed = self._close(entity_key, tick, "destroyed")
+        if closed:
+            self._recorded(tick)
+        return closed
+
+    def _recorded(self, tick: int) -> None:
+        self.stats["versions"] += 1
+        self._latest_tick = max(self._latest_tick, tick)
+        self._since_retention += 1
+        if self._since_retention >= self.retention_every:
+            self.enforce_retention()
+
+    def enforce_retention(self) -> int:
+        """
+        Drop closed versions outside the retention window / row cap.
+
+        Returns:
+            Number of versions dropped
+        """
+        self._since_retention = 0
+        pruned = 0
+        if self.retention_ticks is not None:
+            cutoff = self._latest_tick - self.retention_ticks
+            pruned += len(self.con.execute(
+                "DELETE FROM entity_history WHERE valid_to_tick IS NOT NULL AND valid_to_tick < ? "
+                "RETURNING entity_key",
+                [cutoff],
+            ).fetchall())
+        if self.max_rows is not None:
+            total = self.con.execute("SELECT COUNT(*) FROM entity_history").fetchone()[0]
+            excess = total - self.max_rows
+            if excess > 0:
+                pruned += len(self.con.execute(
+                    """
+                    DELETE FROM entity_history WHERE rowid IN (
+                        SELECT rowid FROM entity_history WHERE valid_to_tick IS NOT NULL
+                        ORDER BY valid_to_tick LIMIT ?
+                    ) RETURNING entity_key
+                    """,
+                    [excess],
+                ).fetchall())
+        if pruned:
+            self.stats["pruned"] += pruned
+            logger.debug(f"Entity history retention dropped {pruned} versions")
+        return pruned
+
+
+def _rows_to_dicts(cursor: duckdb.DuckDBPyConnection) -> List[Dict[str, Any]]:
+    columns = [d[0] for d in cursor.description]
+    rows = []
+    for values in cursor.fetchall():
+        row = dict(zip(columns, values))
+        if isinstance(row.get("state"), str):
+            row["state"] = json.loads(row["state"])
+        rows.append(row)
+    return rows
+
+
+def entities_as_of(con: duckdb.DuckDBPyConnection, tick: int) -> List[Dict[str, Any]]:
+    """
+    Entity versions that were current at a tick.
+
+    Args:
+        con: DuckDB connection or reader cursor
+        tick: Game tick
+
+    Returns:
+        One dict per entity (entity_key, entity_name, position, state, op,
+        valid_from_tick, valid_to_tick)
+    """
+    return _rows_to_dicts(con.execute(AS_OF_SQL, [tick, tick]))
+
+
+def entities_changed_since(con: duckdb.DuckDBPyConnection, tick: int) -> List[Dict[str, Any]]:
+    """
+    Versions opened or closed after a tick, oldest change first.
+
+    Args:
+        con: DuckDB connection or reader cursor
+        tick: Game tick
+
+    Returns:
+        Version dicts; closed_by == "destroyed" marks removals
+    """
+    return _rows_to_dicts(con.execute(CHANGED_SINCE_SQL, [tick, tick]))
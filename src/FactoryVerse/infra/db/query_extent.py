@@ -0,0 +1,261 @@
+"""
+Infer the map area a SQL query can touch from its spatial predicates.
+
+Lets map_db wait only for the chunks a query reads instead of the whole map.
+Recognized predicates (literal numbers or ``?`` parameters):
+
+- ``ST_Distance(<expr>, ST_Point(x, y)) < r`` (also ``<=``, either argument
+  order, or ``r > ST_Distance(...)``)
+- ``ST_DWithin(<expr>, ST_Point(x, y), r)``
+- ``ST_Within`` / ``ST_Intersects`` / ``ST_Contains`` with
+  ``ST_MakeEnvelope(x1, y1, x2, y2)``
+- ``position.x`` / ``position.y`` (any table alias) bounded by ``BETWEEN`` or
+  ``<``/``<=``/``>``/``>=`` on both axes
+
+Inference is conservative: only the WHERE clause is read, and a query
+containing ``OR``, ``NOT``, a subquery, ``!=``/``<>`` on a position, a
+distance predicate bounded from below (``ST_Distance(...) > r``), or no
+recognized predicate has no extent (the caller syncs everything). Several
+predicates yield the union of their boxes, a superset of what an ``AND``
+of them can match. Rows reached through joins are assumed to lie within
+the margin that infer_query_chunks pads the area with.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+from FactoryVerse.infra.chunk_scheduler import CHUNK_SIZE
+
+# (min_x, min_y, max_x, max_y) in tile coordinates
+Extent = Tuple[float, float, float, float]
+
+# Give up on chunk sets larger than this (a query over half the map syncs everything)
+MAX_CHUNKS = 1024
+
+_NUM = r"(-?\d+(?:\.\d+)?|\?)"
+_POINT_RE = re.compile(rf"ST_Point\s*\(\s*{_NUM}\s*,\s*{_NUM}\s*\)", re.IGNORECASE)
+_ENVELOPE_RE = re.compile(
+    rf"ST_MakeEnvelope\s*\(\s*{_NUM}\s*,\s*{_NUM}\s*,\s*{_NUM}\s*,\s*{_NUM}\s*\)", re.IGNORECASE
+)
+_BETWEEN_RE = re.compile(
+    rf"\bposition\.(x|y)\s+BETWEEN\s+{_NUM}\s+AND\s+{_NUM}", re.IGNORECASE
+)
+_COMPARE_RE = re.compile(rf"\bposition\.(x|y)\s*(<=|>=|<|>)\s*{_NUM}", re.IGNORECASE)
+_COMPARE_REVERSED_RE = re.compile(rf"{_NUM}\s*(<=|>=|<|>)\s*(?:\w+\.)*position\.(x|y)\b", re.IGNORECASE)
+_WHERE_RE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+_WHERE_END_RE = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|HAVING|QUALIFY|WINDOW|LIMIT|OFFSET)\b", re.IGNORECASE)
+_NOT_EQUAL_POSITION_RE = re.compile(
+    r"\bposition\b[\w.]*\s*(?:!=|<>)|(?:!=|<>)\s*(?:\w+\.)*position\b", re.IGNORECASE
+)
+
+
+class _Params:
+    """Resolves literal numbers and positional ``?`` parameters by offset."""
+
+    def __init__(self, sql: str, params: Optional[Sequence[Any]]):
+        self._params = list(params or [])
+        self._offsets = [m.start() for m in re.finditer(r"\?", sql)]
+
+    def value(self, match: re.Match, group: int) -> Optional[float]:
+        token = match.group(group)
+        if token != "?":
+            return float(token)
+        try:
+            index = self._offsets.index(match.start(group))
+            return float(self._params[index])
+        except (ValueError, IndexError, TypeError):
+            return None
+
+
+def _call_args(sql: str, open_paren: int) -> Tuple[str, int]:
+    """Return (text between balanced parentheses, index after the closing one)."""
+    depth = 0
+    for i in range(open_paren, len(sql)):
+        if sql[i] == "(":
+            depth += 1
+        elif sql[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return sql[open_paren + 1:i], i + 1
+    return sql[open_paren + 1:], len(sql)
+
+
+def _constant_point(sql: str, start: int, end: int, params: _Params) -> Optional[Tuple[float, float]]:
+    """First ST_Point with constant coordinates inside sql[start:end]."""
+    for match in _POINT_RE.finditer(sql, start, end):
+        x, y = params.value(match, 1), params.value(match, 2)
+        if x is not None and y is not None:
+            return x, y
+    return None
+
+
+def _where_clause(sql: str) -> Optional[str]:
+    """sql with everything outside the WHERE clause blanked (offsets kept for ? params)."""
+    where = _WHERE_RE.search(sql)
+    if where is None:
+        return None
+    end = _WHERE_END_RE.search(sql, where.end())
+    stop = end.start() if end else len(sql)
+    return " " * where.end() + sql[where.end():stop] + " " * (len(sql) - stop)
+
+
+def _distance_extents(sql: str, params: _Params) -> Optional[List[Extent]]:
+    """Boxes of ST_Distance(...) < r predicates; None if a distance is bounded from below."""
+    extents = []
+    for match in re.finditer(r"ST_Distance\s*\(", sql, re.IGNORECASE):
+        args_start = match.end() - 1
+        _, args_end = _call_args(sql, args_start)
+        if (
+            re.compile(r"\s*(?:>|!=|<>|=)").match(sql, args_end)
+            or re.search(r"(?:<|!=|(?<![<>!])=)\s*$", sql[:match.start()])
+        ):
+            # Farther than r (or not exactly r) reaches the whole map
+            return None
+        point = _constant_point(sql, args_start, args_end, params)
+        if point is None:
+            continue
+        radius = None
+        after = re.compile(rf"\s*<=?\s*{_NUM}").match(sql, args_end)
+        if after:
+            radius = params.value(after, 1)
+        else:
+            before = re.search(rf"{_NUM}\s*>=?\s*$", sql[:match.start()])
+            if before:
+                radius = params.value(before, 1)
+        if radius is not None:
+            x, y = point
+            extents.append((x - radius, y - radius, x + radius, y + radius))
+    return extents
+
+
+def _dwithin_extents(sql: str, params: _Params) -> List[Extent]:
+    extents = []
+    for match in re.finditer(r"ST_DWithin\s*\(", sql, re.IGNORECASE):
+        args_start = match.end() - 1
+        _, args_end = _call_args(sql, args_start)
+        point = _constant_point(sql, args_start, args_end, params)
+        radius_match = re.compile(rf".*,\s*{_NUM}\s*\)$", re.DOTALL).match(sql[:args_end], args_start)
+        if point is None or radius_match is None:
+            continue
+        radius = params.value(radius_match, 1)
+        if radius is not None:
+            x, y = point
+            extents.append((x - radius, y - radius, x + radius, y + radius))
+    return extents
+
+
+def _envelope_extents(sql: str, params: _Params) -> List[Extent]:
+    extents = []
+    for match in re.finditer(r"ST_(?:Within|Intersects|Contains)\s*\(", sql, re.IGNORECASE):
+        args_start = match.end() - 1
+        _, args_end = _call_args(sql, args_start)
+        for env in _ENVELOPE_RE.finditer(sql, args_start, args_end):
+            values = [params.value(env, g) for g in range(1, 5)]
+            if None not in values:
+                x1, y1, x2, y2 = values
+                extents.append((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+    return extents
+
+
+def _range_extent(sql: str, params: _Params) -> List[Extent]:
+    bounds = {"x": [-math.inf, math.inf], "y": [-math.inf, math.inf]}
+
+    def tighten(axis: str, op: str, value: Optional[float]) -> None:
+        if value is None:
+            return
+        lo, hi = bounds[axis]
+        if op in ("<", "<="):
+            bounds[axis][1] = min(hi, value)
+        else:
+            bounds[axis][0] = max(lo, value)
+
+    for match in _BETWEEN_RE.finditer(sql):
+        axis = match.group(1).lower()
+        tighten(axis, ">=", params.value(match, 2))
+        tighten(axis, "<=", params.value(match, 3))
+    for match in _COMPARE_RE.finditer(sql):
+        tighten(match.group(1).lower(), match.group(2), params.value(match, 3))
+    for match in _COMPARE_REVERSED_RE.finditer(sql):
+        flipped = {"<": ">", "<=": ">=", ">": "<", ">=": "<="}[match.group(2)]
+        tighten(match.group(3).lower(), flipped, params.value(match, 1))
+
+    (x1, x2), (y1, y2) = bounds["x"], bounds["y"]
+    if all(math.isfinite(v) for v in (x1, x2, y1, y2)) and x1 <= x2 and y1 <= y2:
+        return [(x1, y1, x2, y2)]
+    return []
+
+
+def infer_query_extents(sql: str, params: Optional[Sequence[Any]] = None) -> Optional[List[Extent]]:
+    """
+    Infer the bounding boxes a query's spatial predicates restrict it to.
+
+    Args:
+        sql: SQL query
+        params: Positional parameters for ``?`` placeholders
+
+    Returns:
+        List of (min_x, min_y, max_x, max_y) boxes, or None if the query is
+        not provably restricted to a region
+    """
+    if re.search(r"\bOR\b", sql, re.IGNORECASE) or len(re.findall(r"\bSELECT\b", sql, re.IGNORECASE)) > 1:
+        return None
+    where = _where_clause(sql)
+    if where is None or re.search(r"\bNOT\b", where, re.IGNORECASE) or _NOT_EQUAL_POSITION_RE.search(where):
+        return None
+    resolved = _Params(sql, params)
+    distance = _distance_extents(where, resolved)
+    if distance is None:
+        return None
+    extents = (
+        distance
+        + _dwithin_extents(where, resolved)
+        + _envelope_extents(where, resolved)
+        + _range_extent(where, resolved)
+    )
+    return extents or None
+
+
+def extent_chunks(extents: Sequence[Extent], margin: float = 0.0) -> Optional[Set[Tuple[int, int]]]:
+    """
+    Chunks overlapped by a set of boxes.
+
+    Args:
+        extents: Boxes from infer_query_extents
+        margin: Tiles to pad each box by (entities whose bbox reaches in)
+
+    Returns:
+        Set of (chunk_x, chunk_y), or None if it would exceed MAX_CHUNKS
+    """
+    chunks: Set[Tuple[int, int]] = set()
+    for min_x, min_y, max_x, max_y in extents:
+        cx1, cy1 = math.floor((min_x - margin) / CHUNK_SIZE), math.floor((min_y - margin) / CHUNK_SIZE)
+        cx2, cy2 = math.floor((max_x + margin) / CHUNK_SIZE), math.floor((max_y + margin) / CHUNK_SIZE)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) + len(chunks) > MAX_CHUNKS:
+            return None
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                chunks.add((cx, cy))
+    return chunks
+
+
+def infer_query_chunks(
+    sql: str, params: Optional[Sequence[Any]] = None, margin: float = 8.0
+) -> Optional[Set[Tuple[int, int]]]:
+    """
+    Chunks a query can read, inferred from its spatial predicates.
+
+    Args:
+        sql: SQL query
+        params: Positional parameters for ``?`` placeholders
+        margin: Tiles to pad the inferred area by (large entities straddle chunks)
+
+    Returns:
+        Set of (chunk_x, chunk_y), or None if the whole map must be synced
+    """
+    extents = infer_query_extents(sql, params)
+    if extents is None:
+        return None
+    return extent_chunks(extents, margin=margin)
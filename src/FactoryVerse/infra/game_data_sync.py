@@ -13,17 +13,70 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, List, TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, List, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     import duckdb
     from factorio_rcon import RCONClient
 
 from FactoryVerse.infra.udp_dispatcher import UDPDispatcher, get_udp_dispatcher
+from FactoryVerse.infra.sync_metrics import SyncMetrics
+from FactoryVerse.infra.sync_journal import SyncJournal
+from FactoryVerse.infra.change_feed import ChangeFeed
+from FactoryVerse.infra.subscriptions import Predicate, SqlPredicate, SubscriptionManager
+from FactoryVerse.infra.chunk_scheduler import CHUNK_SIZE, ChunkLoadScheduler, route_chunks
+from FactoryVerse.infra.db.entity_history import EntityHistory, entities_as_of, entities_changed_since
 
 logger = logging.getLogger(__name__)
 
+# Per-chunk append-only operation logs that gap recovery can replay
+UPDATE_LOG_FILES = ("entities_updates.jsonl", "trees_rocks-update.jsonl")
+
+
+def _init_file_sizes(chunk_dir: Path) -> Dict[str, int]:
+    """Sizes of a chunk's *_init.jsonl files (stat only, no reads)."""
+    return {p.name: p.stat().st_size for p in chunk_dir.glob("*_init.jsonl")}
+
+
+def _read_log_tail(path: Path, offset: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], int]:
+    """
+    Read complete JSONL entries from a byte offset.
+    
+    A trailing line without a newline is treated as still being written and
+    is left for the next read.
+    
+    Args:
+        path: JSONL file to read
+        offset: Byte offset to start from
+        
+    Returns:
+        ([(end_offset, entry), ...], new_offset)
+    """
+    import json
+    
+    entries: List[Tuple[int, Dict[str, Any]]] = []
+    try:
+        with open(path, "rb") as f:
+            if offset > path.stat().st_size:
+                # File was truncated/rewritten - start over
+                offset = 0
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if line.strip():
+                    try:
+                        entries.append((offset, json.loads(line)))
+                    except ValueError as e:
+                        logger.warning(f"Skipping malformed line in {path.name}: {e}")
+    except FileNotFoundError:
+        pass
+    return entries, offset
+
 
 class GameDataSyncService:
     """
@@ -43,6 +96,9 @@ class GameDataSyncService:
         snapshot_dir: Path,
         udp_dispatcher: Optional[UDPDispatcher] = None,
         rcon_client: Optional["RCONClient"] = None,
+        metrics_sink: Optional[Path] = None,
+        journal_path: Optional[Path] = None,
+        max_detail_rows: Optional[int] = None,
     ):
         """
         Initialize the game data sync service.
@@ -53,18 +109,33 @@ class GameDataSyncService:
             snapshot_dir: Path to snapshot directory (script-output/factoryverse/snapshots)
             udp_dispatcher: Optional UDPDispatcher instance. If None, uses global dispatcher.
             rcon_client: Optional RCON client for action integration
+            metrics_sink: Optional JSONL file receiving one latency record per applied update
+            journal_path: Optional applied-update journal (use SyncJournal.path_for(db_path)
+                for a persisted DB) enabling fast restarts via recover_from_journal()
+            max_detail_rows: Optional memory budget for tile-level detail (rows of
+                resource_tile, water_tile and resource_entity); see set_memory_budget()
         """
+        # Imported here: db.loader imports the DSL, which imports this module
+        from FactoryVerse.infra.db.loader.utils import normalize_snapshot_dir
+        
         self.agent_id = agent_id
         self.db = db_connection
-        self.snapshot_dir = Path(snapshot_dir)
+        self.snapshot_dir = normalize_snapshot_dir(Path(snapshot_dir))
         self.udp_dispatcher = udp_dispatcher or get_udp_dispatcher()
         self.rcon_client = rcon_client
         
         # Write lock for exclusive DB access
         self._write_lock = asyncio.Lock()
         
-        # Sync queue for background processing
-        self._sync_queue: asyncio.Queue[Tuple[str, Dict[str, Any]]] = asyncio.Queue()
+        # Sync queue for background processing: (update_type, payload, arrived_at)
+        self._sync_queue: asyncio.Queue[Tuple[str, Dict[str, Any], float]] = asyncio.Queue()
+        
+        # Latency instrumentation (arrival -> dequeue -> commit, per op type)
+        self.metrics = SyncMetrics(sink_path=metrics_sink)
+        
+        # Crash-safe journal of applied updates (optional)
+        self._journal: Optional[SyncJournal] = SyncJournal(journal_path) if journal_path else None
+        self._recovering = False
         
         # Background sync task
         self._background_task: Optional[asyncio.Task] = None
@@ -82,9 +153,42 @@ class GameDataSyncService:
         # Chunk loading tracking (chunks that have been loaded into DB)
         self._loaded_chunks: set[Tuple[int, int]] = set()
         
+        # Sizes of each loaded chunk's *_init.jsonl files (for cheap reconciliation)
+        self._chunk_file_sizes: Dict[Tuple[int, int], Dict[str, int]] = {}
+        
+        # Snapshot system phase (INITIAL_SNAPSHOTTING / MAINTENANCE), from system_phase_changed
+        self._system_phase: Optional[str] = None
+        self._maintenance_event = asyncio.Event()
+        
         # Chunks pending load (waiting for COMPLETE state)
         self._pending_loads: Dict[Tuple[int, int], asyncio.Event] = {}
         
+        # COMPLETE chunks waiting to be loaded, nearest to the agents first
+        self._load_scheduler = ChunkLoadScheduler()
+        self._load_task: Optional[asyncio.Task] = None
+        
+        # Memory budget: tile-level detail rows per loaded chunk, least recently
+        # used first, and chunks whose detail was evicted (their map entities and
+        # the patch tables stay in the DB; detail reloads from the snapshot files)
+        self._max_detail_rows = max_detail_rows
+        self._chunk_detail_rows: Dict[Tuple[int, int], int] = {}
+        self._chunk_lru: OrderedDict[Tuple[int, int], None] = OrderedDict()
+        self._evicted_chunks: set[Tuple[int, int]] = set()
+        self._eviction_stats = {"evicted": 0, "reloaded": 0, "rows_evicted": 0}
+        
+        # Optional temporal mode: tick-versioned entity history (enable_history)
+        self._history: Optional[EntityHistory] = None
+        
+        # Change feed with per-consumer cursors (records only while a cursor exists)
+        self.change_feed = ChangeFeed()
+        
+        # Standing query subscriptions, re-evaluated for the entity keys each
+        # applied batch touched (and keys whose status changed)
+        self.subscriptions = SubscriptionManager(agent_id=agent_id)
+        self._touched_keys: set[str] = set()
+        self._status_touched: set[str] = set()
+        self._entity_statuses: Dict[str, Dict[str, Any]] = {}
+        
         # Sequence tracking for reliable UDP (detect packet loss)
         self._last_sequence: Dict[str, int] = {}  # event_type -> last seen sequence
         self._sequence_gaps: List[Tuple[str, int, int]] = []  # (event_type, expected, received)
@@ -92,6 +196,41 @@ class GameDataSyncService:
         # Chunks marked as stale due to sequence gaps (need reload)
         self._stale_chunks: set[Tuple[int, int]] = set()
         
+        # Watermarks: updates enqueued vs. applied (local ordinals), plus the
+        # highest game sequence/tick applied. Waiters block on _watermark_event,
+        # which is swapped for a fresh event every time the watermark advances.
+        self._enqueued_count = 0
+        self._applied_count = 0
+        self._applied_sequence = -1
+        self._applied_tick = -1
+        self._watermark_event = asyncio.Event()
+        
+        # Per-chunk watermarks (key None = updates without a chunk), so a query
+        # over one area only waits for updates to that area
+        self._chunk_enqueued: Dict[Optional[Tuple[int, int]], int] = {}
+        self._chunk_applied: Dict[Optional[Tuple[int, int]], int] = {}
+        
+        # Version published to readers: bumped on every committed write unit
+        # (single update or batch transaction). Readers use their own cursors.
+        self._db_version = 0
+        self._txn_depth = 0
+        
+        # Gap recovery: byte offsets already applied per (chunk, update log),
+        # chunk of the previous sequenced payload, and background repair state
+        self._log_offsets: Dict[Tuple[Tuple[int, int], str], int] = {}
+        self._last_payload_chunk: Optional[Tuple[int, int]] = None
+        self._repair_pending: set[Tuple[int, int]] = set()
+        self._repair_task: Optional[asyncio.Task] = None
+        self._repair_stats: Dict[str, Any] = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "entries_replayed": 0,
+            "bytes_read": 0,
+            "unattributed_gaps": 0,
+            "last_repair_at": None,
+        }
+        
         logger.info(f"GameDataSyncService initialized for agent {agent_id}")
     
     async def start(self) -> None:
@@ -115,6 +254,7 @@ class GameDataSyncService:
         self.udp_dispatcher.subscribe("file_io", self._handle_file_io)
         self.udp_dispatcher.subscribe("snapshot_state", self._handle_snapshot_state)
         self.udp_dispatcher.subscribe("chunk_charted", self._handle_chunk_charted)
+        self.udp_dispatcher.subscribe("system_phase_changed", self._handle_system_phase_changed)
         
         # Start action listener
         await self._action_listener.start()
@@ -144,14 +284,34 @@ class GameDataSyncService:
             except asyncio.CancelledError:
                 pass
         
+        # Cancel in-flight gap repairs and scheduled chunk loads
+        for task in (self._repair_task, self._load_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
         # Stop action listener
         await self._action_listener.stop()
         
+        self.metrics.close()
+        
+        # Leave a fresh checkpoint behind so the next start recovers instantly
+        if self._journal is not None:
+            try:
+                await self.checkpoint_journal()
+            except Exception as e:
+                logger.error(f"Failed to checkpoint sync journal on stop: {e}", exc_info=True)
+            self._journal.close()
+        
         # Unsubscribe from UDP dispatcher
         self.udp_dispatcher.unsubscribe("entity_operation", self._handle_entity_operation)
         self.udp_dispatcher.unsubscribe("file_io", self._handle_file_io)
         self.udp_dispatcher.unsubscribe("snapshot_state", self._handle_snapshot_state)
         self.udp_dispatcher.unsubscribe("chunk_charted", self._handle_chunk_charted)
+        self.udp_dispatcher.unsubscribe("system_phase_changed", self._handle_system_phase_changed)
         
         logger.info(f"GameDataSyncService stopped for agent {self.agent_id}")
     
@@ -168,22 +328,234 @@ class GameDataSyncService:
         2. Required chunks are snapshotted and loaded (if specified)
         3. DB state is current
         
-        This method acquires the write lock, processes any pending updates,
-        ensures required chunks are loaded, and releases the lock.
+        Returns immediately when every update received so far has already been
+        applied and all required chunks are loaded. Otherwise waits for the
+        applied watermark to catch up with what was enqueued at call time (the
+        background loop does the work), or drains the queue under the write
+        lock if the background loop is not running.
+        
+        Completed chunks near an agent (see set_agent_position) that are still
+        queued for loading are loaded before returning; distant ones keep
+        loading in the background.
         
         Args:
             timeout: Maximum time to wait for queue processing (seconds)
             required_chunks: Optional list of (chunk_x, chunk_y) tuples that must be loaded.
-                           If provided, waits for chunks to be COMPLETE and loads them.
+                           They jump the chunk load queue; chunks whose snapshot is in
+                           progress are awaited concurrently, COMPLETE chunks are loaded.
         """
+        target = self._enqueued_count
+        if self._applied_count < target:
+            if self._running:
+                if not await self.wait_for_watermark(count=target, timeout=timeout, raise_on_timeout=False):
+                    logger.warning(
+                        f"ensure_synced timed out after {timeout}s "
+                        f"(applied {self._applied_count}/{target} updates)"
+                    )
+            else:
+                async with self._write_lock:
+                    await self._process_sync_queue(timeout=timeout)
+        
+        missing = [tuple(c) for c in required_chunks or () if not self.is_chunk_resident(*c)]
+        for chunk_key in missing:
+            self._load_scheduler.mark_urgent(chunk_key)
+        missing += [c for c in self._load_scheduler.pending_near() if c not in missing]
+        if missing:
+            await asyncio.gather(
+                *(self._sync_required_chunk(chunk_key, timeout) for chunk_key in missing)
+            )
+    
+    async def _sync_required_chunk(self, chunk_key: Tuple[int, int], timeout: float) -> None:
+        """Wait for an in-progress chunk snapshot and load it (for ensure_synced)."""
+        state = self._chunk_states.get(chunk_key)
+        if state is not None and state != "COMPLETE":
+            try:
+                await self.wait_for_chunk_snapshot(*chunk_key, timeout=timeout, load=False)
+            except asyncio.TimeoutError as e:
+                logger.warning(str(e))
+                return
         async with self._write_lock:
-            # Process any pending updates in queue
-            await self._process_sync_queue(timeout=timeout)
+            await self._ensure_chunk_loaded(*chunk_key, timeout=timeout)
+    
+    def is_synced(self) -> bool:
+        """
+        Check whether every update received so far has been applied (and no
+        completed chunk near an agent is still waiting to be loaded).
+        
+        Returns:
+            True if the applied watermark has caught up with the enqueue count
+        """
+        if self._applied_count < self._enqueued_count:
+            return False
+        return not self._load_scheduler or not self._load_scheduler.has_pending_near()
+    
+    def get_watermark(self) -> Dict[str, int]:
+        """
+        Get the current applied watermark.
+        
+        Returns:
+            Dictionary with:
+            - sequence: Highest game sequence number applied (-1 if none)
+            - tick: Highest game tick applied (-1 if none)
+            - applied: Number of updates applied
+            - enqueued: Number of updates received
+            - version: Number of write units committed and visible to readers
+        """
+        return {
+            "sequence": self._applied_sequence,
+            "tick": self._applied_tick,
+            "applied": self._applied_count,
+            "enqueued": self._enqueued_count,
+            "version": self._db_version,
+        }
+    
+    async def wait_for_watermark(
+        self,
+        sequence: Optional[int] = None,
+        tick: Optional[int] = None,
+        count: Optional[int] = None,
+        timeout: float = 5.0,
+        raise_on_timeout: bool = True,
+    ) -> bool:
+        """
+        Wait until the applied watermark reaches the given values.
+        
+        Returns immediately if already satisfied. Any combination of
+        sequence, tick and count may be given; all must be reached.
+        
+        Args:
+            sequence: Minimum game sequence number that must be applied
+            tick: Minimum game tick that must be applied
+            count: Minimum number of applied updates (see get_watermark)
+            timeout: Maximum time to wait (seconds)
+            raise_on_timeout: Raise asyncio.TimeoutError instead of returning False
+            
+        Returns:
+            True if the watermark was reached, False on timeout
             
-            # Ensure required chunks are loaded
-            if required_chunks:
-                for chunk_x, chunk_y in required_chunks:
-                    await self._ensure_chunk_loaded(chunk_x, chunk_y, timeout=timeout)
+        Raises:
+            asyncio.TimeoutError: If not reached within timeout and raise_on_timeout
+        """
+        def reached() -> bool:
+            return (
+                (sequence is None or self._applied_sequence >= sequence)
+                and (tick is None or self._applied_tick >= tick)
+                and (count is None or self._applied_count >= count)
+            )
+        
+        if await self._wait_until(reached, timeout):
+            return True
+        if raise_on_timeout:
+            raise asyncio.TimeoutError(
+                f"Watermark not reached within {timeout}s "
+                f"(want sequence={sequence}, tick={tick}, count={count}; "
+                f"have {self.get_watermark()})"
+            )
+        return False
+    
+    async def _wait_until(self, reached, timeout: float) -> bool:
+        """Wait for reached() to hold, re-checking on every watermark advance."""
+        if reached():
+            return True
+        deadline = time.monotonic() + timeout
+        while not reached():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._watermark_event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+        return True
+    
+    def chunks_synced(self, chunks: Iterable[Tuple[int, int]]) -> bool:
+        """
+        Check whether every update received so far for the given chunks (and
+        every update without a chunk) has been applied, and the chunks that
+        have a completed snapshot are loaded.
+        
+        Args:
+            chunks: (chunk_x, chunk_y) tuples
+            
+        Returns:
+            True if a query over these chunks would see current data
+        """
+        for chunk_key in [None, *chunks]:
+            if self._chunk_applied.get(chunk_key, 0) < self._chunk_enqueued.get(chunk_key, 0):
+                return False
+            if chunk_key is not None and chunk_key in self._load_scheduler:
+                return False
+        return True
+    
+    async def ensure_synced_for(
+        self, chunks: Iterable[Tuple[int, int]], timeout: float = 5.0
+    ) -> None:
+        """
+        Ensure the given chunks are synced, without waiting on the rest of the map.
+        
+        Waits only for queued updates to these chunks (and updates without a
+        chunk, which may touch anything), then loads any of them whose
+        snapshot is complete or in progress, reloading tile detail that the
+        memory budget evicted. Uncharted chunks are skipped.
+        
+        Args:
+            chunks: (chunk_x, chunk_y) tuples a query will read
+            timeout: Maximum time to wait (seconds)
+        """
+        chunks = {tuple(c) for c in chunks}
+        targets = {
+            chunk_key: self._chunk_enqueued.get(chunk_key, 0)
+            for chunk_key in (None, *chunks)
+        }
+        
+        def reached() -> bool:
+            return all(self._chunk_applied.get(c, 0) >= n for c, n in targets.items())
+        
+        if not reached():
+            if self._running:
+                if not await self._wait_until(reached, timeout):
+                    logger.warning(f"ensure_synced_for timed out after {timeout}s for {len(chunks)} chunks")
+            else:
+                async with self._write_lock:
+                    await self._process_sync_queue(timeout=timeout)
+        
+        missing = [
+            c for c in chunks
+            if not self.is_chunk_resident(*c) and c in self._chunk_states
+        ]
+        for chunk_key in missing:
+            self._load_scheduler.mark_urgent(chunk_key)
+        if missing:
+            await asyncio.gather(
+                *(self._sync_required_chunk(chunk_key, timeout) for chunk_key in missing)
+            )
+        
+        self._touch_chunks(c for c in chunks if c in self._loaded_chunks)
+        if self._max_detail_rows is not None:
+            async with self._write_lock:
+                await self._enforce_memory_budget(pinned=chunks)
+    
+    def _count_enqueued(self, payload: Dict[str, Any]) -> None:
+        """Record a queued update in the global and per-chunk enqueue counters."""
+        self._enqueued_count += 1
+        chunk_key = self._payload_chunk(payload)
+        self._chunk_enqueued[chunk_key] = self._chunk_enqueued.get(chunk_key, 0) + 1
+    
+    def _advance_watermark(self, payload: Dict[str, Any]) -> None:
+        """Record an applied update and wake watermark waiters."""
+        self._applied_count += 1
+        chunk_key = self._payload_chunk(payload)
+        self._chunk_applied[chunk_key] = self._chunk_applied.get(chunk_key, 0) + 1
+        if self._txn_depth == 0:
+            self._db_version += 1
+        sequence = payload.get("sequence")
+        if isinstance(sequence, int) and sequence > self._applied_sequence:
+            self._applied_sequence = sequence
+        tick = payload.get("tick")
+        if isinstance(tick, int) and tick > self._applied_tick:
+            self._applied_tick = tick
+        event, self._watermark_event = self._watermark_event, asyncio.Event()
+        event.set()
     
     async def wait_for_chunk_snapshot(
         self, chunk_x: int, chunk_y: int, timeout: float = 30.0, load: bool = True
@@ -209,28 +581,70 @@ class GameDataSyncService:
         if self._chunk_states.get(chunk_key) == "COMPLETE":
             if not load or chunk_key in self._loaded_chunks:
                 return
-        
-        # Create or get completion event
-        if chunk_key not in self._completion_events:
-            self._completion_events[chunk_key] = asyncio.Event()
-        
-        event = self._completion_events[chunk_key]
-        
-        # Wait for completion
-        try:
-            await asyncio.wait_for(event.wait(), timeout=timeout)
-        except asyncio.TimeoutError:
-            state = self._chunk_states.get(chunk_key, "UNKNOWN")
-            raise asyncio.TimeoutError(
-                f"Chunk ({chunk_x}, {chunk_y}) did not complete within {timeout}s. "
-                f"Current state: {state}"
-            )
+        else:
+            # Create or get completion event
+            if chunk_key not in self._completion_events:
+                self._completion_events[chunk_key] = asyncio.Event()
+            
+            event = self._completion_events[chunk_key]
+            
+            # Wait for completion
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                state = self._chunk_states.get(chunk_key, "UNKNOWN")
+                raise asyncio.TimeoutError(
+                    f"Chunk ({chunk_x}, {chunk_y}) did not complete within {timeout}s. "
+                    f"Current state: {state}"
+                )
         
         # Load chunk if requested
         if load:
             async with self._write_lock:
                 await self._ensure_chunk_loaded(chunk_x, chunk_y, timeout=timeout)
     
+    def reader(self) -> "duckdb.DuckDBPyConnection":
+        """
+        Open a reader cursor on the agent's database.
+        
+        Cursors are separate DuckDB connections to the same database, so each
+        query sees a consistent MVCC snapshot of committed data and never
+        observes a chunk load or gap repair half-way. They are safe to use
+        from a worker thread while the writer keeps applying updates.
+        
+        Returns:
+            A new DuckDB cursor; close it when done
+        """
+        return self.db.cursor()
+    
+    @asynccontextmanager
+    async def _write_transaction(self):
+        """
+        Apply a batch of writes atomically (reentrant, called with write lock held).
+        
+        Commits and publishes a new version when the outermost block exits;
+        rolls back if it raises.
+        """
+        if self._txn_depth > 0:
+            self._txn_depth += 1
+            try:
+                yield
+            finally:
+                self._txn_depth -= 1
+            return
+        
+        self.db.execute("BEGIN TRANSACTION")
+        self._txn_depth = 1
+        try:
+            yield
+        except BaseException:
+            self._txn_depth = 0
+            self.db.execute("ROLLBACK")
+            raise
+        self._txn_depth = 0
+        self.db.execute("COMMIT")
+        self._db_version += 1
+    
     def get_snapshot_state(self, chunk_x: int, chunk_y: int) -> Optional[str]:
         """
         Get current snapshot state for a chunk.
@@ -284,7 +698,8 @@ class GameDataSyncService:
             entity_key = payload.get('entity_key')
             entity_name = payload.get('entity_name')
             logger.info(f"🔔 UDP: entity_operation received - op={op}, key={entity_key}, name={entity_name}")
-            self._sync_queue.put_nowait(("entity_operation", payload))
+            self._sync_queue.put_nowait(("entity_operation", payload, time.time()))
+            self._count_enqueued(payload)
             logger.info(f"   Queued for processing (queue size: {self._sync_queue.qsize()})")
         except asyncio.QueueFull:
             logger.warning(f"Sync queue full, dropping entity operation: {payload.get('op')}")
@@ -292,24 +707,35 @@ class GameDataSyncService:
     def _handle_file_io(self, payload: Dict[str, Any]) -> None:
         """Handle file I/O payload."""
         try:
-            self._sync_queue.put_nowait(("file_io", payload))
+            self._sync_queue.put_nowait(("file_io", payload, time.time()))
+            self._count_enqueued(payload)
         except asyncio.QueueFull:
             logger.warning(f"Sync queue full, dropping file I/O: {payload.get('file_type')}")
     
     def _handle_snapshot_state(self, payload: Dict[str, Any]) -> None:
         """Handle snapshot state payload."""
         try:
-            self._sync_queue.put_nowait(("snapshot_state", payload))
+            self._sync_queue.put_nowait(("snapshot_state", payload, time.time()))
+            self._count_enqueued(payload)
         except asyncio.QueueFull:
             logger.warning(f"Sync queue full, dropping snapshot state")
     
     def _handle_chunk_charted(self, payload: Dict[str, Any]) -> None:
         """Handle chunk charted payload."""
         try:
-            self._sync_queue.put_nowait(("chunk_charted", payload))
+            self._sync_queue.put_nowait(("chunk_charted", payload, time.time()))
+            self._count_enqueued(payload)
         except asyncio.QueueFull:
             logger.warning(f"Sync queue full, dropping chunk charted")
     
+    def _handle_system_phase_changed(self, payload: Dict[str, Any]) -> None:
+        """Handle snapshot system phase change payload."""
+        try:
+            self._sync_queue.put_nowait(("system_phase_changed", payload, time.time()))
+            self._count_enqueued(payload)
+        except asyncio.QueueFull:
+            logger.warning(f"Sync queue full, dropping system phase change")
+    
     # ============================================================================
     # Background Sync Loop
     # ============================================================================
@@ -327,17 +753,29 @@ class GameDataSyncService:
             try:
                 # Get update from queue (with timeout for cancellation)
                 try:
-                    update_type, payload = await asyncio.wait_for(
+                    update_type, payload, arrived_at = await asyncio.wait_for(
                         self._sync_queue.get(), timeout=1.0
                     )
                 except asyncio.TimeoutError:
                     continue  # Check for cancellation
+                dequeued_at = time.time()
+                queue_depth = self._sync_queue.qsize()
                 
                 logger.info(f"📦 Dequeued update from sync queue: type={update_type}")
                 
                 # Process update with write lock
                 async with self._write_lock:
-                    await self._process_update(update_type, payload)
+                    await self._process_update(
+                        update_type, payload,
+                        arrived_at=arrived_at, dequeued_at=dequeued_at, queue_depth=queue_depth,
+                    )
+                
+                # Re-evaluate subscriptions once per burst (queue drained) or every 256 keys
+                if self._sync_queue.empty() or len(self._touched_keys) >= 256:
+                    self._flush_subscriptions()
+                
+                if self._journal is not None and self._journal.should_checkpoint():
+                    await self.checkpoint_journal()
                     
             except asyncio.CancelledError:
                 logger.info(f"Background sync loop cancelled for agent {self.agent_id}")
@@ -350,13 +788,23 @@ class GameDataSyncService:
         
         logger.info(f"Background sync loop stopped for agent {self.agent_id}")
     
-    async def _process_update(self, update_type: str, payload: Dict[str, Any]) -> None:
+    async def _process_update(
+        self,
+        update_type: str,
+        payload: Dict[str, Any],
+        arrived_at: Optional[float] = None,
+        dequeued_at: Optional[float] = None,
+        queue_depth: Optional[int] = None,
+    ) -> None:
         """
         Process a single update (called with write lock held).
         
         Args:
             update_type: Type of update ("action", "entity_operation", "file_io", etc.)
             payload: Update payload
+            arrived_at: Wall time the payload reached our UDP handler (for metrics)
+            dequeued_at: Wall time the update left the sync queue (for metrics)
+            queue_depth: Sync queue depth at dequeue (for metrics)
         """
         try:
             logger.info(f"⚙️  Processing update: type={update_type}, op={payload.get('op', 'N/A')}")
@@ -365,36 +813,39 @@ class GameDataSyncService:
             # NOTE: Lua uses a GLOBAL sequence counter across all event types,
             # so we track globally, not per-event-type
             sequence = payload.get("sequence")
-            if sequence is not None:
+            if sequence is not None and not self._recovering:
                 event_type = payload.get("event_type", update_type)
                 last_seq = self._last_sequence.get("_global", -1)
                 
+                payload_chunk = self._payload_chunk(payload)
+                
                 if last_seq >= 0 and sequence != last_seq + 1:
                     # Gap detected! This indicates actual packet loss
                     gap = (event_type, last_seq + 1, sequence)
                     self._sequence_gaps.append(gap)
                     
-                    # Mark chunk as stale if applicable
-                    # Most events have chunk coordinates (file_io, entity_operation, etc.)
-                    chunk_x = payload.get("chunk_x")
-                    chunk_y = payload.get("chunk_y")
-                    if chunk_x is None and "chunk" in payload:
-                        # Some payloads use nested chunk object
-                        chunk_x = payload["chunk"].get("x")
-                        chunk_y = payload["chunk"].get("y")
-                        
-                    if chunk_x is not None and chunk_y is not None:
-                        self._stale_chunks.add((chunk_x, chunk_y))
+                    # The lost packets were sent between the previous payload and
+                    # this one, so their chunks are the best guess at what is stale
+                    affected = {
+                        c for c in (self._last_payload_chunk, payload_chunk) if c is not None
+                    }
+                    if affected:
+                        for chunk_key in affected:
+                            self._stale_chunks.add(chunk_key)
+                            self._schedule_chunk_repair(chunk_key)
                         logger.warning(
-                            f"Packet loss detected for chunk ({chunk_x},{chunk_y}): "
-                            f"expected seq {last_seq + 1}, got {sequence}. Marked as stale."
+                            f"Packet loss detected: expected seq {last_seq + 1}, got {sequence}. "
+                            f"Scheduled repair for chunks {sorted(affected)}."
                         )
                     else:
+                        self._repair_stats["unattributed_gaps"] += 1
                         logger.warning(
                             f"Packet loss detected (global event): expected seq {last_seq + 1}, got {sequence}."
                         )
                 
                 self._last_sequence["_global"] = sequence
+                if payload_chunk is not None:
+                    self._last_payload_chunk = payload_chunk
             
             # Process update
             if update_type == "entity_operation":
@@ -405,6 +856,8 @@ class GameDataSyncService:
                 await self._process_snapshot_state(payload)
             elif update_type == "chunk_charted":
                 await self._process_chunk_charted(payload)
+            elif update_type == "system_phase_changed":
+                self.set_system_phase(payload.get("phase"))
             else:
                 logger.warning(f"Unknown update type: {update_type}")
                 
@@ -414,6 +867,23 @@ class GameDataSyncService:
                 f"Error processing {update_type} update for agent {self.agent_id}: {e}",
                 exc_info=True
             )
+        finally:
+            self._advance_watermark(payload)
+            if self._journal is not None and not self._recovering:
+                try:
+                    self._journal.append_update(update_type, payload)
+                except Exception as e:
+                    logger.error(f"Failed to journal {update_type} update: {e}")
+            op = payload.get("op") or payload.get("operation") or payload.get("state")
+            self.metrics.record(
+                f"{update_type}.{op}" if op else update_type,
+                tick=payload.get("tick"),
+                arrived_at=arrived_at,
+                dequeued_at=dequeued_at,
+                committed_at=time.time(),
+                queue_depth=queue_depth,
+                sequence=payload.get("sequence"),
+            )
     
     async def _process_sync_queue(self, timeout: float = 5.0) -> None:
         """
@@ -427,14 +897,18 @@ class GameDataSyncService:
         
         while time.time() < deadline:
             try:
-                update_type, payload = self._sync_queue.get_nowait()
-                await self._process_update(update_type, payload)
+                update_type, payload, arrived_at = self._sync_queue.get_nowait()
+                await self._process_update(
+                    update_type, payload,
+                    arrived_at=arrived_at, dequeued_at=time.time(), queue_depth=self._sync_queue.qsize(),
+                )
                 processed += 1
             except asyncio.QueueEmpty:
                 break
         
         if processed > 0:
             logger.debug(f"Processed {processed} queued updates for agent {self.agent_id}")
+            self._flush_subscriptions()
     
     # ============================================================================
     # Chunk Loading Coordination
@@ -456,8 +930,10 @@ class GameDataSyncService:
         """
         chunk_key = (chunk_x, chunk_y)
         
-        # Check if already loaded
+        # Check if already loaded (reloading evicted tile detail if needed)
         if chunk_key in self._loaded_chunks:
+            if chunk_key in self._evicted_chunks:
+                await self._reload_chunk_detail(chunk_key)
             return
         
         # Check if chunk is COMPLETE
@@ -483,184 +959,918 @@ class GameDataSyncService:
                 )
                 return
         
-        # Load the chunk
-        await self._load_chunk(chunk_x, chunk_y)
+        # Load the chunk
+        await self._load_chunk(chunk_x, chunk_y)
+    
+    async def _load_chunk(self, chunk_x: int, chunk_y: int) -> None:
+        """
+        Load a single chunk into DB (called with write lock held).
+        
+        This loads the chunk's snapshot files into the database.
+        Only loads if chunk files exist and are complete.
+        
+        Args:
+            chunk_x: Chunk X coordinate
+            chunk_y: Chunk Y coordinate
+        """
+        import json
+        chunk_key = (chunk_x, chunk_y)
+        
+        # Check if already loaded
+        if chunk_key in self._loaded_chunks:
+            return
+        
+        # Check if chunk directory exists
+        chunk_dir = self.snapshot_dir / str(chunk_x) / str(chunk_y)
+        if not chunk_dir.exists():
+            logger.debug(f"Chunk directory does not exist: {chunk_dir}")
+            self._load_scheduler.discard(chunk_key)
+            return
+        
+        try:
+            # One transaction per chunk so readers never see a half-loaded chunk
+            async with self._write_transaction():
+                detail_rows = self._load_chunk_detail(chunk_dir)
+            
+                # Load placed entities and their component rows (entities_init.jsonl)
+                entities_file = chunk_dir / "entities_init.jsonl"
+                if entities_file.exists():
+                    with open(entities_file, "r") as f:
+                        for line in f:
+                            if line.strip():
+                                await self._sync_entity_created({"entity": json.loads(line)})
+            
+                # Replay update logs and remember how far we got for gap recovery
+                offsets = {}
+                for log_name in UPDATE_LOG_FILES:
+                    entries, offsets[log_name] = _read_log_tail(chunk_dir / log_name, 0)
+                    await self._apply_update_log(chunk_key, log_name, [e for _, e in entries])
+            
+            for log_name, offset in offsets.items():
+                self._log_offsets[(chunk_key, log_name)] = offset
+            self._chunk_file_sizes[chunk_key] = _init_file_sizes(chunk_dir)
+            self._chunk_detail_rows[chunk_key] = detail_rows
+            self._evicted_chunks.discard(chunk_key)
+            self._touch_chunks([chunk_key])
+            
+            # Mark chunk as loaded
+            self._loaded_chunks.add(chunk_key)
+            self._load_scheduler.discard(chunk_key)
+            logger.debug(f"Chunk ({chunk_x}, {chunk_y}) loaded successfully")
+            
+        except Exception as e:
+            logger.error(
+                f"Error loading chunk ({chunk_x}, {chunk_y}): {e}",
+                exc_info=True
+            )
+            raise
+
+    def _load_chunk_detail(self, chunk_dir: Path) -> int:
+        """
+        Insert a chunk's tile-level detail (called inside a write transaction).
+
+        Loads resource tiles, water tiles and trees/rocks from the chunk's
+        *_init.jsonl files.
+
+        Args:
+            chunk_dir: Chunk snapshot directory
+
+        Returns:
+            Number of rows inserted
+        """
+        import json
+        rows = 0
+
+        # Load resource tiles (resources_init.jsonl)
+        resources_file = chunk_dir / "resources_init.jsonl"
+        if resources_file.exists():
+            with open(resources_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        entity_key = f"({data['kind']}:{data['x']},{data['y']})"
+                        self.db.execute(
+                            "INSERT OR REPLACE INTO resource_tile (entity_key, name, position, amount) VALUES (?, ?, ?, ?)",
+                            [entity_key, data["kind"], json.dumps({"x": float(data["x"]), "y": float(data["y"])}), data.get("amount", 0)]
+                        )
+                        rows += 1
+
+        # Load water tiles (water_init.jsonl)
+        water_file = chunk_dir / "water_init.jsonl"
+        if water_file.exists():
+            with open(water_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        entity_key = f"(water:{data['x']},{data['y']})"
+                        self.db.execute(
+                            "INSERT OR REPLACE INTO water_tile (entity_key, type, position) VALUES (?, ?, ?)",
+                            [entity_key, "water-tile", json.dumps({"x": float(data["x"]), "y": float(data["y"])})]
+                        )
+                        rows += 1
+
+        # Load resource entities (trees_rocks_init.jsonl)
+        trees_rocks_file = chunk_dir / "trees_rocks_init.jsonl"
+        if trees_rocks_file.exists():
+            with open(trees_rocks_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        entity_key = data.get("key") or f"({data['name']}:{data['position']['x']},{data['position']['y']})"
+                        bbox = data.get("bounding_box")
+                        if bbox:
+                            self.db.execute(
+                                "INSERT OR REPLACE INTO resource_entity (entity_key, name, type, position, bbox) VALUES (?, ?, ?, ?, ST_MakeEnvelope(?, ?, ?, ?))",
+                                [entity_key, data["name"], data.get("type", "unknown"), json.dumps(data["position"]),
+                                 float(bbox["min_x"]), float(bbox["min_y"]), float(bbox["max_x"]), float(bbox["max_y"])]
+                            )
+                        else:
+                            self.db.execute(
+                                "INSERT OR REPLACE INTO resource_entity (entity_key, name, type, position) VALUES (?, ?, ?, ?)",
+                                [entity_key, data["name"], data.get("type", "unknown"), json.dumps(data["position"])]
+                            )
+                        if self.subscriptions:
+                            self._touched_keys.add(entity_key)
+                        rows += 1
+
+        return rows
+
+    async def _apply_update_log(
+        self, chunk_key: Tuple[int, int], log_name: str, entries: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Apply entries from a chunk's update log (called with write lock held).
+        
+        Args:
+            chunk_key: (chunk_x, chunk_y) the log belongs to
+            log_name: One of UPDATE_LOG_FILES
+            entries: Parsed log entries, in file order
+        """
+        for operation in entries:
+            op = operation.get("op")
+            if log_name == "entities_updates.jsonl":
+                if op == "upsert":
+                    # This is a created/updated entity - sync it
+                    await self._sync_entity_created({
+                        "op": op, "tick": operation.get("tick"), "entity": operation.get("entity"),
+                    })
+                elif op == "remove":
+                    # This is a destroyed entity - sync it
+                    await self._sync_entity_destroyed({
+                        "tick": operation.get("tick"),
+                        "entity_key": operation.get("key"),
+                        "entity_name": operation.get("name", ""),
+                    })
+            elif log_name == "trees_rocks-update.jsonl":
+                entity_key = operation.get("key")
+                if op == "remove" and entity_key:
+                    # Remove the resource entity from the database
+                    self.db.execute(
+                        "DELETE FROM resource_entity WHERE entity_key = ?",
+                        [entity_key]
+                    )
+                    logger.debug(f"Removed resource entity {entity_key} from chunk {chunk_key}")
+    
+    def is_chunk_loaded(self, chunk_x: int, chunk_y: int) -> bool:
+        """
+        Check if chunk is loaded into DB.
+        
+        Args:
+            chunk_x: Chunk X coordinate
+            chunk_y: Chunk Y coordinate
+            
+        Returns:
+            True if chunk is loaded, False otherwise
+        """
+        return (chunk_x, chunk_y) in self._loaded_chunks
+    
+    def is_chunk_resident(self, chunk_x: int, chunk_y: int) -> bool:
+        """
+        Check if chunk is loaded with its tile-level detail in the DB.
+        
+        Args:
+            chunk_x: Chunk X coordinate
+            chunk_y: Chunk Y coordinate
+            
+        Returns:
+            True if chunk is loaded and its detail was not evicted
+        """
+        chunk_key = (chunk_x, chunk_y)
+        return chunk_key in self._loaded_chunks and chunk_key not in self._evicted_chunks
+    
+    def get_pending_chunks(self) -> list[Tuple[int, int]]:
+        """
+        Get list of chunks that are COMPLETE but not yet loaded.
+        
+        Returns:
+            List of (chunk_x, chunk_y) tuples
+        """
+        pending = []
+        for chunk_key, state in self._chunk_states.items():
+            if state == "COMPLETE" and chunk_key not in self._loaded_chunks:
+                pending.append(chunk_key)
+        return pending
+    
+    async def load_all_complete_chunks(self, timeout: float = 30.0) -> int:
+        """
+        Load all chunks that are COMPLETE but not yet loaded.
+        
+        This is useful for initial DB setup or recovery. Chunks are loaded in
+        scheduler order (nearest to the agents first) and the write lock is
+        released between chunks, so live updates and urgent chunks are not
+        held up behind the whole batch.
+        
+        Args:
+            timeout: Maximum time to wait per chunk (seconds)
+            
+        Returns:
+            Number of chunks loaded
+        """
+        for chunk_key in self.get_pending_chunks():
+            self._load_scheduler.push(chunk_key)
+        
+        loaded_count = 0
+        while True:
+            chunk_key = self._load_scheduler.pop()
+            if chunk_key is None:
+                break
+            if await self._load_scheduled_chunk(chunk_key):
+                loaded_count += 1
+        
+        if loaded_count > 0:
+            logger.info(f"Loaded {loaded_count} chunks into DB")
+        
+        return loaded_count
+    
+    # ============================================================================
+    # Chunk Load Scheduling
+    # ============================================================================
+    
+    def set_agent_position(self, agent_id: str, position: Any) -> None:
+        """
+        Tell the chunk load scheduler where an agent is.
+        
+        Pending chunk loads are ordered by distance to the nearest known agent.
+        
+        Args:
+            agent_id: Agent ID
+            position: {x, y} dict or MapPosition (tile coordinates)
+        """
+        self._load_scheduler.set_focus(agent_id, position)
+    
+    def prefetch_route(
+        self,
+        waypoints: List[Any],
+        radius: int = 1,
+        agent_id: Optional[str] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        Prioritize chunks along a planned walking route.
+        
+        Completed chunks on the route are loaded in walking order ahead of
+        other distant chunks; route chunks that complete later get the same
+        priority when they arrive.
+        
+        Args:
+            waypoints: Route positions ({x, y} dicts or MapPositions)
+            radius: Chunks to include on each side of the path
+            agent_id: If given, the route starts at this agent's known chunk
+            
+        Returns:
+            Route chunks in walking order
+        """
+        focus = self._load_scheduler.get_focus(agent_id) if agent_id else None
+        if focus is not None:
+            start = {"x": focus[0] * 32 + 16, "y": focus[1] * 32 + 16}
+            waypoints = [start, *waypoints]
+        
+        chunks = route_chunks(waypoints, radius=radius)
+        self._load_scheduler.set_route(chunks)
+        for chunk_key in chunks:
+            if self._chunk_states.get(chunk_key) == "COMPLETE" and chunk_key not in self._loaded_chunks:
+                self._schedule_chunk_load(chunk_key)
+        return chunks
+    
+    def get_chunk_load_stats(self) -> Dict[str, Any]:
+        """
+        Get chunk load queue statistics.
+        
+        Returns:
+            Dictionary with pending, pending_near, loaded and loader_running
+        """
+        return {
+            "pending": len(self._load_scheduler),
+            "pending_near": len(self._load_scheduler.pending_near()),
+            "loaded": len(self._loaded_chunks),
+            "loader_running": self._load_task is not None and not self._load_task.done(),
+        }
+    
+    def _schedule_chunk_load(self, chunk_key: Tuple[int, int]) -> None:
+        """Queue a COMPLETE chunk and make sure the background loader runs."""
+        self._load_scheduler.push(chunk_key)
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.create_task(self._run_chunk_loads())
+    
+    async def _run_chunk_loads(self) -> None:
+        """Load queued chunks one at a time, re-picking the nearest before each."""
+        while True:
+            chunk_key = self._load_scheduler.pop()
+            if chunk_key is None:
+                return
+            await self._load_scheduled_chunk(chunk_key)
+    
+    async def _load_scheduled_chunk(self, chunk_key: Tuple[int, int]) -> bool:
+        """Load one scheduled chunk under the write lock (released afterwards)."""
+        async with self._write_lock:
+            if chunk_key in self._loaded_chunks:
+                return False
+            try:
+                await self._load_chunk(*chunk_key)
+            except Exception as e:
+                logger.error(f"Failed to load chunk {chunk_key}: {e}", exc_info=True)
+                return False
+            await self._enforce_memory_budget(pinned={chunk_key})
+        self._flush_subscriptions()
+        logger.info(f"Chunk {chunk_key} loaded into DB")
+        return True
+
+    # ============================================================================
+    # Memory Budget
+    # ============================================================================
+
+    async def set_memory_budget(self, max_detail_rows: Optional[int]) -> None:
+        """
+        Cap the tile-level detail kept in the DB, evicting chunks over budget.
+
+        Detail is the per-tile rows of resource_tile, water_tile and
+        resource_entity, which grow with every charted chunk. When over
+        budget, the least recently queried chunks that are not near an agent
+        lose their detail rows; map entities and the resource_patch /
+        water_patch summaries stay. An evicted chunk's detail is reloaded from
+        its snapshot files when a query touches it (ensure_synced_for or
+        ensure_synced(required_chunks=...)).
+
+        Set the budget after the derived tables are built: patches are
+        clustered from the tiles present at that time.
+
+        Args:
+            max_detail_rows: Maximum detail rows to keep, or None for no limit
+        """
+        self._max_detail_rows = max_detail_rows
+        async with self._write_lock:
+            self._track_untracked_chunks()
+            await self._enforce_memory_budget()
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """
+        Get memory budget statistics.
+
+        Returns:
+            Dictionary with max_detail_rows, detail_rows, resident_chunks,
+            evicted_chunks, evicted/reloaded/rows_evicted counters and
+            duckdb_memory_bytes (None if DuckDB cannot report it)
+        """
+        cursor = self.reader()
+        try:
+            row = cursor.execute("SELECT SUM(memory_usage_bytes) FROM duckdb_memory()").fetchone()
+            duckdb_memory = int(row[0]) if row and row[0] is not None else None
+        except Exception:
+            duckdb_memory = None
+        finally:
+            cursor.close()
+        return {
+            "max_detail_rows": self._max_detail_rows,
+            "detail_rows": self._resident_detail_rows(),
+            "resident_chunks": len(self._loaded_chunks) - len(self._evicted_chunks),
+            "evicted_chunks": len(self._evicted_chunks),
+            **self._eviction_stats,
+            "duckdb_memory_bytes": duckdb_memory,
+        }
+
+    def _track_untracked_chunks(self) -> None:
+        """
+        Count detail rows of chunks loaded outside _load_chunk (bulk load_all,
+        journal recovery) and make them the least recently used.
+        """
+        untracked = [c for c in self._loaded_chunks if c not in self._chunk_detail_rows]
+        if not untracked:
+            return
+        counts: Dict[Tuple[int, int], int] = {}
+        for table in ("resource_tile", "water_tile", "resource_entity"):
+            rows = self.db.execute(
+                f"SELECT CAST(floor(position.x / {CHUNK_SIZE}) AS INTEGER), "
+                f"CAST(floor(position.y / {CHUNK_SIZE}) AS INTEGER), COUNT(*) FROM {table} GROUP BY 1, 2"
+            ).fetchall()
+            for chunk_x, chunk_y, count in rows:
+                counts[(chunk_x, chunk_y)] = counts.get((chunk_x, chunk_y), 0) + count
+        for chunk_key in untracked:
+            self._chunk_detail_rows[chunk_key] = counts.get(chunk_key, 0)
+            if chunk_key not in self._chunk_lru:
+                self._chunk_lru[chunk_key] = None
+                self._chunk_lru.move_to_end(chunk_key, last=False)
+
+    def _resident_detail_rows(self) -> int:
+        """Detail rows of loaded chunks that were not evicted."""
+        return sum(
+            rows for chunk_key, rows in self._chunk_detail_rows.items()
+            if chunk_key not in self._evicted_chunks
+        )
+
+    def _touch_chunks(self, chunks: Iterable[Tuple[int, int]]) -> None:
+        """Mark chunks as most recently used."""
+        for chunk_key in chunks:
+            self._chunk_lru[chunk_key] = None
+            self._chunk_lru.move_to_end(chunk_key)
+
+    async def _enforce_memory_budget(self, pinned: Iterable[Tuple[int, int]] = ()) -> int:
+        """
+        Evict least recently used chunk detail until under budget (write lock held).
+
+        Chunks near an agent (within the load scheduler's near radius) and
+        pinned chunks are never evicted. Before any agent position is known
+        only pinned chunks are kept.
+
+        Args:
+            pinned: Chunks the caller is about to read
+
+        Returns:
+            Number of chunks evicted
+        """
+        if self._max_detail_rows is None:
+            return 0
+        pinned = set(pinned)
+        evicted = 0
+        total = self._resident_detail_rows()
+        for chunk_key in list(self._chunk_lru):
+            if total <= self._max_detail_rows:
+                break
+            if (
+                chunk_key in pinned
+                or chunk_key in self._evicted_chunks
+                or chunk_key not in self._loaded_chunks
+                or self._load_scheduler.is_near_focus(chunk_key)
+            ):
+                continue
+            total -= await self._evict_chunk_detail(chunk_key)
+            evicted += 1
+        if total > self._max_detail_rows:
+            logger.debug(f"Detail rows {total} over budget {self._max_detail_rows}: remaining chunks are near or pinned")
+        return evicted
+
+    async def _evict_chunk_detail(self, chunk_key: Tuple[int, int]) -> int:
+        """
+        Delete a chunk's tile-level detail rows (write lock held).
+
+        Args:
+            chunk_key: (chunk_x, chunk_y)
+
+        Returns:
+            Number of detail rows the chunk had
+        """
+        async with self._write_transaction():
+            self._delete_chunk_rows(chunk_key)
+        rows = self._chunk_detail_rows.get(chunk_key, 0)
+        self._evicted_chunks.add(chunk_key)
+        self._chunk_lru.pop(chunk_key, None)
+        self._eviction_stats["evicted"] += 1
+        self._eviction_stats["rows_evicted"] += rows
+        logger.debug(f"Evicted detail of chunk {chunk_key} ({rows} rows)")
+        return rows
+
+    def _delete_chunk_rows(self, chunk_key: Tuple[int, int], entities: bool = False) -> None:
+        """
+        Delete the rows positioned in a chunk (called inside a write transaction).
+
+        Args:
+            chunk_key: (chunk_x, chunk_y)
+            entities: Also delete map entities and their component rows
+                (tile-level detail only otherwise)
+        """
+        chunk_x, chunk_y = chunk_key
+        bounds = [
+            chunk_x * CHUNK_SIZE, (chunk_x + 1) * CHUNK_SIZE,
+            chunk_y * CHUNK_SIZE, (chunk_y + 1) * CHUNK_SIZE,
+        ]
+        in_chunk = "position.x >= ? AND position.x < ? AND position.y >= ? AND position.y < ?"
+        if entities and self.subscriptions:
+            # Rows missing from the new snapshot must flip their subscriptions too
+            self._touched_keys.update(
+                row[0] for row in self.db.execute(f"SELECT entity_key FROM resource_entity WHERE {in_chunk}", bounds).fetchall()
+            )
+        for table in ("resource_tile", "water_tile", "resource_entity"):
+            self.db.execute(f"DELETE FROM {table} WHERE {in_chunk}", bounds)
+        if entities:
+            removed = self.db.execute(
+                f"SELECT entity_key, entity_name, position FROM map_entity WHERE {in_chunk}", bounds
+            ).fetchall()
+            # Component tables first (foreign key constraints)
+            for table in ("inserter", "transport_belt", "mining_drill", "assemblers", "pumpjack", "electric_pole"):
+                self.db.execute(
+                    f"DELETE FROM {table} WHERE entity_key IN (SELECT entity_key FROM map_entity WHERE {in_chunk})",
+                    bounds,
+                )
+            self.db.execute(f"DELETE FROM map_entity WHERE {in_chunk}", bounds)
+            # Same hooks as entity_destroyed; entities the reload brings back
+            # get a new version and compact to "modified" in the change feed
+            tick = self._op_tick({})
+            for entity_key, entity_name, position in removed:
+                if self._history is not None:
+                    self._history.record_destroy(entity_key, tick)
+                if self.subscriptions:
+                    self._touched_keys.add(entity_key)
+                self.change_feed.record("entity", "removed", entity_key, name=entity_name, position=position, tick=tick)
+
+    async def _reload_chunk_detail(self, chunk_key: Tuple[int, int]) -> None:
+        """
+        Reload an evicted chunk's detail from its snapshot files (write lock held).
+
+        Re-inserts the init files and replays the whole trees/rocks update
+        log, so removals that happened while the chunk was evicted apply.
+
+        Args:
+            chunk_key: (chunk_x, chunk_y)
+        """
+        chunk_dir = self.snapshot_dir / str(chunk_key[0]) / str(chunk_key[1])
+        log_name = "trees_rocks-update.jsonl"
+        async with self._write_transaction():
+            rows = self._load_chunk_detail(chunk_dir)
+            entries, offset = _read_log_tail(chunk_dir / log_name, 0)
+            await self._apply_update_log(chunk_key, log_name, [e for _, e in entries])
+        self._log_offsets[(chunk_key, log_name)] = offset
+        self._chunk_detail_rows[chunk_key] = rows
+        self._evicted_chunks.discard(chunk_key)
+        self._touch_chunks([chunk_key])
+        self._eviction_stats["reloaded"] += 1
+        logger.debug(f"Reloaded detail of chunk {chunk_key} ({rows} rows)")
+
+    # ============================================================================
+    # Bootstrap Streaming
+    # ============================================================================
+    
+    def set_system_phase(self, phase: Optional[str]) -> None:
+        """
+        Record the snapshot system phase (from a UDP event or an RCON status query).
+        
+        Args:
+            phase: "INITIAL_SNAPSHOTTING" or "MAINTENANCE"
+        """
+        if not phase:
+            return
+        self._system_phase = phase
+        if phase == "MAINTENANCE":
+            self._maintenance_event.set()
+        else:
+            self._maintenance_event.clear()
+    
+    @property
+    def system_phase(self) -> Optional[str]:
+        """Last known snapshot system phase, or None if not seen yet."""
+        return self._system_phase
+    
+    async def wait_for_maintenance(self, timeout: float = 120.0) -> bool:
+        """
+        Wait for the snapshot system to reach MAINTENANCE (bootstrap finished).
+        
+        Args:
+            timeout: Maximum time to wait (seconds)
+            
+        Returns:
+            True if MAINTENANCE was reached, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._maintenance_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
-    async def _load_chunk(self, chunk_x: int, chunk_y: int) -> None:
+    def schedule_snapshot_chunks(self) -> int:
         """
-        Load a single chunk into DB (called with write lock held).
+        Queue every snapshotted chunk on disk that is not loaded yet.
         
-        This loads the chunk's snapshot files into the database.
-        Only loads if chunk files exist and are complete.
+        Used when streaming a bootstrap into an empty DB: chunks completed
+        before we subscribed are picked up here (one directory walk), later
+        ones arrive via snapshot_state COMPLETE.
         
-        Args:
-            chunk_x: Chunk X coordinate
-            chunk_y: Chunk Y coordinate
+        Returns:
+            Number of chunks queued
         """
-        import json
-        chunk_key = (chunk_x, chunk_y)
+        from FactoryVerse.infra.db.loader.utils import iter_chunk_dirs
         
-        # Check if already loaded
-        if chunk_key in self._loaded_chunks:
-            return
+        queued = 0
+        for chunk_x, chunk_y, chunk_dir in iter_chunk_dirs(self.snapshot_dir):
+            chunk_key = (chunk_x, chunk_y)
+            if chunk_key in self._loaded_chunks or not any(chunk_dir.glob("*_init.jsonl")):
+                continue
+            self._chunk_states.setdefault(chunk_key, "COMPLETE")
+            self._schedule_chunk_load(chunk_key)
+            queued += 1
+        return queued
+    
+    async def reconcile_snapshot_files(self) -> Dict[str, int]:
+        """
+        Bring the DB in line with the snapshot files, checking file sizes only.
         
-        # Check if chunk directory exists
-        chunk_dir = self.snapshot_dir / str(chunk_x) / str(chunk_y)
-        if not chunk_dir.exists():
-            logger.debug(f"Chunk directory does not exist: {chunk_dir}")
-            return
+        Chunks that are on disk but not loaded are loaded; chunks whose init
+        files changed size since they were loaded (re-snapshotted) are
+        reloaded; update logs longer than the applied offset are replayed
+        from that offset. Unchanged chunks cost a few stat() calls.
         
-        try:
-            # Load resource tiles (resources_init.jsonl)
-            resources_file = chunk_dir / "resources_init.jsonl"
-            if resources_file.exists():
-                with open(resources_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            data = json.loads(line)
-                            entity_key = f"{data['kind']}:{data['x']},{data['y']}"
-                            self.db.execute(
-                                "INSERT OR REPLACE INTO resource_tile (entity_key, name, position, amount) VALUES (?, ?, ?, ?)",
-                                [entity_key, data["kind"], json.dumps({"x": float(data["x"]), "y": float(data["y"])}), data.get("amount", 0)]
-                            )
-            
-            # Load water tiles (water_init.jsonl)
-            water_file = chunk_dir / "water_init.jsonl"
-            if water_file.exists():
-                with open(water_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            data = json.loads(line)
-                            entity_key = f"water:{data['x']},{data['y']}"
-                            self.db.execute(
-                                "INSERT OR REPLACE INTO water_tile (entity_key, type, position) VALUES (?, ?, ?)",
-                                [entity_key, "water-tile", json.dumps({"x": float(data["x"]), "y": float(data["y"])})]
-                            )
-            
-            # Load resource entities (trees_rocks_init.jsonl)
-            trees_rocks_file = chunk_dir / "trees_rocks_init.jsonl"
-            if trees_rocks_file.exists():
-                with open(trees_rocks_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            data = json.loads(line)
-                            entity_key = data.get("key") or f"{data['name']}:{data['position']['x']},{data['position']['y']}"
-                            bbox = data.get("bounding_box")
-                            if bbox:
-                                self.db.execute(
-                                    "INSERT OR REPLACE INTO resource_entity (entity_key, name, type, position, bbox) VALUES (?, ?, ?, ?, ST_MakeEnvelope(?, ?, ?, ?))",
-                                    [entity_key, data["name"], data.get("type", "unknown"), json.dumps(data["position"]),
-                                     float(bbox["min_x"]), float(bbox["min_y"]), float(bbox["max_x"]), float(bbox["max_y"])]
-                                )
-                            else:
-                                self.db.execute(
-                                    "INSERT OR REPLACE INTO resource_entity (entity_key, name, type, position) VALUES (?, ?, ?, ?)",
-                                    [entity_key, data["name"], data.get("type", "unknown"), json.dumps(data["position"])]
-                                )
-            
-            # Replay updates log (entities_updates.jsonl)
-            updates_file = chunk_dir / "entities_updates.jsonl"
-            if updates_file.exists():
-                with open(updates_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            operation = json.loads(line)
-                            op = operation.get("op")
-                            if op == "upsert":
-                                # This is a created/updated entity - sync it
-                                await self._sync_entity_created({"entity": operation.get("entity")})
-                            elif op == "remove":
-                                # This is a destroyed entity - sync it
-                                await self._sync_entity_destroyed({
-                                    "entity_key": operation.get("key"),
-                                    "entity_name": operation.get("name", ""),
-                                })
+        Returns:
+            Dictionary with checked, loaded, reloaded and log_entries_replayed
+        """
+        from FactoryVerse.infra.db.loader.utils import iter_chunk_dirs
+        
+        stats = {"checked": 0, "loaded": 0, "reloaded": 0, "log_entries_replayed": 0}
+        for chunk_x, chunk_y, chunk_dir in iter_chunk_dirs(self.snapshot_dir):
+            chunk_key = (chunk_x, chunk_y)
+            stats["checked"] += 1
+            sizes = _init_file_sizes(chunk_dir)
+            if not sizes:
+                continue
             
-            # Replay trees/rocks updates log (trees_rocks-update.jsonl)
-            trees_rocks_updates_file = chunk_dir / "trees_rocks-update.jsonl"
-            if trees_rocks_updates_file.exists():
-                with open(trees_rocks_updates_file, "r") as f:
-                    for line in f:
-                        if line.strip():
-                            operation = json.loads(line)
-                            op = operation.get("op")
-                            if op == "remove":
-                                # Remove the resource entity from the database
-                                entity_key = operation.get("key")
-                                if entity_key:
-                                    self.db.execute(
-                                        "DELETE FROM resource_entity WHERE entity_key = ?",
-                                        [entity_key]
-                                    )
-                                    logger.debug(f"Removed resource entity {entity_key} from chunk ({chunk_x}, {chunk_y})")
+            if chunk_key in self._loaded_chunks and self._chunk_file_sizes.get(chunk_key) not in (None, sizes):
+                if await self._replace_chunk(chunk_key):
+                    stats["reloaded"] += 1
+                continue
+            elif chunk_key not in self._loaded_chunks:
+                stats["loaded"] += 1
             
-            # Mark chunk as loaded
-            self._loaded_chunks.add(chunk_key)
-            logger.debug(f"Chunk ({chunk_x}, {chunk_y}) loaded successfully")
+            if chunk_key not in self._loaded_chunks:
+                await self._load_scheduled_chunk(chunk_key)
+                continue
             
-        except Exception as e:
-            logger.error(
-                f"Error loading chunk ({chunk_x}, {chunk_y}): {e}",
-                exc_info=True
-            )
-            raise
+            for log_name in UPDATE_LOG_FILES:
+                log_path = chunk_dir / log_name
+                if log_path.exists() and log_path.stat().st_size > self._log_offsets.get((chunk_key, log_name), 0):
+                    stats["log_entries_replayed"] += await self._repair_chunk(chunk_key)
+                    break
+        
+        logger.info(f"Snapshot reconciliation: {stats}")
+        return stats
     
-    def is_chunk_loaded(self, chunk_x: int, chunk_y: int) -> bool:
+    async def _replace_chunk(self, chunk_key: Tuple[int, int]) -> bool:
         """
-        Check if chunk is loaded into DB.
+        Replace a re-snapshotted chunk's rows with its current snapshot files.
+
+        The old rows are deleted and the chunk loaded again in one
+        transaction, so entities and tiles missing from the new snapshot
+        are gone and readers never see the chunk empty.
+
+        Args:
+            chunk_key: (chunk_x, chunk_y)
+
+        Returns:
+            True if the chunk was reloaded
+        """
+        async with self._write_lock:
+            was_loaded = chunk_key in self._loaded_chunks
+            offsets = {
+                log_name: self._log_offsets[(chunk_key, log_name)]
+                for log_name in UPDATE_LOG_FILES if (chunk_key, log_name) in self._log_offsets
+            }
+            try:
+                async with self._write_transaction():
+                    self._delete_chunk_rows(chunk_key, entities=True)
+                    self._loaded_chunks.discard(chunk_key)
+                    for log_name in UPDATE_LOG_FILES:
+                        self._log_offsets.pop((chunk_key, log_name), None)
+                    await self._load_chunk(*chunk_key)
+            except Exception as e:
+                # The transaction rolled back: the old rows and their offsets are still current
+                if was_loaded:
+                    self._loaded_chunks.add(chunk_key)
+                for log_name, offset in offsets.items():
+                    self._log_offsets[(chunk_key, log_name)] = offset
+                logger.error(f"Failed to reload chunk {chunk_key}: {e}", exc_info=True)
+                return False
+            await self._enforce_memory_budget(pinned={chunk_key})
+        self._flush_subscriptions()
+        logger.info(f"Chunk {chunk_key} reloaded from a new snapshot")
+        return True
+    
+    async def run_write(self, fn, *args, **kwargs) -> Any:
+        """
+        Run a blocking writer function as one transaction under the write lock.
         
         Args:
-            chunk_x: Chunk X coordinate
-            chunk_y: Chunk Y coordinate
+            fn: Callable taking the DB connection as first argument
+                (e.g. a loader function)
+            *args: Further positional arguments for fn
+            **kwargs: Keyword arguments for fn
             
         Returns:
-            True if chunk is loaded, False otherwise
+            Whatever fn returns
         """
-        return (chunk_x, chunk_y) in self._loaded_chunks
+        async with self._write_lock:
+            async with self._write_transaction():
+                return fn(self.db, *args, **kwargs)
     
-    def get_pending_chunks(self) -> list[Tuple[int, int]]:
+    # ============================================================================
+    # Restart Journal
+    # ============================================================================
+    
+    def mark_chunks_loaded_from_disk(self) -> int:
         """
-        Get list of chunks that are COMPLETE but not yet loaded.
+        Record every chunk directory on disk as loaded, at its current log offsets.
+        
+        Call right after a bulk load_all() so gap repair, the journal and
+        ensure_synced know which chunks are in the DB and how far their update
+        logs were applied.
         
         Returns:
-            List of (chunk_x, chunk_y) tuples
+            Number of chunks recorded
         """
-        pending = []
-        for chunk_key, state in self._chunk_states.items():
-            if state == "COMPLETE" and chunk_key not in self._loaded_chunks:
-                pending.append(chunk_key)
-        return pending
+        from FactoryVerse.infra.db.loader.utils import iter_chunk_dirs
+        
+        count = 0
+        for chunk_x, chunk_y, chunk_dir in iter_chunk_dirs(self.snapshot_dir):
+            chunk_key = (chunk_x, chunk_y)
+            for log_name in UPDATE_LOG_FILES:
+                _, offset = _read_log_tail(chunk_dir / log_name, self._log_offsets.get((chunk_key, log_name), 0))
+                self._log_offsets[(chunk_key, log_name)] = offset
+            self._loaded_chunks.add(chunk_key)
+            self._chunk_states.setdefault(chunk_key, "COMPLETE")
+            count += 1
+        return count
     
-    async def load_all_complete_chunks(self, timeout: float = 30.0) -> int:
+    def _journal_state(self) -> Dict[str, Any]:
+        """Sync state persisted in journal checkpoints."""
+        return {
+            "version": self._db_version,
+            "sequence": self._applied_sequence,
+            "tick": self._applied_tick,
+            "loaded_chunks": sorted([list(c) for c in self._loaded_chunks]),
+            "evicted_chunks": sorted([list(c) for c in self._evicted_chunks]),
+            "offsets": [
+                [chunk[0], chunk[1], log_name, offset]
+                for (chunk, log_name), offset in sorted(self._log_offsets.items())
+            ],
+        }
+    
+    async def checkpoint_journal(self) -> None:
         """
-        Load all chunks that are COMPLETE but not yet loaded.
+        Checkpoint the database and compact the journal to one state record.
+        
+        No-op when the service has no journal.
+        """
+        if self._journal is None:
+            return
+        async with self._write_lock:
+            self.db.execute("CHECKPOINT")
+            self._journal.write_checkpoint(self._journal_state())
+    
+    async def recover_from_journal(self) -> Dict[str, Any]:
+        """
+        Resume from the journal after a restart instead of a full reload.
         
-        This is useful for initial DB setup or recovery.
+        Restores loaded chunks, log offsets and watermarks from the last
+        checkpoint, re-applies updates journaled after it, then catches up on
+        what happened while we were down: the tail of every loaded chunk's
+        update logs and any chunk directories that appeared meanwhile. Work is
+        proportional to the downtime, not to the map size.
         
-        Args:
-            timeout: Maximum time to wait per chunk (seconds)
-            
         Returns:
-            Number of chunks loaded
+            Dictionary with recovered (bool), tail_replayed, log_entries_replayed,
+            new_chunks_loaded and seconds
         """
-        pending = self.get_pending_chunks()
-        loaded_count = 0
+        from FactoryVerse.infra.db.loader.utils import iter_chunk_dirs
+        
+        if self._journal is None:
+            return {"recovered": False, "reason": "no journal configured"}
+        checkpoint, tail = self._journal.load()
+        if checkpoint is None:
+            return {"recovered": False, "reason": "no checkpoint in journal"}
+        
+        started = time.monotonic()
+        self._loaded_chunks = {tuple(c) for c in checkpoint.get("loaded_chunks", [])}
+        for chunk_key in self._loaded_chunks:
+            self._chunk_states.setdefault(chunk_key, "COMPLETE")
+        self._evicted_chunks = {tuple(c) for c in checkpoint.get("evicted_chunks", [])}
+        self._log_offsets = {
+            ((x, y), log_name): offset for x, y, log_name, offset in checkpoint.get("offsets", [])
+        }
+        self._applied_sequence = checkpoint.get("sequence", -1)
+        self._applied_tick = checkpoint.get("tick", -1)
+        self._db_version = checkpoint.get("version", 0)
         
-        async with self._write_lock:
-            for chunk_x, chunk_y in pending:
-                try:
-                    await self._load_chunk(chunk_x, chunk_y)
-                    loaded_count += 1
-                except Exception as e:
-                    logger.error(
-                        f"Failed to load chunk ({chunk_x}, {chunk_y}): {e}",
-                        exc_info=True
-                    )
+        # Re-apply updates journaled after the checkpoint (idempotent upserts/deletes)
+        self._recovering = True
+        try:
+            async with self._write_lock:
+                for update_type, payload in tail:
+                    # Count it as enqueued too, or applied runs ahead and is_synced() lies
+                    self._count_enqueued(payload)
+                    await self._process_update(update_type, payload)
+        finally:
+            self._recovering = False
+        
+        # Catch up on update logs written while we were down
+        replayed = 0
+        for chunk_key in sorted(self._loaded_chunks):
+            replayed += await self._repair_chunk(chunk_key)
+        
+        # Load chunks snapshotted while we were down
+        new_chunks = 0
+        for chunk_x, chunk_y, chunk_dir in iter_chunk_dirs(self.snapshot_dir):
+            chunk_key = (chunk_x, chunk_y)
+            if chunk_key not in self._loaded_chunks:
+                async with self._write_lock:
+                    await self._load_chunk(*chunk_key)
+                self._chunk_states.setdefault(chunk_key, "COMPLETE")
+                new_chunks += 1
+        
+        # Sequence numbers restart or jump while we were down - don't report that as loss
+        self._last_sequence.pop("_global", None)
+        await self.checkpoint_journal()
+        
+        stats = {
+            "recovered": True,
+            "tail_replayed": len(tail),
+            "log_entries_replayed": replayed,
+            "new_chunks_loaded": new_chunks,
+            "seconds": time.monotonic() - started,
+        }
+        logger.info(f"Recovered sync state from journal: {stats}")
+        return stats
+    
+    # ============================================================================
+    # Gap Recovery
+    # ============================================================================
+    
+    @staticmethod
+    def _payload_chunk(payload: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """Extract (chunk_x, chunk_y) from a payload, if it carries one."""
+        chunk_x = payload.get("chunk_x")
+        chunk_y = payload.get("chunk_y")
+        if chunk_x is None and isinstance(payload.get("chunk"), dict):
+            # Most payloads use a nested chunk object
+            chunk_x = payload["chunk"].get("x")
+            chunk_y = payload["chunk"].get("y")
+        if chunk_x is None or chunk_y is None:
+            return None
+        return (int(chunk_x), int(chunk_y))
+    
+    def _schedule_chunk_repair(self, chunk_key: Tuple[int, int]) -> None:
+        """Queue a chunk for background update-log replay."""
+        if chunk_key not in self._repair_pending:
+            self._repair_pending.add(chunk_key)
+            self._repair_stats["scheduled"] += 1
+        if self._repair_task is None or self._repair_task.done():
+            self._repair_task = asyncio.create_task(self._run_chunk_repairs())
+    
+    async def _run_chunk_repairs(self) -> None:
+        """Drain the repair queue, one chunk at a time."""
+        while self._repair_pending:
+            chunk_key = self._repair_pending.pop()
+            try:
+                replayed = await self._repair_chunk(chunk_key)
+                self._stale_chunks.discard(chunk_key)
+                self._repair_stats["completed"] += 1
+                self._repair_stats["last_repair_at"] = time.time()
+                logger.info(f"Repaired chunk {chunk_key}: replayed {replayed} update log entries")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._repair_stats["failed"] += 1
+                logger.error(f"Gap repair failed for chunk {chunk_key}: {e}", exc_info=True)
+    
+    async def _repair_chunk(self, chunk_key: Tuple[int, int]) -> int:
+        """
+        Replay a chunk's update logs from the last applied byte offset.
         
-        if loaded_count > 0:
-            logger.info(f"Loaded {loaded_count} chunks into DB")
+        File reads happen in a worker thread without the write lock; the lock
+        is only taken to apply the entries. Entries that another writer applied
+        while we were reading (offset moved on) are skipped.
         
-        return loaded_count
+        Args:
+            chunk_key: (chunk_x, chunk_y) to repair
+            
+        Returns:
+            Number of entries applied
+        """
+        chunk_dir = self.snapshot_dir / str(chunk_key[0]) / str(chunk_key[1])
+        applied = 0
+        
+        for log_name in UPDATE_LOG_FILES:
+            offset_key = (chunk_key, log_name)
+            start_offset = self._log_offsets.get(offset_key, 0)
+            entries, end_offset = await asyncio.to_thread(
+                _read_log_tail, chunk_dir / log_name, start_offset
+            )
+            self._repair_stats["bytes_read"] += max(0, end_offset - start_offset)
+            
+            async with self._write_lock:
+                current = self._log_offsets.get(offset_key, 0)
+                fresh = [entry for entry_end, entry in entries if entry_end > current]
+                if fresh:
+                    async with self._write_transaction():
+                        await self._apply_update_log(chunk_key, log_name, fresh)
+                self._log_offsets[offset_key] = max(current, end_offset)
+            
+            applied += len(fresh)
+        
+        self._repair_stats["entries_replayed"] += applied
+        return applied
     
     # ============================================================================
     # Update Processors (stubs for Phase 1, to be implemented in later phases)
@@ -736,6 +1946,12 @@ class GameDataSyncService:
         
         logger.info(f"🔧 Entity {entity_name} is valid, upserting to map_entity...")
         
+        existed = None
+        if self.change_feed.active:
+            existed = self.db.execute(
+                "SELECT 1 FROM map_entity WHERE entity_key = ?", [entity_key]
+            ).fetchone() is not None
+        
         # Insert/update map_entity
         await self._upsert_map_entity(entity_data)
         
@@ -756,6 +1972,19 @@ class GameDataSyncService:
         elif entity_type == "electric-pole":
             await self._upsert_electric_pole(entity_data)
         
+        if self._history is not None:
+            self._history.record_upsert(
+                {**entity_data, "key": entity_key}, self._op_tick(payload), op=payload.get("op") or "created"
+            )
+        if self.subscriptions:
+            self._touched_keys.add(entity_key)
+        if existed is not None:
+            self.change_feed.record(
+                "entity", "modified" if existed else "added", entity_key,
+                name=entity_name, position=entity_data.get("position"), tick=payload.get("tick"),
+                type=entity_type,
+            )
+        
         logger.info(f"✅ Entity created: {entity_key} ({entity_name})")
     
     async def _sync_entity_destroyed(self, payload: Dict[str, Any]) -> None:
@@ -805,6 +2034,14 @@ class GameDataSyncService:
             
             # Delete from map_entity
             self.db.execute("DELETE FROM map_entity WHERE entity_key = ?", [entity_key])
+            if self._history is not None:
+                self._history.record_destroy(entity_key, self._op_tick(payload))
+            if self.subscriptions:
+                self._touched_keys.add(entity_key)
+            self.change_feed.record(
+                "entity", "removed", entity_key,
+                name=entity_name or None, position=payload.get("position"), tick=payload.get("tick"),
+            )
             logger.debug(f"Map entity destroyed: {entity_key} ({entity_name})")
     
     async def _sync_entity_rotated(self, payload: Dict[str, Any]) -> None:
@@ -849,6 +2086,16 @@ class GameDataSyncService:
             [direction_upper, entity_key]
         )
         
+        if self._history is not None:
+            self._history.record_rotation(entity_key, direction_name, self._op_tick(payload))
+        if self.subscriptions:
+            self._touched_keys.add(entity_key)
+        self.change_feed.record(
+            "entity", "modified", entity_key,
+            name=payload.get("entity_name"), position=payload.get("position"), tick=payload.get("tick"),
+            direction=direction_name,
+        )
+        
         logger.debug(f"Entity rotated: {entity_key} -> {direction_upper}")
     
     async def _sync_entity_configuration_changed(self, payload: Dict[str, Any]) -> None:
@@ -857,6 +2104,149 @@ class GameDataSyncService:
         # The entity data should contain the updated configuration
         await self._sync_entity_created(payload)
     
+    def _op_tick(self, payload: Dict[str, Any]) -> int:
+        """Game tick of an entity operation (latest applied tick if absent)."""
+        tick = payload.get("tick")
+        return tick if isinstance(tick, int) else max(self._applied_tick, 0)
+    
+    # ============================================================================
+    # Query Subscriptions
+    # ============================================================================
+    
+    def subscribe(
+        self,
+        name: str,
+        predicate: Union[str, Predicate],
+        sink: Callable[[Dict[str, Any]], None],
+        notify_initial: bool = False,
+    ) -> int:
+        """
+        Register a standing query (see infra.subscriptions).
+        
+        The predicate is evaluated once over the whole DB to establish which
+        rows match; afterwards only keys touched by applied updates are
+        re-evaluated, and every flip is sent to sink as a notification.
+        
+        Args:
+            name: Subscription name (re-registering replaces it)
+            predicate: SELECT returning entity_key, or a Predicate object
+            sink: Receives notification payloads (e.g. a notification queue put)
+            notify_initial: Also send became_true for rows matching right now
+            
+        Returns:
+            Number of rows currently matching
+        """
+        if isinstance(predicate, str):
+            predicate = SqlPredicate(predicate)
+        cursor = self.reader()
+        try:
+            return self.subscriptions.add(
+                name, predicate, sink, cursor, self._entity_statuses,
+                notify_initial=notify_initial, tick=self._applied_tick,
+            )
+        finally:
+            cursor.close()
+    
+    def unsubscribe(self, name: str) -> bool:
+        """
+        Remove a standing query.
+        
+        Args:
+            name: Subscription name
+            
+        Returns:
+            True if it existed
+        """
+        return self.subscriptions.remove(name)
+    
+    def _flush_subscriptions(self) -> int:
+        """Re-evaluate subscriptions for keys touched since the last flush."""
+        if not self.subscriptions:
+            self._touched_keys.clear()
+            self._status_touched.clear()
+            return 0
+        if not self._touched_keys and not self._status_touched:
+            return 0
+        touched, self._touched_keys = self._touched_keys, set()
+        status_touched, self._status_touched = self._status_touched, set()
+        cursor = self.reader()
+        try:
+            return self.subscriptions.evaluate(
+                cursor, touched, status_touched, self._entity_statuses, tick=self._applied_tick,
+            )
+        finally:
+            cursor.close()
+    
+    # ============================================================================
+    # Entity History
+    # ============================================================================
+    
+    async def enable_history(
+        self, retention_ticks: Optional[int] = None, max_rows: Optional[int] = None
+    ) -> None:
+        """
+        Turn on tick-versioned entity history (see infra.db.entity_history).
+        
+        From now on every applied entity operation closes the entity's
+        current version in entity_history and opens a new one. Entities
+        already in map_entity are seeded with a state-less version at the
+        latest applied tick.
+        
+        Args:
+            retention_ticks: Keep closed versions for this many ticks
+                (e.g. 60 * 60 * 30 for 30 minutes); None keeps all
+            max_rows: Cap on history rows (oldest closed versions go first)
+        """
+        async with self._write_lock:
+            async with self._write_transaction():
+                self._history = EntityHistory(self.db, retention_ticks=retention_ticks, max_rows=max_rows)
+                self._history.seed_from_map_entity(max(self._applied_tick, 0))
+        logger.info(f"Entity history enabled (retention_ticks={retention_ticks}, max_rows={max_rows})")
+    
+    def history_as_of(self, tick: int) -> List[Dict[str, Any]]:
+        """
+        Entity states as of a game tick (entities with a recorded version).
+        
+        Args:
+            tick: Game tick
+            
+        Returns:
+            Version dicts with entity_key, entity_name, position, state, op,
+            valid_from_tick and valid_to_tick
+        """
+        cursor = self.reader()
+        try:
+            return entities_as_of(cursor, tick)
+        finally:
+            cursor.close()
+    
+    def history_changed_since(self, tick: int) -> List[Dict[str, Any]]:
+        """
+        Entity versions opened or closed after a game tick.
+        
+        Args:
+            tick: Game tick
+            
+        Returns:
+            Version dicts, oldest change first (closed_by "destroyed" marks removals)
+        """
+        cursor = self.reader()
+        try:
+            return entities_changed_since(cursor, tick)
+        finally:
+            cursor.close()
+    
+    def get_history_stats(self) -> Dict[str, Any]:
+        """
+        Get entity history statistics.
+        
+        Returns:
+            Dictionary with enabled, versions, closed and pruned counters
+        """
+        if self._history is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._history.stats}
+    
     # ============================================================================
     # Entity Data Processing Helpers
     # ============================================================================
@@ -1186,6 +2576,11 @@ class GameDataSyncService:
             logger.debug(f"File does not exist (may not be created yet): {file_path}")
             return
         
+        if file_type in ("resource", "water", "trees_rocks") and self._payload_chunk(payload) in self._evicted_chunks:
+            # Evicted detail is read from the file when the chunk is next queried
+            logger.debug(f"Skipping {file_type} reload for evicted chunk: {file_path}")
+            return
+        
         if file_type == "resource":
             # Resource tiles (resources_init.jsonl)
             await self._reload_resource_tiles(file_path_obj)
@@ -1202,6 +2597,10 @@ class GameDataSyncService:
         elif file_type == "ghosts_init":
             # Ghosts - reload from file
             await self._reload_ghosts(file_path_obj)
+        elif file_type == "status":
+            # Status snapshots are read on demand; only diffed for the change feed
+            if self.change_feed.active or self.subscriptions.watches_status:
+                self._record_status_changes(file_path_obj)
         else:
             logger.debug(f"Unhandled file type for written operation: {file_type}")
     
@@ -1235,8 +2634,10 @@ class GameDataSyncService:
             agent_id = payload.get("agent_id")
             await self._append_agent_production_statistics(file_path_obj, agent_id, entry_count)
         elif file_type == "status":
-            # Status files - on-demand reads, not incremental sync
+            # Status files - on-demand reads, not incremental sync (only diffed for the change feed)
             logger.debug(f"Status file appended (on-demand reads): {file_path}")
+            if self.change_feed.active or self.subscriptions.watches_status:
+                self._record_status_changes(file_path_obj)
         elif file_type == "entities_updates":
             # Entities updates - append new operations
             await self._append_entities_updates(file_path_obj, entry_count)
@@ -1450,6 +2851,9 @@ class GameDataSyncService:
         if not entries:
             return
         
+        if self.change_feed.active:
+            self._record_ghost_changes(entries)
+        
         # Insert/update ghosts
         for g in entries:
             self.db.execute(
@@ -1475,6 +2879,25 @@ class GameDataSyncService:
         
         logger.debug(f"Reloaded {len(entries)} ghosts from {file_path}")
     
+    def _record_ghost_changes(self, entries: List[Dict[str, Any]]) -> None:
+        """Diff a full ghosts file against the ghost table into the change feed."""
+        previous = {
+            key: (name, x, y, direction)
+            for key, name, x, y, direction in self.db.execute(
+                "SELECT ghost_key, ghost_name, position_x, position_y, direction FROM ghost"
+            ).fetchall()
+        }
+        for g in entries:
+            old = previous.pop(g["ghost_key"], None)
+            new = (g["ghost_name"], g["position"]["x"], g["position"]["y"], g["direction"])
+            if old != new:
+                self.change_feed.record(
+                    "ghost", "added" if old is None else "modified", g["ghost_key"],
+                    name=g["ghost_name"], position=g["position"], direction=g["direction_name"],
+                )
+        for key, (name, x, y, _) in previous.items():
+            self.change_feed.record("ghost", "removed", key, name=name, position={"x": x, "y": y})
+    
     # ============================================================================
     # File Append Helpers (for appended operations)
     # ============================================================================
@@ -1586,11 +3009,47 @@ class GameDataSyncService:
             # Table might not exist
             logger.debug(f"Agent production statistics table not available: {e}")
     
-    async def _append_entities_updates(self, file_path: Path, entry_count: int) -> None:
-        """Append new entity operations from entities_updates.jsonl."""
+    def _record_status_changes(self, file_path: Path) -> None:
+        """Decode a status file into status transitions (change feed and subscriptions)."""
+        import json
+        from FactoryVerse.infra.db.loader.status_loader import (
+            ENTITY_ENUM_TO_NAME, _decode_status_record, _get_status_enum_from_db,
+        )
+        
+        status_enum = _get_status_enum_from_db(self.db)
+        if not status_enum:
+            return
+        try:
+            tick = int(file_path.stem.split("-")[-1])
+        except ValueError:
+            tick = None
+        statuses = {}
+        with open(file_path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    decoded = _decode_status_record(json.loads(line), ENTITY_ENUM_TO_NAME, status_enum)
+                except (ValueError, TypeError):
+                    continue
+                if decoded:
+                    entity_key, status_name, x, y = decoded
+                    statuses[entity_key] = {
+                        "status": status_name, "name": entity_key[1:].split(":")[0], "x": x, "y": y,
+                    }
+        self.change_feed.record_statuses(statuses, tick=tick)
+        
+        previous = self._entity_statuses
+        self._status_touched.update(
+            key for key in statuses.keys() | previous.keys()
+            if (statuses.get(key) or {}).get("status") != (previous.get(key) or {}).get("status")
+        )
+        self._entity_statuses = statuses
+    
+    def _read_last_entries(self, file_path: Path, entry_count: int) -> List[Dict[str, Any]]:
+        """Read the last N parsed entries of a JSONL file."""
         import json
         
-        # Read only the last N entries
         entries = []
         try:
             with open(file_path, "r") as f:
@@ -1603,7 +3062,22 @@ class GameDataSyncService:
                             logger.warning(f"Error parsing entity update entry: {e}")
                             continue
         except FileNotFoundError:
-            return
+            pass
+        return entries
+    
+    async def _append_entities_updates(self, file_path: Path, entry_count: int) -> None:
+        """Append new entity operations from entities_updates.jsonl."""
+        # Read from the last applied offset when we know it, so gap repairs and
+        # appends never re-apply the same entries; otherwise take the last N
+        chunk_x, chunk_y = self._extract_chunk_from_path(file_path)
+        offset_key = ((chunk_x, chunk_y), file_path.name)
+        if chunk_x is not None and offset_key in self._log_offsets:
+            tail, self._log_offsets[offset_key] = _read_log_tail(
+                file_path, self._log_offsets[offset_key]
+            )
+            entries = [entry for _, entry in tail]
+        else:
+            entries = self._read_last_entries(file_path, entry_count)
 
         if not entries:
             return
@@ -1725,16 +3199,9 @@ class GameDataSyncService:
             if chunk_key in self._pending_loads:
                 self._pending_loads[chunk_key].set()
             
-            # Auto-load chunk if not already loaded
+            # Queue chunk for loading (nearest to the agents first)
             if chunk_key not in self._loaded_chunks:
-                try:
-                    await self._load_chunk(chunk_x, chunk_y)
-                    logger.info(f"Chunk ({chunk_x}, {chunk_y}) loaded into DB")
-                except Exception as e:
-                    logger.error(
-                        f"Failed to load chunk ({chunk_x}, {chunk_y}): {e}",
-                        exc_info=True
-                    )
+                self._schedule_chunk_load(chunk_key)
             
             logger.debug(f"Chunk ({chunk_x}, {chunk_y}) snapshot completed")
     
@@ -1760,6 +3227,27 @@ class GameDataSyncService:
                 # Chunk state will be updated via snapshot_state payloads
     
 
+    def get_sync_latency_stats(self) -> Dict[str, Any]:
+        """
+        Get sync-path latency histograms.
+        
+        Returns:
+            Dictionary with per-op-type histogram summaries (count, mean, min,
+            max, p50/p90/p99, buckets) for queue_wait_ms, apply_ms, visible_ms
+            and tick_lag_ms, plus queue_depth and recent depth_series samples.
+            Op types look like "entity_operation.created" or "file_io.appended".
+        """
+        return self.metrics.get_stats()
+    
+    def enable_metrics_sink(self, path: Path) -> None:
+        """
+        Stream one JSONL latency record per applied update to a file.
+        
+        Args:
+            path: File to append to
+        """
+        self.metrics.open_sink(path)
+    
     @property
     def is_running(self) -> bool:
         """Check if service is running."""
@@ -1776,6 +3264,9 @@ class GameDataSyncService:
             Dictionary with gap statistics:
             - total_gaps: Total number of packet loss events detected
             - gaps_by_type: Dictionary grouping gaps by the event_type where loss was detected
+            - stale_chunks: Chunks affected by a gap that have not been repaired yet
+            - repairs: Gap repair counters (scheduled, completed, failed,
+              entries_replayed, bytes_read, unattributed_gaps, pending, last_repair_at)
             - summary: Human-readable summary
         """
         from collections import defaultdict
@@ -1797,9 +3288,22 @@ class GameDataSyncService:
                 total_missed = sum(g['gap_size'] for g in gaps)
                 summary_lines.append(f"  {event_type}: {len(gaps)} gaps, {total_missed} packets missed")
         
+        repairs = dict(self._repair_stats)
+        repairs['pending'] = len(self._repair_pending)
+        if repairs['scheduled'] > 0 or repairs['unattributed_gaps'] > 0:
+            summary_lines.append(
+                f"\nRepairs: {repairs['completed']}/{repairs['scheduled']} completed, "
+                f"{repairs['failed']} failed, {repairs['pending']} pending, "
+                f"{repairs['entries_replayed']} entries replayed"
+            )
+            if repairs['unattributed_gaps']:
+                summary_lines.append(f"  {repairs['unattributed_gaps']} gaps could not be attributed to a chunk")
+        
         return {
             'total_gaps': total_gaps,
             'gaps_by_type': dict(gaps_by_type),
+            'stale_chunks': sorted(self._stale_chunks),
+            'repairs': repairs,
             'summary': '\n'.join(summary_lines)
         }
 
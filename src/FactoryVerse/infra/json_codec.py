@@ -0,0 +1,39 @@
+"""JSON decoding for RCON responses.
+
+Uses orjson when it is installed (the optional ``fast`` extra), which
+decodes large payloads such as get_reachable several times faster than
+stdlib json. Falls back to stdlib json when orjson is missing, and for
+the NaN/Infinity literals only stdlib json accepts.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+def json_loads(text: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Decoded value
+
+    Raises:
+        json.JSONDecodeError: If text is not valid JSON
+        TypeError: If text is not str or bytes
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
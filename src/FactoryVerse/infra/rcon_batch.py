@@ -0,0 +1,205 @@
+"""Batch many remote interface calls into one RCON round trip.
+
+Every DSL call is one ``/sc`` command, so a script that inspects 30
+furnaces waits for 30 sequential round trips. RconBatch collects calls and
+sends them as a single Lua chunk; each call runs in its own pcall and the
+chunk prints one JSON array of per-call outcomes:
+
+    [{"ok": true, "result": {...}}, {"ok": false, "error": "..."}, ...]
+
+which resolves one future per call:
+
+    async with factory.batch() as b:
+        futures = [b.call("inspect_entity", name, pos) for name, pos in furnaces]
+    results = [f.result() for f in futures]
+
+Calls run in order, in the same game tick. A failing call only fails its
+own future (BatchCallError); a chunk that fails as a whole (Lua syntax
+error, unparsable response) fails every future in it. Batches larger than
+max_command_bytes are split over several commands.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from FactoryVerse.infra.json_codec import json_loads
+
+logger = logging.getLogger(__name__)
+
+# Split very large batches so a single command stays a moderate RCON packet
+RCON_MAX_COMMAND_BYTES = 16000
+
+
+class BatchCallError(RuntimeError):
+    """A single call inside a batch raised a Lua error."""
+
+    def __init__(self, method: str, message: str):
+        super().__init__(f"{method}: {message}")
+        self.method = method
+        self.message = message
+
+
+class RconBatch:
+    """Collects remote interface calls and sends them as one Lua chunk."""
+
+    def __init__(
+        self,
+        build_call: Callable[..., str],
+        execute: Callable[[str], str],
+        max_command_bytes: Optional[int] = RCON_MAX_COMMAND_BYTES,
+        execute_async: Optional[Callable[[str], Awaitable[str]]] = None,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            build_call: (method, *args) -> Lua remote.call expression
+            execute: Sends a Lua chunk (without the /sc prefix) and returns the response
+            max_command_bytes: Split batches whose chunk would exceed this (None = never)
+            execute_async: Awaitable variant of execute; when given, flush() does
+                not block the event loop and split chunks are sent concurrently
+        """
+        self._build_call = build_call
+        self._execute = execute
+        self._execute_async = execute_async
+        self.max_command_bytes = max_command_bytes
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self.stats = {"calls": 0, "round_trips": 0, "errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def call(self, method: str, *args: Any) -> asyncio.Future:
+        """
+        Queue a remote interface call.
+
+        Args:
+            method: RemoteInterface method name
+            *args: Positional arguments (serialized like PlayingFactory._build_command)
+
+        Returns:
+            Future resolved with the call's result when the batch is flushed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((method, self._build_call(method, *args), future))
+        return future
+
+    async def flush(self) -> int:
+        """
+        Send all queued calls.
+
+        Returns:
+            Number of RCON round trips used
+        """
+        pending, self._pending = self._pending, []
+        groups = self._split(pending)
+        if self._execute_async is not None:
+            await asyncio.gather(*(self._send_async(group) for group in groups))
+        else:
+            for group in groups:
+                self._send(group)
+        self.stats["calls"] += len(pending)
+        self.stats["round_trips"] += len(groups)
+        return len(groups)
+
+    def cancel(self) -> None:
+        """Drop queued calls without sending them (their futures are cancelled)."""
+        pending, self._pending = self._pending, []
+        for _, _, future in pending:
+            future.cancel()
+
+    async def __aenter__(self) -> "RconBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.cancel()
+            return
+        await self.flush()
+
+    def _split(self, pending: List[Tuple[str, str, asyncio.Future]]) -> List[List[Tuple[str, str, asyncio.Future]]]:
+        """Group calls so that each chunk stays under max_command_bytes."""
+        groups: List[List[Tuple[str, str, asyncio.Future]]] = []
+        size = 0
+        for entry in pending:
+            entry_size = len(_call_statement(len(groups[-1]) + 1 if groups else 1, entry[1]))
+            if (
+                not groups
+                or (self.max_command_bytes is not None and size + entry_size > self.max_command_bytes)
+            ):
+                groups.append([])
+                size = len(_CHUNK_HEAD) + len(_CHUNK_TAIL)
+                entry_size = len(_call_statement(1, entry[1]))
+            groups[-1].append(entry)
+            size += entry_size
+        return groups
+
+    def _send(self, group: List[Tuple[str, str, asyncio.Future]]) -> None:
+        chunk = build_batch_chunk([expression for _, expression, _ in group])
+        try:
+            response = self._execute(chunk)
+        except Exception as e:
+            self._fail(group, e)
+            return
+        self._resolve(group, response)
+
+    async def _send_async(self, group: List[Tuple[str, str, asyncio.Future]]) -> None:
+        chunk = build_batch_chunk([expression for _, expression, _ in group])
+        try:
+            response = await self._execute_async(chunk)
+        except Exception as e:
+            self._fail(group, e)
+            return
+        self._resolve(group, response)
+
+    def _fail(self, group: List[Tuple[str, str, asyncio.Future]], error: Exception) -> None:
+        logger.error(f"RCON batch of {len(group)} calls failed: {error}")
+        self.stats["errors"] += len(group)
+        for _, _, future in group:
+            if not future.done():
+                future.set_exception(error)
+
+    def _resolve(self, group: List[Tuple[str, str, asyncio.Future]], response: Optional[str]) -> None:
+        try:
+            outcomes = json_loads(response)
+        except (TypeError, ValueError):
+            outcomes = None
+        if not isinstance(outcomes, list) or len(outcomes) != len(group):
+            self._fail(group, RuntimeError(f"Unexpected batch response: {response!r}"))
+            return
+
+        for (method, _, future), outcome in zip(group, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, dict) and outcome.get("ok"):
+                future.set_result(outcome.get("result"))
+            else:
+                self.stats["errors"] += 1
+                message = outcome.get("error") if isinstance(outcome, dict) else str(outcome)
+                future.set_exception(BatchCallError(method, message))
+
+
+_CHUNK_HEAD = "local r={} local ok,v "
+_CHUNK_TAIL = "rcon.print(helpers.table_to_json(r))"
+
+
+def _call_statement(index: int, expression: str) -> str:
+    return (
+        f"ok,v=pcall(function() return {expression} end) "
+        f"r[{index}]=ok and {{ok=true,result=v}} or {{ok=false,error=tostring(v)}} "
+    )
+
+
+def build_batch_chunk(expressions: List[str]) -> str:
+    """
+    Build the Lua chunk that runs several calls and prints their outcomes.
+
+    Args:
+        expressions: Lua expressions (remote.call(...)), evaluated in order
+
+    Returns:
+        Lua source printing a JSON array of {ok, result} / {ok, error}
+    """
+    body = "".join(_call_statement(i, expression) for i, expression in enumerate(expressions, start=1))
+    return _CHUNK_HEAD + body + _CHUNK_TAIL
@@ -0,0 +1,220 @@
+"""Compact RCON calls through a dispatcher registered in the game.
+
+A DSL call normally sends the whole chunk
+
+    rcon.print(helpers.table_to_json(remote.call('agent_1', 'inspect_entity',
+        table.unpack(helpers.json_to_table('["stone-furnace",{"x":1,"y":2}]')))))
+
+which Factorio compiles on every call. RemoteDispatcher registers two
+small functions in the game's console environment once (the handshake):
+
+    fvc(interface, op, args_json)  -- returns remote.call(interface, <method op>, ...)
+    fvd(interface, op, args_json)  -- prints fvc(...) as JSON
+
+where op is the 1-based index of the method in the interface's sorted
+method list. Afterwards a call is sent as
+
+    fvd('agent_1',9,'["stone-furnace",{"x":1,"y":2}]')
+
+Method lists come from ``remote.interfaces`` and are cached per mod
+version (fetch_remote_interfaces), so reconnecting agents don't
+re-introspect. Console globals do not survive a save/load, and an agent
+interface created after the handshake has no method table; a command that
+finds the dispatcher or its table missing is detected (is_unregistered)
+and the caller re-runs the handshake and resends.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MOD_NAME = "fv_embodied_agent"
+
+INTERFACES_COMMAND = "/sc rcon.print(helpers.table_to_json(remote.interfaces))"
+
+# (mod version) -> {interface: {method: true}}
+_INTERFACE_CACHE: Dict[str, Dict[str, Any]] = {}
+
+# interface -> method list registered in the game (op = index + 1)
+_REGISTERED: Dict[str, List[str]] = {}
+
+_COMPACT_CALL_RE = re.compile(r"\bfv[cd]\('(\w+)',(\d+)")
+
+# Raised by fvc when an interface or op has no registered method
+UNREGISTERED_ERROR = "fv_unregistered"
+
+_DISPATCHER_LUA = (
+    "fv_ops=fv_ops or {} "
+    "for k,v in pairs(helpers.json_to_table('{ops}')) do fv_ops[k]=v end "
+    "function fvc(i,op,a) local t=fv_ops[i] local m=t and t[op] "
+    "if not m then error('" + UNREGISTERED_ERROR + "') end "
+    "if a then return remote.call(i,m,table.unpack(helpers.json_to_table(a))) end "
+    "return remote.call(i,m) end "
+    "function fvd(i,op,a) rcon.print(helpers.table_to_json(fvc(i,op,a))) end "
+    "rcon.print('fv_ok')"
+)
+
+
+def get_mod_version(send: Callable[[str], Optional[str]], mod_name: str = MOD_NAME) -> str:
+    """
+    Version of the agent mod running on the server.
+
+    Args:
+        send: Sends an RCON command and returns the response
+        mod_name: Mod to look up
+
+    Returns:
+        Version string ("" if the mod is not active)
+    """
+    response = send(f"/sc rcon.print(script.active_mods['{mod_name}'] or '')")
+    return (response or "").strip()
+
+
+def fetch_remote_interfaces(
+    send: Callable[[str], Optional[str]],
+    mod_version: Optional[str] = None,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Remote interfaces of the server, cached per mod version.
+
+    Args:
+        send: Sends an RCON command and returns the response
+        mod_version: Known mod version (looked up if None)
+        refresh: Re-introspect even if cached (e.g. a new agent interface appeared)
+
+    Returns:
+        {interface: {method: true}}
+    """
+    if mod_version is None:
+        mod_version = get_mod_version(send)
+    if not refresh and mod_version in _INTERFACE_CACHE:
+        return _INTERFACE_CACHE[mod_version]
+
+    interfaces_json = send(INTERFACES_COMMAND)
+    if interfaces_json is None:
+        raise ValueError("RCON command returned None - check RCON connection and server status")
+    if not interfaces_json.strip():
+        raise ValueError("RCON command returned empty string - check if helpers.table_to_json is available")
+    interfaces = json.loads(interfaces_json)
+    _INTERFACE_CACHE[mod_version] = interfaces
+    return interfaces
+
+
+class RemoteDispatcher:
+    """Registers the in-game dispatcher and builds compact call expressions."""
+
+    def __init__(self, send: Callable[[str], Optional[str]], interfaces: Optional[List[str]] = None):
+        """
+        Initialize the dispatcher (call handshake() before use).
+
+        Args:
+            send: Sends an RCON command and returns the response
+            interfaces: Interfaces to register (default: all)
+        """
+        self._send = send
+        self._only = set(interfaces) if interfaces is not None else None
+        self._methods: Dict[str, List[str]] = {}
+        self._ops: Dict[str, Dict[str, int]] = {}
+        self.mod_version: Optional[str] = None
+        self.ready = False
+        self.stats = {"handshakes": 0, "compact_calls": 0, "fallbacks": 0}
+
+    def handshake(self, refresh: bool = False) -> bool:
+        """
+        Register the dispatcher functions and method tables in the game.
+
+        Args:
+            refresh: Re-introspect remote interfaces instead of using the cache
+
+        Returns:
+            True if the dispatcher is ready
+        """
+        self.ready = False
+        self.mod_version = get_mod_version(self._send)
+        interfaces = fetch_remote_interfaces(self._send, self.mod_version, refresh=refresh)
+        self._methods = {
+            name: sorted(methods)
+            for name, methods in interfaces.items()
+            if isinstance(methods, dict) and (self._only is None or name in self._only)
+        }
+        self._ops = {name: {m: i for i, m in enumerate(methods, start=1)} for name, methods in self._methods.items()}
+        ops_json = json.dumps(self._methods, separators=(",", ":"))
+        response = self._send("/sc " + _DISPATCHER_LUA.replace("{ops}", ops_json))
+        self.ready = (response or "").strip() == "fv_ok"
+        if self.ready:
+            _REGISTERED.update(self._methods)
+        self.stats["handshakes"] += 1
+        if not self.ready:
+            logger.warning(f"RCON dispatcher handshake failed: {response!r}")
+        return self.ready
+
+    def has(self, interface: str, method: str) -> bool:
+        return self.ready and method in self._ops.get(interface, {})
+
+    def has_interface(self, interface: str) -> bool:
+        return self.ready and interface in self._ops
+
+    def call_expression(self, interface: str, method: str, args_json: Optional[str] = None) -> Optional[str]:
+        """
+        Lua expression evaluating to the call's result, or None if not registered.
+
+        Args:
+            interface: Remote interface name
+            method: Method name
+            args_json: JSON array of positional arguments (None = no arguments)
+        """
+        return self._expression("fvc", interface, method, args_json)
+
+    def command(self, interface: str, method: str, args_json: Optional[str] = None) -> Optional[str]:
+        """
+        Lua chunk printing the call's result as JSON, or None if not registered.
+
+        Args:
+            interface: Remote interface name
+            method: Method name
+            args_json: JSON array of positional arguments (None = no arguments)
+        """
+        return self._expression("fvd", interface, method, args_json)
+
+    def _expression(self, function: str, interface: str, method: str, args_json: Optional[str]) -> Optional[str]:
+        if not self.has(interface, method):
+            self.stats["fallbacks"] += 1
+            return None
+        self.stats["compact_calls"] += 1
+        op = self._ops[interface][method]
+        if args_json is None:
+            return f"{function}('{interface}',{op})"
+        return f"{function}('{interface}',{op},'{args_json}')"
+
+    @staticmethod
+    def is_unregistered(response: Optional[str]) -> bool:
+        """True if a response shows the dispatcher or a method table is gone (e.g. after a save was loaded)."""
+        if not response:
+            return False
+        if UNREGISTERED_ERROR in response:
+            return True
+        return "attempt to call" in response and (
+            "'fvd'" in response or "'fvc'" in response or "fv_ops" in response
+        )
+
+
+def compact_call_methods(command: str) -> List[str]:
+    """
+    Method names of the compact dispatcher calls in a command.
+
+    Args:
+        command: RCON command text
+
+    Returns:
+        Method names (empty if the command uses no registered compact call)
+    """
+    methods = []
+    for interface, op in _COMPACT_CALL_RE.findall(command):
+        registered = _REGISTERED.get(interface)
+        if registered and 0 < int(op) <= len(registered):
+            methods.append(registered[int(op) - 1])
+    return methods
@@ -6,24 +6,26 @@ import time
 from typing import Optional, Dict, Any
 
 from FactoryVerse.infra.udp_dispatcher import UDPDispatcher, get_udp_dispatcher
+from FactoryVerse.infra.rcon_dispatch import fetch_remote_interfaces
+from FactoryVerse.infra.action_registry import ActionRegistry, get_action_registry
 
 
 class AsyncActionListener:
     """UDP listener for async action completion events."""
     
-    def __init__(self, udp_dispatcher: Optional[UDPDispatcher] = None, timeout: int = 30):
+    def __init__(self, udp_dispatcher: Optional[UDPDispatcher] = None, timeout: int = 30,
+                 registry: Optional[ActionRegistry] = None):
         """
         Initialize the UDP listener.
         
         Args:
             udp_dispatcher: Optional UDPDispatcher instance. If None, uses global dispatcher.
             timeout: Default timeout in seconds for waiting on actions
+            registry: Action registry tracking completions (default: the process-wide one)
         """
         self.udp_dispatcher = udp_dispatcher
         self.timeout = timeout
-        self.pending_actions: Dict[str, asyncio.Event] = {}
-        self.action_results: Dict[str, Dict[str, Any]] = {}
-        self.event_loops: Dict[str, asyncio.AbstractEventLoop] = {}  # Store event loop for each action
+        self.actions = registry or get_action_registry()
         self.running = False
         
     async def start(self):
@@ -54,22 +56,14 @@ class AsyncActionListener:
             if not action_id:
                 return  # Not an action completion event, ignore
             
-            # Direct lookup by action_id
-            if action_id not in self.pending_actions:
-                print(f"⚠️  Received completion for unregistered action: {action_id}")
+            # Progress and queued events don't finish the await
+            if payload.get('status') in ("queued", "progress"):
                 return
             
-            # Store result and signal completion (thread-safe)
-            self.action_results[action_id] = payload
-            event = self.pending_actions[action_id]
-            
-            # Use the stored event loop to safely signal from background thread
-            loop = self.event_loops.get(action_id)
-            if loop and loop.is_running():
-                loop.call_soon_threadsafe(event.set)
-            else:
-                # Fallback if no loop or loop not running
-                event.set()
+            # Resolve the waiter's future (thread-safe); buffered if it beat the registration
+            if not self.actions.complete(action_id, payload):
+                print(f"⚠️  Received completion for unregistered action: {action_id}")
+                return
             
             rcon_tick = payload.get('rcon_tick')
             completion_tick = payload.get('completion_tick')
@@ -94,15 +88,8 @@ class AsyncActionListener:
         print("✅ AsyncActionListener stopped")
     
     def register_action(self, action_id: str):
-        """Register an action to wait for completion via UDP."""
-        event = asyncio.Event()
-        self.pending_actions[action_id] = event
-        self.action_results[action_id] = None
-        # Capture the running event loop (important for Jupyter and other async contexts)
-        try:
-            self.event_loops[action_id] = asyncio.get_running_loop()
-        except RuntimeError:
-            self.event_loops[action_id] = None
+        """Register an action to wait for completion via UDP (call from the waiting event loop)."""
+        self.actions.register(action_id)
     
     async def wait_for_action(self, action_id: str, timeout: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -119,27 +106,17 @@ class AsyncActionListener:
             TimeoutError: If action doesn't complete within timeout
             ValueError: If action_id not registered
         """
-        if action_id not in self.pending_actions:
-            raise ValueError(f"Action not registered: {action_id}")
-        
-        event = self.pending_actions[action_id]
         timeout_secs = timeout or self.timeout
         wait_start = time.time()
         
         try:
-            await asyncio.wait_for(event.wait(), timeout=timeout_secs)
+            result = await self.actions.wait(action_id, timeout=timeout_secs)
             wait_time_ms = (time.time() - wait_start) * 1000
-            result = self.action_results[action_id]
             print(f"   → Waited {wait_time_ms:.1f}ms for UDP")
             return result
         except asyncio.TimeoutError:
             print(f"❌ Action timeout: {action_id} (waited {timeout_secs}s)")
             raise
-        finally:
-            # Cleanup
-            self.pending_actions.pop(action_id, None)
-            self.action_results.pop(action_id, None)
-            self.event_loops.pop(action_id, None)
 
 
 class RconHelper:
@@ -175,7 +152,8 @@ class RconHelper:
             self._create_agent(udp_port, destroy_existing)
         
         self.interfaces = None
-        self._fetch_interfaces()
+        # A freshly created agent adds an interface the cached introspection lacks
+        self._fetch_interfaces(refresh=auto_create_agent)
     
     def _create_agent(self, udp_port: Optional[int] = None, destroy_existing: bool = True):
         """Create agent via admin API."""
@@ -196,24 +174,14 @@ class RconHelper:
             print(f"⚠️  Error creating agent: {e}")
             # Don't raise - allow initialization to continue even if agent creation fails
     
-    def _fetch_interfaces(self):
-        """Fetch remote interfaces from Lua."""
+    def _fetch_interfaces(self, refresh: bool = False):
+        """Fetch remote interfaces from Lua (cached per mod version across reconnects)."""
         try:
             # Fetch remote interfaces to validate connection
-            interfaces_cmd = "/c rcon.print(helpers.table_to_json(remote.interfaces))"
-            interfaces_json = self.rcon_client.send_command(interfaces_cmd)
-            
-            if interfaces_json is None:
-                raise ValueError("RCON command returned None - check RCON connection and server status")
-            
-            if not interfaces_json.strip():
-                raise ValueError("RCON command returned empty string - check if helpers.table_to_json is available")
-            
-            self.interfaces = json.loads(interfaces_json)
+            self.interfaces = fetch_remote_interfaces(self.rcon_client.send_command, refresh=refresh)
             print(f"✅ Loaded remote interfaces: {list(self.interfaces.keys())}")
         except json.JSONDecodeError as e:
             print(f"❌ Error parsing interfaces JSON: {e}")
-            print(f"   Raw response: {interfaces_json}")
             raise
         except Exception as e:
             print(f"❌ Error fetching interfaces: {e}")
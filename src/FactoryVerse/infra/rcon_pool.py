@@ -0,0 +1,421 @@
+"""Pool of RCON connections with health checks and per-agent fair scheduling.
+
+A runtime normally hands every agent and helper the same RCONClient, with
+no queueing discipline: a chatty agent (or a bulk snapshot) delays
+everyone else, and a dropped connection fails calls until someone
+reconnects by hand. RconPool keeps several connections to one server and
+schedules commands onto them:
+
+- Weighted fair queueing over (agent, request class) flows: each command
+  gets a virtual finish time ``max(V, flow's last finish) + 1 / weight``
+  and the smallest finish time is sent next, so flows share the
+  connections in proportion to agent_weight * class_weight. Request
+  classes default to action (4) > query (2) > bulk (1), which puts
+  movement/crafting commands ahead of large inspections.
+- A cap on commands in flight across all connections, so the server's
+  tick is not flooded (Factorio runs RCON commands inside the tick).
+- Keepalive: an idle connection is probed every keepalive_interval
+  seconds; a failed probe or a network error closes it and the next
+  command reconnects (with backoff). Commands that failed to send are
+  retried once on the new connection; commands whose response was lost
+  are failed, since they may already have run.
+
+Agents use a handle with the same interface as RconTransport:
+
+    pool = create_rcon_pool(host, port, password, size=3)
+    factory = PlayingFactory(pool, "agent_1", ...)   # uses pool.handle("agent_1")
+    pool.handle("agent_2").send_command("/sc ...")
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from factorio_rcon import RCONNotConnected, RCONSendError
+
+from FactoryVerse.infra.rcon_dispatch import compact_call_methods
+
+logger = logging.getLogger(__name__)
+
+REQUEST_CLASS_WEIGHTS = {"action": 4.0, "query": 2.0, "bulk": 1.0}
+
+# RemoteInterface methods that change game state (scheduled as "action")
+ACTION_METHODS = {
+    "walk_to", "stop_walking", "mine_resource", "stop_mining", "craft_enqueue", "craft_dequeue",
+    "enqueue_research", "cancel_current_research", "place_entity", "pickup_entity", "remove_ghost",
+    "set_entity_recipe", "rotate_entity", "teleport", "put_inventory_item", "take_inventory_item",
+    "set_entity_filter", "set_inventory_limit", "transfer_inventory_items",
+}
+
+# Methods returning large payloads (scheduled as "bulk")
+BULK_METHODS = {"get_reachable", "get_chunks_in_view", "get_recipes", "get_technologies"}
+
+_METHOD_RE = re.compile(r"remote\.call\('[^']*',\s*'(\w+)'")
+
+KEEPALIVE_COMMAND = "/sc rcon.print('ok')"
+
+
+def command_methods(command: str) -> List[str]:
+    """
+    RemoteInterface methods a command calls (full remote.call form or compact dispatcher calls).
+
+    Args:
+        command: RCON command text
+
+    Returns:
+        Method names in the order they appear
+    """
+    return _METHOD_RE.findall(command) + compact_call_methods(command)
+
+
+def classify_command(command: str) -> str:
+    """
+    Request class of a command from the RemoteInterface method it calls
+    (full remote.call form or a compact dispatcher call).
+
+    Args:
+        command: RCON command text
+
+    Returns:
+        "action", "query" or "bulk" (batched chunks are bulk)
+    """
+    methods = command_methods(command)
+    if len(methods) > 1 or any(m in BULK_METHODS for m in methods):
+        return "bulk"
+    if methods and methods[0] in ACTION_METHODS:
+        return "action"
+    return "query"
+
+
+class FairQueue:
+    """Weighted fair queue over (agent, request class) flows (not thread safe)."""
+
+    def __init__(
+        self,
+        agent_weights: Optional[Dict[str, float]] = None,
+        class_weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            agent_weights: Weight per agent id (default 1.0)
+            class_weights: Weight per request class (default REQUEST_CLASS_WEIGHTS)
+        """
+        self.agent_weights = dict(agent_weights or {})
+        self.class_weights = dict(REQUEST_CLASS_WEIGHTS if class_weights is None else class_weights)
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[Tuple[Optional[str], str], float] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def weight(self, agent_id: Optional[str], request_class: str) -> float:
+        return self.agent_weights.get(agent_id, 1.0) * self.class_weights.get(request_class, 1.0)
+
+    def push(
+        self, item: Any, agent_id: Optional[str] = None, request_class: str = "query", cost: float = 1.0
+    ) -> Tuple[float, int]:
+        """Enqueue an item for a flow; returns its position tag for requeue()."""
+        flow = (agent_id, request_class)
+        start = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+        finish = start + cost / self.weight(agent_id, request_class)
+        self._last_finish[flow] = finish
+        tag = (finish, next(self._seq))
+        heapq.heappush(self._heap, (*tag, item))
+        return tag
+
+    def requeue(self, item: Any, tag: Tuple[float, int]) -> None:
+        """Put a popped item back at its original position, ahead of its flow's later items."""
+        heapq.heappush(self._heap, (*tag, item))
+
+    def pop(self) -> Any:
+        """Dequeue the item with the smallest virtual finish time."""
+        finish, _, item = heapq.heappop(self._heap)
+        self._virtual_time = max(self._virtual_time, finish)
+        return item
+
+
+class _Request:
+    __slots__ = ("command", "future", "agent_id", "request_class", "queued_at", "attempts", "tag")
+
+    def __init__(self, command: str, agent_id: Optional[str], request_class: str):
+        self.command = command
+        self.future: Future = Future()
+        self.agent_id = agent_id
+        self.request_class = request_class
+        self.queued_at = time.monotonic()
+        self.attempts = 0
+        self.tag: Optional[Tuple[float, int]] = None
+
+
+class RconPool:
+    """RCON connections to one server, shared fairly between agents."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        size: int = 2,
+        max_in_flight: int = 4,
+        pipeline: int = 4,
+        keepalive_interval: float = 30.0,
+        max_backoff: float = 10.0,
+        agent_weights: Optional[Dict[str, float]] = None,
+        class_weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the pool (connections open lazily, on first use).
+
+        Args:
+            connect: Returns a new connected RCON client
+            size: Number of connections (one I/O thread each)
+            max_in_flight: Commands sent but not yet answered, across connections
+            pipeline: Most commands written per round trip on one connection
+            keepalive_interval: Probe idle connections this often (seconds)
+            max_backoff: Longest wait between reconnect attempts (seconds)
+            agent_weights: Fair-share weight per agent id (default 1.0)
+            class_weights: Weight per request class (default REQUEST_CLASS_WEIGHTS)
+        """
+        self._connect = connect
+        self.size = size
+        self.max_in_flight = max_in_flight
+        self.pipeline = pipeline
+        self.keepalive_interval = keepalive_interval
+        self.max_backoff = max_backoff
+        self._queue = FairQueue(agent_weights, class_weights)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self.stats = {
+            "commands": 0, "round_trips": 0, "errors": 0, "retries": 0,
+            "connects": 0, "keepalives": 0, "max_in_flight": 0,
+            "per_agent": {}, "queue_wait_s": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def handle(self, agent_id: Optional[str] = None) -> "PooledRcon":
+        """Client handle that tags commands with an agent id."""
+        return PooledRcon(self, agent_id)
+
+    def set_agent_weight(self, agent_id: str, weight: float) -> None:
+        """Change an agent's fair-share weight (applies to newly queued commands)."""
+        with self._cond:
+            self._queue.agent_weights[agent_id] = weight
+
+    def submit(self, command: str, agent_id: Optional[str] = None, request_class: Optional[str] = None) -> Future:
+        """
+        Queue a command.
+
+        Args:
+            command: Full RCON command (e.g. "/sc ...")
+            agent_id: Flow the command is accounted to
+            request_class: "action", "query" or "bulk" (default: classify_command)
+
+        Returns:
+            concurrent.futures.Future resolved with the response text
+        """
+        request = _Request(command, agent_id, request_class or classify_command(command))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RCON pool is closed")
+            self._ensure_threads()
+            request.tag = self._queue.push(request, agent_id, request.request_class)
+            self._cond.notify()
+        return request.future
+
+    def send_command(self, command: str, agent_id: Optional[str] = None) -> Optional[str]:
+        """Send a command and block until its response arrives."""
+        return self.submit(command, agent_id).result()
+
+    async def send_command_async(self, command: str, agent_id: Optional[str] = None) -> Optional[str]:
+        """Send a command without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(command, agent_id))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Fail queued commands, stop the I/O threads and close the connections."""
+        with self._cond:
+            self._closed = True
+            while len(self._queue):
+                _resolve(self._queue.pop().future, error=RuntimeError("RCON pool closed"))
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with commands, round_trips, errors, retries, connects,
+            keepalives, max_in_flight, per_agent counts, queued and in_flight
+        """
+        with self._cond:
+            return {**self.stats, "per_agent": dict(self.stats["per_agent"]),
+                    "queued": len(self._queue), "in_flight": self._in_flight}
+
+    # ------------------------------------------------------------------
+    # I/O threads
+    # ------------------------------------------------------------------
+
+    def _ensure_threads(self) -> None:
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for slot in range(len(self._threads), self.size):
+            thread = threading.Thread(target=self._run, args=(slot,), name=f"rcon-pool-{slot}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _take(self) -> Optional[List[_Request]]:
+        """Wait for work within the in-flight cap; [] on keepalive timeout, None when closed."""
+        with self._cond:
+            deadline = time.monotonic() + self.keepalive_interval
+            group: List[_Request] = []
+            while not group:
+                while not self._closed and not (len(self._queue) and self._in_flight < self.max_in_flight):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return None
+                count = min(self.pipeline, self.max_in_flight - self._in_flight)
+                # Cancelled requests (e.g. asyncio.wait_for timeouts) are dropped, not sent
+                while len(group) < count and len(self._queue):
+                    request = self._queue.pop()
+                    if not request.future.cancelled():
+                        group.append(request)
+            self._in_flight += len(group)
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+            return group
+
+    def _run(self, slot: int) -> None:
+        client = None
+        backoff = 0.0
+        while True:
+            group = self._take()
+            if group is None:
+                break
+            if not group:
+                client = self._keepalive(slot, client)
+                continue
+            try:
+                if client is None:
+                    if backoff:
+                        time.sleep(backoff)
+                    try:
+                        client = self._open(slot)
+                    except Exception as e:
+                        backoff = min(self.max_backoff, max(0.5, backoff * 2))
+                        self._fail_or_retry(group, e, sent=False)
+                        continue
+                try:
+                    responses = self._send(client, group)
+                except Exception as e:
+                    client = self._drop(slot, client)
+                    self._fail_or_retry(group, e, sent=not isinstance(e, (RCONSendError, RCONNotConnected)))
+                    continue
+                backoff = 0.0
+            finally:
+                with self._cond:
+                    self._in_flight -= len(group)
+                    self._cond.notify_all()
+            now = time.monotonic()
+            with self._cond:
+                self.stats["commands"] += len(group)
+                self.stats["round_trips"] += 1
+                for request in group:
+                    per_agent = self.stats["per_agent"]
+                    per_agent[request.agent_id] = per_agent.get(request.agent_id, 0) + 1
+                    self.stats["queue_wait_s"] += now - request.queued_at
+            for i, request in enumerate(group):
+                _resolve(request.future, result=responses.get(i))
+        self._drop(slot, client)
+
+    def _open(self, slot: int) -> Any:
+        client = self._connect()
+        with self._cond:
+            self.stats["connects"] += 1
+        logger.debug(f"RCON pool connection {slot} opened")
+        return client
+
+    def _drop(self, slot: int, client: Any) -> None:
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+            logger.debug(f"RCON pool connection {slot} closed")
+        return None
+
+    @staticmethod
+    def _send(client: Any, group: List[_Request]) -> Dict[int, Optional[str]]:
+        if hasattr(client, "send_commands"):
+            return client.send_commands({i: request.command for i, request in enumerate(group)})
+        return {i: client.send_command(request.command) for i, request in enumerate(group)}
+
+    def _keepalive(self, slot: int, client: Any) -> Any:
+        if client is None:
+            return None
+        try:
+            client.send_command(KEEPALIVE_COMMAND)
+            with self._cond:
+                self.stats["keepalives"] += 1
+            return client
+        except Exception as e:
+            logger.warning(f"RCON pool connection {slot} failed keepalive: {e}")
+            return self._drop(slot, client)
+
+    def _fail_or_retry(self, group: List[_Request], error: Exception, sent: bool) -> None:
+        """Re-queue commands that never reached the server (once); fail the rest."""
+        with self._cond:
+            for request in group:
+                if not sent and request.attempts == 0 and not self._closed:
+                    request.attempts += 1
+                    # Original tag: goes back ahead of the flow's later commands
+                    self._queue.requeue(request, request.tag)
+                    self.stats["retries"] += 1
+                else:
+                    self.stats["errors"] += 1
+                    _resolve(request.future, error=error)
+            self._cond.notify_all()
+        logger.warning(f"RCON pool round trip failed ({len(group)} commands): {error}")
+
+
+def _resolve(future: Future, result: Any = None, error: Optional[Exception] = None) -> None:
+    """Complete a future unless the caller cancelled it meanwhile."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class PooledRcon:
+    """Per-agent view of an RconPool (same interface as RconTransport)."""
+
+    def __init__(self, pool: RconPool, agent_id: Optional[str] = None):
+        self.pool = pool
+        self.agent_id = agent_id
+
+    def submit(self, command: str, request_class: Optional[str] = None) -> Future:
+        return self.pool.submit(command, self.agent_id, request_class)
+
+    def send_command(self, command: str) -> Optional[str]:
+        """Send a command and block until its response arrives."""
+        return self.submit(command).result()
+
+    async def send_command_async(self, command: str) -> Optional[str]:
+        """Send a command without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(command))
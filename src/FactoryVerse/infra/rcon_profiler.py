@@ -0,0 +1,182 @@
+"""Per-method RCON and action latency profiling.
+
+PlayingFactory logs every RCON TX/RX, but nothing adds the timings up.
+RconProfiler aggregates, per RemoteInterface method:
+
+- call count and errors
+- request and response bytes
+- RCON round-trip time (command sent -> response received)
+- JSON decode time of the response
+- async completion latency (action registered -> UDP completion), in
+  seconds and in game ticks when the payload carries them
+
+Commands that call several methods (RconBatch chunks) are recorded under
+"batch". Latencies use the fixed-bucket LatencyHistogram of sync_metrics,
+so recording is cheap and nothing is stored per call.
+
+Usage:
+    with factory.profile() as profiler:
+        await walking.to(...)
+        reachable.get_entities()
+    print(profiler.format_table())
+    profiler.write("session/rcon_profile")
+"""
+
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from FactoryVerse.infra.sync_metrics import LatencyHistogram
+
+BATCH_METHOD = "batch"
+
+# Upper bucket bounds for completion latency in game ticks
+TICK_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 3600, 7200, 36000)
+
+
+class MethodProfile:
+    """Counters and latency histograms for one method."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.rtt_ms = LatencyHistogram()
+        self.decode_ms = LatencyHistogram()
+        self.completion_ms = LatencyHistogram()
+        self.completion_ticks = LatencyHistogram(buckets=TICK_BUCKETS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "rtt_ms": self.rtt_ms.to_dict(),
+            "decode_ms": self.decode_ms.to_dict(),
+            "completion_ms": self.completion_ms.to_dict(),
+            "completion_ticks": self.completion_ticks.to_dict(),
+        }
+
+
+class RconProfiler:
+    """Aggregates RCON and async action timings per RemoteInterface method (thread safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.methods: Dict[str, MethodProfile] = defaultdict(MethodProfile)
+
+    @staticmethod
+    def method_of(methods: List[str]) -> str:
+        """Profile key for the methods a command calls."""
+        if len(methods) == 1:
+            return methods[0]
+        return BATCH_METHOD if methods else "other"
+
+    def record_call(
+        self,
+        method: str,
+        request_bytes: int,
+        response_bytes: int,
+        rtt: float,
+        error: bool = False,
+    ) -> None:
+        """
+        Record one RCON round trip.
+
+        Args:
+            method: Method key (see method_of)
+            request_bytes: Size of the command sent
+            response_bytes: Size of the response received
+            rtt: Round-trip time in seconds
+            error: True if the round trip raised
+        """
+        with self._lock:
+            profile = self.methods[method]
+            profile.calls += 1
+            profile.errors += int(error)
+            profile.request_bytes += request_bytes
+            profile.response_bytes += response_bytes
+            profile.rtt_ms.observe(rtt * 1000.0)
+
+    def record_decode(self, method: str, seconds: float) -> None:
+        """Record JSON decode time of one response."""
+        with self._lock:
+            self.methods[method].decode_ms.observe(seconds * 1000.0)
+
+    def record_completion(self, method: str, seconds: float, ticks: Optional[float] = None) -> None:
+        """
+        Record async completion latency of one action.
+
+        Args:
+            method: Action method (e.g., 'walk_to')
+            seconds: Registration -> completion wall time
+            ticks: Game ticks from enqueue to completion, if known
+        """
+        with self._lock:
+            profile = self.methods[method]
+            profile.completion_ms.observe(seconds * 1000.0)
+            if ticks is not None:
+                profile.completion_ticks.observe(ticks)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.methods = defaultdict(MethodProfile)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-method stats, heaviest total round-trip time first."""
+        with self._lock:
+            items = sorted(self.methods.items(), key=lambda kv: kv[1].rtt_ms.total, reverse=True)
+            return {method: profile.to_dict() for method, profile in items}
+
+    def format_table(self) -> str:
+        """
+        Summary as a fixed-width text table.
+
+        Returns:
+            One row per method, heaviest total round-trip time first
+        """
+        header = (
+            f"{'method':<28} {'calls':>6} {'err':>4} {'req KB':>8} {'resp KB':>8} "
+            f"{'rtt tot ms':>10} {'rtt p50':>8} {'rtt p99':>8} {'decode ms':>9} "
+            f"{'done p50 s':>10} {'ticks avg':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for method, stats in self.summary().items():
+            rtt, decode = stats["rtt_ms"], stats["decode_ms"]
+            done, ticks = stats["completion_ms"], stats["completion_ticks"]
+            lines.append(
+                f"{method[:28]:<28} {stats['calls']:>6} {stats['errors']:>4} "
+                f"{stats['request_bytes'] / 1024:>8.1f} {stats['response_bytes'] / 1024:>8.1f} "
+                f"{rtt['mean'] * rtt['count'] if rtt['count'] else 0:>10.1f} "
+                f"{_fmt(rtt['p50'])} {_fmt(rtt['p99'])} {_fmt(decode['mean'], 9)} "
+                f"{_fmt(done['p50'] / 1000.0 if done['p50'] is not None else None, 10, 2)} "
+                f"{_fmt(ticks['mean'], 9, 0)}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """
+        Write the summary as <path>.json and the table as <path>.txt.
+
+        Args:
+            path: Output path without extension (e.g. session_dir / "rcon_profile")
+
+        Returns:
+            Path of the JSON file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        json_path = path.with_suffix(".json")
+        json_path.write_text(json.dumps(self.summary(), indent=2))
+        path.with_suffix(".txt").write_text(self.format_table() + "\n")
+        return json_path
+
+
+def _fmt(value: Optional[float], width: int = 8, decimals: int = 1) -> str:
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width}.{decimals}f}"
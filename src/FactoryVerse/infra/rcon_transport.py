@@ -0,0 +1,180 @@
+"""RCON transport with a dedicated I/O thread and per-command futures.
+
+factorio_rcon.RCONClient is blocking and not thread safe, so calling it
+from async DSL methods stalls the event loop (and with it the UDP-driven
+map sync and every other awaited action). RconTransport owns the client
+on a single I/O thread; callers submit commands and get a future back:
+
+    transport = RconTransport.for_client(rcon_client)
+    response = await transport.send_command_async("/sc rcon.print(game.tick)")
+    response = transport.send_command("/sc ...")  # blocking, drop-in for RCONClient
+
+Commands submitted while the thread is busy are written back to back on
+the same connection and matched to their responses by RCON packet id
+(RCONClient.send_commands), so concurrent coroutines overlap their round
+trip latency instead of queueing behind each other.
+
+The caller owns the transport: for_client() shares one per client while
+it is referenced (e.g. by a PlayingFactory), and once it is garbage
+collected its I/O thread exits on its own and the client can be freed.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from factorio_rcon import RCONClient
+
+logger = logging.getLogger(__name__)
+
+# Commands written per pipelined round trip
+DEFAULT_MAX_PIPELINE = 32
+
+# Seconds between checks whether an idle transport was garbage collected
+IDLE_CHECK_INTERVAL = 1.0
+
+
+class RconTransport:
+    """Runs an RCON client on its own thread and correlates responses to futures."""
+
+    # Live transports by client id (weak: the transport's users keep it alive)
+    _transports: "weakref.WeakValueDictionary[int, RconTransport]" = weakref.WeakValueDictionary()
+    _transports_lock = threading.Lock()
+
+    def __init__(self, client: Any, max_pipeline: int = DEFAULT_MAX_PIPELINE):
+        """
+        Initialize the transport (the I/O thread starts on first use).
+
+        Args:
+            client: Connected RCONClient (or any object with send_command)
+            max_pipeline: Most commands written before reading responses
+        """
+        self.client = client
+        self.max_pipeline = max_pipeline
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"commands": 0, "round_trips": 0, "max_pipeline": 0, "errors": 0}
+
+    @classmethod
+    def for_client(cls, client: Any) -> "RconTransport":
+        """
+        Shared transport for a client (one I/O thread per connection while
+        the transport is referenced).
+
+        Args:
+            client: RCONClient, or an RconTransport (returned as is)
+
+        Returns:
+            The client's RconTransport
+        """
+        if isinstance(client, RconTransport):
+            return client
+        with cls._transports_lock:
+            transport = cls._transports.get(id(client))
+            if transport is None or transport.client is not client:
+                transport = cls(client)
+                cls._transports[id(client)] = transport
+            return transport
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, command: str) -> Future:
+        """
+        Queue a command for the I/O thread.
+
+        Args:
+            command: Full RCON command (e.g. "/sc ...")
+
+        Returns:
+            concurrent.futures.Future resolved with the response text
+        """
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((command, future))
+        return future
+
+    def send_command(self, command: str) -> Optional[str]:
+        """Send a command and block until its response arrives."""
+        return self.submit(command).result()
+
+    async def send_command_async(self, command: str) -> Optional[str]:
+        """Send a command without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(command))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the I/O thread after the queued commands are sent."""
+        if self.is_running:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._transports_lock:
+            if self._transports.get(id(self.client)) is self:
+                del self._transports[id(self.client)]
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if not self.is_running:
+                # The thread holds only a weak reference, so it doesn't keep the transport alive
+                self._thread = threading.Thread(
+                    target=RconTransport._run, args=(weakref.ref(self), self._queue),
+                    name="rcon-transport", daemon=True,
+                )
+                self._thread.start()
+
+    @staticmethod
+    def _run(ref: "weakref.ref[RconTransport]", commands: "queue.Queue[Optional[Tuple[str, Future]]]") -> None:
+        while True:
+            try:
+                item = commands.get(timeout=IDLE_CHECK_INTERVAL)
+            except queue.Empty:
+                if ref() is None:
+                    return
+                continue
+            if item is None:
+                return
+            transport = ref()
+            if transport is None:
+                return
+            group = [item]
+            stop = False
+            while len(group) < transport.max_pipeline:
+                try:
+                    item = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                group.append(item)
+            transport._send(group)
+            del transport
+            if stop:
+                return
+
+    def _send(self, group: List[Tuple[str, Future]]) -> None:
+        group = [(command, future) for command, future in group if future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        try:
+            if isinstance(self.client, RCONClient):
+                responses = self.client.send_commands({i: command for i, (command, _) in enumerate(group)})
+            else:
+                responses = {i: self.client.send_command(command) for i, (command, _) in enumerate(group)}
+        except Exception as e:
+            logger.error(f"RCON send of {len(group)} commands failed: {e}")
+            self.stats["errors"] += len(group)
+            for _, future in group:
+                future.set_exception(e)
+            return
+        self.stats["commands"] += len(group)
+        self.stats["round_trips"] += 1
+        self.stats["max_pipeline"] = max(self.stats["max_pipeline"], len(group))
+        for i, (_, future) in enumerate(group):
+            future.set_result(responses.get(i))
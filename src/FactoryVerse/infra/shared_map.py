@@ -0,0 +1,333 @@
+"""Single-writer shared map database with per-agent read replicas.
+
+Without this, every PlayingFactory loads the whole map into its own DuckDB
+and applies the same UDP stream itself, so N agents on one server do the
+map sync work N times. A SharedMapNode owns the only writable database and
+the only GameDataSyncService; agents attach to it instead:
+
+- In-process agents (same Python process, e.g. a multi-agent harness) read
+  through cursors on the node's connection - no copy at all.
+- Agents in other processes (one Jupyter kernel each) open a read-only
+  replica file the node publishes whenever the map changed, and re-open the
+  newest one when they sync. DuckDB does not allow other processes to open a
+  file while it is attached read-write, hence the published copies.
+
+Replica layout (in replica_dir):
+    manifest.json           {"version", "file", "watermark", "published_at"}
+    map-<version>.duckdb    Published read-only copies (the newest few are kept)
+
+Usage (writer):
+    node = SharedMapNode("map.duckdb", snapshot_dir, replica_dir="map-replicas")
+    await node.start()
+
+Usage (agent kernel):
+    factory.attach_shared_map("map-replicas")   # or attach_shared_map(node)
+
+Command line:
+    python -m FactoryVerse.infra.shared_map --db map.duckdb --snapshot-dir <script-output> --replica-dir map-replicas
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import duckdb
+
+from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+SHARED_AGENT_ID = "shared_map"
+
+
+class SharedMapNode:
+    """Owns the single writable map database and publishes read replicas."""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        snapshot_dir: Union[str, Path],
+        replica_dir: Optional[Union[str, Path]] = None,
+        publish_interval: float = 1.0,
+        keep_replicas: int = 3,
+        udp_dispatcher: Optional[UDPDispatcher] = None,
+        prototype_api_file: Optional[str] = None,
+    ):
+        """
+        Initialize the shared map node.
+
+        Args:
+            db_path: Writable DuckDB file owned by this node
+            snapshot_dir: Snapshot directory or script-output root
+            replica_dir: Directory to publish read-only replicas into. If None,
+                only in-process readers are served.
+            publish_interval: Minimum seconds between replica publications
+            keep_replicas: Number of published replica files to keep
+            udp_dispatcher: Optional UDPDispatcher (defaults to the global one)
+            prototype_api_file: Optional path to prototype-api.json for the schema
+        """
+        self.db_path = Path(db_path)
+        self.snapshot_dir = Path(snapshot_dir)
+        self.replica_dir = Path(replica_dir) if replica_dir else None
+        self.publish_interval = publish_interval
+        self.keep_replicas = max(1, keep_replicas)
+        self.prototype_api_file = prototype_api_file
+        self._udp_dispatcher = udp_dispatcher
+
+        self.db: Optional["duckdb.DuckDBPyConnection"] = None
+        self.sync: Optional[GameDataSyncService] = None
+        self._publish_task: Optional[asyncio.Task] = None
+        self._published_version = -1
+        self.publish_count = 0
+        self.last_publish_seconds = 0.0
+
+    async def start(self) -> None:
+        """Load the map, start the sync service and the replica publisher."""
+        from FactoryVerse.infra.db.duckdb_schema import connect
+        from FactoryVerse.infra.db.loader import load_all
+
+        if self.db is not None:
+            logger.warning("SharedMapNode is already running")
+            return
+
+        self.db = connect(self.db_path)
+        await asyncio.to_thread(load_all, self.db, self.snapshot_dir, self.prototype_api_file)
+
+        self.sync = GameDataSyncService(
+            agent_id=SHARED_AGENT_ID,
+            db_connection=self.db,
+            snapshot_dir=self.snapshot_dir,
+            udp_dispatcher=self._udp_dispatcher,
+        )
+        await self.sync.start()
+
+        if self.replica_dir is not None:
+            self.replica_dir.mkdir(parents=True, exist_ok=True)
+            await self.publish()
+            self._publish_task = asyncio.create_task(self._publish_loop())
+
+        logger.info(f"SharedMapNode serving {self.db_path}")
+
+    async def stop(self) -> None:
+        """Stop publishing and syncing, then close the database."""
+        if self._publish_task:
+            self._publish_task.cancel()
+            try:
+                await self._publish_task
+            except asyncio.CancelledError:
+                pass
+            self._publish_task = None
+        if self.sync:
+            await self.sync.stop()
+            self.sync = None
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def reader(self) -> "duckdb.DuckDBPyConnection":
+        """Open an in-process reader cursor on the shared database."""
+        if self.db is None:
+            raise RuntimeError("SharedMapNode is not running")
+        return self.db.cursor()
+
+    @property
+    def version(self) -> int:
+        """Committed write version of the shared database."""
+        return self.sync.get_watermark()["version"] if self.sync else -1
+
+    async def publish(self) -> Optional[Path]:
+        """
+        Publish a read-only replica if the map changed since the last one.
+
+        A read transaction is opened under the sync service's write lock,
+        which only pins a consistent snapshot; the copy itself (COPY FROM
+        DATABASE into a new file) runs afterwards, while writes go on.
+
+        Returns:
+            Path to the new replica, or None if nothing changed
+        """
+        if self.replica_dir is None or self.db is None or self.sync is None:
+            return None
+        if self.version == self._published_version:
+            return None
+
+        started = time.monotonic()
+        cursor = self.db.cursor()
+        try:
+            async with self.sync._write_lock:
+                cursor.execute("BEGIN TRANSACTION")
+                # Transactions start lazily: touch the catalog to pin the snapshot now
+                cursor.execute("SELECT 1 FROM duckdb_tables() LIMIT 0").fetchall()
+                watermark = self.sync.get_watermark()
+            version = watermark["version"]
+            replica_name = f"map-{version}.duckdb"
+            tmp_path = self.replica_dir / f".{replica_name}.tmp"
+            tmp_path.unlink(missing_ok=True)
+            await asyncio.to_thread(_copy_snapshot, cursor, tmp_path)
+        finally:
+            cursor.close()
+        os.replace(tmp_path, self.replica_dir / replica_name)
+
+        manifest = {
+            "version": version,
+            "file": replica_name,
+            "watermark": watermark,
+            "published_at": time.time(),
+        }
+        manifest_tmp = self.replica_dir / f".{MANIFEST_NAME}.tmp"
+        manifest_tmp.write_text(json.dumps(manifest))
+        os.replace(manifest_tmp, self.replica_dir / MANIFEST_NAME)
+
+        self._published_version = version
+        self.publish_count += 1
+        self.last_publish_seconds = time.monotonic() - started
+        self._prune_replicas()
+        logger.debug(f"Published map replica {replica_name}")
+        return self.replica_dir / replica_name
+
+    def _prune_replicas(self) -> None:
+        """Delete all but the newest keep_replicas replica files."""
+        replicas: List[Path] = sorted(
+            self.replica_dir.glob("map-*.duckdb"),
+            key=lambda p: int(p.stem.split("-", 1)[1]),
+        )
+        for old in replicas[:-self.keep_replicas]:
+            try:
+                old.unlink()  # Readers that still have it open keep their handle
+            except OSError:
+                pass
+
+    async def _publish_loop(self) -> None:
+        """Publish replicas at most every publish_interval seconds.
+
+        The pause is stretched to the duration of the last copy, so a large
+        map spends at most half of the node's time publishing.
+        """
+        while True:
+            await asyncio.sleep(max(self.publish_interval, self.last_publish_seconds))
+            try:
+                await self.publish()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to publish map replica: {e}", exc_info=True)
+
+
+def _copy_snapshot(cursor: "duckdb.DuckDBPyConnection", path: Path) -> None:
+    """Copy the database as seen by cursor's open transaction into a new file, then end it."""
+    database = cursor.execute("SELECT current_database()").fetchone()[0]
+    target = str(path).replace("'", "''")
+    cursor.execute(f"ATTACH '{target}' AS fv_replica")
+    try:
+        cursor.execute(f'COPY FROM DATABASE "{database}" TO fv_replica')
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        cursor.execute("DETACH fv_replica")
+
+
+class MapReplica:
+    """Agent-side read-only view of replicas published by a SharedMapNode."""
+
+    def __init__(self, replica_dir: Union[str, Path]):
+        """
+        Initialize the replica reader.
+
+        Args:
+            replica_dir: Directory a SharedMapNode publishes into
+        """
+        self.replica_dir = Path(replica_dir)
+        self.version = -1
+        self.watermark: Dict[str, Any] = {}
+        self._connection: Optional["duckdb.DuckDBPyConnection"] = None
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.replica_dir / MANIFEST_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def refresh(self) -> bool:
+        """
+        Switch to the newest published replica, if there is a newer one.
+
+        Returns:
+            True if a newer replica was opened
+        """
+        import duckdb
+
+        manifest = self._read_manifest()
+        if manifest is None or manifest["version"] <= self.version:
+            return False
+
+        con = duckdb.connect(str(self.replica_dir / manifest["file"]), read_only=True)
+        try:
+            con.execute("LOAD spatial")
+        except Exception:
+            pass  # Extension not installed; spatial columns stay opaque
+        old, self._connection = self._connection, con
+        self.version = manifest["version"]
+        self.watermark = manifest.get("watermark", {})
+        if old is not None:
+            old.close()
+        return True
+
+    @property
+    def connection(self) -> "duckdb.DuckDBPyConnection":
+        """Read-only connection to the current replica (opened on first use)."""
+        if self._connection is None and not self.refresh():
+            raise RuntimeError(f"No map replica published in {self.replica_dir} yet")
+        return self._connection
+
+    def close(self) -> None:
+        """Close the current replica connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the shared FactoryVerse map sync node")
+    parser.add_argument("--db", required=True, help="Writable DuckDB file owned by the node")
+    parser.add_argument("--snapshot-dir", required=True, help="Snapshot directory or script-output root")
+    parser.add_argument("--replica-dir", required=True, help="Directory to publish read replicas into")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between replica publications")
+    parser.add_argument("--udp-port", type=int, default=34400)
+    args = parser.parse_args(argv)
+
+    async def run():
+        node = SharedMapNode(
+            args.db,
+            args.snapshot_dir,
+            replica_dir=args.replica_dir,
+            publish_interval=args.interval,
+            udp_dispatcher=UDPDispatcher(port=args.udp_port),
+        )
+        await node.start()
+        print(f"✅ Shared map node running: {args.db} -> {args.replica_dir} (Ctrl+C to stop)")
+        try:
+            while True:
+                await asyncio.sleep(1)
+        finally:
+            await node.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
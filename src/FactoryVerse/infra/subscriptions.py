@@ -0,0 +1,255 @@
+"""Standing query subscriptions evaluated incrementally on sync.
+
+Instead of polling ("is any drill out of ore?", "is this furnace out of
+fuel?"), register a predicate once. GameDataSyncService tracks which
+entity keys each applied batch touched (entity ops, chunk loads, status
+transitions) and re-evaluates subscriptions for those keys only, so the
+cost follows the rate of change rather than the number of polls. Every
+key whose result flips produces one transition notification:
+
+    {"event_type": "notification", "notification_type": "subscription",
+     "agent_id": ..., "tick": ...,
+     "data": {"subscription": "drills_out_of_ore", "entity_key": "(...)",
+              "transition": "became_true" | "became_false", "row": {...}}}
+
+Predicates:
+
+- SqlPredicate: a SELECT returning an ``entity_key`` column for the rows
+  where the condition holds, e.g.
+  ``SELECT entity_key, entity_name FROM map_entity WHERE entity_name = 'lab'``.
+  Evaluated as ``SELECT * FROM (<sql>) WHERE entity_key IN (<touched>)``.
+- StatusPredicate: the entity's latest status (from the status snapshots
+  the mod writes every 60 ticks) is one of the given statuses, e.g.
+  ``StatusPredicate({"no_minable_resources"}, entity_names={"burner-mining-drill"})``
+  or ``StatusPredicate({"no_fuel", "no_power"})``.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# entity_key -> {"status", "name", "x", "y"}
+Statuses = Dict[str, Dict[str, Any]]
+
+
+class Predicate:
+    """Base class for subscription predicates."""
+
+    # True if the predicate depends on entity statuses (status snapshots are
+    # only decoded while such a predicate is subscribed)
+    watches_status = False
+
+    def evaluate(
+        self, con: Any, keys: Optional[Set[str]], statuses: Statuses
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Rows for which the predicate holds.
+
+        Args:
+            con: DuckDB reader cursor
+            keys: Restrict to these entity keys (None = all)
+            statuses: Latest entity statuses
+
+        Returns:
+            entity_key -> row dict for every matching key
+        """
+        raise NotImplementedError
+
+
+class SqlPredicate(Predicate):
+    """Predicate given as a SELECT that returns an entity_key column."""
+
+    def __init__(self, sql: str):
+        """
+        Args:
+            sql: SELECT returning entity_key (plus any columns to report)
+        """
+        self.sql = sql.strip().rstrip(";")
+
+    def evaluate(self, con, keys, statuses):
+        if keys is None:
+            cursor = con.execute(f"SELECT * FROM ({self.sql}) AS subscription_rows")
+        else:
+            cursor = con.execute(
+                f"SELECT * FROM ({self.sql}) AS subscription_rows "
+                f"WHERE entity_key IN (SELECT unnest(?::VARCHAR[]))",
+                [sorted(keys)],
+            )
+        columns = [d[0] for d in cursor.description]
+        rows = {}
+        for values in cursor.fetchall():
+            row = dict(zip(columns, values))
+            rows[row["entity_key"]] = row
+        return rows
+
+    def __repr__(self) -> str:
+        return f"SqlPredicate({self.sql!r})"
+
+
+class StatusPredicate(Predicate):
+    """Entity's latest status is one of a set (optionally for some entity names)."""
+
+    watches_status = True
+
+    def __init__(self, statuses: Iterable[str], entity_names: Optional[Iterable[str]] = None):
+        """
+        Args:
+            statuses: Status names (e.g. {"no_fuel", "no_power"})
+            entity_names: Restrict to these entity names
+        """
+        self.statuses = set(statuses)
+        self.entity_names = set(entity_names) if entity_names is not None else None
+
+    def evaluate(self, con, keys, statuses):
+        candidates = statuses.keys() if keys is None else keys
+        rows = {}
+        for key in candidates:
+            info = statuses.get(key)
+            if info is None or info["status"] not in self.statuses:
+                continue
+            if self.entity_names is not None and info.get("name") not in self.entity_names:
+                continue
+            rows[key] = {"entity_key": key, **info}
+        return rows
+
+    def __repr__(self) -> str:
+        return f"StatusPredicate({sorted(self.statuses)!r}, entity_names={self.entity_names!r})"
+
+
+class Subscription:
+    """A registered predicate and the keys it currently holds for."""
+
+    def __init__(self, name: str, predicate: Predicate, sink: Callable[[Dict[str, Any]], None]):
+        self.name = name
+        self.predicate = predicate
+        self.sink = sink
+        self.matching: Dict[str, Dict[str, Any]] = {}
+
+
+class SubscriptionManager:
+    """Holds subscriptions and turns per-batch re-evaluations into transitions."""
+
+    def __init__(self, agent_id: Optional[str] = None):
+        self.agent_id = agent_id
+        self._subscriptions: Dict[str, Subscription] = {}
+        self.stats = {"evaluations": 0, "keys_evaluated": 0, "transitions": 0, "errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def watches_status(self) -> bool:
+        """True if any subscription depends on entity statuses."""
+        return any(s.predicate.watches_status for s in self._subscriptions.values())
+
+    def add(
+        self,
+        name: str,
+        predicate: Predicate,
+        sink: Callable[[Dict[str, Any]], None],
+        con: Any,
+        statuses: Statuses,
+        notify_initial: bool = False,
+        tick: Optional[int] = None,
+    ) -> int:
+        """
+        Register (or replace) a subscription and evaluate it once over everything.
+
+        Args:
+            name: Subscription name
+            predicate: SqlPredicate / StatusPredicate
+            sink: Receives notification payloads
+            con: DuckDB reader cursor for the baseline evaluation
+            statuses: Latest entity statuses
+            notify_initial: Send became_true for rows already matching
+            tick: Tick reported in initial notifications
+
+        Returns:
+            Number of rows currently matching
+        """
+        subscription = Subscription(name, predicate, sink)
+        subscription.matching = predicate.evaluate(con, None, statuses)
+        self._subscriptions[name] = subscription
+        if notify_initial:
+            for key, row in subscription.matching.items():
+                self._notify(subscription, key, True, row, tick)
+        return len(subscription.matching)
+
+    def remove(self, name: str) -> bool:
+        """Unregister a subscription; returns False if it did not exist."""
+        return self._subscriptions.pop(name, None) is not None
+
+    def names(self) -> List[str]:
+        """Registered subscription names."""
+        return list(self._subscriptions)
+
+    def evaluate(
+        self,
+        con: Any,
+        touched: Set[str],
+        status_touched: Set[str],
+        statuses: Statuses,
+        tick: Optional[int] = None,
+    ) -> int:
+        """
+        Re-evaluate subscriptions for the keys a batch touched.
+
+        Args:
+            con: DuckDB reader cursor
+            touched: Entity keys written by the batch
+            status_touched: Entity keys whose status changed
+            statuses: Latest entity statuses
+            tick: Tick reported in notifications
+
+        Returns:
+            Number of transitions sent
+        """
+        transitions = 0
+        for subscription in list(self._subscriptions.values()):
+            keys = touched | status_touched if subscription.predicate.watches_status else touched
+            if not keys:
+                continue
+            try:
+                now = subscription.predicate.evaluate(con, keys, statuses)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Subscription {subscription.name!r} failed: {e}")
+                continue
+            self.stats["evaluations"] += 1
+            self.stats["keys_evaluated"] += len(keys)
+            for key in keys:
+                was = key in subscription.matching
+                row = now.get(key)
+                if row is not None and not was:
+                    subscription.matching[key] = row
+                    self._notify(subscription, key, True, row, tick)
+                    transitions += 1
+                elif row is None and was:
+                    old = subscription.matching.pop(key)
+                    self._notify(subscription, key, False, old, tick)
+                    transitions += 1
+                elif row is not None:
+                    subscription.matching[key] = row
+        self.stats["transitions"] += transitions
+        return transitions
+
+    def _notify(
+        self, subscription: Subscription, key: str, state: bool, row: Dict[str, Any], tick: Optional[int]
+    ) -> None:
+        payload = {
+            "event_type": "notification",
+            "notification_type": "subscription",
+            "agent_id": self.agent_id,
+            "tick": tick,
+            "data": {
+                "subscription": subscription.name,
+                "entity_key": key,
+                "transition": "became_true" if state else "became_false",
+                "row": {k: v for k, v in row.items() if isinstance(v, (str, int, float, bool, type(None), dict, list))},
+            },
+        }
+        try:
+            subscription.sink(payload)
+        except Exception as e:
+            logger.error(f"Subscription sink for {subscription.name!r} failed: {e}")
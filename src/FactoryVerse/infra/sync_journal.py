@@ -0,0 +1,135 @@
+"""Crash-safe journal of applied sync updates.
+
+Lives next to a persisted map database (``<db>.journal.jsonl``) and lets a
+restarted GameDataSyncService resume from where it stopped instead of doing
+a full load_all plus bootstrap wait.
+
+The file holds one checkpoint record followed by the updates applied since:
+
+    {"kind": "checkpoint", "version": ..., "sequence": ..., "tick": ...,
+     "loaded_chunks": [[x, y], ...], "offsets": [[x, y, "entities_updates.jsonl", 1234], ...],
+     "checkpoint_at": ...}
+    {"kind": "update", "type": "entity_operation", "payload": {...}}
+    ...
+
+A checkpoint is written right after a DuckDB CHECKPOINT and atomically
+replaces the whole file, so the journal stays compact. A torn trailing line
+left by a crash is ignored on load.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJournal:
+    """Append-only journal of applied updates with periodic checkpoints."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        checkpoint_every: int = 500,
+        checkpoint_interval: float = 30.0,
+    ):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Journal file path
+            checkpoint_every: Checkpoint after this many journaled updates
+            checkpoint_interval: Checkpoint at least this often (seconds) when
+                there are journaled updates
+        """
+        self.path = Path(path)
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._file = None
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+
+    @staticmethod
+    def path_for(db_path: Union[str, Path]) -> Path:
+        """Return the journal path that belongs to a database file."""
+        return Path(f"{db_path}.journal.jsonl")
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Read the last checkpoint and the updates journaled after it.
+
+        Returns:
+            (checkpoint or None, [(update_type, payload), ...])
+        """
+        checkpoint: Optional[Dict[str, Any]] = None
+        tail: List[Tuple[str, Dict[str, Any]]] = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # Torn write from a crash
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping corrupt journal line in {self.path.name}")
+                        continue
+                    if record.get("kind") == "checkpoint":
+                        checkpoint = record
+                        tail = []
+                    elif record.get("kind") == "update":
+                        tail.append((record["type"], record["payload"]))
+        except FileNotFoundError:
+            pass
+        return checkpoint, tail
+
+    def append_update(self, update_type: str, payload: Dict[str, Any]) -> None:
+        """Journal one applied update."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"kind": "update", "type": update_type, "payload": payload}) + "\n")
+        self._file.flush()
+        self._since_checkpoint += 1
+
+    def should_checkpoint(self) -> bool:
+        """Check whether enough updates or time accumulated for a checkpoint."""
+        if self._since_checkpoint == 0:
+            return False
+        return (
+            self._since_checkpoint >= self.checkpoint_every
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        )
+
+    def write_checkpoint(self, state: Dict[str, Any]) -> None:
+        """
+        Replace the journal with a single checkpoint record.
+
+        Call only after the database itself has been checkpointed, so the
+        recorded state is durable.
+
+        Args:
+            state: Sync state (version, sequence, tick, loaded_chunks, offsets)
+        """
+        record = {"kind": "checkpoint", "checkpoint_at": time.time(), **state}
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp_path, self.path)
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,245 @@
+"""Latency instrumentation for the game-data sync path.
+
+Records, per applied update, when it arrived from the dispatcher, when the
+background loop dequeued it and when its DB writes were committed, together
+with the game tick carried in the payload and the queue depth at dequeue.
+Everything is aggregated into fixed-bucket histograms (cheap to update, no
+per-sample storage) and can optionally be streamed to a JSONL sink for
+offline analysis.
+
+Usage:
+    metrics = SyncMetrics(sink_path="sync-metrics.jsonl")
+    metrics.record("entity_operation.created", tick=1200, arrived_at=...,
+                   dequeued_at=..., committed_at=..., queue_depth=3)
+    metrics.get_stats()["visible_ms"]["entity_operation.created"]["p99"]
+"""
+
+import bisect
+import json
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+TICKS_PER_SECOND = 60
+
+# Upper bucket bounds in milliseconds (roughly log-spaced, 0.1ms .. 60s)
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 5000, 10000, 30000, 60000,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram with count/sum/min/max and percentile estimates."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is overflow
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        """Add one sample."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a percentile (upper bound of the bucket holding it).
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Estimated value, capped at the observed max, or None if empty
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def fraction_below(self, threshold: float) -> Optional[float]:
+        """Fraction of samples in buckets whose upper bound is <= threshold."""
+        if self.count == 0:
+            return None
+        idx = bisect.bisect_right(self.buckets, threshold)
+        return sum(self.counts[:idx]) / self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary with count, mean, min, max, p50/p90/p99 and bucket counts."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {
+                **{f"le_{b:g}": n for b, n in zip(self.buckets, self.counts)},
+                "overflow": self.counts[-1],
+            },
+        }
+
+
+class SyncMetrics:
+    """Per-operation-type latency histograms for GameDataSyncService.
+
+    Histogram families (all in milliseconds, keyed by operation type):
+    - queue_wait_ms: arrival at dispatcher -> dequeued by the sync loop
+    - apply_ms: dequeued -> DB writes committed
+    - visible_ms: arrival -> committed (what a reader waits for)
+    - tick_lag_ms: game tick -> committed, relative to the best observed
+      tick/wall offset (removes the unknown clock offset between game and host)
+
+    Queue depth is recorded at every dequeue as a histogram and a short
+    time series of (wall_time, depth) samples.
+    """
+
+    def __init__(
+        self,
+        sink_path: Optional[Union[str, Path]] = None,
+        depth_samples: int = 1000,
+    ):
+        """
+        Initialize metrics.
+
+        Args:
+            sink_path: Optional JSONL file that receives one line per update
+            depth_samples: Number of recent queue depth samples to keep
+        """
+        self._lock = threading.Lock()
+        self.queue_wait_ms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.apply_ms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.visible_ms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.tick_lag_ms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.queue_depth = LatencyHistogram(buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000))
+        self.depth_series: Deque[Tuple[float, int]] = deque(maxlen=depth_samples)
+        self._min_tick_offset: Optional[float] = None
+        self._sink = None
+        if sink_path is not None:
+            self.open_sink(sink_path)
+
+    def open_sink(self, path: Union[str, Path]) -> None:
+        """Start appending per-update records to a JSONL file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if self._sink is not None:
+                self._sink.close()
+            self._sink = open(path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        """Flush and close the JSONL sink, if any."""
+        with self._lock:
+            if self._sink is not None:
+                self._sink.close()
+                self._sink = None
+
+    def record(
+        self,
+        op_type: str,
+        tick: Optional[int],
+        arrived_at: Optional[float],
+        dequeued_at: Optional[float],
+        committed_at: float,
+        queue_depth: Optional[int] = None,
+        sequence: Optional[int] = None,
+    ) -> None:
+        """
+        Record one applied update.
+
+        Args:
+            op_type: Operation type key (e.g. "entity_operation.created")
+            tick: Game tick from the payload, if any
+            arrived_at: Wall time the datagram reached the dispatcher handler
+            dequeued_at: Wall time the sync loop dequeued the update
+            committed_at: Wall time the update's writes were committed
+            queue_depth: Sync queue depth observed at dequeue
+            sequence: Payload sequence number, if any (sink only)
+        """
+        with self._lock:
+            if arrived_at is not None and dequeued_at is not None:
+                self.queue_wait_ms[op_type].observe((dequeued_at - arrived_at) * 1000.0)
+            if dequeued_at is not None:
+                self.apply_ms[op_type].observe((committed_at - dequeued_at) * 1000.0)
+            if arrived_at is not None:
+                self.visible_ms[op_type].observe((committed_at - arrived_at) * 1000.0)
+            if isinstance(tick, (int, float)):
+                offset = committed_at - tick / TICKS_PER_SECOND
+                if self._min_tick_offset is None or offset < self._min_tick_offset:
+                    self._min_tick_offset = offset
+                self.tick_lag_ms[op_type].observe((offset - self._min_tick_offset) * 1000.0)
+            if queue_depth is not None:
+                self.queue_depth.observe(queue_depth)
+                self.depth_series.append((committed_at, queue_depth))
+
+            if self._sink is not None:
+                self._sink.write(json.dumps({
+                    "op_type": op_type,
+                    "sequence": sequence,
+                    "tick": tick,
+                    "arrived_at": arrived_at,
+                    "dequeued_at": dequeued_at,
+                    "committed_at": committed_at,
+                    "queue_depth": queue_depth,
+                }) + "\n")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of all histograms.
+
+        Returns:
+            Dictionary with queue_wait_ms, apply_ms, visible_ms and tick_lag_ms
+            (each op_type -> histogram summary), queue_depth (histogram summary)
+            and depth_series (recent (wall_time, depth) samples)
+        """
+        with self._lock:
+            return {
+                "queue_wait_ms": {k: h.to_dict() for k, h in self.queue_wait_ms.items()},
+                "apply_ms": {k: h.to_dict() for k, h in self.apply_ms.items()},
+                "visible_ms": {k: h.to_dict() for k, h in self.visible_ms.items()},
+                "tick_lag_ms": {k: h.to_dict() for k, h in self.tick_lag_ms.items()},
+                "queue_depth": self.queue_depth.to_dict(),
+                "depth_series": list(self.depth_series),
+            }
+
+    def check_slo(self, op_type: str, threshold_ms: float, percentile: float = 99.0) -> Optional[bool]:
+        """
+        Check a visibility SLO such as "p99 entity_operation visible within 50 ms".
+
+        Args:
+            op_type: Operation type key
+            threshold_ms: Latency bound in milliseconds
+            percentile: Percentile that must be within the bound
+
+        Returns:
+            True/False, or None if there are no samples for op_type
+        """
+        with self._lock:
+            hist = self.visible_ms.get(op_type)
+            if hist is None or hist.count == 0:
+                return None
+            value = hist.percentile(percentile)
+        return value is not None and value <= threshold_ms
+
+    def reset(self) -> None:
+        """Clear all histograms (the sink stays open)."""
+        with self._lock:
+            for family in (self.queue_wait_ms, self.apply_ms, self.visible_ms, self.tick_lag_ms):
+                family.clear()
+            self.queue_depth = LatencyHistogram(buckets=self.queue_depth.buckets)
+            self.depth_series.clear()
+            self._min_tick_offset = None
@@ -0,0 +1,344 @@
+"""UDP traffic capture and replay for offline load testing.
+
+Records every datagram the UDPDispatcher receives into a timestamped JSONL
+capture file, optionally alongside a tar archive of the snapshot directory as
+it was when recording started. The replayer re-emits a capture to a local UDP
+port at real-time speed, an accelerated multiple, or as fast as possible, so
+GameDataSyncService and AsyncActionListener throughput can be benchmarked
+without a live Factorio server.
+
+Usage:
+    dispatcher = get_udp_dispatcher()
+    with UDPCaptureRecorder("run.capture.jsonl", snapshot_dir=snapshot_dir) as rec:
+        rec.attach(dispatcher)
+        ...  # play normally
+
+    extract_snapshot_archive("run.capture.snapshots.tar.gz", "/tmp/snapshots")
+    stats = UDPReplayer("run.capture.jsonl", port=34400, speed=10.0).replay()
+
+Command line:
+    python -m FactoryVerse.infra.udp_capture record run.capture.jsonl --port 34400
+    python -m FactoryVerse.infra.udp_capture replay run.capture.jsonl --speed 0
+"""
+
+import argparse
+import base64
+import json
+import socket
+import tarfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+CAPTURE_FORMAT_VERSION = 1
+
+
+@dataclass
+class CapturedDatagram:
+    """A single recorded datagram."""
+    offset: float  # Seconds since the start of the capture
+    wall_time: float  # Unix timestamp when the datagram was received
+    addr: tuple
+    data: bytes
+
+
+def snapshot_archive_path(capture_path: Union[str, Path]) -> Path:
+    """Return the snapshot archive path that pairs with a capture file."""
+    capture_path = Path(capture_path)
+    name = capture_path.name
+    if name.endswith(".jsonl"):
+        name = name[: -len(".jsonl")]
+    return capture_path.with_name(f"{name}.snapshots.tar.gz")
+
+
+def archive_snapshot_dir(snapshot_dir: Union[str, Path], dest: Union[str, Path]) -> Path:
+    """
+    Archive a snapshot directory into a gzipped tarball.
+
+    Args:
+        snapshot_dir: Snapshot directory (the one containing chunk folders)
+        dest: Destination .tar.gz path
+
+    Returns:
+        Path to the written archive
+    """
+    snapshot_dir = Path(snapshot_dir)
+    dest = Path(dest)
+    if not snapshot_dir.is_dir():
+        raise FileNotFoundError(f"Snapshot directory not found: {snapshot_dir}")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(dest, "w:gz") as tar:
+        tar.add(snapshot_dir, arcname=".")
+    return dest
+
+
+def extract_snapshot_archive(archive: Union[str, Path], dest_dir: Union[str, Path]) -> Path:
+    """
+    Extract a snapshot archive written by archive_snapshot_dir.
+
+    Args:
+        archive: Path to the .tar.gz archive
+        dest_dir: Directory to extract into (created if missing)
+
+    Returns:
+        Path to the extracted snapshot directory
+    """
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(archive, "r:gz") as tar:
+        tar.extractall(dest_dir, filter="data")
+    return dest_dir
+
+
+class UDPCaptureRecorder:
+    """Tees raw UDP datagrams into a timestamped JSONL capture file.
+
+    The first line of the file is a header record; each following line is one
+    datagram with its offset from the start of the capture. Payloads are
+    stored as text when they are valid UTF-8 and base64 otherwise.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        snapshot_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Capture file to write (overwritten if it exists)
+            snapshot_dir: Optional snapshot directory to archive next to the
+                capture when recording starts
+        """
+        self.path = Path(path)
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.snapshot_archive: Optional[Path] = None
+        self.count = 0
+        self._file = None
+        self._start_mono = 0.0
+        self._lock = threading.Lock()
+        self._dispatchers: List[UDPDispatcher] = []
+
+    def open(self):
+        """Open the capture file, write the header and archive snapshots."""
+        if self._file is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.snapshot_dir is not None:
+            self.snapshot_archive = archive_snapshot_dir(
+                self.snapshot_dir, snapshot_archive_path(self.path)
+            )
+
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._start_mono = time.monotonic()
+        header = {
+            "capture_version": CAPTURE_FORMAT_VERSION,
+            "started_at": time.time(),
+            "snapshot_archive": self.snapshot_archive.name if self.snapshot_archive else None,
+        }
+        self._file.write(json.dumps(header) + "\n")
+        self._file.flush()
+
+    def attach(self, dispatcher: UDPDispatcher):
+        """Start recording everything the dispatcher receives."""
+        self.open()
+        dispatcher.add_tap(self.record)
+        self._dispatchers.append(dispatcher)
+
+    def record(self, data: bytes, addr: tuple):
+        """Append one datagram to the capture (dispatcher tap callback)."""
+        offset = time.monotonic() - self._start_mono
+        entry: Dict[str, Any] = {
+            "t": round(offset, 6),
+            "ts": time.time(),
+            "addr": list(addr) if addr else None,
+        }
+        try:
+            entry["data"] = data.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["data_b64"] = base64.b64encode(data).decode("ascii")
+        line = json.dumps(entry) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self.count += 1
+
+    def close(self):
+        """Detach from dispatchers and close the capture file."""
+        for dispatcher in self._dispatchers:
+            dispatcher.remove_tap(self.record)
+        self._dispatchers.clear()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_capture(path: Union[str, Path]) -> Iterator[CapturedDatagram]:
+    """
+    Iterate over the datagrams in a capture file.
+
+    Args:
+        path: Capture file written by UDPCaptureRecorder
+
+    Yields:
+        CapturedDatagram for each recorded packet, in capture order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "capture_version" in entry:
+                continue  # Header
+            if "data" in entry:
+                data = entry["data"].encode("utf-8")
+            else:
+                data = base64.b64decode(entry["data_b64"])
+            yield CapturedDatagram(
+                offset=float(entry["t"]),
+                wall_time=float(entry.get("ts", 0.0)),
+                addr=tuple(entry["addr"]) if entry.get("addr") else (),
+                data=data,
+            )
+
+
+class UDPReplayer:
+    """Re-emits a capture file to a UDP port.
+
+    speed=1.0 reproduces the original pacing, speed=N compresses inter-packet
+    gaps by N, and speed=0 (or None) sends as fast as possible.
+    """
+
+    def __init__(
+        self,
+        capture_path: Union[str, Path],
+        host: str = "127.0.0.1",
+        port: int = 34400,
+        speed: Optional[float] = 1.0,
+    ):
+        """
+        Initialize the replayer.
+
+        Args:
+            capture_path: Capture file to replay
+            host: Destination host
+            port: Destination port (where the dispatcher under test listens)
+            speed: Replay speed multiplier; 0 or None for max speed
+        """
+        self.capture_path = Path(capture_path)
+        self.host = host
+        self.port = port
+        self.speed = speed
+
+    def replay(self) -> Dict[str, Any]:
+        """
+        Send every captured datagram to the destination.
+
+        Returns:
+            Dict with packets, bytes, elapsed_s, captured_s and packets_per_s
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        packets = 0
+        total_bytes = 0
+        last_offset = 0.0
+        start = time.monotonic()
+        try:
+            for dgram in read_capture(self.capture_path):
+                if self.speed:
+                    due = start + dgram.offset / self.speed
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                sock.sendto(dgram.data, (self.host, self.port))
+                packets += 1
+                total_bytes += len(dgram.data)
+                last_offset = dgram.offset
+        finally:
+            sock.close()
+
+        elapsed = time.monotonic() - start
+        return {
+            "packets": packets,
+            "bytes": total_bytes,
+            "elapsed_s": elapsed,
+            "captured_s": last_offset,
+            "packets_per_s": packets / elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def _cmd_record(args):
+    """Record traffic arriving on a UDP port until interrupted."""
+    import asyncio
+
+    async def run():
+        dispatcher = UDPDispatcher(args.host, args.port)
+        recorder = UDPCaptureRecorder(args.capture, snapshot_dir=args.snapshot_dir)
+        await dispatcher.start()
+        recorder.attach(dispatcher)
+        print(f"🎙️  Recording {args.host}:{args.port} -> {args.capture} (Ctrl+C to stop)")
+        try:
+            while True:
+                await asyncio.sleep(1)
+        finally:
+            recorder.close()
+            await dispatcher.stop()
+            print(f"✅ Recorded {recorder.count} datagrams")
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def _cmd_replay(args):
+    """Replay a capture to a UDP port."""
+    replayer = UDPReplayer(args.capture, host=args.host, port=args.port, speed=args.speed)
+    stats = replayer.replay()
+    print(
+        f"✅ Replayed {stats['packets']} datagrams ({stats['bytes']} bytes) in "
+        f"{stats['elapsed_s']:.3f}s (captured span {stats['captured_s']:.3f}s, "
+        f"{stats['packets_per_s']:.0f} pkt/s)"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Record and replay FactoryVerse UDP traffic")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record UDP traffic to a capture file")
+    record_parser.add_argument("capture", help="Capture file to write")
+    record_parser.add_argument("--host", default="127.0.0.1")
+    record_parser.add_argument("--port", type=int, default=34400)
+    record_parser.add_argument("--snapshot-dir", default=None, help="Snapshot dir to archive alongside the capture")
+    record_parser.set_defaults(func=_cmd_record)
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a capture file to a UDP port")
+    replay_parser.add_argument("capture", help="Capture file to replay")
+    replay_parser.add_argument("--host", default="127.0.0.1")
+    replay_parser.add_argument("--port", type=int, default=34400)
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Speed multiplier (0 = max speed)")
+    replay_parser.set_defaults(func=_cmd_replay)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,26 @@ Usage:
     
     # Or subscribe to all events
     dispatcher.subscribe("*", handler_function)
+
+Framing:
+    Besides plain single-JSON datagrams, two envelopes are understood so the
+    mod can coalesce events and send payloads larger than one datagram:
+
+    Batch - many events in one datagram, each dispatched individually:
+        {"event_type": "batch", "events": [{...}, {...}]}
+
+    Fragment - one slice of a serialized JSON document; slices are buffered
+    per (sender, msg_id) until all `count` of them (0-based `index`) have
+    arrived, then the joined document is processed like a normal datagram
+    (it may itself be a batch). Incomplete messages are dropped after
+    `fragment_timeout` seconds.
+        {"event_type": "fragment", "msg_id": 17, "index": 0, "count": 3, "data": "..."}
 """
 
 import json
 import socket
 import threading
+import time
 from typing import Callable, Dict, List, Optional, Any
 from collections import defaultdict
 
@@ -30,13 +45,15 @@ class UDPDispatcher:
     Multiple components can subscribe to receive messages based on event_type.
     """
     
-    def __init__(self, host: str = "127.0.0.1", port: int = 34400):
+    def __init__(self, host: str = "127.0.0.1", port: int = 34400, fragment_timeout: float = 5.0):
         """
         Initialize the UDP dispatcher.
         
         Args:
             host: Host to bind UDP socket to
             port: Port to bind UDP socket to
+            fragment_timeout: Seconds to keep an incomplete fragmented message
+                before discarding it
         """
         self.host = host
         self.port = port
@@ -45,6 +62,19 @@ class UDPDispatcher:
         self.listener_thread: Optional[threading.Thread] = None
         self.running = False
         self._lock = threading.Lock()
+        # Raw datagram taps (e.g. capture recorders), called before parsing
+        self._taps: List[Callable[[bytes, tuple], None]] = []
+        # Fragment reassembly: (addr, msg_id) -> {count, parts, first_seen}
+        self.fragment_timeout = fragment_timeout
+        self._fragments: Dict[tuple, Dict[str, Any]] = {}
+        self._fragment_lock = threading.Lock()
+        self.framing_stats = {
+            "batches": 0,
+            "batched_events": 0,
+            "fragments": 0,
+            "reassembled": 0,
+            "fragments_expired": 0,
+        }
     
     def subscribe(self, event_type: str, handler: Callable[[Dict[str, Any]], None]):
         """
@@ -74,6 +104,32 @@ class UDPDispatcher:
                 except ValueError:
                     pass  # Handler not in list
     
+    def add_tap(self, tap: Callable[[bytes, tuple], None]):
+        """
+        Register a tap that receives every raw datagram before it is parsed.
+        
+        Taps are used by the capture recorder to tee traffic to disk. They run
+        on the listener thread, so they should be cheap and must not block.
+        
+        Args:
+            tap: Callback receiving (data, addr) for each datagram
+        """
+        with self._lock:
+            self._taps.append(tap)
+    
+    def remove_tap(self, tap: Callable[[bytes, tuple], None]):
+        """
+        Remove a previously registered raw datagram tap.
+        
+        Args:
+            tap: Tap callback to remove
+        """
+        with self._lock:
+            try:
+                self._taps.remove(tap)
+            except ValueError:
+                pass  # Tap not registered
+    
     async def start(self):
         """Start the UDP listener in a background thread."""
         if self.running:
@@ -104,6 +160,7 @@ class UDPDispatcher:
                 data, addr = self.sock.recvfrom(65535)
                 self._process_message(data, addr)
             except socket.timeout:
+                self._expire_fragments()
                 continue
             except Exception as e:
                 if self.running:
@@ -111,6 +168,18 @@ class UDPDispatcher:
     
     def _process_message(self, data: bytes, addr: tuple):
         """Parse and dispatch a UDP message to subscribers."""
+        with self._lock:
+            taps = list(self._taps)
+        for tap in taps:
+            try:
+                tap(data, addr)
+            except Exception as e:
+                print(f"⚠️  Error in UDP tap: {e}")
+        
+        self._handle_document(data, addr)
+    
+    def _handle_document(self, data: bytes, addr: tuple):
+        """Parse one JSON document and dispatch it, unwrapping framing envelopes."""
         try:
             payload = json.loads(data.decode('utf-8'))
         except json.JSONDecodeError as e:
@@ -120,6 +189,77 @@ class UDPDispatcher:
             print(f"❌ Error processing UDP message from {addr}: {e}")
             return
         
+        if not isinstance(payload, dict):
+            print(f"⚠️  Ignoring non-object UDP payload from {addr}")
+            return
+        
+        event_type = payload.get('event_type')
+        if event_type == "batch":
+            events = payload.get('events') or []
+            self.framing_stats["batches"] += 1
+            self.framing_stats["batched_events"] += len(events)
+            for event in events:
+                if isinstance(event, dict):
+                    self._dispatch(event)
+            return
+        if event_type == "fragment":
+            self._handle_fragment(payload, addr)
+            return
+        
+        self._dispatch(payload)
+    
+    def _handle_fragment(self, payload: Dict[str, Any], addr: tuple):
+        """Buffer a fragment and process the message once all slices arrived."""
+        try:
+            key = (addr, payload['msg_id'])
+            index = int(payload['index'])
+            count = int(payload['count'])
+            part = payload['data']
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️  Malformed UDP fragment from {addr}: {e}")
+            return
+        if count <= 0 or not 0 <= index < count:
+            print(f"⚠️  UDP fragment index {index} out of range (count={count}) from {addr}")
+            return
+        
+        self.framing_stats["fragments"] += 1
+        now = time.monotonic()
+        self._expire_fragments(now)
+        
+        with self._fragment_lock:
+            entry = self._fragments.get(key)
+            if entry is None or entry["count"] != count:
+                entry = {"count": count, "parts": {}, "first_seen": now}
+                self._fragments[key] = entry
+            entry["parts"][index] = part
+            if len(entry["parts"]) < count:
+                return
+            del self._fragments[key]
+        
+        self.framing_stats["reassembled"] += 1
+        document = "".join(entry["parts"][i] for i in range(count))
+        self._handle_document(document.encode('utf-8'), addr)
+    
+    def _expire_fragments(self, now: Optional[float] = None):
+        """Drop incomplete fragmented messages older than fragment_timeout."""
+        if not self._fragments:
+            return
+        now = time.monotonic() if now is None else now
+        with self._fragment_lock:
+            expired = [
+                key for key, entry in self._fragments.items()
+                if now - entry["first_seen"] > self.fragment_timeout
+            ]
+            for key in expired:
+                entry = self._fragments.pop(key)
+                self.framing_stats["fragments_expired"] += 1
+                print(
+                    f"⚠️  Dropped incomplete UDP message {key[1]} from {key[0]} "
+                    f"({len(entry['parts'])}/{entry['count']} fragments)"
+                )
+    
+    def _dispatch(self, payload: Dict[str, Any]):
+        """Route a single event payload to its subscribers."""
         # Determine event type
         event_type = payload.get('event_type')
         
@@ -159,6 +299,9 @@ class UDPDispatcher:
         
         with self._lock:
             self.subscribers.clear()
+            self._taps.clear()
+        with self._fragment_lock:
+            self._fragments.clear()
         
         print("✅ UDPDispatcher stopped")
     
@@ -87,7 +87,8 @@ configure(
     runtime_config.agent_id,
     snapshot_dir=runtime_config.snapshot_dir,
     db_path=runtime_config.db_path,
-    agent_udp_port=actual_udp_port
+    agent_udp_port=actual_udp_port,
+    shared_map_dir=os.getenv("FV_SHARED_MAP_DIR"),  # Optional shared map sync node
 )
 print(f"✅ DSL configured")
 print(f"   Agent: {runtime_config.agent_id}")
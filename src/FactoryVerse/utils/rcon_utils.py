@@ -6,7 +6,10 @@ the first-command warning issue.
 """
 
 from factorio_rcon import RCONClient
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from FactoryVerse.infra.rcon_pool import RconPool
 
 
 def initialize_rcon_connection(client: RCONClient) -> None:
@@ -66,6 +69,47 @@ def create_rcon_client(
     return client
 
 
+def create_rcon_pool(
+    host: str = "localhost",
+    port: int = 27100,
+    password: str = "factorio",
+    size: int = 2,
+    max_in_flight: int = 4,
+    **pool_options
+) -> "RconPool":
+    """
+    Create a pool of initialized RCON connections to one server.
+    
+    Connections open lazily and are re-created automatically when they drop.
+    Pass the pool wherever an RCON client is expected (PlayingFactory,
+    configure); each agent gets a fair share of the connections.
+    
+    Args:
+        host: RCON server host
+        port: RCON server port
+        password: RCON password
+        size: Number of connections
+        max_in_flight: Cap on commands in flight across connections
+        **pool_options: Further RconPool options (keepalive_interval,
+            agent_weights, class_weights, ...)
+        
+    Returns:
+        RconPool instance
+        
+    Example:
+        >>> pool = create_rcon_pool(size=3)
+        >>> pool.handle("agent_1").send_command("/sc rcon.print(game.tick)")
+    """
+    from FactoryVerse.infra.rcon_pool import RconPool
+    
+    return RconPool(
+        lambda: create_rcon_client(host, port, password, initialize=True),
+        size=size,
+        max_in_flight=max_in_flight,
+        **pool_options
+    )
+
+
 def validate_rcon_connection(
     host: str = "localhost",
     port: int = 27100,
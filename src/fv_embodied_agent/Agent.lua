@@ -367,7 +367,7 @@ end
 -- - types/agent/mining.lua: mine_resource, stop_mining
 -- - types/agent/crafting.lua: craft_enqueue, craft_dequeue
 -- - types/agent/placement.lua: place_entity, get_placement_cues
--- - types/agent/entity_ops.lua: set_entity_recipe, set_entity_filter, set_inventory_limit, get_inventory_item, set_inventory_item, pickup_entity
+-- - types/agent/entity_ops.lua: set_entity_recipe, set_entity_filter, set_inventory_limit, get_inventory_item, set_inventory_item, transfer_inventory_items, pickup_entity
 -- ============================================================================
 
 -- ============================================================================
@@ -299,6 +299,32 @@ The agent must have the items in their inventory.]],
             return self:set_inventory_item(entity_name, position, inventory_type, item_name, count)
         end,
     },
+    transfer_inventory_items = {
+        category = "inventory",
+        is_async = false,
+        doc = [[Run many put/take transfers between the agent and entities in one call.
+Each transfer succeeds or fails on its own; failures are reported per transfer.]],
+        paramspec = {
+            _param_order = { "transfers" },
+            transfers = {
+                type = "table",
+                required = true,
+                doc = "Array of {op = 'put'|'take', entity_name, position, inventory_type, item_name, count}",
+            },
+        },
+        returns = {
+            type = "result",
+            schema = {
+                success = { type = "boolean", doc = "True if every transfer succeeded" },
+                succeeded = { type = "number", doc = "Number of transfers that succeeded" },
+                failed = { type = "number", doc = "Number of transfers that failed" },
+                results = { type = "table", doc = "Per transfer {success, result} or {success, error}" },
+            },
+        },
+        func = function(self, transfers)
+            return self:transfer_inventory_items(transfers)
+        end,
+    },
 
     -- ========================================================================
     -- SYNC: Placement
@@ -433,6 +433,46 @@ function EntityOpsActions.get_inventory_item(self, entity_name, position, invent
     }
 end
 
+--- Run several inventory transfers in one call
+--- Each transfer is protected on its own, so one failing entity doesn't stop the rest.
+--- @param transfers table Array of {op = "put"|"take", entity_name, position, inventory_type, item_name, count}
+--- @return table Result {success, succeeded, failed, results = array of {success, result|error}}
+function EntityOpsActions.transfer_inventory_items(self, transfers)
+    local results = {}
+    local succeeded = 0
+    for i, transfer in ipairs(transfers or {}) do
+        local fn = nil
+        if transfer.op == "put" then
+            fn = EntityOpsActions.set_inventory_item
+        elseif transfer.op == "take" then
+            fn = EntityOpsActions.get_inventory_item
+        end
+        
+        if not fn then
+            results[i] = { success = false, error = "Agent: Unknown transfer op: " .. tostring(transfer.op) }
+        else
+            local ok, res = pcall(
+                fn, self, transfer.entity_name, transfer.position,
+                transfer.inventory_type, transfer.item_name, transfer.count
+            )
+            if ok then
+                succeeded = succeeded + 1
+                results[i] = { success = true, result = res }
+            else
+                -- Strip the "file:line: " prefix added by error()
+                results[i] = { success = false, error = (tostring(res):gsub("^.-:%d+: ", "")) }
+            end
+        end
+    end
+    
+    return {
+        success = succeeded == #results,
+        succeeded = succeeded,
+        failed = #results - succeeded,
+        results = results,
+    }
+end
+
 --- Set item in entity inventory (transfers from agent inventory)
 --- @param entity_name string Entity prototype name
 --- @param position table|nil Position {x, y} (nil to use agent position with radius search)
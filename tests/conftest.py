@@ -11,7 +11,8 @@ This configuration provides:
 
 import pytest
 from pathlib import Path
-from typing import Generator
+from typing import Any, Callable, Generator, List
+import json
 import subprocess
 import time
 
@@ -312,6 +313,63 @@ def empty_test_area(test_ground: TestGround):
     return (100, 100, 20, 20)
 
 
+# ============================================================================
+# Offline Factory Fixtures
+# ============================================================================
+
+class FakeRcon:
+    """RCON client stand-in: records commands and answers each with respond(command)."""
+
+    def __init__(self, respond: Callable[[str], Any]):
+        self.respond = respond
+        self.commands: List[str] = []
+
+    def send_command(self, command: str) -> str:
+        self.commands.append(command)
+        response = self.respond(command)
+        return response if isinstance(response, str) else json.dumps(response)
+
+
+@pytest.fixture
+def fake_rcon():
+    """
+    Build bare FakeRcon clients, e.g. for dsl.configure().
+
+    Returns:
+        make(respond) -> FakeRcon
+    """
+    return FakeRcon
+
+
+@pytest.fixture
+def fake_factory():
+    """
+    Build PlayingFactory instances over a FakeRcon (no Factorio server needed).
+
+    Call it with respond(command) -> response, a string or any JSON value.
+    Factories built with the same respond share one FakeRcon, like agents on
+    one server connection; it is available as factory._rcon.client. Pass an
+    ActionRegistry to complete async actions from the test instead of UDP.
+
+    Returns:
+        make(respond, agent_id="agent_1", registry=None) -> PlayingFactory
+    """
+    from FactoryVerse.dsl.recipe.base import Recipes
+    from FactoryVerse.dsl.technology.base import TechTree
+
+    servers = {}
+
+    def make(respond: Callable[[str], Any], agent_id: str = "agent_1", registry: Any = None) -> PlayingFactory:
+        server = servers.setdefault(respond, FakeRcon(respond))
+        factory = PlayingFactory(server, agent_id, Recipes([]), TechTree())
+        if registry is not None:
+            factory._async_listener.actions = registry
+            factory._async_listener.running = True  # no UDP socket in tests
+        return factory
+
+    return make
+
+
 # ============================================================================
 # Pytest Configuration
 # ============================================================================
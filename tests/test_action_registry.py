@@ -0,0 +1,68 @@
+"""Tests for future-based action tracking and the timer wheel."""
+
+import asyncio
+import threading
+
+import pytest
+
+from FactoryVerse.infra.action_registry import ActionRegistry, TimerWheel
+
+
+def test_timer_wheel_expires_across_levels():
+    """Test that timers fire within one tick of their deadline at every level, and cancelled ones never fire."""
+    wheel = TimerWheel(resolution=1.0, slots=8, levels=3, now=0)
+    deadlines = {"a": 3, "b": 8, "c": 20, "d": 100, "e": 700}
+    timers = {key: wheel.schedule(deadline, key) for key, deadline in deadlines.items()}
+    wheel.cancel(timers["c"])
+    assert len(wheel) == 4
+
+    fired = {}
+    for now in range(1, 800):
+        for key in wheel.advance(now):
+            fired[key] = now
+    assert fired == {"a": 3, "b": 8, "d": 100, "e": 700}
+    assert len(wheel) == 0
+
+
+async def test_registry_futures_early_results_timeouts_and_cleanup():
+    """Test early completions, timeouts, progress extension, cancellation cleanup and many in-flight actions."""
+    registry = ActionRegistry(resolution=0.01)
+
+    # Completion from the UDP thread before the RCON response was registered
+    thread = threading.Thread(target=registry.complete, args=("early", {"status": "completed"}))
+    thread.start()
+    thread.join()
+    registry.register("early")
+    assert await registry.wait("early", timeout=1) == {"status": "completed"}
+
+    registry.register("slow")
+    with pytest.raises(asyncio.TimeoutError):
+        await registry.wait("slow", timeout=0.05)
+    assert not registry.complete("slow", {"status": "completed"})  # late duplicate is dropped
+
+    # Progress pushes the deadline back
+    registry.register("walk", timeout=0.1)
+    waiter = asyncio.ensure_future(registry.wait("walk"))
+    for _ in range(4):
+        await asyncio.sleep(0.05)
+        registry.progress("walk", {"result": {"distance": 3}}, extend=True)
+    assert registry.get_progress("walk") == {"distance": 3}
+    threading.Thread(target=registry.complete, args=("walk", {"status": "completed"})).start()
+    assert (await waiter)["status"] == "completed"
+
+    registry.register("abandoned", timeout=10)
+    waiter = asyncio.ensure_future(registry.wait("abandoned"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+
+    ids = [f"a{i}" for i in range(5000)]
+    for action_id in ids:
+        registry.register(action_id, timeout=30)
+    waiters = asyncio.gather(*(registry.wait(action_id) for action_id in ids))
+    threading.Thread(target=lambda: [registry.complete(a, {"id": a}) for a in ids]).start()
+    assert [r["id"] for r in await waiters] == ids
+
+    assert len(registry) == 0
+    assert registry.stats["timeouts"] == 1
+    registry.close()
@@ -0,0 +1,53 @@
+"""Tests for the per-consumer map change feed."""
+
+from FactoryVerse.infra.change_feed import ChangeFeed, format_changes
+
+
+def _pos(x, y=0):
+    return {"x": x, "y": y}
+
+
+def test_deltas_are_compacted_per_cursor_and_filtered():
+    """Test that each cursor sees net changes since its own last read, filtered by kind and area."""
+    feed = ChangeFeed()
+    feed.record("entity", "added", "(lab:0,0)", position=_pos(0))  # nobody listening yet: dropped
+    assert feed.changes_since("planner")["count"] == 0
+    feed.register("builder")
+
+    feed.record("entity", "added", "(inserter:1,0)", name="inserter", position=_pos(1))
+    feed.record("entity", "modified", "(inserter:1,0)", position=_pos(1), direction="east")
+    feed.record("entity", "added", "(pipe:2,0)", position=_pos(2))
+    feed.record("entity", "removed", "(pipe:2,0)")
+    feed.record("entity", "removed", "(lab:0,0)", position=_pos(0))
+    feed.record("ghost", "added", "(ghost:500,0)", position=_pos(500))
+
+    delta = feed.changes_since("planner")
+    assert [e["key"] for e in delta["added"]] == ["(inserter:1,0)", "(ghost:500,0)"]
+    assert delta["added"][0]["direction"] == "east" and delta["added"][0]["name"] == "inserter"
+    assert [e["key"] for e in delta["removed"]] == ["(lab:0,0)"]
+    assert feed.changes_since("planner")["count"] == 0
+
+    near = feed.changes_since("builder", kinds=["entity"], area=(-10, -10, 10, 10))
+    assert [e["key"] for e in near["added"]] == ["(inserter:1,0)"]
+    assert "- entity (lab:0,0) @ (0, 0)" in format_changes(near)
+
+
+def test_status_transitions_and_truncation():
+    """Test that status snapshots become transitions and a lagging cursor is flagged truncated."""
+    feed = ChangeFeed(capacity=3)
+    feed.register("llm")
+    feed.record_statuses({"(lab:0,0)": {"status": "working", "x": 0, "y": 0}}, tick=60)  # baseline
+    feed.record_statuses({
+        "(lab:0,0)": {"status": "no_power", "x": 0, "y": 0},
+        "(boiler:4,4)": {"status": "working", "x": 4, "y": 4},
+    }, tick=120)
+
+    delta = feed.changes_since("llm", kinds=["status"])
+    assert [(e["key"], e["previous"], e["status"]) for e in delta["modified"]] == [("(lab:0,0)", "working", "no_power")]
+    assert [e["key"] for e in delta["added"]] == ["(boiler:4,4)"]
+    assert not delta["truncated"]
+
+    for x in range(5):
+        feed.record("entity", "added", f"(pipe:{x},0)", position=_pos(x))
+    delta = feed.changes_since("llm")
+    assert delta["truncated"] and len(delta["added"]) == 3
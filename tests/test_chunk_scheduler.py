@@ -0,0 +1,35 @@
+"""Tests for proximity-priority chunk load scheduling."""
+
+from FactoryVerse.infra.chunk_scheduler import ChunkLoadScheduler, chunk_of, route_chunks
+
+
+def test_pop_orders_by_agent_distance_and_urgent_preempts():
+    """Test that the nearest chunk loads first and an urgent chunk jumps the queue."""
+    scheduler = ChunkLoadScheduler()
+    for chunk in ((10, 10), (5, 0), (1, 1), (-3, 0)):
+        scheduler.push(chunk)
+    scheduler.set_focus("agent_1", {"x": 40, "y": 40})  # chunk (1, 1)
+
+    assert scheduler.pop() == (1, 1)
+    scheduler.mark_urgent((10, 10))
+    assert scheduler.pop() == (10, 10)
+
+    # Agent moved: priorities are re-evaluated at the next pop
+    scheduler.set_focus("agent_1", {"x": -90, "y": 5})
+    assert [scheduler.pop(), scheduler.pop(), scheduler.pop()] == [(-3, 0), (5, 0), None]
+
+
+def test_route_chunks_follow_walking_order():
+    """Test that route prefetch ranks chunks along the path ahead of nearer off-route chunks."""
+    assert chunk_of({"x": -0.5, "y": 31.9}) == (-1, 0)
+    route = route_chunks([{"x": 16, "y": 16}, {"x": 16 + 32 * 4, "y": 16}], radius=0)
+    assert route == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+
+    scheduler = ChunkLoadScheduler(near_radius=1)
+    for chunk in ((4, 0), (0, 3), (2, 0)):
+        scheduler.push(chunk)
+    scheduler.set_focus("agent_1", {"x": 16, "y": 16})
+    scheduler.set_route(route)
+
+    assert scheduler.pending_near() == []
+    assert [scheduler.pop() for _ in range(3)] == [(2, 0), (0, 3), (4, 0)]
@@ -0,0 +1,66 @@
+"""Tests for bulk inventory actions on entity collections."""
+
+import json
+import re
+from unittest.mock import Mock
+
+from FactoryVerse.dsl.entity.base import Furnace, WoodenChest
+from FactoryVerse.dsl.entity.collection import EntityCollection
+from FactoryVerse.dsl.entity.remote_view_entity import RemoteViewEntity
+from FactoryVerse.dsl.item.base import ItemStack
+from FactoryVerse.dsl.types import MapPosition
+
+
+def _transfers(command):
+    return json.loads(re.search(r"json_to_table\('(.*)'\)", command).group(1))[0]
+
+
+def transfer_inventory_items(command):
+    """Run transfer_inventory_items like the mod: the entity at x=9 is out of reach."""
+    results = []
+    for t in _transfers(command):
+        if t["position"]["x"] == 9:
+            results.append({"success": False, "error": "Agent: Entity is out of reach"})
+        elif t["op"] == "take":
+            results.append({"success": True, "result": {
+                "success": True, "item_name": "", "count": 4,
+                "items": [{"item_name": "iron-plate", "count": 4}],
+            }})
+        else:
+            results.append({"success": True, "result": {"success": True, "count": t["count"]}})
+    return {"results": results}
+
+
+def test_bulk_actions_run_in_one_call_with_per_entity_results(fake_factory, monkeypatch):
+    """Test one round trip per bulk action, client-side validation failures, and server-side partial failures."""
+    protos = Mock()
+    protos.is_fuel.side_effect = lambda name: name == "coal"
+    protos.get_fuel_category.return_value = "chemical"
+    protos.get_fuel_items.return_value = ["coal"]
+    monkeypatch.setattr("FactoryVerse.dsl.prototypes.get_item_prototypes", lambda: protos)
+
+    factory = fake_factory(transfer_inventory_items)
+    calls = factory._rcon.client.commands
+    furnaces = [Furnace("stone-furnace", MapPosition(x=x, y=0)) for x in (1, 3, 9)]
+    chest = WoodenChest("wooden-chest", MapPosition(x=5, y=0))
+    entities = EntityCollection(furnaces + [chest], factory=factory)
+
+    results = entities.add_fuel([ItemStack("coal", 5), ItemStack("coal", 2)])
+    assert len(calls) == 1 and len(_transfers(calls[0])) == 6
+    assert [r["success"] for r in results] == [True, True, False, False]
+    assert results[0]["results"] == [{"success": True, "count": 5}, {"success": True, "count": 2}]
+    assert results[2]["error"] == "Agent: Entity is out of reach"
+    assert results[3]["error"] == "wooden-chest does not accept fuel"
+
+    results = EntityCollection(furnaces, factory=factory).add_fuel([ItemStack("iron-ore", 5)])
+    assert len(calls) == 1 and not any(r["success"] for r in results)
+
+    # map_db results are read-only views; bulk actions still go through (the server checks reach)
+    views = EntityCollection([RemoteViewEntity(f) for f in furnaces], factory=factory)
+    results = views.take_products()
+    assert _transfers(calls[-1])[0] == {
+        "op": "take", "entity_name": "stone-furnace", "position": {"x": 1, "y": 0},
+        "inventory_type": "output", "item_name": "", "count": None,
+    }
+    assert [(s.name, s.count) for s in results[0]["items"]] == [("iron-plate", 4)]
+    assert [r["success"] for r in results] == [True, True, False]
@@ -0,0 +1,50 @@
+"""Tests for tick-versioned entity history."""
+
+import duckdb
+
+from FactoryVerse.infra.db.entity_history import EntityHistory, entities_as_of, entities_changed_since
+
+
+def _inserter(x, **extra):
+    return {"key": f"(inserter:{x},0)", "name": "inserter", "position": {"x": x, "y": 0}, **extra}
+
+
+def test_versions_answer_as_of_and_changed_since():
+    """Test that each op closes the previous version, replays are no-ops, and ticks select versions."""
+    con = duckdb.connect(":memory:")
+    history = EntityHistory(con)
+
+    assert history.record_upsert(_inserter(1, direction="north"), tick=100, op="created")
+    assert not history.record_upsert(_inserter(1, direction="north"), tick=150)  # log replay
+    assert history.record_upsert(_inserter(2), tick=200, op="created")
+    assert history.record_rotation("(inserter:1,0)", "east", tick=300)
+    assert history.record_destroy("(inserter:2,0)", tick=400)
+
+    at_250 = entities_as_of(con, 250)
+    assert [(r["entity_key"], r["state"].get("direction")) for r in at_250] == [
+        ("(inserter:1,0)", "north"), ("(inserter:2,0)", None),
+    ]
+    assert [r["entity_key"] for r in entities_as_of(con, 400)] == ["(inserter:1,0)"]
+
+    changes = entities_changed_since(con, 250)
+    assert [(r["op"], r["closed_by"]) for r in changes] == [
+        ("created", "rotated"), ("rotated", None), ("created", "destroyed"),
+    ]
+    assert con.execute("SELECT COUNT(*) FROM entity_history_current").fetchone()[0] == 1
+    con.close()
+
+
+def test_retention_drops_only_old_closed_versions():
+    """Test that retention by age and by row cap keeps every open version."""
+    con = duckdb.connect(":memory:")
+    history = EntityHistory(con, retention_ticks=1000, max_rows=3)
+    for tick in range(0, 5000, 500):
+        history.record_upsert(_inserter(1, tick=tick), tick=tick)
+    history.record_upsert(_inserter(2), tick=4600)
+
+    assert history.enforce_retention() > 0
+    rows = con.execute("SELECT valid_from_tick, valid_to_tick FROM entity_history ORDER BY 1").fetchall()
+    assert len(rows) == 3
+    assert rows[-2:] == [(4500, None), (4600, None)]
+    assert all(to is None or to >= 3600 for _, to in rows)
+    con.close()
@@ -0,0 +1,420 @@
+"""Tests for GameDataSyncService internals that don't need a live server."""
+
+import json
+import subprocess
+import sys
+
+import duckdb
+import pytest
+
+from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+
+@pytest.fixture
+def sync_service(tmp_path):
+    """Sync service over a minimal resource_entity table and a one-chunk snapshot dir."""
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    for key in ("tree-a", "tree-b", "tree-c"):
+        con.execute("INSERT INTO resource_entity VALUES (?)", [key])
+
+    chunk_dir = tmp_path / "snapshots" / "0" / "0"
+    chunk_dir.mkdir(parents=True)
+    (chunk_dir / "trees_rocks-update.jsonl").write_text(json.dumps({"op": "remove", "key": "tree-c"}) + "\n")
+
+    service = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    yield service, con, chunk_dir
+    con.close()
+
+
+def _keys(con):
+    return sorted(r[0] for r in con.execute("SELECT entity_key FROM resource_entity").fetchall())
+
+
+async def test_sequence_gap_replays_chunk_log_from_offset(sync_service):
+    """Test that a sequence gap replays only the unapplied tail of the chunk's update log."""
+    service, con, chunk_dir = sync_service
+    await service._load_chunk(0, 0)
+    assert _keys(con) == ["tree-a", "tree-b"]
+
+    await service._process_update("chunk_charted", {"sequence": 1, "chunk": {"x": 0, "y": 0}})
+
+    # Packet 2 (announcing this removal) is lost; the log still has it
+    with open(chunk_dir / "trees_rocks-update.jsonl", "a") as f:
+        f.write(json.dumps({"op": "remove", "key": "tree-a"}) + "\n")
+
+    await service._process_update("chunk_charted", {"sequence": 3, "chunk": {"x": 0, "y": 0}})
+    await service._repair_task
+
+    assert _keys(con) == ["tree-b"]
+    stats = service.get_sequence_gap_stats()
+    assert stats["total_gaps"] == 1
+    assert stats["stale_chunks"] == []
+    assert stats["repairs"]["completed"] == 1
+    assert stats["repairs"]["entries_replayed"] == 1
+
+
+async def test_gap_without_chunk_is_unattributed(sync_service):
+    """Test that gaps on chunk-less events are counted but trigger no repair."""
+    service, _, _ = sync_service
+    await service._process_update("chunk_charted", {"sequence": 10})
+    await service._process_update("chunk_charted", {"sequence": 12})
+
+    stats = service.get_sequence_gap_stats()
+    assert stats["total_gaps"] == 1
+    assert stats["repairs"]["scheduled"] == 0
+    assert stats["repairs"]["unattributed_gaps"] == 1
+
+
+async def test_ensure_synced_fast_path_and_drain(sync_service):
+    """Test that ensure_synced returns at once when caught up and drains when not running."""
+    service, _, _ = sync_service
+    assert service.is_synced()
+    await service.ensure_synced()
+
+    service._handle_chunk_charted({"sequence": 5, "tick": 300, "chunk": {"x": 1, "y": 1}})
+    assert not service.is_synced()
+
+    await service.ensure_synced()
+
+    assert service.is_synced()
+    assert service.get_watermark()["sequence"] == 5
+    assert service.get_watermark()["tick"] == 300
+
+
+async def test_wait_for_watermark_wakes_on_apply(sync_service):
+    """Test that watermark waiters are released once the update is applied."""
+    import asyncio
+
+    service, _, _ = sync_service
+    assert await service.wait_for_watermark(sequence=-1)
+
+    waiter = asyncio.create_task(service.wait_for_watermark(sequence=7, tick=60, timeout=2.0))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await service._process_update("chunk_charted", {"sequence": 7, "tick": 60})
+    assert await waiter
+
+    assert not await service.wait_for_watermark(sequence=8, timeout=0.01, raise_on_timeout=False)
+
+
+async def test_required_chunks_are_awaited_concurrently(sync_service):
+    """Test that in-progress chunk snapshots required by ensure_synced are awaited together."""
+    import asyncio
+
+    service, _, _ = sync_service
+    for chunk in ((2, 0), (3, 0)):
+        await service._process_update("snapshot_state", {"state": "WRITE", "chunk": {"x": chunk[0], "y": chunk[1]}})
+
+    sync_task = asyncio.create_task(service.ensure_synced(timeout=2.0, required_chunks=[(2, 0), (3, 0)]))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert len(service._completion_events) == 2
+
+    for chunk in ((3, 0), (2, 0)):
+        await service._process_update("snapshot_state", {"state": "COMPLETE", "chunk": {"x": chunk[0], "y": chunk[1]}})
+    await asyncio.wait_for(sync_task, timeout=1.0)
+
+
+async def test_readers_never_see_half_loaded_chunk(sync_service, tmp_path):
+    """Test that a reader cursor sees a chunk load atomically."""
+    service, con, _ = sync_service
+    chunk_dir = tmp_path / "snapshots" / "1" / "0"
+    chunk_dir.mkdir(parents=True)
+    (chunk_dir / "trees_rocks-update.jsonl").write_text(
+        json.dumps({"op": "remove", "key": "tree-a"}) + "\n" + json.dumps({"op": "remove", "key": "tree-b"}) + "\n"
+    )
+    reader = service.reader()
+    seen = []
+    original_apply = service._apply_update_log
+
+    async def observing_apply(chunk_key, log_name, entries):
+        await original_apply(chunk_key, log_name, entries)
+        seen.append(sorted(r[0] for r in reader.execute("SELECT entity_key FROM resource_entity").fetchall()))
+
+    service._apply_update_log = observing_apply
+    version = service.get_watermark()["version"]
+    await service._load_chunk(1, 0)
+
+    assert all(keys == ["tree-a", "tree-b", "tree-c"] for keys in seen)
+    assert sorted(r[0] for r in reader.execute("SELECT entity_key FROM resource_entity").fetchall()) == ["tree-c"]
+    assert service.get_watermark()["version"] == version + 1
+    reader.close()
+
+
+async def test_latency_stats_recorded_per_op_type(sync_service):
+    """Test that applied updates land in per-op-type latency histograms."""
+    service, _, _ = sync_service
+    service._handle_entity_operation({"op": "destroyed", "entity_key": "chest:1,1", "entity_name": "tree-x", "tick": 5})
+    service._handle_chunk_charted({"tick": 6})
+
+    await service.ensure_synced()
+
+    stats = service.get_sync_latency_stats()
+    assert stats["visible_ms"]["entity_operation.destroyed"]["count"] == 1
+    assert stats["visible_ms"]["chunk_charted"]["count"] == 1
+    assert stats["queue_depth"]["count"] == 2
+
+
+async def test_completed_chunks_load_nearest_first(sync_service, tmp_path):
+    """Test that COMPLETE chunks are queued and ensure_synced only waits for chunks near the agent."""
+    import asyncio
+
+    service, con, _ = sync_service
+    (tmp_path / "snapshots" / "9" / "9").mkdir(parents=True)
+    service.set_agent_position("agent_1", {"x": 5, "y": 5})
+
+    for chunk in ((9, 9), (0, 0)):
+        await service._process_update("snapshot_state", {"state": "COMPLETE", "chunk": {"x": chunk[0], "y": chunk[1]}})
+    assert not service.is_synced()
+
+    await service.ensure_synced()
+    assert service.is_chunk_loaded(0, 0)
+    assert _keys(con) == ["tree-a", "tree-b"]
+    assert service.is_synced()
+
+    await asyncio.wait_for(service._load_task, timeout=1.0)
+    assert service.is_chunk_loaded(9, 9)
+    assert service.get_chunk_load_stats()["pending"] == 0
+
+
+async def test_bootstrap_streams_chunks_and_reconciles_by_size(sync_service, tmp_path):
+    """Test that on-disk chunks stream in once and reconciliation only picks up changed files."""
+    service, con, _ = sync_service
+    for column in ("name", "type", "position"):
+        con.execute(f"ALTER TABLE resource_entity ADD COLUMN {column} VARCHAR")
+
+    def write_chunk(x, key):
+        chunk_dir = tmp_path / "snapshots" / str(x) / "0"
+        chunk_dir.mkdir(parents=True)
+        (chunk_dir / "trees_rocks_init.jsonl").write_text(
+            json.dumps({"key": key, "name": "rock-big", "position": {"x": x * 32, "y": 1}}) + "\n"
+        )
+        return chunk_dir
+
+    rock_dir = write_chunk(2, "rock-1")
+    assert service.schedule_snapshot_chunks() == 1
+    await service._load_task
+    assert "rock-1" in _keys(con)
+
+    # After bootstrap: a rock was mined and a new chunk was snapshotted
+    (rock_dir / "trees_rocks-update.jsonl").write_text(json.dumps({"op": "remove", "key": "rock-1"}) + "\n")
+    write_chunk(3, "rock-2")
+    stats = await service.reconcile_snapshot_files()
+
+    assert stats["loaded"] == 1 and stats["reloaded"] == 0
+    assert stats["log_entries_replayed"] == 1
+    assert _keys(con) == ["rock-2", "tree-a", "tree-b", "tree-c"]
+
+    service._handle_system_phase_changed({"event_type": "system_phase_changed", "phase": "MAINTENANCE"})
+    await service.ensure_synced()
+    assert await service.wait_for_maintenance(timeout=0.1)
+
+
+async def test_ensure_synced_for_waits_only_on_queried_chunks(sync_service):
+    """Test that a chunk-scoped sync returns once its own chunk's updates apply, ignoring others."""
+    import asyncio
+
+    service, _, _ = sync_service
+    service._running = True  # Updates are applied by the (simulated) background loop
+    near = {"sequence": 1, "chunk": {"x": 1, "y": 1}}
+    far = {"sequence": 2, "chunk": {"x": 5, "y": 5}}
+    service._handle_chunk_charted(near)
+    service._handle_chunk_charted(far)
+    assert not service.chunks_synced([(1, 1)])
+
+    waiter = asyncio.create_task(service.ensure_synced_for([(1, 1)], timeout=2.0))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await service._process_update("chunk_charted", near)
+    await asyncio.wait_for(waiter, timeout=1.0)
+
+    assert service.chunks_synced([(1, 1)])
+    assert not service.chunks_synced([(5, 5)])
+    assert not service.is_synced()
+    service._running = False
+
+
+async def test_memory_budget_evicts_far_chunk_detail_and_reloads_on_query(tmp_path):
+    """Test that far chunks lose tile detail over budget and get it back when a query touches them."""
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TYPE map_position AS STRUCT(x DOUBLE, y DOUBLE)")
+    con.execute("CREATE TABLE resource_tile (entity_key VARCHAR PRIMARY KEY, name VARCHAR, position map_position, amount INTEGER)")
+    con.execute("CREATE TABLE water_tile (entity_key VARCHAR PRIMARY KEY, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY, name VARCHAR, type VARCHAR, position map_position)")
+    for x in (0, 4):
+        chunk_dir = tmp_path / "snapshots" / str(x) / "0"
+        chunk_dir.mkdir(parents=True)
+        tiles = [{"kind": "iron-ore", "x": x * 32 + i, "y": 3, "amount": 500} for i in range(3)]
+        (chunk_dir / "resources_init.jsonl").write_text("".join(json.dumps(t) + "\n" for t in tiles))
+        (chunk_dir / "trees_rocks_init.jsonl").write_text(
+            json.dumps({"key": f"tree-{x}", "name": "tree-01", "position": {"x": x * 32 + 5.5, "y": 9.5}}) + "\n"
+        )
+    service = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    service.set_agent_position("agent_1", {"x": 1, "y": 1})
+    for chunk in ((0, 0), (4, 0)):
+        await service._process_update("snapshot_state", {"state": "COMPLETE", "chunk": {"x": chunk[0], "y": chunk[1]}})
+    await service.load_all_complete_chunks()
+
+    await service.set_memory_budget(5)
+
+    # The far chunk is evicted even though it was loaded last; the agent's chunk stays
+    assert not service.is_chunk_resident(4, 0) and service.is_chunk_resident(0, 0)
+    assert con.execute("SELECT COUNT(*) FROM resource_tile").fetchone()[0] == 3
+    assert service.get_memory_stats()["detail_rows"] == 4
+
+    # Mined while evicted: the tree removal is replayed on reload
+    (tmp_path / "snapshots" / "4" / "0" / "trees_rocks-update.jsonl").write_text(
+        json.dumps({"op": "remove", "key": "tree-4"}) + "\n"
+    )
+    await service.ensure_synced_for([(4, 0)])
+
+    assert service.is_chunk_resident(4, 0)
+    assert con.execute("SELECT COUNT(*) FROM resource_tile WHERE position.x >= 128").fetchone()[0] == 3
+    assert con.execute("SELECT entity_key FROM resource_entity ORDER BY 1").fetchall() == [("tree-0",)]
+    stats = service.get_memory_stats()
+    assert stats["evicted"] == 1 and stats["reloaded"] == 1
+    con.close()
+
+
+async def test_memory_budget_evicts_before_agent_position_is_known(tmp_path):
+    """Test that the budget applies at load time, when no agent position has been reported yet."""
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TYPE map_position AS STRUCT(x DOUBLE, y DOUBLE)")
+    con.execute("CREATE TABLE resource_tile (entity_key VARCHAR PRIMARY KEY, name VARCHAR, position map_position, amount INTEGER)")
+    con.execute("CREATE TABLE water_tile (entity_key VARCHAR PRIMARY KEY, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY, name VARCHAR, type VARCHAR, position map_position)")
+    for x in (0, 4):
+        chunk_dir = tmp_path / "snapshots" / str(x) / "0"
+        chunk_dir.mkdir(parents=True)
+        tiles = [{"kind": "iron-ore", "x": x * 32 + i, "y": 3, "amount": 500} for i in range(3)]
+        (chunk_dir / "resources_init.jsonl").write_text("".join(json.dumps(t) + "\n" for t in tiles))
+    service = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    for chunk in ((0, 0), (4, 0)):
+        await service._process_update("snapshot_state", {"state": "COMPLETE", "chunk": {"x": chunk[0], "y": chunk[1]}})
+    await service.load_all_complete_chunks()
+
+    await service.set_memory_budget(3)
+
+    stats = service.get_memory_stats()
+    assert stats["evicted_chunks"] == 1 and stats["detail_rows"] == 3
+    assert con.execute("SELECT COUNT(*) FROM resource_tile").fetchone()[0] == 3
+    con.close()
+
+
+async def test_resnapshotted_chunk_drops_rows_missing_from_new_snapshot(tmp_path):
+    """Test that reconciliation replaces a re-snapshotted chunk's rows instead of only upserting."""
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TYPE map_position AS STRUCT(x DOUBLE, y DOUBLE)")
+    con.execute("CREATE TABLE resource_tile (entity_key VARCHAR PRIMARY KEY, name VARCHAR, position map_position, amount INTEGER)")
+    con.execute("CREATE TABLE water_tile (entity_key VARCHAR PRIMARY KEY, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY, name VARCHAR, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE map_entity (entity_key VARCHAR PRIMARY KEY, entity_name VARCHAR, position map_position)")
+    for table in ("inserter", "transport_belt", "mining_drill", "assemblers", "pumpjack", "electric_pole"):
+        con.execute(f"CREATE TABLE {table} (entity_key VARCHAR)")
+    con.execute(
+        "INSERT INTO map_entity VALUES ('chest-old', 'wooden-chest', {'x': 4.5, 'y': 4.5}), "
+        "('chest-far', 'wooden-chest', {'x': 40.5, 'y': 4.5})"
+    )
+    con.execute("INSERT INTO inserter VALUES ('chest-old')")
+
+    chunk_dir = tmp_path / "snapshots" / "0" / "0"
+    chunk_dir.mkdir(parents=True)
+
+    def write_rocks(*keys):
+        (chunk_dir / "trees_rocks_init.jsonl").write_text("".join(
+            json.dumps({"key": key, "name": "rock-big", "position": {"x": 2 + i, "y": 1}}) + "\n"
+            for i, key in enumerate(keys)
+        ))
+
+    write_rocks("rock-1", "rock-22")
+    service = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    await service.reconcile_snapshot_files()
+    assert _keys(con) == ["rock-1", "rock-22"]
+
+    # A reload that fails leaves the chunk loaded with its old rows
+    async def broken_load(chunk_x, chunk_y):
+        raise OSError("snapshot file vanished")
+
+    write_rocks("rock-3")
+    real_load, service._load_chunk = service._load_chunk, broken_load
+    assert (await service.reconcile_snapshot_files())["reloaded"] == 0
+    assert (0, 0) in service._loaded_chunks and ((0, 0), "trees_rocks-update.jsonl") in service._log_offsets
+    assert _keys(con) == ["rock-1", "rock-22"]
+
+    service._load_chunk = real_load
+    await service.enable_history()
+    service.change_feed.register("planner")
+    stats = await service.reconcile_snapshot_files()
+
+    assert stats["reloaded"] == 1
+    assert _keys(con) == ["rock-3"]
+    assert con.execute("SELECT entity_key FROM map_entity").fetchall() == [("chest-far",)]
+    assert con.execute("SELECT COUNT(*) FROM inserter").fetchone()[0] == 0
+    # Removals go through the same hooks as entity_destroyed
+    assert [c["key"] for c in service.change_feed.changes_since("planner")["removed"]] == ["chest-old"]
+    assert con.execute("SELECT closed_by FROM entity_history WHERE entity_key = 'chest-old'").fetchall() == [("destroyed",)]
+    con.close()
+
+
+async def test_load_snapshots_after_configure_does_not_load_twice(fake_factory, tmp_path, monkeypatch):
+    """Test that load_snapshots() on an already loaded factory only starts sync and picks up new chunks."""
+    factory = fake_factory(lambda command: {})
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    (tmp_path / "snapshots").mkdir()
+    factory._duckdb_connection = con
+    factory._game_data_sync = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+
+    async def no_wait(timeout):
+        pass
+
+    async def full_load(*args, **kwargs):
+        raise AssertionError("map loaded twice")
+
+    monkeypatch.setattr(factory, "_wait_for_bootstrap_complete", no_wait)
+    monkeypatch.setattr(factory, "_stream_bootstrap", full_load)
+    monkeypatch.setattr(factory, "_load_snapshots_sync", full_load)
+    await factory.load_snapshots(snapshot_dir=tmp_path / "snapshots")
+
+    assert factory._game_data_sync.is_running
+    await factory._stop_game_data_sync()
+    con.close()
+
+
+def test_map_db_connection_reuses_one_reader_per_thread(fake_factory):
+    """Test that map_db.connection hands each thread one cursor that keeps seeing new commits."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from FactoryVerse.dsl import dsl
+    from FactoryVerse.dsl.types import _playing_factory
+
+    factory = fake_factory(lambda command: {})
+    factory._duckdb_connection = duckdb.connect(":memory:")
+    factory._duckdb_connection.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    token = _playing_factory.set(factory)
+    try:
+        reader = dsl.map_db.connection
+        assert all(dsl.map_db.connection is reader for _ in range(100))
+        factory._duckdb_connection.execute("INSERT INTO resource_entity VALUES ('tree-a')")
+        assert reader.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 1
+
+        def other_thread_reader():
+            _playing_factory.set(factory)
+            return dsl.map_db.connection
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(other_thread_reader).result() is not reader
+    finally:
+        _playing_factory.reset(token)
+        factory._duckdb_connection.close()
+
+
+@pytest.mark.parametrize("module", ["FactoryVerse.infra.game_data_sync", "FactoryVerse.infra.shared_map"])
+def test_sync_modules_import_first(module):
+    """Test that the sync modules import in a fresh interpreter (no DSL <-> loader import cycle)."""
+    result = subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,66 @@
+"""Tests for fanning actions out to several agents."""
+
+import json
+import re
+import threading
+
+import pytest
+
+from FactoryVerse.dsl.multi_agent import MultiAgentFactory
+from FactoryVerse.dsl.recipe.base import Recipes
+from FactoryVerse.dsl.types import MapPosition
+from FactoryVerse.infra.action_registry import ActionRegistry
+
+CALL_RE = re.compile(r"remote\.call\('(\w+)', '(\w+)', table\.unpack\(helpers\.json_to_table\('(.*?)'\)\)\)")
+
+
+async def test_walk_agents_in_one_round_trip(fake_factory):
+    """Test one batched enqueue for all agents, gathered completions and per-agent failures."""
+    registry = ActionRegistry()
+
+    def respond(command):
+        """Answer batched enqueues and report completions over the registry like the UDP thread."""
+        outcomes = []
+        for agent_id, method, args in CALL_RE.findall(command):
+            args = json.loads(args)
+            if agent_id == "agent_3":
+                outcomes.append({"ok": False, "error": "Agent: no path found"})
+                continue
+            action_id = f"{method}_{agent_id}"
+            outcomes.append({"ok": True, "result": {"queued": True, "action_id": action_id}})
+            # Completion can beat the RCON response back to the client
+            threading.Thread(target=registry.complete, args=(action_id, {
+                "status": "completed", "success": True, "action_id": action_id,
+                "result": {"position": args[0]},
+            })).start()
+        return outcomes
+
+    factories = [fake_factory(respond, f"agent_{i}", registry) for i in range(1, 5)]
+    server = factories[0]._rcon.client
+
+    agents = MultiAgentFactory(factories)
+    targets = {f"agent_{i}": MapPosition(x=10 * i, y=0) for i in range(1, 5)}
+    report = await agents.walk_to(targets, timeout=5)
+
+    assert len(server.commands) == 1
+    assert report.succeeded == ["agent_1", "agent_2", "agent_4"] and report.failed == ["agent_3"]
+    assert report["agent_2"]["result"]["position"] == {"x": 20, "y": 0}
+    assert "no path found" in str(report.errors["agent_3"])
+    assert not report.ok
+    assert len(registry) == 0
+    registry.close()
+
+
+async def test_craft_validates_every_recipe_before_sending(fake_factory):
+    """Test that one agent's non-hand-craftable recipe fails the fleet craft before any round trip."""
+    factories = [fake_factory(lambda command: [], f"agent_{i}") for i in (1, 2)]
+    for factory in factories:
+        factory.recipes = Recipes([
+            {"name": "iron-gear-wheel", "ingredients": [{"name": "iron-plate", "amount": 2}]},
+            {"name": "iron-plate", "category": "smelting", "ingredients": [{"name": "iron-ore"}]},
+        ])
+
+    agents = MultiAgentFactory(factories)
+    with pytest.raises(ValueError, match="iron-plate is not hand-craftable"):
+        await agents.craft({"agent_1": ("iron-gear-wheel", 5), "agent_2": "iron-plate"})
+    assert factories[0]._rcon.client.commands == []
@@ -0,0 +1,59 @@
+"""Tests for inferring the chunks a map_db query can touch."""
+
+from FactoryVerse.infra.db.query_extent import infer_query_chunks, infer_query_extents
+
+
+def test_spatial_predicates_resolve_to_chunk_sets():
+    """Test that distance, envelope and range predicates (literal or ? params) map to chunks."""
+    sql = "SELECT * FROM map_entity WHERE ST_Distance(position, ST_Point(?, ?)) < ? AND entity_name = 'inserter'"
+    assert infer_query_extents(sql, [100, 40, 10]) == [(90.0, 30.0, 110.0, 50.0)]
+    assert infer_query_chunks(sql, [100, 40, 10], margin=0) == {(2, 0), (3, 0), (2, 1), (3, 1)}
+
+    envelope = "SELECT * FROM resource_tile WHERE ST_Within(position, ST_MakeEnvelope(0, 0, 31, 31))"
+    assert infer_query_chunks(envelope, margin=0) == {(0, 0)}
+
+    ranged = "SELECT * FROM map_entity e WHERE e.position.x BETWEEN -40 AND -1 AND e.position.y >= 0 AND e.position.y < 10"
+    assert infer_query_chunks(ranged, margin=0) == {(-2, 0), (-1, 0)}
+
+
+def test_unbounded_queries_fall_back_to_full_sync():
+    """Test that OR, subqueries, one-axis ranges and unresolvable params give no extent."""
+    assert infer_query_chunks("SELECT entity_name, COUNT(*) FROM map_entity GROUP BY 1") is None
+    assert infer_query_chunks(
+        "SELECT * FROM map_entity WHERE ST_Distance(position, ST_Point(0, 0)) < 5 OR entity_name = 'lab'"
+    ) is None
+    assert infer_query_chunks(
+        "SELECT * FROM map_entity WHERE entity_key IN (SELECT entity_key FROM map_entity WHERE position.x < 5)"
+    ) is None
+    assert infer_query_chunks("SELECT * FROM map_entity WHERE position.x < 5 AND position.x > 0") is None
+    assert infer_query_chunks("SELECT * FROM map_entity WHERE ST_DWithin(position, ST_Point(?, ?), 5)", []) is None
+    assert infer_query_chunks("SELECT * FROM map_entity WHERE ST_Distance(position, ST_Point(0, 0)) < 1000000") is None
+
+
+def test_only_where_restrictions_bound_the_query():
+    """Test that negated, select-list, not-equal and lower-bound distance predicates give no extent."""
+    assert infer_query_chunks(
+        "SELECT * FROM map_entity WHERE NOT ST_Within(position, ST_MakeEnvelope(0, 0, 10, 10))"
+    ) is None
+    assert infer_query_chunks(
+        "SELECT ST_Distance(position, ST_Point(0, 0)) < 5 AS near FROM map_entity"
+    ) is None
+    assert infer_query_chunks(
+        "SELECT ST_Distance(position, ST_Point(0, 0)) < 5 AS near FROM map_entity WHERE entity_name = 'lab'"
+    ) is None
+    assert infer_query_chunks(
+        "SELECT * FROM map_entity WHERE ST_Distance(position, ST_Point(0, 0)) > 5 AND position.x BETWEEN 0 AND 10"
+        " AND position.y BETWEEN 0 AND 10"
+    ) is None
+    assert infer_query_chunks("SELECT * FROM map_entity WHERE 5 < ST_Distance(position, ST_Point(0, 0))") is None
+    assert infer_query_chunks(
+        "SELECT * FROM map_entity e WHERE e.position.x <> 3 AND e.position.x BETWEEN 0 AND 10"
+        " AND e.position.y BETWEEN 0 AND 10"
+    ) is None
+
+    # Parameters before the WHERE clause still resolve by position
+    sql = (
+        "SELECT ST_Distance(position, ST_Point(?, ?)) AS d FROM map_entity "
+        "WHERE 10 >= ST_Distance(position, ST_Point(?, ?)) ORDER BY d LIMIT 5"
+    )
+    assert infer_query_extents(sql, [0, 0, 100, 40]) == [(90.0, 30.0, 110.0, 50.0)]
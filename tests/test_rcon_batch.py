@@ -0,0 +1,69 @@
+"""Tests for batching remote interface calls into one RCON round trip."""
+
+import json
+import re
+
+import pytest
+
+from FactoryVerse.infra.rcon_batch import BatchCallError, RconBatch
+
+
+class FakeRcon:
+    """Answers batch chunks by echoing each call's method (or failing it)."""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, chunk):
+        self.commands.append(chunk)
+        outcomes = []
+        for method, args in re.findall(r"remote\.call\('agent_1', '(\w+)'(?:, table\.unpack\(helpers\.json_to_table\('(.*?)'\)\))?\)", chunk):
+            if method == "boom":
+                outcomes.append({"ok": False, "error": "entity not found"})
+            else:
+                outcomes.append({"ok": True, "result": {"method": method, "args": json.loads(args or "[]")}})
+        return json.dumps(outcomes)
+
+
+def _build_call(method, *args):
+    call = f"remote.call('agent_1', '{method}'"
+    if args:
+        call += f", table.unpack(helpers.json_to_table('{json.dumps(list(args))}'))"
+    return call + ")"
+
+
+async def test_calls_share_one_round_trip_and_resolve_individually():
+    """Test that queued calls go out as one chunk and each future gets its own outcome."""
+    rcon = FakeRcon()
+    async with RconBatch(_build_call, rcon.execute) as b:
+        furnaces = [b.call("inspect_entity", "stone-furnace", {"x": x, "y": 0}) for x in range(30)]
+        failing = b.call("boom")
+
+    assert len(rcon.commands) == 1 and rcon.commands[0].count("pcall(") == 31
+    assert rcon.commands[0].endswith("rcon.print(helpers.table_to_json(r))")
+    assert furnaces[7].result() == {"method": "inspect_entity", "args": ["stone-furnace", {"x": 7, "y": 0}]}
+    with pytest.raises(BatchCallError, match="entity not found"):
+        failing.result()
+    assert b.stats == {"calls": 31, "round_trips": 1, "errors": 1}
+
+
+async def test_large_batches_split_and_bad_responses_fail_the_chunk():
+    """Test splitting by command size, cancellation on error, and whole-chunk failures."""
+    rcon = FakeRcon()
+    batch = RconBatch(_build_call, rcon.execute, max_command_bytes=400)
+    futures = [batch.call("get_position") for _ in range(10)]
+    assert await batch.flush() == len(rcon.commands) > 1
+    assert all(len(c) <= 400 for c in rcon.commands)
+    assert all(f.result() == {"method": "get_position", "args": []} for f in futures)
+
+    with pytest.raises(ValueError):
+        async with RconBatch(_build_call, rcon.execute) as b:
+            dropped = b.call("get_position")
+            raise ValueError("script error")
+    assert dropped.cancelled()
+
+    broken = RconBatch(_build_call, lambda chunk: "Cannot execute command. Error: syntax")
+    future = broken.call("get_position")
+    await broken.flush()
+    with pytest.raises(RuntimeError, match="Unexpected batch response"):
+        future.result()
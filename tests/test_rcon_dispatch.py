@@ -0,0 +1,70 @@
+"""Tests for compact RCON calls through the in-game dispatcher."""
+
+import json
+import re
+
+from FactoryVerse.infra import rcon_dispatch
+from FactoryVerse.infra.rcon_pool import classify_command
+
+INTERFACES = {"agent_1": {"walk_to": True, "inspect": True, "inspect_entity": True}, "agent": {"create_agent": True}}
+
+
+class FakeGame:
+    """Answers the handshake and compact calls like the game would."""
+
+    def __init__(self):
+        self.registered = None
+        self.introspections = 0
+
+    def __call__(self, command):
+        if "script.active_mods" in command:
+            return "0.1.3"
+        if command == rcon_dispatch.INTERFACES_COMMAND:
+            self.introspections += 1
+            return INTERFACES
+        if "function fvd" in command:
+            self.registered = json.loads(re.search(r"json_to_table\('(.*?)'\)\) do", command).group(1))
+            return "fv_ok"
+        match = re.match(r"/sc fvd\('(\w+)',(\d+)(?:,'(.*)')?\)$", command)
+        if match:
+            if self.registered is None:
+                return "Cannot execute command. Error: [string \"fvd(...)\"]:1: attempt to call a nil value (global 'fvd')"
+            if match.group(1) not in self.registered:
+                return "Cannot execute command. Error: [string \"fvd(...)\"]:1: fv_unregistered"
+            method = self.registered[match.group(1)][int(match.group(2)) - 1]
+            return {"method": method, "args": json.loads(match.group(3) or "[]")}
+        return {"full": command}
+
+
+def test_compact_calls_after_handshake_and_reregistration(fake_factory):
+    """Test that calls shrink to opcodes, interfaces are cached per mod version, and a lost dispatcher is re-registered."""
+    rcon_dispatch._INTERFACE_CACHE.clear()
+    server = FakeGame()
+    factory = fake_factory(server)
+    full = factory._build_command("inspect_entity", "stone-furnace", {"x": 1, "y": 2})
+
+    assert factory.enable_dispatcher()
+    compact = factory._build_command("inspect_entity", "stone-furnace", {"x": 1, "y": 2})
+    assert compact == "fvd('agent_1',2,'[\"stone-furnace\",{\"x\":1,\"y\":2}]')"
+    assert len(compact) < len(full) / 2
+    assert factory._build_remote_call("walk_to", {"x": 0, "y": 0}).startswith("fvc('agent_1',3,")
+    assert classify_command("/sc " + factory._build_command("walk_to", {"x": 0, "y": 0})) == "action"
+    assert factory._execute_and_parse_json(compact) == {
+        "method": "inspect_entity", "args": ["stone-furnace", {"x": 1, "y": 2}],
+    }
+
+    # Save loaded: console globals are gone, the next call re-registers and resends
+    server.registered = None
+    assert factory._execute_and_parse_json(factory._build_command("inspect"))["method"] == "inspect"
+    assert factory._dispatcher.stats["handshakes"] == 2
+
+    # Dispatcher registered without this agent's method table: same recovery
+    del server.registered["agent_1"]
+    assert factory._execute_and_parse_json(factory._build_command("inspect"))["method"] == "inspect"
+    assert factory._dispatcher.stats["handshakes"] == 3
+
+    # A reconnecting agent reuses the cached interfaces for this mod version
+    other_server = FakeGame()
+    other = fake_factory(other_server)
+    assert other.enable_dispatcher()
+    assert other_server.introspections == 0
@@ -0,0 +1,133 @@
+"""Tests for the RCON connection pool and its fair scheduling."""
+
+import threading
+import time
+
+import pytest
+from factorio_rcon import RCONReceiveError, RCONSendError
+
+from FactoryVerse.infra.rcon_pool import FairQueue, RconPool, classify_command
+
+
+def test_fair_queue_shares_by_weight_and_class():
+    """Test that a chatty agent doesn't starve others and actions overtake bulk reads."""
+    assert classify_command("/sc rcon.print(helpers.table_to_json(remote.call('agent_1', 'walk_to', x)))") == "action"
+    assert classify_command("/sc rcon.print(helpers.table_to_json(remote.call('agent_1', 'get_reachable')))") == "bulk"
+    assert classify_command("/sc rcon.print(game.tick)") == "query"
+
+    queue = FairQueue()
+    for i in range(6):
+        queue.push(f"a{i}", "agent_a", "query")
+    queue.push("b0", "agent_b", "query")
+    queue.push("b1", "agent_b", "query")
+    assert [queue.pop() for _ in range(4)] == ["a0", "b0", "a1", "b1"]
+
+    queue = FairQueue(agent_weights={"agent_a": 2.0})
+    for i in range(4):
+        queue.push(f"bulk{i}", "agent_a", "bulk")
+    queue.push("walk", "agent_b", "action")
+    assert queue.pop() == "walk"
+
+
+class FakeClient:
+    """Records concurrency; fails the first round trip if told to."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.closed = False
+
+    def send_commands(self, commands):
+        with FakeClient.lock:
+            FakeClient.active += len(commands)
+            FakeClient.peak = max(FakeClient.peak, FakeClient.active)
+        try:
+            time.sleep(0.02)
+            if self.fail_with is not None:
+                raise self.fail_with
+            return {key: f"ok:{command}" for key, command in commands.items()}
+        finally:
+            with FakeClient.lock:
+                FakeClient.active -= len(commands)
+
+    def send_command(self, command):
+        return self.send_commands({0: command})[0]
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_caps_in_flight_and_reconnects():
+    """Test the in-flight cap, retry after a send failure, and no retry after a lost response."""
+    clients = [FakeClient(fail_with=RCONSendError("broken pipe"))]
+
+    def connect():
+        client = clients.pop(0) if clients else FakeClient()
+        return client
+
+    pool = RconPool(connect, size=3, max_in_flight=2, pipeline=2)
+    futures = [pool.handle(f"agent_{i % 2}").submit(f"/sc {i}") for i in range(12)]
+    assert [f.result(timeout=5) for f in futures] == [f"ok:/sc {i}" for i in range(12)]
+    stats = pool.get_stats()
+    assert FakeClient.peak <= 2
+    assert stats["retries"] >= 1 and stats["errors"] == 0
+    assert stats["per_agent"] == {"agent_0": 6, "agent_1": 6}
+    pool.close()
+
+    pool = RconPool(lambda: FakeClient(fail_with=RCONReceiveError("timeout")), size=1)
+    with pytest.raises(RCONReceiveError):
+        pool.send_command("/sc 1")
+    assert pool.get_stats()["retries"] == 0
+    pool.close()
+
+
+def test_pool_drops_cancelled_requests():
+    """Test that a request cancelled while another is in flight is skipped without stopping the I/O thread."""
+    release = threading.Event()
+
+    class GatedClient(FakeClient):
+        def send_commands(self, commands):
+            release.wait(5)
+            return {key: f"ok:{command}" for key, command in commands.items()}
+
+    pool = RconPool(GatedClient, size=1, max_in_flight=1)
+    first = pool.submit("/sc 1")
+    time.sleep(0.05)  # first is in flight, the next ones queue
+    cancelled = pool.submit("/sc 2")
+    assert cancelled.cancel()
+    release.set()
+    assert first.result(timeout=5) == "ok:/sc 1"
+    assert pool.submit("/sc 3").result(timeout=5) == "ok:/sc 3"
+    assert pool.get_stats()["commands"] == 2
+    pool.close()
+
+
+def test_pool_retry_keeps_flow_order():
+    """Test that a command re-queued after a send failure still goes out before its flow's later commands."""
+    release = threading.Event()
+    sent = []
+
+    class FailingClient(FakeClient):
+        def send_commands(self, commands):
+            release.wait(5)
+            raise RCONSendError("broken pipe")
+
+    class RecordingClient(FakeClient):
+        def send_commands(self, commands):
+            sent.extend(commands.values())
+            return {key: f"ok:{command}" for key, command in commands.items()}
+
+    clients = [FailingClient()]
+    pool = RconPool(lambda: clients.pop(0) if clients else RecordingClient(), size=1, max_in_flight=1)
+    agent = pool.handle("agent_1")
+    walk = agent.submit("/sc walk", "action")
+    time.sleep(0.05)  # walk is in flight on the failing connection
+    stop = agent.submit("/sc stop", "action")
+    release.set()
+    assert walk.result(timeout=5) == "ok:/sc walk" and stop.result(timeout=5) == "ok:/sc stop"
+    assert sent == ["/sc walk", "/sc stop"]
+    assert pool.get_stats()["retries"] == 1
+    pool.close()
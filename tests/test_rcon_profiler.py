@@ -0,0 +1,47 @@
+"""Tests for per-method RCON and action profiling."""
+
+import json
+import threading
+
+from FactoryVerse.infra.action_registry import ActionRegistry
+
+
+async def test_profile_records_calls_decode_and_completion(fake_factory, tmp_path):
+    """Test per-method counters inside profile(), completion ticks, the table and the session files."""
+    registry = ActionRegistry()
+
+    def respond(command):
+        """Answer inspect, and enqueue crafts that complete over the registry like the UDP thread."""
+        if "craft_enqueue" in command:
+            threading.Thread(target=registry.complete, args=("craft_1", {
+                "action_type": "craft_enqueue", "status": "completed", "success": True,
+                "result": {"actual_ticks": 30, "products": []},
+            })).start()
+            return {"queued": True, "action_id": "craft_1"}
+        return {"position": {"x": 0, "y": 0}}
+
+    factory = fake_factory(respond, registry=registry)
+
+    factory.execute(factory._build_command("inspect"))  # not profiled
+    with factory.profile() as profiler:
+        for _ in range(3):
+            factory._execute_and_parse_json(factory._build_command("inspect"))
+        response = await factory._call_async("craft_enqueue", "iron-gear-wheel", 1)
+        await factory._await_action(response, timeout=5)
+    assert factory.profiler is None
+
+    summary = profiler.summary()
+    inspect = summary["inspect"]
+    assert inspect["calls"] == 3 and inspect["errors"] == 0
+    assert inspect["request_bytes"] > 0 and inspect["response_bytes"] > 0
+    assert inspect["rtt_ms"]["count"] == 3 and inspect["decode_ms"]["count"] == 3
+
+    craft = summary["craft_enqueue"]
+    assert craft["calls"] == 1
+    assert craft["completion_ms"]["count"] == 1 and craft["completion_ticks"]["mean"] == 30
+
+    assert "inspect" in profiler.format_table()
+    json_path = profiler.write(tmp_path / "rcon_profile")
+    assert json.loads(json_path.read_text())["inspect"]["calls"] == 3
+    assert (tmp_path / "rcon_profile.txt").exists()
+    registry.close()
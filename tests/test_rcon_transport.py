@@ -0,0 +1,102 @@
+"""Tests for the threaded RCON transport."""
+
+import asyncio
+import time
+
+import pytest
+from factorio_rcon import RCONClient, RCONSendError
+
+from FactoryVerse.infra.rcon_transport import RconTransport
+
+
+class SlowRcon(RCONClient):
+    """RCONClient whose pipelined round trip takes a fixed latency."""
+
+    def __init__(self, latency=0.05):
+        super().__init__("localhost", 0, "", connect_on_init=False)
+        self.latency = latency
+        self.fail = False
+
+    def send_commands(self, commands):
+        time.sleep(self.latency)
+        if self.fail:
+            raise RCONSendError("connection reset")
+        return {key: f"ok:{command}" for key, command in commands.items()}
+
+
+async def test_concurrent_commands_overlap_without_blocking_the_loop():
+    """Test that concurrent awaits share pipelined round trips while the event loop keeps running."""
+    client = SlowRcon()
+    transport = RconTransport.for_client(client)
+    assert RconTransport.for_client(client) is transport and RconTransport.for_client(transport) is transport
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.create_task(ticker())
+    start = time.monotonic()
+    responses = await asyncio.gather(*(transport.send_command_async(f"/sc {i}") for i in range(20)))
+    elapsed = time.monotonic() - start
+    ticking.cancel()
+
+    assert responses == [f"ok:/sc {i}" for i in range(20)]
+    assert elapsed < 20 * client.latency / 2
+    assert transport.stats["round_trips"] < 20 and transport.stats["commands"] == 20
+    assert ticks > 3
+    assert transport.send_command("/sc x") == "ok:/sc x"
+    transport.close()
+    assert not transport.is_running
+
+
+async def test_send_errors_fail_only_the_affected_commands():
+    """Test that a failed round trip raises for its commands and later commands still go through."""
+    client = SlowRcon(latency=0)
+    transport = RconTransport(client)
+    client.fail = True
+    with pytest.raises(RCONSendError):
+        await transport.send_command_async("/sc 1")
+    client.fail = False
+    assert await transport.send_command_async("/sc 2") == "ok:/sc 2"
+    assert transport.stats["errors"] == 1
+    transport.close()
+
+
+def test_unreferenced_transport_releases_client_and_thread(monkeypatch):
+    """Test that a dropped transport lets its client be collected and its I/O thread exit."""
+    import gc
+    import weakref
+
+    from FactoryVerse.infra import rcon_transport
+
+    monkeypatch.setattr(rcon_transport, "IDLE_CHECK_INTERVAL", 0.01)
+    client = SlowRcon(latency=0)
+    transport = RconTransport.for_client(client)
+    assert transport.send_command("/sc 1") == "ok:/sc 1"
+    thread, client_ref = transport._thread, weakref.ref(client)
+
+    del transport, client
+    gc.collect()
+    thread.join(timeout=2)
+    assert not thread.is_alive() and client_ref() is None
+
+
+async def test_async_craft_validates_recipe_before_sending(fake_factory):
+    """Test that crafting.craft() rejects recipes craft_enqueue() would, without a round trip."""
+    from FactoryVerse.dsl.recipe.base import Recipes
+
+    factory = fake_factory(lambda command: {"queued": True, "action_id": "craft_1"})
+    factory.recipes = Recipes([
+        {"name": "iron-plate", "category": "smelting", "ingredients": [{"name": "iron-ore"}]},
+        {"name": "engine-unit", "enabled": False, "ingredients": [{"name": "pipe"}]},
+    ])
+
+    with pytest.raises(ValueError, match="not hand-craftable"):
+        await factory.crafting.craft("iron-plate")
+    with pytest.raises(ValueError, match="not enabled"):
+        await factory.crafting.craft("engine-unit")
+    assert factory._rcon.client.commands == []
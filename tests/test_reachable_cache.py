@@ -0,0 +1,74 @@
+"""Tests for the tick-scoped reachable snapshot cache."""
+
+from FactoryVerse.dsl.types import MapPosition
+
+SNAPSHOT = {
+    "tick": 600,
+    "agent_position": {"x": 0.5, "y": 0.5},
+    "entities": [],
+    "resources": [{"name": "iron-ore", "position": {"x": 2.5, "y": 1.5}, "amount": 500}],
+}
+
+
+def test_reachable_snapshot_reused_until_invalidated(fake_factory):
+    """Test cache hits, fresh=True, nearby/far entity operations, and invalidation by the agent's own actions."""
+    reachable_calls = []
+
+    def respond(command):
+        if "get_reachable" in command:
+            reachable_calls.append(command)
+            return SNAPSHOT
+        return {"success": True}
+
+    factory = fake_factory(respond)
+
+    assert factory.reachable_resources.get_resource("iron-ore") is not None
+    factory.reachable_resources.get_resources()
+    factory.reachable_entities.get_entities()
+    assert len(reachable_calls) == 1
+
+    factory.reachable_resources.get_resources(fresh=True)
+    assert len(reachable_calls) == 2
+
+    # An operation far away keeps the snapshot, one within reach drops it
+    factory._reachable_cache.on_entity_operation({"entity_key": "(stone-furnace:100.0,100.0)"})
+    factory.reachable_entities.get_entities()
+    assert len(reachable_calls) == 2
+    factory._reachable_cache.on_entity_operation({"entity": {"position": {"x": 3, "y": 3}}})
+    factory.reachable_entities.get_entities()
+    assert len(reachable_calls) == 3
+
+    # The agent's own state-changing calls invalidate as well
+    factory._build_command("place_entity", "stone-furnace", {"x": 1, "y": 1})
+    factory.reachable_entities.get_entities()
+    assert len(reachable_calls) == 4
+
+    # Moving to another cell misses the cache
+    factory._reachable_cache.note_position({"x": 5.5, "y": 0.5})
+    factory.reachable_entities.get_entities()
+    assert len(reachable_calls) == 5
+
+
+def test_reachable_entities_built_on_access(fake_factory, monkeypatch):
+    """Test that lookups by name and position only build the entities they return."""
+    import FactoryVerse.dsl.entity.base as entity_base
+
+    snapshot = dict(SNAPSHOT, entities=[
+        {"name": "stone-furnace", "type": "furnace", "position": {"x": float(x), "y": 2.0}, "status": "working"}
+        for x in range(50)
+    ] + [{"name": "wooden-chest", "type": "container", "position": {"x": 3.5, "y": 4.5}}])
+
+    built = []
+    create = entity_base.create_entity_from_data
+    monkeypatch.setattr(entity_base, "create_entity_from_data", lambda data: built.append(data) or create(data))
+    factory = fake_factory(lambda command: snapshot)
+
+    chest = factory.reachable_entities.get_entity("wooden-chest")
+    assert chest.name == "wooden-chest" and len(built) == 1
+    furnace = factory.reachable_entities.get_entity("stone-furnace", MapPosition(x=7, y=2))
+    assert furnace.position == MapPosition(x=7, y=2) and len(built) == 2
+    assert factory.reachable_entities.get_entity("stone-furnace", MapPosition(x=7, y=3)) is None
+
+    furnaces = factory.reachable_entities.get_entities("stone-furnace", options={"status": "working"})
+    assert len(furnaces) == 50 and len(built) == 51
+    assert furnaces[7] is furnace  # built once per snapshot
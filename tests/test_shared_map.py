@@ -0,0 +1,78 @@
+"""Tests for the shared map node's replica publishing."""
+
+import duckdb
+
+from FactoryVerse.infra import shared_map
+from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.shared_map import MapReplica, SharedMapNode
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+
+def _node(tmp_path):
+    """SharedMapNode wired to a small writable DB without loading snapshots."""
+    node = SharedMapNode(tmp_path / "map.duckdb", tmp_path / "snapshots", replica_dir=tmp_path / "replicas", keep_replicas=2)
+    node.replica_dir.mkdir()
+    node.db = duckdb.connect(str(node.db_path))
+    node.db.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    node.db.execute("INSERT INTO resource_entity VALUES ('tree-a')")
+    node.sync = GameDataSyncService("shared_map", node.db, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    return node
+
+
+async def test_replica_follows_published_versions(tmp_path):
+    """Test that agents see new data only after the node publishes it."""
+    node = _node(tmp_path)
+    assert await node.publish() is not None
+    assert await node.publish() is None  # Nothing changed
+
+    replica = MapReplica(node.replica_dir)
+    assert replica.connection.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 1
+
+    node.db.execute("INSERT INTO resource_entity VALUES ('tree-b')")
+    await node.sync._process_update("chunk_charted", {"sequence": 1})
+    assert not replica.refresh()  # Not published yet
+    await node.publish()
+
+    assert replica.refresh()
+    assert replica.connection.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 2
+    assert replica.watermark["sequence"] == 1
+
+    # Older replica files are pruned
+    node.db.execute("INSERT INTO resource_entity VALUES ('tree-c')")
+    await node.sync._process_update("chunk_charted", {"sequence": 2})
+    await node.publish()
+    assert len(list(node.replica_dir.glob("map-*.duckdb"))) == 2
+
+    replica.close()
+    node.db.close()
+
+
+async def test_in_process_reader_sees_writes(tmp_path):
+    """Test that in-process readers share the node's database through cursors."""
+    node = _node(tmp_path)
+    reader = node.reader()
+    node.db.execute("INSERT INTO resource_entity VALUES ('tree-b')")
+    assert reader.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 2
+    reader.close()
+    node.db.close()
+
+
+async def test_publish_copies_a_snapshot_outside_the_write_lock(tmp_path, monkeypatch):
+    """Test that writes go on during the copy and the replica holds the state pinned under the lock."""
+    node = _node(tmp_path)
+    copy_snapshot = shared_map._copy_snapshot
+
+    def copy_while_writing(cursor, path):
+        assert not node.sync._write_lock.locked()
+        node.db.execute("INSERT INTO resource_entity VALUES ('tree-late')")
+        copy_snapshot(cursor, path)
+
+    monkeypatch.setattr(shared_map, "_copy_snapshot", copy_while_writing)
+    await node.publish()
+
+    replica = MapReplica(node.replica_dir)
+    assert replica.connection.execute("SELECT entity_key FROM resource_entity").fetchall() == [("tree-a",)]
+    assert node.db.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 2
+    assert not list(node.replica_dir.glob(".*.tmp"))
+    replica.close()
+    node.db.close()
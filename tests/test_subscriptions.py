@@ -0,0 +1,97 @@
+"""Tests for standing query subscriptions."""
+
+import json
+
+import duckdb
+
+from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.subscriptions import SqlPredicate, StatusPredicate, SubscriptionManager
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+
+def _map_db():
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE map_entity (entity_key VARCHAR, entity_name VARCHAR, fuel INTEGER)")
+    con.execute("INSERT INTO map_entity VALUES ('(furnace:0,0)', 'stone-furnace', 5), ('(furnace:2,0)', 'stone-furnace', 0)")
+    return con
+
+
+def test_sql_subscription_reports_transitions_for_touched_keys_only():
+    """Test that a SQL predicate is re-evaluated for touched keys and reports each flip once."""
+    con = _map_db()
+    received = []
+    manager = SubscriptionManager(agent_id="agent_1")
+    matching = manager.add(
+        "out_of_fuel", SqlPredicate("SELECT entity_key, fuel FROM map_entity WHERE fuel = 0;"),
+        received.append, con, {}, notify_initial=True, tick=10,
+    )
+    assert matching == 1 and received[0]["data"]["entity_key"] == "(furnace:2,0)"
+    received.clear()
+
+    con.execute("UPDATE map_entity SET fuel = 0 WHERE entity_key = '(furnace:0,0)'")
+    con.execute("UPDATE map_entity SET fuel = 3 WHERE entity_key = '(furnace:2,0)'")
+    # Only furnace 0 was touched: furnace 2's flip is not seen yet
+    assert manager.evaluate(con, {"(furnace:0,0)"}, set(), {}, tick=20) == 1
+    assert received[0]["notification_type"] == "subscription"
+    assert received[0]["data"] == {
+        "subscription": "out_of_fuel", "entity_key": "(furnace:0,0)", "transition": "became_true",
+        "row": {"entity_key": "(furnace:0,0)", "fuel": 0},
+    }
+
+    assert manager.evaluate(con, {"(furnace:0,0)", "(furnace:2,0)"}, set(), {}, tick=30) == 1
+    assert received[-1]["data"]["transition"] == "became_false"
+    assert received[-1]["data"]["entity_key"] == "(furnace:2,0)"
+    assert manager.stats["transitions"] == 2
+
+
+def test_status_subscription_follows_status_changes():
+    """Test that a status predicate reacts to status transitions and is filtered by entity name."""
+    con = _map_db()
+    received = []
+    manager = SubscriptionManager()
+    predicate = StatusPredicate({"no_minable_resources"}, entity_names={"burner-mining-drill"})
+    manager.add("drills_out_of_ore", predicate, received.append, con, {})
+    assert manager.watches_status
+
+    statuses = {
+        "(burner-mining-drill:4,4)": {"status": "no_minable_resources", "name": "burner-mining-drill", "x": 4, "y": 4},
+        "(electric-mining-drill:8,8)": {"status": "no_minable_resources", "name": "electric-mining-drill", "x": 8, "y": 8},
+    }
+    assert manager.evaluate(con, set(), set(statuses), statuses, tick=60) == 1
+    assert received[0]["data"]["entity_key"] == "(burner-mining-drill:4,4)"
+
+    # Entity destroyed: status disappears from the snapshot
+    assert manager.evaluate(con, set(), {"(burner-mining-drill:4,4)"}, {}, tick=120) == 1
+    assert received[-1]["data"]["transition"] == "became_false"
+    assert manager.remove("drills_out_of_ore") and not manager.watches_status
+
+
+async def test_subscription_sees_entities_arriving_and_leaving_by_chunk_load(tmp_path):
+    """Test that chunk loads and re-snapshots count as touching the chunk's entities."""
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TYPE map_position AS STRUCT(x DOUBLE, y DOUBLE)")
+    con.execute("CREATE TABLE resource_tile (entity_key VARCHAR PRIMARY KEY, name VARCHAR, position map_position, amount INTEGER)")
+    con.execute("CREATE TABLE water_tile (entity_key VARCHAR PRIMARY KEY, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY, name VARCHAR, type VARCHAR, position map_position)")
+    con.execute("CREATE TABLE map_entity (entity_key VARCHAR PRIMARY KEY, entity_name VARCHAR, position map_position)")
+    for table in ("inserter", "transport_belt", "mining_drill", "assemblers", "pumpjack", "electric_pole"):
+        con.execute(f"CREATE TABLE {table} (entity_key VARCHAR)")
+    chunk_dir = tmp_path / "snapshots" / "0" / "0"
+    chunk_dir.mkdir(parents=True)
+    rocks = chunk_dir / "trees_rocks_init.jsonl"
+    rocks.write_text(json.dumps({"key": "rock-1", "name": "rock-big", "position": {"x": 2, "y": 1}}) + "\n")
+
+    received = []
+    service = GameDataSyncService("agent_1", con, tmp_path / "snapshots", udp_dispatcher=UDPDispatcher())
+    assert service.subscribe("rocks", "SELECT entity_key FROM resource_entity WHERE name = 'rock-big'", received.append) == 0
+
+    await service.reconcile_snapshot_files()
+    assert [(n["data"]["entity_key"], n["data"]["transition"]) for n in received] == [("rock-1", "became_true")]
+    received.clear()
+
+    rocks.write_text(json.dumps({"key": "rock-33", "name": "rock-big", "position": {"x": 9, "y": 1}}) + "\n")
+    await service.reconcile_snapshot_files()
+    assert sorted((n["data"]["entity_key"], n["data"]["transition"]) for n in received) == [
+        ("rock-1", "became_false"), ("rock-33", "became_true"),
+    ]
+    con.close()
@@ -0,0 +1,108 @@
+"""Tests for the applied-update journal and restart recovery."""
+
+import json
+
+import duckdb
+
+from FactoryVerse.dsl import dsl
+from FactoryVerse.dsl.agent import PlayingFactory
+from FactoryVerse.infra.game_data_sync import GameDataSyncService
+from FactoryVerse.infra.sync_journal import SyncJournal
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+
+def test_journal_load_returns_tail_after_checkpoint_and_ignores_torn_line(tmp_path):
+    """Test that load() returns the last checkpoint, the updates after it, and drops a torn write."""
+    journal = SyncJournal(tmp_path / "map.duckdb.journal.jsonl")
+    journal.append_update("chunk_charted", {"sequence": 1})
+    journal.write_checkpoint({"sequence": 1, "tick": 10})
+    journal.append_update("chunk_charted", {"sequence": 2})
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"kind": "update", "type": "chunk_cha')
+
+    checkpoint, tail = SyncJournal(journal.path).load()
+
+    assert checkpoint["sequence"] == 1
+    assert tail == [("chunk_charted", {"sequence": 2})]
+
+
+async def test_recover_from_journal_catches_up_only_on_new_log_entries(tmp_path):
+    """Test that a restarted service resumes from the checkpoint and replays only what it missed."""
+    db_path = tmp_path / "map.duckdb"
+    chunk_dir = tmp_path / "snapshots" / "0" / "0"
+    chunk_dir.mkdir(parents=True)
+    log_path = chunk_dir / "trees_rocks-update.jsonl"
+    log_path.write_text(json.dumps({"op": "remove", "key": "tree-c"}) + "\n")
+
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    for key in ("tree-a", "tree-b", "tree-d"):
+        con.execute("INSERT INTO resource_entity VALUES (?)", [key])
+    service = GameDataSyncService(
+        "agent_1", con, tmp_path / "snapshots",
+        udp_dispatcher=UDPDispatcher(), journal_path=SyncJournal.path_for(db_path),
+    )
+    assert service.mark_chunks_loaded_from_disk() == 1
+    await service._process_update("chunk_charted", {"sequence": 4, "tick": 240})
+    await service.checkpoint_journal()
+    await service._process_update("chunk_charted", {"sequence": 5, "tick": 300})
+    service._journal.close()
+    con.close()
+
+    # While down: one more removal is logged for the chunk
+    with open(log_path, "a") as f:
+        f.write(json.dumps({"op": "remove", "key": "tree-a"}) + "\n")
+
+    con = duckdb.connect(str(db_path))
+    restarted = GameDataSyncService(
+        "agent_1", con, tmp_path / "snapshots",
+        udp_dispatcher=UDPDispatcher(), journal_path=SyncJournal.path_for(db_path),
+    )
+    stats = await restarted.recover_from_journal()
+
+    assert stats["recovered"]
+    assert stats["tail_replayed"] == 1
+    assert stats["log_entries_replayed"] == 1
+    assert sorted(r[0] for r in con.execute("SELECT entity_key FROM resource_entity").fetchall()) == ["tree-b", "tree-d"]
+    assert restarted.get_watermark()["sequence"] == 5
+    assert restarted.get_watermark()["tick"] == 300
+    watermark = restarted.get_watermark()
+    assert watermark["applied"] == watermark["enqueued"]
+    restarted._count_enqueued({"sequence": 6})
+    assert not restarted.is_synced()
+    checkpoint, tail = SyncJournal(SyncJournal.path_for(db_path)).load()
+    assert checkpoint["sequence"] == 5 and tail == []
+    con.close()
+
+
+async def test_configure_resumes_from_journal_instead_of_full_load(tmp_path, fake_rcon, monkeypatch):
+    """Test that configure(db_path=...) recovers a checkpointed DB without calling the full loader."""
+    db_path = tmp_path / "map.duckdb"
+    (tmp_path / "snapshots" / "0" / "0").mkdir(parents=True)
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE TABLE resource_entity (entity_key VARCHAR PRIMARY KEY)")
+    con.execute("INSERT INTO resource_entity VALUES ('tree-a')")
+    service = GameDataSyncService(
+        "agent_1", con, tmp_path / "snapshots",
+        udp_dispatcher=UDPDispatcher(), journal_path=SyncJournal.path_for(db_path),
+    )
+    service.mark_chunks_loaded_from_disk()
+    await service._process_update("chunk_charted", {"sequence": 7, "tick": 420})
+    await service.checkpoint_journal()
+    service._journal.close()
+    con.close()
+
+    def full_load(*args, **kwargs):
+        raise AssertionError("configure() reloaded a DB it could resume")
+
+    monkeypatch.setattr(PlayingFactory, "_load_snapshots_sync", full_load)
+    monkeypatch.setattr(dsl, "_configured_factory", None)
+    dsl.configure(fake_rcon(lambda command: []), "agent_1", snapshot_dir=tmp_path / "snapshots", db_path=db_path)
+
+    sync = dsl._configured_factory._game_data_sync
+    assert sync is not None and not sync.is_running
+    assert sync.get_watermark()["sequence"] == 7
+    assert dsl._configured_factory._duckdb_connection.execute("SELECT count(*) FROM resource_entity").fetchone()[0] == 1
+    sync._journal.close()
+    dsl._configured_factory._duckdb_connection.close()
@@ -0,0 +1,46 @@
+"""Tests for sync-path latency metrics."""
+
+import json
+
+from FactoryVerse.infra.sync_metrics import LatencyHistogram, SyncMetrics
+
+
+def test_histogram_percentiles():
+    """Test that percentiles fall in the right buckets."""
+    hist = LatencyHistogram()
+    for _ in range(98):
+        hist.observe(3.0)
+    hist.observe(40.0)
+    hist.observe(400.0)
+
+    assert hist.count == 100
+    assert hist.percentile(50) == 5
+    assert hist.percentile(99) == 50
+    assert hist.percentile(100) == 400.0
+    assert hist.fraction_below(5) == 0.98
+
+
+def test_record_and_slo(tmp_path):
+    """Test per-op histograms, tick lag and the JSONL sink."""
+    sink = tmp_path / "metrics.jsonl"
+    metrics = SyncMetrics(sink_path=sink)
+
+    # Two updates 1s apart in game time, second one committed 30ms later than the first
+    metrics.record("entity_operation.created", tick=600, arrived_at=100.000, dequeued_at=100.002,
+                   committed_at=100.004, queue_depth=0)
+    metrics.record("entity_operation.created", tick=660, arrived_at=101.010, dequeued_at=101.030,
+                   committed_at=101.034, queue_depth=4)
+    metrics.close()
+
+    stats = metrics.get_stats()
+    visible = stats["visible_ms"]["entity_operation.created"]
+    assert visible["count"] == 2
+    assert round(visible["max"]) == 24
+    assert round(stats["tick_lag_ms"]["entity_operation.created"]["max"]) == 30
+    assert stats["queue_depth"]["max"] == 4
+    assert metrics.check_slo("entity_operation.created", 50) is True
+    assert metrics.check_slo("entity_operation.created", 10) is False
+    assert metrics.check_slo("file_io.appended", 50) is None
+
+    lines = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert [line["tick"] for line in lines] == [600, 660]
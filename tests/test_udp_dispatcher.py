@@ -0,0 +1,70 @@
+"""Tests for UDP dispatcher framing (batches and fragments)."""
+
+import json
+
+from FactoryVerse.infra.udp_dispatcher import UDPDispatcher
+
+ADDR = ("127.0.0.1", 5000)
+
+
+def _collecting_dispatcher(**kwargs):
+    dispatcher = UDPDispatcher(**kwargs)
+    received = []
+    dispatcher.subscribe("*", received.append)
+    return dispatcher, received
+
+
+def test_single_json_packet_still_dispatched():
+    """Test that plain single-JSON datagrams keep working."""
+    dispatcher, received = _collecting_dispatcher()
+    dispatcher._process_message(b'{"event_type": "chunk_charted", "chunk": {"x": 1, "y": 2}}', ADDR)
+    assert received == [{"event_type": "chunk_charted", "chunk": {"x": 1, "y": 2}}]
+
+
+def test_batch_envelope_dispatches_each_event():
+    """Test that a batch envelope is unwrapped into individual events."""
+    dispatcher, received = _collecting_dispatcher()
+    typed = []
+    dispatcher.subscribe("entity_operation", typed.append)
+
+    batch = {
+        "event_type": "batch",
+        "events": [
+            {"event_type": "entity_operation", "op": "created", "sequence": 1},
+            {"event_type": "entity_operation", "op": "destroyed", "sequence": 2},
+            {"event_type": "chunk_charted", "sequence": 3},
+        ],
+    }
+    dispatcher._process_message(json.dumps(batch).encode(), ADDR)
+
+    assert [e["sequence"] for e in received] == [1, 2, 3]
+    assert [e["op"] for e in typed] == ["created", "destroyed"]
+    assert dispatcher.framing_stats["batched_events"] == 3
+
+
+def test_fragments_reassembled_out_of_order():
+    """Test that fragments are buffered and joined regardless of arrival order."""
+    dispatcher, received = _collecting_dispatcher()
+    document = json.dumps({"event_type": "file_io", "entities": ["x" * 50] * 20})
+    size = len(document) // 3 + 1
+    parts = [document[i:i + size] for i in range(0, len(document), size)]
+
+    for index in (2, 0, 1):
+        frame = {"event_type": "fragment", "msg_id": 7, "index": index, "count": len(parts), "data": parts[index]}
+        dispatcher._process_message(json.dumps(frame).encode(), ADDR)
+
+    assert received == [json.loads(document)]
+    assert dispatcher._fragments == {}
+
+
+def test_incomplete_fragments_expire():
+    """Test that incomplete messages are dropped after the timeout."""
+    dispatcher, received = _collecting_dispatcher(fragment_timeout=0.0)
+    frame = {"event_type": "fragment", "msg_id": 1, "index": 0, "count": 2, "data": "{\"event_type\""}
+    dispatcher._process_message(json.dumps(frame).encode(), ADDR)
+
+    dispatcher._expire_fragments()
+
+    assert received == []
+    assert dispatcher._fragments == {}
+    assert dispatcher.framing_stats["fragments_expired"] == 1